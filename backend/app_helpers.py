@@ -15,7 +15,9 @@ import os
 import re
 import tempfile
 import threading
+import time
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from email.message import EmailMessage
 from functools import wraps
@@ -37,8 +39,38 @@ from flask_jwt_extended import get_jwt, get_jwt_identity, jwt_required
 from marshmallow import ValidationError
 from werkzeug.exceptions import BadRequest
 
+import json_snapshots
 from data_access import DataAccessLayer
-from recommendation_engine import RecommendationEngine
+from dal.knowledge import knowledge_summary
+from recommendation_engine import NUMPY_AVAILABLE, RecommendationEngine, TfidfModel
+from blueprints.metrics_defs import (
+    AUDIT_LOG_DROPPED,
+    AUDIT_LOG_FLUSH_DURATION,
+    AUDIT_LOG_QUEUE_DEPTH,
+    AUDIT_LOG_WRITTEN,
+)
+from services.audit_log_store import flush_all_stores, get_audit_log_store
+from services.audit_log_writer import AuditLogWriter
+from services.derived_index import DerivedIndexRegistry
+from knowledge_events import (
+    CREATED,
+    DELETED,
+    apply_changes,
+    file_version,
+    knowledge_events,
+)
+from services.knowledge_facets import KnowledgeFacets
+if NUMPY_AVAILABLE:
+    from services.interaction_matrix import InteractionMatrix
+from services.related_items import RelatedItemsTable, related_items_path
+from services.search_index import (
+    INCIDENT_FIELD_WEIGHTS,
+    KNOWLEDGE_FIELD_WEIGHTS,
+    SOP_FIELD_WEIGHTS,
+    SearchIndex,
+    parse_query,
+)
+from services.view_counters import VIEW_ACTIONS, PopularityIndex, ViewCounters
 
 logger = logging.getLogger(__name__)
 
@@ -49,8 +81,9 @@ logger = logging.getLogger(__name__)
 _file_lock = threading.RLock()
 _token_blacklist: set = set()
 _dal = None
-_access_log_queue: list = []
+_access_log_queue: list = []  # (data_dir, entry) のタプル
 _access_log_queue_lock = threading.Lock()
+_audit_log_writer = None
 
 # 環境設定
 MKS_ENV = os.environ.get("MKS_ENV", "development")
@@ -60,6 +93,12 @@ IS_PRODUCTION = MKS_ENV.lower() == "production"
 _base_dir = os.path.dirname(os.path.abspath(__file__))
 DEFAULT_DATA_DIR = os.path.join(_base_dir, "data")
 
+# 監査ログ非同期書き込み設定
+AUDIT_LOG_ASYNC = os.getenv("MKS_AUDIT_LOG_ASYNC", "true").lower() in ("true", "1", "yes")
+AUDIT_LOG_QUEUE_MAX = int(os.getenv("MKS_AUDIT_LOG_QUEUE_MAX", 10000))
+AUDIT_LOG_BATCH_SIZE = int(os.getenv("MKS_AUDIT_LOG_BATCH_SIZE", 500))
+AUDIT_LOG_FLUSH_INTERVAL = float(os.getenv("MKS_AUDIT_LOG_FLUSH_INTERVAL", 1.0))
+
 # ================================================================
 # Redis キャッシュ設定
 # ================================================================
@@ -156,8 +195,71 @@ def get_dal() -> DataAccessLayer:
 # ================================================================
 
 
+# 世代番号でまとめて無効化するキー（プレフィックス → 依存するファミリー）
+# 無効化は世代番号の INCR 1回で済み、古い世代のキーは TTL で消える
+CACHE_KEY_FAMILIES = {
+    "knowledge_list": ("knowledge",),
+    "knowledge_popular": ("knowledge",),
+    "knowledge_tags": ("knowledge",),
+    "knowledge_recent": ("knowledge",),
+    "knowledge_related": ("knowledge",),
+    "knowledge_search": ("knowledge",),
+    "knowledge_dal_list": ("knowledge",),
+    "sop_list": ("sop",),
+    "incidents_list": ("incidents",),
+    "projects_list": ("projects",),
+    "experts_list": ("experts",),
+    "experts_dal_list": ("experts",),
+    "search": ("knowledge", "sop", "incidents"),
+    "dashboard_stats": ("knowledge", "sop", "incidents"),
+}
+_CACHE_GENERATION_KEY = "cache_gen:{}"
+
+# タグ集合（タグ → キャッシュキーの集合）。個別エンティティの詳細キーを狙って削除する
+_CACHE_TAG_KEY = "cache_tag:{}"
+# タグ集合の TTL（タグ付きキーの最長 TTL 以上にする）
+_CACHE_TAG_TTL = CACHE_TTL_VERY_LONG
+
+_cache_purge_pool = None
+_cache_purge_pool_lock = threading.Lock()
+
+
+def get_cache_generation(family: str) -> int:
+    """キーファミリーの世代番号（Redis未接続時は 0）"""
+    if not CACHE_ENABLED or not redis_client:
+        return 0
+    try:
+        value = redis_client.get(_CACHE_GENERATION_KEY.format(family))
+        return int(value) if value else 0
+    except Exception:
+        return 0
+
+
+def _get_cache_generations(families) -> list:
+    """複数ファミリーの世代番号を MGET 1回で取得（Redis未接続時は 0）"""
+    if not CACHE_ENABLED or not redis_client:
+        return [0] * len(families)
+    try:
+        values = redis_client.mget([_CACHE_GENERATION_KEY.format(f) for f in families])
+        return [int(v) if v else 0 for v in values]
+    except Exception:
+        return [0] * len(families)
+
+
+def bump_cache_generation(family: str):
+    """キーファミリーの世代番号を進める（既存キャッシュをまとめて無効化）"""
+    redis_client.incr(_CACHE_GENERATION_KEY.format(family))
+
+
 def get_cache_key(prefix, *args) -> str:
-    """キャッシュキー生成"""
+    """キャッシュキー生成（ファミリーに属するキーには世代番号を含める）"""
+    families = CACHE_KEY_FAMILIES.get(prefix, ())
+    if len(families) == 1:
+        generations = [get_cache_generation(families[0])]
+    else:
+        generations = _get_cache_generations(families) if families else []
+    if any(generations):
+        prefix = f"{prefix}@{'.'.join(str(g) for g in generations)}"
     return f"{prefix}:{':'.join(str(arg) for arg in args)}"
 
 
@@ -172,36 +274,82 @@ def cache_get(key):
         return None
 
 
-def cache_set(key, value, ttl=CACHE_TTL):
-    """キャッシュ設定"""
+def cache_set(key, value, ttl=CACHE_TTL, tags=()):
+    """キャッシュ設定
+
+    tags を指定するとタグ集合にキーを登録する（purge_cache_tags で個別に削除できる）。
+    """
     if not CACHE_ENABLED or not redis_client:
         return
     try:
-        redis_client.setex(key, ttl, json.dumps(value))
+        payload = json.dumps(value)
+        if not tags:
+            redis_client.setex(key, ttl, payload)
+            return
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.setex(key, ttl, payload)
+        for tag in tags:
+            tag_key = _CACHE_TAG_KEY.format(tag)
+            pipe.sadd(tag_key, key)
+            pipe.expire(tag_key, _CACHE_TAG_TTL)
+        pipe.execute()
     except Exception as e:
         logger.debug("Redis cache write failed for key: %s - %s", key, str(e))
 
 
+def purge_cache_tags(*tags):
+    """タグ付きキーをバックグラウンドで削除する（リクエストスレッドは投入のみ）
+
+    Returns:
+        削除処理の Future（Redis未接続時は None）
+    """
+    global _cache_purge_pool
+    if not redis_client or not tags:
+        return None
+    with _cache_purge_pool_lock:
+        if _cache_purge_pool is None:
+            _cache_purge_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache-purge")
+    return _cache_purge_pool.submit(_purge_cache_tags, tags)
+
+
+def _purge_cache_tags(tags):
+    """タグ集合の読み出しと削除を MULTI で行い、対象キーをパイプラインでまとめて DEL"""
+    try:
+        tag_keys = [_CACHE_TAG_KEY.format(tag) for tag in tags]
+        pipe = redis_client.pipeline(transaction=True)
+        for tag_key in tag_keys:
+            pipe.smembers(tag_key)
+        pipe.delete(*tag_keys)
+        members = pipe.execute()[:-1]
+
+        keys = set().union(*members)
+        if keys:
+            pipe = redis_client.pipeline(transaction=False)
+            for key in keys:
+                pipe.delete(key)
+            pipe.execute()
+        logger.debug("Cache purged: tags=%s keys=%d", tags, len(keys))
+    except Exception as e:
+        logger.warning("Cache tag purge failed: %s", e)
+
+
 class CacheInvalidator:
-    """集中キャッシュ無効化ロジック（Phase G-6）"""
+    """集中キャッシュ無効化ロジック（Phase G-6）
+
+    一覧系のキーは世代番号（INCR 1回）、個別エンティティの詳細キーはタグで無効化する。
+    キー走査（SCAN）は行わないため、キャッシュ件数に関係なく書き込み側のコストは一定。
+    """
 
     @staticmethod
     def invalidate_knowledge(knowledge_id=None):
-        """ナレッジ関連キャッシュ無効化"""
+        """ナレッジ関連キャッシュ無効化（世代番号を進めるだけでキー走査はしない）
+
+        他のナレッジの関連アイテムにも変更が影響するため、ID指定時もファミリー全体を無効化する。
+        """
         if not redis_client:
             return
         try:
-            patterns = [
-                "knowledge_list:*",
-                "knowledge_popular:*",
-                "knowledge_tags",
-                "knowledge_recent:*",
-            ]
-            if knowledge_id:
-                patterns.append(f"knowledge_related:{knowledge_id}:*")
-            for pattern in patterns:
-                for key in redis_client.scan_iter(pattern):
-                    redis_client.delete(key)
+            bump_cache_generation("knowledge")
             logger.info("Cache invalidated: knowledge (id=%s)", knowledge_id or "all")
         except Exception as e:
             logger.warning("Cache invalidation failed: %s", e)
@@ -211,15 +359,9 @@ class CacheInvalidator:
         if not redis_client:
             return
         try:
-            patterns = ["projects_list:*"]
+            bump_cache_generation("projects")
             if project_id:
-                patterns.extend([
-                    f"projects_detail:{project_id}",
-                    f"projects_progress:{project_id}",
-                ])
-            for pattern in patterns:
-                for key in redis_client.scan_iter(pattern):
-                    redis_client.delete(key)
+                purge_cache_tags(f"projects:{project_id}")
             logger.info("Cache invalidated: projects (id=%s)", project_id or "all")
         except Exception as e:
             logger.warning("Cache invalidation failed: %s", e)
@@ -229,12 +371,9 @@ class CacheInvalidator:
         if not redis_client:
             return
         try:
-            patterns = ["experts_list:*", "experts_stats"]
+            bump_cache_generation("experts")
             if expert_id:
-                patterns.extend([f"experts_detail:{expert_id}"])
-            for pattern in patterns:
-                for key in redis_client.scan_iter(pattern):
-                    redis_client.delete(key)
+                purge_cache_tags(f"experts:{expert_id}")
             logger.info("Cache invalidated: experts (id=%s)", expert_id or "all")
         except Exception as e:
             logger.warning("Cache invalidation failed: %s", e)
@@ -244,12 +383,8 @@ class CacheInvalidator:
         if not redis_client:
             return
         try:
-            patterns = []
             if reg_id:
-                patterns.append(f"regulations_detail:{reg_id}")
-            for pattern in patterns:
-                for key in redis_client.scan_iter(pattern):
-                    redis_client.delete(key)
+                purge_cache_tags(f"regulations:{reg_id}")
             logger.info("Cache invalidated: regulations (id=%s)", reg_id or "all")
         except Exception as e:
             logger.warning("Cache invalidation failed: %s", e)
@@ -259,16 +394,23 @@ class CacheInvalidator:
         if not redis_client:
             return
         try:
-            patterns = ["sop_list"]
+            bump_cache_generation("sop")
             if sop_id:
-                patterns.append(f"sop_related:{sop_id}:*")
-            for pattern in patterns:
-                for key in redis_client.scan_iter(pattern):
-                    redis_client.delete(key)
+                purge_cache_tags(f"sop:{sop_id}")
             logger.info("Cache invalidated: sop (id=%s)", sop_id or "all")
         except Exception as e:
             logger.warning("Cache invalidation failed: %s", e)
 
+    @staticmethod
+    def invalidate_incidents(incident_id=None):
+        if not redis_client:
+            return
+        try:
+            bump_cache_generation("incidents")
+            logger.info("Cache invalidated: incidents (id=%s)", incident_id or "all")
+        except Exception as e:
+            logger.warning("Cache invalidation failed: %s", e)
+
 
 # ================================================================
 # ユーザー管理
@@ -496,24 +638,184 @@ def validate_request(schema_class):
 # ================================================================
 
 
+def get_access_log_store():
+    """現在のデータディレクトリに対応する監査ログストアを取得"""
+    return get_audit_log_store(get_data_dir())
+
+
+def iter_access_logs():
+    """監査ログをストリーミングで取得（PostgreSQLモードではDAL経由）"""
+    dal = get_dal()
+    if dal.use_postgresql:
+        try:
+            logs = dal.get_access_logs()
+        except Exception as e:
+            logger.error("PostgreSQL query error for access_logs: %s", e)
+            logger.info("Falling back to JSON mode for access_logs")
+        else:
+            yield from logs
+            return
+    yield from get_access_log_store().iter_records()
+
+
+_interaction_matrices: dict = {}  # データディレクトリ（PGは "postgresql"） -> (行列, カーソル)
+_interaction_matrices_lock = threading.Lock()
+INTERACTION_BATCH_SIZE = int(os.environ.get("MKS_INTERACTION_BATCH_SIZE", 50000))
+
+
+def get_interaction_matrix():
+    """協調フィルタリング用の閲覧行列を取得（監査ログの追記分だけを取り込む）
+
+    JSONモードでは監査ログストアのカーソル以降、PostgreSQLモードでは
+    前回取り込んだ最大IDより新しいログだけを INTERACTION_BATCH_SIZE 件ずつ読む。
+    初回の全件取り込みは start_interaction_matrix_warmup() でワーカー起動時に済ませておく。
+    NumPy 未導入時は None（推薦エンジンはログ走査による逐次計算にフォールバック）。
+    """
+    if not NUMPY_AVAILABLE:
+        return None
+
+    dal = get_dal()
+    with _interaction_matrices_lock:
+        if dal.use_postgresql:
+            matrix, cursor = _interaction_matrices.setdefault(
+                "postgresql", (InteractionMatrix(), {"last_id": 0})
+            )
+            while True:
+                try:
+                    logs = dal.get_access_logs(
+                        {"since_id": cursor["last_id"], "limit": INTERACTION_BATCH_SIZE}
+                    )
+                except Exception as e:
+                    logger.error("PostgreSQL query error for access_logs: %s", e)
+                    return matrix
+                matrix.ingest(logs)
+                cursor["last_id"] = max(
+                    [cursor["last_id"]] + [log["id"] for log in logs if log.get("id")]
+                )
+                if len(logs) < INTERACTION_BATCH_SIZE:
+                    return matrix
+
+        store = get_access_log_store()
+        entry = _interaction_matrices.get(store.base_dir)
+        if entry is None or not store.cursor_valid(entry[1]):
+            entry = (InteractionMatrix(), store.new_cursor())
+            _interaction_matrices[store.base_dir] = entry
+        matrix, cursor = entry
+        # iter_since はストリーミングで、行列側も一定件数ごとにマージするためメモリは一定
+        matrix.ingest(store.iter_since(cursor))
+        return matrix
+
+
+def start_interaction_matrix_warmup():
+    """閲覧行列の初回取り込みをバックグラウンドで開始（ワーカー起動時に呼ぶ）
+
+    取り込み中に届いた推薦リクエストはロックで完了を待つため、二重に読み込むことはない。
+    """
+    if not NUMPY_AVAILABLE:
+        return None
+
+    def _warmup():
+        try:
+            started = time.monotonic()
+            matrix = get_interaction_matrix()
+            logger.info(
+                "Interaction matrix warmed up: %d cells in %.1fs",
+                len(matrix),
+                time.monotonic() - started,
+            )
+        except Exception as e:
+            logger.warning("Interaction matrix warmup failed: %s: %s", type(e).__name__, e)
+
+    thread = threading.Thread(target=_warmup, name="interaction-matrix-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
 def _flush_access_logs():
-    """アクセスログをファイルに一括書き込み"""
+    """キュー内のアクセスログを監査ログストアにバッチ追記"""
     global _access_log_queue
     with _access_log_queue_lock:
         if not _access_log_queue:
             return
-        entries_to_write = _access_log_queue[:]
+        entries_to_write = _access_log_queue
         _access_log_queue = []
+    AUDIT_LOG_QUEUE_DEPTH.set(0)
 
-    try:
-        with _file_lock:
-            logs = load_data("access_logs.json")
-            for entry in entries_to_write:
-                entry["id"] = len(logs) + 1
-                logs.append(entry)
-            save_data("access_logs.json", logs)
-    except Exception as e:
-        logger.warning("_flush_access_logs failed: %s: %s", type(e).__name__, e)
+    # データディレクトリごとにまとめて書き込む
+    batches = defaultdict(list)
+    for data_dir, entry in entries_to_write:
+        batches[data_dir].append(entry)
+
+    for data_dir, entries in batches.items():
+        started = time.monotonic()
+        try:
+            store = get_audit_log_store(data_dir)
+            for i in range(0, len(entries), AUDIT_LOG_BATCH_SIZE):
+                store.append_many(entries[i:i + AUDIT_LOG_BATCH_SIZE])
+            AUDIT_LOG_WRITTEN.inc(len(entries))
+        except Exception as e:
+            AUDIT_LOG_DROPPED.labels(reason="write_error").inc(len(entries))
+            logger.warning("_flush_access_logs failed: %s: %s", type(e).__name__, e)
+        finally:
+            AUDIT_LOG_FLUSH_DURATION.observe(time.monotonic() - started)
+
+
+def _audit_log_async_enabled() -> bool:
+    """非同期書き込みを使うか（pytest実行中は書き込み直後の検証のため同期）"""
+    return AUDIT_LOG_ASYNC and not os.environ.get("PYTEST_CURRENT_TEST")
+
+
+def _get_audit_log_writer() -> AuditLogWriter:
+    """監査ログ書き込みワーカーを取得（fork後のワーカープロセスでは再起動）"""
+    global _audit_log_writer
+    if _audit_log_writer is None or not _audit_log_writer.is_alive():
+        with _access_log_queue_lock:
+            if _audit_log_writer is None or not _audit_log_writer.is_alive():
+                _audit_log_writer = AuditLogWriter(
+                    _flush_access_logs, flush_interval=AUDIT_LOG_FLUSH_INTERVAL
+                )
+                _audit_log_writer.start()
+    return _audit_log_writer
+
+
+def _enqueue_access_log(entry: dict):
+    """アクセスログをキューに積む（満杯時は破棄してカウント）"""
+    data_dir = get_data_dir()
+    with _access_log_queue_lock:
+        overflow = len(_access_log_queue) >= AUDIT_LOG_QUEUE_MAX
+        if not overflow:
+            _access_log_queue.append((data_dir, entry))
+        depth = len(_access_log_queue)
+    AUDIT_LOG_QUEUE_DEPTH.set(depth)
+
+    if overflow:
+        AUDIT_LOG_DROPPED.labels(reason="overflow").inc()
+        logger.warning(
+            "Audit log queue full (%d), dropping entry: %s",
+            AUDIT_LOG_QUEUE_MAX,
+            entry.get("action"),
+        )
+        return
+
+    if not _audit_log_async_enabled():
+        _flush_access_logs()
+        return
+
+    writer = _get_audit_log_writer()
+    if depth >= AUDIT_LOG_BATCH_SIZE:
+        writer.notify()
+
+
+def shutdown_audit_log_writer(timeout: float = 5.0):
+    """書き込みワーカーを停止し、キューを書き出して fsync する（gunicorn フック用）"""
+    global _audit_log_writer
+    writer = _audit_log_writer
+    _audit_log_writer = None
+    if writer is not None:
+        writer.stop(timeout)
+    else:
+        _flush_access_logs()
+    flush_all_stores()
 
 
 def log_access(
@@ -526,7 +828,7 @@ def log_access(
     old_value=None,
     new_value=None,
 ):
-    """詳細な監査ログを記録（全環境で書き込み）"""
+    """詳細な監査ログを記録（キュー経由でバックグラウンド書き込み）"""
     try:
         session_id = None
         try:
@@ -566,11 +868,9 @@ def log_access(
         if details:
             log_entry["details"] = details
 
-        with _file_lock:
-            logs = load_data("access_logs.json")
-            log_entry["id"] = len(logs) + 1
-            logs.append(log_entry)
-            save_data("access_logs.json", logs)
+        _enqueue_access_log(log_entry)
+        if status == "success":
+            record_view(action, resource_id)
     except Exception as e:
         logger.warning("log_access failed: %s: %s", type(e).__name__, e)
 
@@ -580,6 +880,30 @@ def log_access(
 # ================================================================
 
 
+def _parse_data_file(filepath: str) -> list:
+    """データファイルをパースし dict の要素だけを返す（load_data のキャッシュミス時）"""
+    filename = os.path.basename(filepath)
+    with open(filepath, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    if not isinstance(data, list):
+        logger.warning(
+            "%s: Expected list, got %s. Returning empty list.",
+            filename,
+            type(data).__name__,
+        )
+        return []
+
+    valid_items = [item for item in data if isinstance(item, dict)]
+    if len(valid_items) != len(data):
+        logger.warning(
+            "%s: Filtered out %d non-dict items",
+            filename,
+            len(data) - len(valid_items),
+        )
+    return valid_items
+
+
 def load_data(filename: str) -> list:
     """JSONファイルまたはPostgreSQLからデータを読み込む（透過的切り替え）"""
     dal = get_dal()
@@ -602,34 +926,22 @@ def load_data(filename: str) -> list:
             logger.error("PostgreSQL query error for %s: %s", filename, e)
             logger.info("Falling back to JSON mode for %s", filename)
 
+    if filename == "access_logs.json":
+        try:
+            return get_access_log_store().read_all()
+        except Exception as e:
+            logger.error("Unexpected error reading %s: %s: %s", filename, type(e).__name__, e)
+            return []
+
     filepath = os.path.join(get_data_dir(), filename)
 
     try:
         with _file_lock:
-            if not os.path.exists(filepath):
-                logger.info("File not found: %s (returning empty list)", filename)
-                return []
-
-            with open(filepath, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            if not isinstance(data, list):
-                logger.warning(
-                    "%s: Expected list, got %s. Returning empty list.",
-                    filename,
-                    type(data).__name__,
-                )
-                return []
-
-            valid_items = [item for item in data if isinstance(item, dict)]
-            if len(valid_items) != len(data):
-                logger.warning(
-                    "%s: Filtered out %d non-dict items",
-                    filename,
-                    len(data) - len(valid_items),
-                )
-
-            return valid_items
+            items = json_snapshots.load_list(filepath, _parse_data_file)
+        if items is None:
+            logger.info("File not found: %s (returning empty list)", filename)
+            return []
+        return items
 
     except json.JSONDecodeError as e:
         logger.error(
@@ -647,6 +959,114 @@ def load_data(filename: str) -> list:
         return []
 
 
+def load_item(filename: str, value, field: str = "id"):
+    """
+    フィールド値（既定は id）が一致する最初の要素を取得
+
+    JSONモードではスナップショットごとに構築する索引で引く（全件走査しない）。
+    PostgreSQLモードでは load_data の結果から探す。
+
+    Returns:
+        要素 dict（見つからない場合・読み込みエラー時は None）
+    """
+    dal = get_dal()
+    if dal.use_postgresql or filename == "access_logs.json":
+        return next((item for item in load_data(filename) if item.get(field) == value), None)
+
+    filepath = os.path.join(get_data_dir(), filename)
+    try:
+        with _file_lock:
+            return json_snapshots.find_one(filepath, _parse_data_file, field, value)
+    except Exception as e:
+        logger.error("Error reading %s: %s: %s", filename, type(e).__name__, e)
+        return None
+
+
+_PAGE_METHODS = {
+    "knowledge.json": "get_knowledge_page",
+    "sop.json": "get_sop_page",
+    "incidents.json": "get_incidents_page",
+    "approvals.json": "get_approvals_page",
+}
+
+
+def load_page(filename: str, filters: dict | None = None, **kwargs):
+    """
+    一覧を1ページ分取得（load_data のページング版）
+
+    フィルタ・ソート・キーセットカーソル・射影を DAL の get_*_page に渡し、
+    PostgreSQLモードではSQL、JSONモードではスナップショットごとのソート順で処理する。
+    PostgreSQLのエラー時は load_data と同様に JSON にフォールバックする。
+
+    Args:
+        filename: knowledge.json / sop.json / incidents.json / approvals.json
+        filters: 一致フィルタ
+        **kwargs: limit, cursor, sort, order, fields, offset
+
+    Returns:
+        (要素リスト, 次ページのカーソル, 総件数の見積もり)
+
+    Raises:
+        ValueError: 不正なカーソル
+    """
+    method = _PAGE_METHODS[filename]
+    dal = get_dal()
+    if dal.use_postgresql:
+        try:
+            return getattr(dal, method)(filters, **kwargs)
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.error("PostgreSQL query error for %s: %s", filename, e)
+            logger.info("Falling back to JSON mode for %s", filename)
+
+    json_dal = DataAccessLayer(use_postgresql=False)
+    json_dal.data_dir = get_data_dir()
+    with _file_lock:
+        return getattr(json_dal, method)(filters, **kwargs)
+
+
+def list_page_args(filter_fields) -> dict:
+    """
+    一覧APIのクエリパラメータから load_page の引数を組み立てる
+
+    per_page または cursor を指定した場合のみページングする（未指定時は従来どおり全件）。
+    sort / order / fields（カンマ区切り）と filter_fields に挙げた一致フィルタを受け付ける。
+
+    Raises:
+        ValueError: per_page が整数でない場合
+    """
+    args = request.args
+    per_page = args.get("per_page")
+    cursor = args.get("cursor") or None
+    if per_page is not None:
+        try:
+            limit = min(max(int(per_page), 1), 200)
+        except ValueError:
+            raise ValueError("per_page must be an integer") from None
+    else:
+        limit = 50 if cursor else None
+
+    page_args = {
+        "filters": {field: args[field] for field in filter_fields if args.get(field)},
+        "limit": limit,
+        "cursor": cursor,
+        "order": "asc" if args.get("order") == "asc" else "desc",
+        "fields": [f for f in args.get("fields", "").split(",") if f] or None,
+    }
+    if "requester_id" in page_args["filters"]:
+        page_args["filters"]["requester_id"] = args.get("requester_id", type=int)
+    if args.get("sort"):
+        page_args["sort"] = args["sort"]
+    return page_args
+
+
+def page_cache_token(page_args: dict) -> str:
+    """load_page の引数からキャッシュキー用の短いトークンを作る"""
+    raw = json.dumps(page_args, sort_keys=True, ensure_ascii=False)
+    return hashlib.md5(raw.encode("utf-8")).hexdigest()[:16]
+
+
 def save_data(filename: str, data: list):
     """JSONファイルに安全にデータを保存（アトミック書き込み + スレッドロック）"""
     with _file_lock:
@@ -670,6 +1090,7 @@ def save_data(filename: str, data: list):
 
             os.replace(tmp_path, filepath)
             tmp_path = None
+            json_snapshots.bump_generation(filepath)
 
         except PermissionError as e:
             logger.error("Permission denied writing %s: %s", filename, e)
@@ -713,6 +1134,335 @@ def search_in_fields(item: dict, query: str, fields: list) -> tuple:
     return matched_fields, relevance_score
 
 
+_SEARCH_FIELD_WEIGHTS = {
+    "knowledge.json": KNOWLEDGE_FIELD_WEIGHTS,
+    "sop.json": SOP_FIELD_WEIGHTS,
+    "incidents.json": INCIDENT_FIELD_WEIGHTS,
+}
+_derived_indexes = DerivedIndexRegistry()
+
+
+def _get_derived_index(key, filename: str, builder):
+    """派生データ構造を取得（データが変わった場合のみ再構築）
+
+    JSONモードではファイルの (mtime, size, inode)、PostgreSQLモードでは
+    集計クエリによる (件数, 最大ID, 最終更新日時) をバージョンとし、
+    変更がなければデータの読み込み自体を省略する。
+    """
+    version = _collection_version(filename)
+    return _derived_indexes.get(key, version, lambda: load_data(filename), builder)
+
+
+def _collection_version(filename: str):
+    """load_data(filename) の内容のバージョン（派生データ構造の再構築判定用）"""
+    dal = get_dal()
+    version = None
+    if dal.use_postgresql:
+        try:
+            version = dal.get_collection_version(filename)
+        except Exception as e:
+            logger.error("PostgreSQL version query error for %s: %s", filename, e)
+    if version is None:
+        # JSONモード、またはDBが使えず load_data が JSON にフォールバックする場合
+        version = file_version(os.path.join(get_data_dir(), filename))
+    return version
+
+
+def get_search_index(filename: str) -> SearchIndex:
+    """検索インデックスを取得（ナレッジは変更イベントで差分更新される）"""
+    weights = _SEARCH_FIELD_WEIGHTS[filename]
+    return _get_derived_index(
+        filename, filename, lambda items: SearchIndex.build(items, weights)
+    )
+
+
+def search_knowledge_ranked(
+    query: str,
+    limit: int,
+    offset: int = 0,
+    sort: str = "relevance_score",
+    order: str = "desc",
+    summary: bool = False,
+) -> tuple[list[dict], int]:
+    """
+    ナレッジのランク付き検索（1ページ分）
+
+    PostgreSQLモードでは DAL の search_knowledge（pg_trgm 索引・スコア計算・LIMIT/OFFSET を
+    SQL側で実行）を使い、全件を読み込まない。JSONモード・DBエラー時はプロセス内の
+    転置インデックス（BM25）で検索してから並べ替える。
+    summary=True の場合は本文を含まないサマリービュー（knowledge_summary）で返す。
+
+    Returns:
+        (relevance_score 付きナレッジのリスト, 総件数)
+    """
+    dal = get_dal()
+    if dal.use_postgresql:
+        try:
+            page = dal.search_knowledge(parse_query(query), limit, offset, sort, order, summary=summary)
+            if page is not None:
+                return page
+        except Exception as e:
+            logger.error("PostgreSQL knowledge search error: %s: %s", type(e).__name__, e)
+
+    matched = []
+    for item, _, score in get_search_index("knowledge.json").search(query):
+        item_copy = knowledge_summary(item) if summary else item.copy()
+        item_copy["relevance_score"] = score
+        matched.append(item_copy)
+    sort_key = sort if sort in ("updated_at", "created_at") else "relevance_score"
+    matched.sort(key=lambda x: x.get(sort_key) or "", reverse=(order == "desc"))
+    return matched[offset:offset + limit], len(matched)
+
+
+def get_tfidf_model(filename: str) -> TfidfModel | None:
+    """関連アイテム計算用の学習済みTF-IDFモデルを取得（コーパスのバージョンごとに学習）
+
+    IDF がコーパス全体に依存するため差分更新は行わず、変更後の初回アクセスで再学習する。
+    NumPy 未導入時は None（推薦エンジンは逐次計算にフォールバック）。
+    """
+    if not NUMPY_AVAILABLE:
+        return None
+    return _get_derived_index(("tfidf", filename), filename, TfidfModel.fit)
+
+
+def get_related_items_table(collection: str) -> RelatedItemsTable | None:
+    """バッチで事前計算した関連アイテムテーブルを取得（未構築・読み込み失敗時は None）
+
+    scripts/build_related_items.py または夜間ジョブが書き出したファイルを
+    ファイルのバージョンごとに1回だけ読み込む。
+    """
+    path = related_items_path(get_data_dir(), collection)
+    version = file_version(path)
+    if version is None:
+        return None
+    try:
+        return _derived_indexes.get(
+            ("related_items", collection), version, lambda: path, RelatedItemsTable.load
+        )
+    except (OSError, ValueError) as e:
+        logger.warning("Related items table unavailable: %s: %s", path, e)
+        return None
+
+
+def get_knowledge_facets() -> KnowledgeFacets:
+    """ナレッジのタグ・カテゴリ集計を取得（変更イベントで差分更新される）"""
+    return _get_derived_index(
+        "knowledge_facets", "knowledge.json", KnowledgeFacets.build
+    )
+
+
+def _next_knowledge_version(version, event):
+    """変更イベント適用後のコーパスバージョン（適用できない場合は None）"""
+    if event.data_dir is not None:
+        if event.version_before is None or version != event.version_before:
+            return None
+        return event.version_after
+
+    if not (isinstance(version, tuple) and version and version[0] == "pg"):
+        return None
+    # 最大ID・最終更新日時は削除では下がり得るが、その場合は次回の集計クエリと
+    # 一致せず再構築される（差分が取りこぼされることはない）
+    _, count, max_id, max_updated = version
+    for change in event.changes:
+        if change.action == CREATED:
+            count += 1
+        elif change.action == DELETED:
+            count -= 1
+        if change.action == DELETED or change.item is None:
+            continue
+        item_id = change.item.get("id")
+        if isinstance(item_id, int) and (max_id is None or item_id > max_id):
+            max_id = item_id
+        updated = change.item.get("updated_at")
+        if updated and (max_updated is None or updated > max_updated):
+            max_updated = updated
+    return ("pg", count, max_id, max_updated)
+
+
+@knowledge_events.subscribe
+def _apply_knowledge_event(event):
+    """ナレッジ変更イベントを検索インデックス・タグ集計に差分適用"""
+    # JSONモードでは現在のデータディレクトリへの書き込み、
+    # PostgreSQLモードではDBへの書き込みのみ対象
+    if get_dal().use_postgresql:
+        if event.data_dir is not None:
+            return
+    elif event.data_dir is None or (
+        os.path.abspath(event.data_dir) != os.path.abspath(get_data_dir())
+    ):
+        return
+    for key in ("knowledge.json", "knowledge_facets"):
+        _derived_indexes.apply(
+            key,
+            lambda index: apply_changes(index, event.changes),
+            lambda version: _next_knowledge_version(version, event),
+        )
+
+
+@knowledge_events.subscribe
+def _invalidate_knowledge_cache(event):
+    """ナレッジ変更イベントでRedisキャッシュを無効化"""
+    ids = {c.knowledge_id for c in event.changes}
+    CacheInvalidator.invalidate_knowledge(ids.pop() if len(ids) == 1 else None)
+
+
+# ================================================================
+# 閲覧数カウンタ・人気/トレンド
+# ================================================================
+
+# カウンタのリソース種別 → 閲覧数の初期値（views フィールド）を持つデータファイル
+VIEW_COUNTER_FILES = {
+    "knowledge": "knowledge.json",
+    "sop": "sop.json",
+    "consultation": "consultations.json",
+}
+# 人気・トレンド一覧で返す軽量表現（本文などの重いフィールドを保持しない）
+VIEW_COUNTER_SUMMARIES = {
+    "knowledge": knowledge_summary,
+}
+VIEW_COUNTER_FLUSH_INTERVAL = float(os.getenv("MKS_VIEW_COUNTER_FLUSH_INTERVAL", 30.0))
+TRENDING_HALF_LIFE_HOURS = float(os.getenv("MKS_TRENDING_HALF_LIFE_HOURS", 24.0))
+
+_view_counters: dict = {}  # データディレクトリ -> ViewCounters
+_view_counters_lock = threading.Lock()
+_view_counter_writer = None
+
+
+def _view_count_store(data_dir: str) -> DataAccessLayer:
+    """閲覧数の永続化先（データディレクトリを固定した DAL）"""
+    dal = DataAccessLayer(use_postgresql=get_dal().use_postgresql)
+    dal.data_dir = data_dir
+    return dal
+
+
+def get_view_counters() -> ViewCounters:
+    """現在のデータディレクトリの閲覧数カウンタを取得"""
+    data_dir = get_data_dir()
+    with _view_counters_lock:
+        counters = _view_counters.get(data_dir)
+        if counters is None:
+            counters = ViewCounters(
+                lambda: _view_count_store(data_dir),
+                redis_client=redis_client if CACHE_ENABLED else None,
+                half_life=TRENDING_HALF_LIFE_HOURS * 3600,
+            )
+            _view_counters[data_dir] = counters
+    return counters
+
+
+def flush_view_counters() -> int:
+    """全データディレクトリの未永続化の閲覧数を書き出す"""
+    with _view_counters_lock:
+        counters_list = list(_view_counters.values())
+    return sum(counters.flush() for counters in counters_list)
+
+
+def _get_view_counter_writer() -> AuditLogWriter:
+    """閲覧数の定期フラッシュワーカーを取得（fork後のワーカープロセスでは再起動）"""
+    global _view_counter_writer
+    if _view_counter_writer is None or not _view_counter_writer.is_alive():
+        with _view_counters_lock:
+            if _view_counter_writer is None or not _view_counter_writer.is_alive():
+                _view_counter_writer = AuditLogWriter(
+                    flush_view_counters,
+                    flush_interval=VIEW_COUNTER_FLUSH_INTERVAL,
+                    name="view-counter-writer",
+                )
+                _view_counter_writer.start()
+    return _view_counter_writer
+
+
+def shutdown_view_counter_writer(timeout: float = 5.0):
+    """定期フラッシュを停止し、未永続化の閲覧数を書き出す（gunicorn フック用）"""
+    global _view_counter_writer
+    writer = _view_counter_writer
+    _view_counter_writer = None
+    if writer is not None:
+        writer.stop(timeout)
+    else:
+        flush_view_counters()
+
+
+def record_view(action: str, resource_id):
+    """閲覧系の監査イベントを閲覧数カウンタに反映（log_access から呼ぶ）"""
+    resource = VIEW_ACTIONS.get(action)
+    if resource is None or resource_id is None:
+        return
+    get_view_counters().record(resource, resource_id)
+    # pytest 実行中はフラッシュせず、未永続化の差分として参照する
+    if _audit_log_async_enabled():
+        _get_view_counter_writer()
+
+
+def get_view_count(resource: str, item: dict) -> int:
+    """アイテムの閲覧数（views の初期値 + 永続化済み + 未永続化の差分）"""
+    item_id = item.get("id")
+    try:
+        persisted = _view_count_store(get_data_dir()).get_view_count(resource, item_id)
+    except Exception as e:
+        logger.error("View counter query error for %s: %s", resource, e)
+        persisted = 0
+    pending = get_view_counters().pending(resource).get(item_id, 0)
+    return (item.get("views") or 0) + persisted + pending
+
+
+def get_popularity_index(resource: str) -> PopularityIndex:
+    """閲覧数の上位K件（アイテムまたは永続化済みカウンタが変わった場合のみ再構築）"""
+    filename = VIEW_COUNTER_FILES[resource]
+    store = _view_count_store(get_data_dir())
+    try:
+        # カウンタ未作成（None）も1つのバージョンとして扱う
+        version = (_collection_version(filename), store.get_view_counts_version())
+    except Exception as e:
+        logger.error("View counter version query error: %s", e)
+        version = None
+
+    def _build(items):
+        try:
+            persisted = store.get_view_counts(resource)
+        except Exception as e:
+            logger.error("View counter query error for %s: %s", resource, e)
+            persisted = {}
+        summarize = VIEW_COUNTER_SUMMARIES.get(resource)
+        if summarize is not None:
+            items = [summarize(item) for item in items if item]
+        return PopularityIndex.build(items, persisted)
+
+    return _derived_indexes.get(
+        ("popularity", resource), version, lambda: load_data(filename), _build
+    )
+
+
+def get_popular_ranking(resource: str, limit: int) -> list:
+    """閲覧数の上位 [(ID, 閲覧数)]（未永続化の差分を含む）"""
+    index = get_popularity_index(resource)
+    return index.ranked(get_view_counters().pending(resource), limit)
+
+
+def get_popular_items(resource: str, limit: int) -> list:
+    """閲覧数上位のアイテム（views は未永続化の差分を含む合計）"""
+    index = get_popularity_index(resource)
+    result = []
+    for item_id, views in index.ranked(get_view_counters().pending(resource), limit):
+        item = dict(index.items_by_id[item_id])
+        item["views"] = views
+        result.append(item)
+    return result
+
+
+def get_trending_items(resource: str, limit: int) -> list:
+    """最近の閲覧が多いアイテム（半減期で減衰するスコア順）"""
+    items_by_id = get_popularity_index(resource).items_by_id
+    result = []
+    for item_id, score in get_view_counters().trending(resource, limit):
+        item = items_by_id.get(item_id)
+        if item:
+            item = dict(item)
+            item["trending_score"] = round(score, 3)
+            result.append(item)
+    return result
+
+
 def highlight_text(text: str, query: str) -> str:
     """検索語をハイライトマークで囲む"""
     if not text or not query:
@@ -341,6 +341,11 @@ app.register_blueprint(metrics_bp)
 
 logger.info("[INIT] Blueprints registered: auth_bp, knowledge_bp, dashboard_bp, ms365_bp, ms365_integration_bp, operations_bp, recommendations_bp, admin_bp, health_bp, consultations_bp, metrics_bp")
 
+# DAL が共有するリクエストスコープのDBセッションをリクエスト終了時に破棄する
+import database  # noqa: E402
+
+database.init_app(app)
+
 # ============================================================
 # Phase H-1: 共有ヘルパーを app_helpers からインポート
 # Blueprint (auth.py, knowledge.py) と同一シングルトンを共有するために必要
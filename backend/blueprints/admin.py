@@ -19,7 +19,7 @@ import psutil
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
 
-from app_helpers import check_permission, load_data, log_access
+from app_helpers import check_permission, iter_access_logs, load_data, log_access
 
 logger = logging.getLogger(__name__)
 
@@ -51,7 +51,6 @@ def get_access_logs():
     """
     try:
         current_user_id = get_jwt_identity()
-        logs = load_data("access_logs.json")
 
         user_id_filter = request.args.get("user_id", type=int)
         action_filter = request.args.get("action", "")
@@ -63,52 +62,45 @@ def get_access_logs():
         per_page = min(request.args.get("per_page", 50, type=int), 200)
         sort_order = request.args.get("sort", "desc")
 
-        filtered_logs = logs
-
-        if user_id_filter:
-            filtered_logs = [
-                l for l in filtered_logs if l.get("user_id") == user_id_filter
-            ]
-
-        if action_filter:
-            filtered_logs = [
-                l
-                for l in filtered_logs
-                if action_filter.lower() in str(l.get("action", "")).lower()
-            ]
-
-        if resource_filter:
-            filtered_logs = [
-                l for l in filtered_logs if l.get("resource") == resource_filter
-            ]
-
-        if status_filter:
-            filtered_logs = [
-                l for l in filtered_logs if l.get("status") == status_filter
-            ]
-
+        start_dt = None
         if start_date:
             try:
                 start_dt = datetime.fromisoformat(start_date.replace("Z", "+00:00"))
-                filtered_logs = [
-                    l
-                    for l in filtered_logs
-                    if datetime.fromisoformat(l.get("timestamp", "")) >= start_dt
-                ]
             except ValueError:
                 pass
 
+        end_dt = None
         if end_date:
             try:
                 end_dt = datetime.fromisoformat(end_date.replace("Z", "+00:00"))
-                filtered_logs = [
-                    l
-                    for l in filtered_logs
-                    if datetime.fromisoformat(l.get("timestamp", "")) <= end_dt
-                ]
             except ValueError:
                 pass
 
+        action_lower = action_filter.lower()
+
+        def _matches(l):
+            if user_id_filter and l.get("user_id") != user_id_filter:
+                return False
+            if action_filter and action_lower not in str(l.get("action", "")).lower():
+                return False
+            if resource_filter and l.get("resource") != resource_filter:
+                return False
+            if status_filter and l.get("status") != status_filter:
+                return False
+            if start_dt or end_dt:
+                try:
+                    log_dt = datetime.fromisoformat(l.get("timestamp", ""))
+                except ValueError:
+                    return False
+                if start_dt and log_dt < start_dt:
+                    return False
+                if end_dt and log_dt > end_dt:
+                    return False
+            return True
+
+        # 監査ログストアからストリーミングで読み、条件に合うものだけ保持する
+        filtered_logs = [l for l in iter_access_logs() if _matches(l)]
+
         filtered_logs.sort(
             key=lambda x: x.get("timestamp", ""), reverse=(sort_order == "desc")
         )
@@ -170,13 +162,12 @@ def get_access_logs_stats():
     """監査ログの統計情報（管理者専用）"""
     try:
         current_user_id = get_jwt_identity()
-        logs = load_data("access_logs.json")
 
         now = datetime.now()
         today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
         week_start = today_start - timedelta(days=7)
 
-        total_logs = len(logs)
+        total_logs = 0
         today_logs = 0
         week_logs = 0
         action_counts = Counter()
@@ -184,7 +175,8 @@ def get_access_logs_stats():
         status_counts = Counter()
         user_activity = Counter()
 
-        for log in logs:
+        for log in iter_access_logs():
+            total_logs += 1
             try:
                 log_time = datetime.fromisoformat(log.get("timestamp", ""))
 
@@ -18,6 +18,7 @@ from app_helpers import (
     check_permission,
     create_notification,
     get_user_permissions,
+    get_view_count,
     load_users,
     log_access,
     validate_request,
@@ -97,6 +98,7 @@ def get_consultation_detail(consultation_id):
             404,
         )
 
+    consultation["views"] = get_view_count("consultation", consultation)
     return jsonify({"success": True, "data": consultation})
 
 
@@ -19,8 +19,15 @@ from app_helpers import (
     cache_set,
     check_permission,
     get_cache_key,
+    get_related_items_table,
+    get_tfidf_model,
+    get_view_count,
+    list_page_args,
     load_data,
+    load_item,
+    load_page,
     log_access,
+    page_cache_token,
     recommendation_engine,
 )
 
@@ -42,17 +49,25 @@ def get_sop():
         current_user_id = get_jwt_identity()
         log_access(current_user_id, "sop.list", "sop")
 
-        cache_key = get_cache_key("sop_list")
-        cached_result = cache_get(cache_key)
-        if cached_result:
-            logger.info("Cache hit: sop_list - %s", cache_key)
-            return jsonify(cached_result)
+        try:
+            page_args = list_page_args(("category", "status"))
+            cache_key = get_cache_key("sop_list", page_cache_token(page_args))
+            cached_result = cache_get(cache_key)
+            if cached_result:
+                logger.info("Cache hit: sop_list - %s", cache_key)
+                return jsonify(cached_result)
+
+            sop_list, next_cursor, total = load_page("sop.json", **page_args)
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": {"code": "INVALID_PARAMETER", "message": str(e)},
+            }), 400
 
-        sop_list = load_data("sop.json") or []
         response_data = {
             "success": True,
             "data": sop_list,
-            "pagination": {"total_items": len(sop_list)},
+            "pagination": {"total_items": total, "next_cursor": next_cursor},
         }
         cache_set(cache_key, response_data, ttl=3600)
         logger.info("Cache set: sop_list - %s", cache_key)
@@ -70,12 +85,12 @@ def get_sop_detail(sop_id):
     current_user_id = get_jwt_identity()
     log_access(current_user_id, "sop.view", "sop", sop_id)
 
-    sop_list = load_data("sop.json")
-    sop = next((s for s in sop_list if s["id"] == sop_id), None)
+    sop = load_item("sop.json", sop_id)
 
     if not sop:
         return jsonify({"success": False, "error": "SOP not found"}), 404
 
+    sop["views"] = get_view_count("sop", sop)
     return jsonify({"success": True, "data": sop})
 
 
@@ -90,7 +105,8 @@ def get_related_sop(sop_id):
         algorithm: アルゴリズム（tag/category/keyword/hybrid、デフォルト: hybrid）
         min_score: 最小スコア閾値（デフォルト: 0.1）
 
-    NOTE: MLアルゴリズム（O(n²)計算量）のため、キャッシュ優先度最高。
+    NOTE: hybrid は事前計算テーブル（scripts/build_related_items.py）を参照し、
+    それ以外はコーパス単位の学習済みTF-IDFモデルを使用（1リクエスト O(nnz)）。
     """
     current_user_id = get_jwt_identity()
     log_access(current_user_id, "sop.related", "sop", sop_id)
@@ -140,9 +156,23 @@ def get_related_sop(sop_id):
     if not target_sop:
         return jsonify({"success": False, "error": "SOP not found"}), 404
 
-    related = recommendation_engine.get_related_items(
-        target_sop, sop_list, limit=limit, algorithm=algorithm, min_score=min_score
-    )
+    # ハイブリッドはバッチ事前計算テーブルを参照（未構築・対象が編集済みならオンデマンド計算）
+    related = None
+    if algorithm == "hybrid":
+        table = get_related_items_table("sop")
+        if table is not None:
+            related = table.lookup(target_sop, sop_list, limit, min_score)
+    if related is None:
+        # 学習済みTF-IDFモデルで疎行列×ベクトル積1回（候補はモデルの学習コーパスそのもの）
+        model = get_tfidf_model("sop.json")
+        related = recommendation_engine.get_related_items(
+            target_sop,
+            model.items if model is not None else sop_list,
+            limit=limit,
+            algorithm=algorithm,
+            min_score=min_score,
+            model=model,
+        )
 
     response_data = {
         "success": True,
@@ -154,7 +184,7 @@ def get_related_sop(sop_id):
         },
     }
 
-    cache_set(cache_key, response_data, ttl=3600)
+    cache_set(cache_key, response_data, ttl=3600, tags=(f"sop:{sop_id}",))
     logger.info("Cache set: sop_related - %s", cache_key)
 
     return jsonify(response_data)
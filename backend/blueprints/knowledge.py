@@ -5,6 +5,7 @@ Phase H-1: app_v2.py knowledge エンドポイント完全移行
 移行エンドポイント一覧（12件）:
   GET    /api/v1/knowledge                       - ナレッジ一覧取得（フィルタ・ページネーション）
   GET    /api/v1/knowledge/popular               - 人気ナレッジTop N
+  GET    /api/v1/knowledge/trending              - トレンドナレッジ（最近の閲覧数）
   GET    /api/v1/knowledge/recent                - 最近追加ナレッジ
   GET    /api/v1/knowledge/favorites             - お気に入りナレッジ
   GET    /api/v1/knowledge/tags                  - タグクラウド集計
@@ -24,23 +25,40 @@ from flask import Blueprint, g, jsonify, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
 
 from app_helpers import (
-    CacheInvalidator,
     cache_get,
     cache_set,
     check_permission,
     get_cache_key,
+    get_data_dir,
+    get_knowledge_facets,
+    get_popular_items,
+    get_related_items_table,
+    get_search_index,
+    get_tfidf_model,
+    get_trending_items,
     get_user_permissions,
+    get_view_count,
     highlight_text,
+    knowledge_summary,
     load_data,
+    load_item,
+    load_page,
     load_users,
     log_access,
     recommendation_engine,
     save_data,
-    search_in_fields,
+    search_knowledge_ranked,
     validate_request,
 )
 from app_helpers import create_notification  # 通知ヘルパー
 from schemas import KnowledgeCreateSchema
+from knowledge_events import (
+    CREATED,
+    DELETED,
+    UPDATED,
+    knowledge_file_version,
+    publish_knowledge_change,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -48,7 +66,13 @@ knowledge_bp = Blueprint("knowledge", __name__, url_prefix="/api/v1")
 knowledge_bp.strict_slashes = False
 
 
-_KNOWLEDGE_LIST_REDIS_KEY = "knowledge_list:all"
+# 関連ナレッジのレスポンスでサマリービューに残す推薦情報
+_RECOMMENDATION_FIELDS = (
+    "recommendation_score",
+    "recommendation_reasons",
+    "recommendation_details",
+)
+
 _KNOWLEDGE_LIST_REDIS_TTL = 300  # 5分
 
 
@@ -57,18 +81,19 @@ def _get_knowledge_list() -> list:
     ナレッジリストを2段キャッシュで取得（N+1回避）
 
     L1: Flask g オブジェクト（リクエストスコープ）
-    L2: Redis キャッシュ（TTL=5分、knowledge_list:* パターンで自動無効化）
+    L2: Redis キャッシュ（TTL=5分、knowledge ファミリーの世代番号で無効化）
 
     同一リクエスト内で複数回呼ばれても I/O は最大1回のみ実行される。
     """
     if not hasattr(g, "_knowledge_list_cache"):
         # L2: Redis キャッシュを確認
-        cached = cache_get(_KNOWLEDGE_LIST_REDIS_KEY)
+        cache_key = get_cache_key("knowledge_list", "all")
+        cached = cache_get(cache_key)
         if cached is not None:
             g._knowledge_list_cache = cached
         else:
             data = load_data("knowledge.json") or []
-            cache_set(_KNOWLEDGE_LIST_REDIS_KEY, data, ttl=_KNOWLEDGE_LIST_REDIS_TTL)
+            cache_set(cache_key, data, ttl=_KNOWLEDGE_LIST_REDIS_TTL)
             g._knowledge_list_cache = data
     return g._knowledge_list_cache
 
@@ -114,6 +139,8 @@ def get_knowledge():
         highlight_key = request.args.get("highlight", "false")
         sort = request.args.get("sort", "created_at")
         order = request.args.get("order", "desc")
+        cursor = request.args.get("cursor")
+        per_page = min(per_page, 100)
 
         # キャッシュキー生成
         cache_key = get_cache_key(
@@ -126,6 +153,7 @@ def get_knowledge():
             per_page,
             sort,
             order,
+            cursor or "",
         )
 
         # キャッシュチェック
@@ -134,63 +162,69 @@ def get_knowledge():
             logger.info("Cache hit: knowledge_list - %s", cache_key)
             return jsonify(cached_result)
 
-        knowledge_list = load_data("knowledge.json") or []
-        filtered = knowledge_list
-
-        if category:
-            filtered = [k for k in filtered if k.get("category") == category]
-
-        # 全文検索（title, summary, content フィールド対応）
+        next_cursor = None
+        # 全文検索（title, summary, content フィールド対応、転置インデックス使用）
         if search:
             highlight = highlight_key == "true"
             filtered_with_score = []
 
-            for k in filtered:
-                matched_fields, score = search_in_fields(
-                    k, search, ["title", "summary", "content"]
-                )
-                if matched_fields:
-                    k_copy = k.copy()
-                    k_copy["matched_fields"] = matched_fields
-                    k_copy["relevance_score"] = score
-
-                    if highlight:
-                        for field in ["title", "summary", "content"]:
-                            if field in k_copy and k_copy[field]:
-                                k_copy[field] = highlight_text(k_copy[field], search)
-
-                    filtered_with_score.append(k_copy)
-
-            # スコア順にソート
-            filtered = sorted(
-                filtered_with_score,
-                key=lambda x: x["relevance_score"],
-                reverse=True,
-            )
+            for k, matched_fields, score in get_search_index("knowledge.json").search(
+                search
+            ):
+                if category and k.get("category") != category:
+                    continue
+                # 一覧は本文を含まないサマリービューで返す（本文は /knowledge/<id>）
+                k_copy = knowledge_summary(k)
+                k_copy["matched_fields"] = matched_fields
+                k_copy["relevance_score"] = score
 
-        if tags:
-            tag_list = tags.split(",")
-            filtered = [
-                k for k in filtered
-                if any(tag in k.get("tags", []) for tag in tag_list)
-            ]
-
-        # ソート（search以外の場合）
-        if not search and sort in ("created_at", "updated_at", "views", "rating"):
-            reverse = order == "desc"
-            filtered = sorted(
-                filtered,
-                key=lambda x: x.get(sort, ""),
-                reverse=reverse,
-            )
+                if highlight:
+                    for field in ["title", "summary", "content_snippet"]:
+                        if field in k_copy and k_copy[field]:
+                            k_copy[field] = highlight_text(k_copy[field], search)
+
+                filtered_with_score.append(k_copy)
+
+            # インデックスの検索結果はスコア順
+            filtered = filtered_with_score
+
+            if tags:
+                tag_list = tags.split(",")
+                filtered = [
+                    k for k in filtered
+                    if any(tag in k.get("tags", []) for tag in tag_list)
+                ]
+
+            # ページネーション
+            total_items = len(filtered)
+            start_idx = (page - 1) * per_page
+            paginated_data = filtered[start_idx:start_idx + per_page]
+        else:
+            # フィルタ・ソート・ページングは DAL 側（SQL / 事前計算したソート順）で行い、
+            # 本文を含まないサマリービューで受け取る
+            page_filters = {}
+            if category:
+                page_filters["category"] = category
+            if tags:
+                page_filters["tags"] = tags.split(",")
+            try:
+                paginated_data, next_cursor, total_items = load_page(
+                    "knowledge.json",
+                    page_filters,
+                    limit=max(per_page, 0),
+                    cursor=cursor,
+                    sort=sort,
+                    order=order,
+                    offset=0 if cursor else max(0, (page - 1) * per_page),
+                    summary=True,
+                )
+            except ValueError:
+                return jsonify({
+                    "success": False,
+                    "error": {"code": "INVALID_CURSOR", "message": "cursor is invalid"},
+                }), 400
 
-        # ページネーション
-        total_items = len(filtered)
-        per_page = min(per_page, 100)
         total_pages = (total_items + per_page - 1) // per_page if per_page > 0 else 1
-        start_idx = (page - 1) * per_page
-        end_idx = start_idx + per_page
-        paginated_data = filtered[start_idx:end_idx]
 
         response_data = {
             "success": True,
@@ -200,6 +234,7 @@ def get_knowledge():
                 "total_pages": total_pages,
                 "current_page": page,
                 "per_page": per_page,
+                "next_cursor": next_cursor,
             },
         }
         cache_set(cache_key, response_data, ttl=3600)  # 1時間
@@ -214,7 +249,7 @@ def get_knowledge():
 @knowledge_bp.route("/knowledge/popular", methods=["GET"])
 @check_permission("knowledge.read")
 def get_popular_knowledge():
-    """人気ナレッジTop Nを取得（閲覧数順）"""
+    """人気ナレッジTop Nを取得（閲覧数順、閲覧数カウンタの上位K件から）"""
     try:
         current_user_id = get_jwt_identity()
         log_access(current_user_id, "knowledge.popular", "knowledge")
@@ -228,15 +263,9 @@ def get_popular_knowledge():
             logger.info("Cache hit: knowledge_popular - %s", cache_key)
             return jsonify(cached_result)
 
-        knowledge_list = load_data("knowledge.json") or []
+        popular_knowledge = get_popular_items("knowledge", limit)
 
-        sorted_knowledge = sorted(
-            knowledge_list,
-            key=lambda k: k.get("views", 0) if k else 0,
-            reverse=True,
-        )[:limit]
-
-        response_data = {"success": True, "data": sorted_knowledge}
+        response_data = {"success": True, "data": popular_knowledge}
         cache_set(cache_key, response_data, ttl=3600)  # 1時間
         logger.info("Cache set: knowledge_popular - %s", cache_key)
 
@@ -246,6 +275,17 @@ def get_popular_knowledge():
         raise
 
 
+@knowledge_bp.route("/knowledge/trending", methods=["GET"])
+@check_permission("knowledge.read")
+def get_trending_knowledge():
+    """トレンドナレッジを取得（閲覧ごとに加算し半減期で減衰するスコア順）"""
+    current_user_id = get_jwt_identity()
+    log_access(current_user_id, "knowledge.trending", "knowledge")
+
+    limit = min(request.args.get("limit", 10, type=int), 50)
+    return jsonify({"success": True, "data": get_trending_items("knowledge", limit)})
+
+
 @knowledge_bp.route("/knowledge/recent", methods=["GET"])
 @check_permission("knowledge.read")
 def get_recent_knowledge():
@@ -267,33 +307,36 @@ def get_recent_knowledge():
             logger.info("Cache hit: knowledge_recent - %s", cache_key)
             return jsonify(cached_result)
 
-        knowledge_list = load_data("knowledge.json") or []
         cutoff_date = datetime.now() - timedelta(days=days)
 
+        # 作成日時の降順にサマリービューを1ページずつ読み、期間外に達したら打ち切る
         recent_knowledge = []
-        for k in knowledge_list or []:
-            if not k:
-                continue
-            created_at = k.get("created_at")
-            if created_at:
+        cursor = None
+        while len(recent_knowledge) < limit:
+            page_items, cursor, _ = load_page(
+                "knowledge.json", limit=limit, cursor=cursor, sort="created_at", summary=True
+            )
+            for k in page_items:
+                created_at = k.get("created_at")
+                if not created_at:
+                    cursor = None  # 作成日時なしは末尾に並ぶ
+                    break
                 try:
-                    created_date = datetime.fromisoformat(
-                        created_at.replace("Z", "+00:00")
-                    )
-                    if created_date >= cutoff_date:
-                        recent_knowledge.append(k)
+                    created_date = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+                    if created_date < cutoff_date:
+                        cursor = None
+                        break
                 except Exception as parse_err:
                     logger.debug(
                         "Failed to parse created_at for knowledge id=%s: %s",
                         k.get("id"),
                         str(parse_err),
                     )
-
-        sorted_knowledge = sorted(
-            recent_knowledge,
-            key=lambda k: k.get("created_at", "") if k else "",
-            reverse=True,
-        )[:limit]
+                    continue
+                recent_knowledge.append(k)
+            if cursor is None:
+                break
+        sorted_knowledge = recent_knowledge[:limit]
 
         response_data = {"success": True, "data": sorted_knowledge}
         cache_set(cache_key, response_data, ttl=900)  # 15分（時間依存データ）
@@ -318,13 +361,19 @@ def get_favorite_knowledge():
             f for f in favorites
             if str(f.get("user_id")) == str(current_user_id)
         ]
-        fav_ids = {str(f.get("knowledge_id")) for f in user_favs}
+        fav_ids = set()
+        for f in user_favs:
+            try:
+                fav_ids.add(int(f.get("knowledge_id")))
+            except (TypeError, ValueError):
+                continue
 
         if not fav_ids:
             return jsonify({"success": True, "data": []})
 
-        knowledge_list = load_data("knowledge.json") or []
-        result = [k for k in knowledge_list if str(k.get("id")) in fav_ids]
+        result, _, _ = load_page(
+            "knowledge.json", {"ids": sorted(fav_ids)}, limit=None, summary=True
+        )
 
         return jsonify({"success": True, "data": result})
     except Exception as e:
@@ -337,7 +386,9 @@ def get_favorite_knowledge():
 def get_knowledge_tags():
     """ナレッジのタグ集計を取得（タグクラウド用、キャッシュ対応）
 
-    NOTE: 全スキャン+集計処理（O(n)）のため、キャッシュ優先度高。
+    NOTE: タグ集計自体は変更イベントで差分更新されるが、PostgreSQLモードでは
+    鮮度確認に集計クエリが必要なため、Redisキャッシュを優先する。
+    キャッシュはナレッジ変更時に世代番号で無効化される。
     """
     try:
         current_user_id = get_jwt_identity()
@@ -349,21 +400,10 @@ def get_knowledge_tags():
             logger.info("Cache hit: knowledge_tags - %s", cache_key)
             return jsonify(cached_result)
 
-        knowledge_list = load_data("knowledge.json") or []
-
-        tag_count = {}
-        for k in knowledge_list or []:
-            if not k:
-                continue
-            tags = k.get("tags", []) or []
-            for tag in tags:
-                if tag:
-                    tag_count[tag] = tag_count.get(tag, 0) + 1
-
-        sorted_tags = sorted(tag_count.items(), key=lambda x: x[1], reverse=True)
+        # 変更イベントで差分更新されるタグ集計から取得（全件走査なし）
         tag_list = [
             {"name": tag, "count": count, "size": min(count // 5 + 1, 5)}
-            for tag, count in sorted_tags
+            for tag, count in get_knowledge_facets().tag_counts()
         ]
 
         response_data = {"success": True, "data": tag_list}
@@ -383,12 +423,12 @@ def get_knowledge_detail(knowledge_id):
     current_user_id = get_jwt_identity()
     log_access(current_user_id, "knowledge.view", "knowledge", knowledge_id)
 
-    knowledge_list = load_data("knowledge.json")
-    knowledge = next((k for k in knowledge_list if k["id"] == knowledge_id), None)
+    knowledge = load_item("knowledge.json", knowledge_id)
 
     if not knowledge:
         return jsonify({"success": False, "error": "Knowledge not found"}), 404
 
+    knowledge["views"] = get_view_count("knowledge", knowledge)
     return jsonify({"success": True, "data": knowledge})
 
 
@@ -403,7 +443,8 @@ def get_related_knowledge(knowledge_id):
         algorithm: アルゴリズム（tag/category/keyword/hybrid、デフォルト: hybrid）
         min_score: 最小スコア閾値（デフォルト: 0.1）
 
-    NOTE: MLアルゴリズム（O(n²)計算量）のため、キャッシュ優先度最高。
+    NOTE: hybrid は事前計算テーブル（scripts/build_related_items.py）を参照し、
+    それ以外はコーパス単位の学習済みTF-IDFモデルを使用（1リクエスト O(nnz)）。
     """
     current_user_id = get_jwt_identity()
     log_access(current_user_id, "knowledge.related", "knowledge", knowledge_id)
@@ -449,15 +490,25 @@ def get_related_knowledge(knowledge_id):
     if not target_knowledge:
         return jsonify({"success": False, "error": "Knowledge not found"}), 404
 
-    # 関連アイテム取得（高負荷ML処理）
-    related = recommendation_engine.get_related_items(
-        target_knowledge,
-        knowledge_list,
-        limit=limit,
-        algorithm=algorithm,
-        min_score=min_score,
-    )
+    # ハイブリッドはバッチ事前計算テーブルを参照（未構築・対象が編集済みならオンデマンド計算）
+    related = None
+    if algorithm == "hybrid":
+        table = get_related_items_table("knowledge")
+        if table is not None:
+            related = table.lookup(target_knowledge, knowledge_list, limit, min_score)
+    if related is None:
+        # 学習済みTF-IDFモデルで疎行列×ベクトル積1回（候補はモデルの学習コーパスそのもの）
+        model = get_tfidf_model("knowledge.json")
+        related = recommendation_engine.get_related_items(
+            target_knowledge,
+            model.items if model is not None else knowledge_list,
+            limit=limit,
+            algorithm=algorithm,
+            min_score=min_score,
+            model=model,
+        )
 
+    related = [knowledge_summary(item, _RECOMMENDATION_FIELDS) for item in related]
     response_data = {
         "success": True,
         "data": {
@@ -502,10 +553,14 @@ def create_knowledge():
     }
 
     knowledge_list.append(new_knowledge)
+    data_dir = get_data_dir()
+    version_before = knowledge_file_version(data_dir)
     save_data("knowledge.json", knowledge_list)
 
-    # キャッシュ無効化（CacheInvalidator使用）
-    CacheInvalidator.invalidate_knowledge()
+    # 変更イベント発行（検索インデックス等の差分更新・キャッシュ無効化）
+    publish_knowledge_change(
+        CREATED, new_knowledge, data_dir=data_dir, version_before=version_before
+    )
 
     log_access(current_user_id, "knowledge.create", "knowledge", new_id)
 
@@ -556,6 +611,8 @@ def update_knowledge(knowledge_id):
         "tags", "status", "priority", "project", "owner",
     ]
 
+    previous = dict(knowledge_list[knowledge_index])
+
     for field in updatable_fields:
         if field in data:
             knowledge_list[knowledge_index][field] = data[field]
@@ -563,10 +620,18 @@ def update_knowledge(knowledge_id):
     knowledge_list[knowledge_index]["updated_at"] = datetime.now().isoformat()
     knowledge_list[knowledge_index]["updated_by_id"] = current_user_id
 
+    data_dir = get_data_dir()
+    version_before = knowledge_file_version(data_dir)
     save_data("knowledge.json", knowledge_list)
 
-    # キャッシュ無効化（CacheInvalidator使用）
-    CacheInvalidator.invalidate_knowledge(knowledge_id)
+    # 変更イベント発行（検索インデックス等の差分更新・キャッシュ無効化）
+    publish_knowledge_change(
+        UPDATED,
+        knowledge_list[knowledge_index],
+        previous=previous,
+        data_dir=data_dir,
+        version_before=version_before,
+    )
 
     log_access(current_user_id, "knowledge.update", "knowledge", knowledge_id)
 
@@ -612,10 +677,17 @@ def delete_knowledge(knowledge_id):
         }), 403
 
     deleted_knowledge = knowledge_list.pop(knowledge_index)
+    data_dir = get_data_dir()
+    version_before = knowledge_file_version(data_dir)
     save_data("knowledge.json", knowledge_list)
 
-    # キャッシュ無効化（CacheInvalidator使用）
-    CacheInvalidator.invalidate_knowledge(knowledge_id)
+    # 変更イベント発行（検索インデックス等の差分更新・キャッシュ無効化）
+    publish_knowledge_change(
+        DELETED,
+        previous=deleted_knowledge,
+        data_dir=data_dir,
+        version_before=version_before,
+    )
 
     log_access(current_user_id, "knowledge.delete", "knowledge", knowledge_id)
 
@@ -689,18 +761,10 @@ def search_knowledge():
     if cached:
         return jsonify(cached)
 
-    knowledge_list = load_data("knowledge.json") or []
-    q_lower = query.lower()
-
-    # title / summary / content の全文検索
-    matched = [
-        k for k in knowledge_list
-        if q_lower in (k.get("title", "") + k.get("summary", "") + k.get("content", "")).lower()
-    ]
-
-    total = len(matched)
-    start = (page - 1) * per_page
-    results = matched[start:start + per_page]
+    # title / summary / content の全文検索（PostgreSQL: pg_trgm、JSON: 転置インデックス + BM25）
+    results, total = search_knowledge_ranked(
+        query, per_page, (page - 1) * per_page, summary=True
+    )
 
     log_access(current_user_id, "knowledge.search", "knowledge", query)
 
@@ -774,83 +838,43 @@ def unified_search():
 
     # 各エンティティを検索
     if "knowledge" in types:
-        knowledge_list = load_data("knowledge.json")
-        matched = []
-
-        for item in knowledge_list:
-            matched_fields, score = search_in_fields(
-                item, search_query, ["title", "summary", "content"]
-            )
-            if matched_fields:
-                item_copy = item.copy()
-                item_copy["relevance_score"] = score
-                if highlight:
-                    for field in ["title", "summary"]:
-                        if field in item_copy and item_copy[field]:
-                            item_copy[field] = highlight_text(item_copy[field], search_query)
-                matched.append(item_copy)
-
-        # ソート
-        if sort_by == "relevance_score":
-            matched = sorted(
-                matched,
-                key=lambda x: x["relevance_score"],
-                reverse=(order == "desc"),
-            )
-        elif sort_by == "updated_at":
-            matched = sorted(
-                matched,
-                key=lambda x: x.get("updated_at", ""),
-                reverse=(order == "desc"),
-            )
-        elif sort_by == "created_at":
-            matched = sorted(
-                matched,
-                key=lambda x: x.get("created_at", ""),
-                reverse=(order == "desc"),
-            )
-
-        # ページネーション
-        start_idx = (page - 1) * page_size
-        end_idx = start_idx + page_size
+        # スコア計算・ソート・ページングは検索側で行い、1ページ分だけ受け取る
+        items, count = search_knowledge_ranked(
+            search_query, page_size, (page - 1) * page_size, sort_by, order, summary=True
+        )
+        if highlight:
+            for item in items:
+                for field in ["title", "summary"]:
+                    if field in item and item[field]:
+                        item[field] = highlight_text(item[field], search_query)
         results["knowledge"] = {
-            "items": matched[start_idx:end_idx],
-            "count": len(matched),
+            "items": items,
+            "count": count,
             "page": page,
             "page_size": page_size,
-            "total_pages": (len(matched) + page_size - 1) // page_size,
+            "total_pages": (count + page_size - 1) // page_size,
         }
-        total_count += len(matched)
+        total_count += count
 
     if "sop" in types:
-        sop_list = load_data("sop.json")
         matched = []
 
-        for item in sop_list:
-            matched_fields, score = search_in_fields(item, search_query, ["title", "content"])
-            if matched_fields:
-                item_copy = item.copy()
-                item_copy["relevance_score"] = score
-                matched.append(item_copy)
+        for item, _, score in get_search_index("sop.json").search(search_query):
+            item_copy = item.copy()
+            item_copy["relevance_score"] = score
+            matched.append(item_copy)
 
-        matched = sorted(matched, key=lambda x: x["relevance_score"], reverse=True)
         results["sop"] = {"items": matched[:10], "count": len(matched)}
         total_count += len(matched)
 
     if "incidents" in types:
-        incidents_list = load_data("incidents.json")
         matched = []
 
-        for item in incidents_list:
-            matched_fields, score = search_in_fields(
-                item, search_query, ["title", "description"]
-            )
-            if matched_fields:
-                item_copy = item.copy()
-                item_copy["relevance_score"] = score
-                matched.append(item_copy)
+        for item, _, score in get_search_index("incidents.json").search(search_query):
+            item_copy = item.copy()
+            item_copy["relevance_score"] = score
+            matched.append(item_copy)
 
-        matched = sorted(matched, key=lambda x: x["relevance_score"], reverse=True)
         results["incidents"] = {"items": matched[:10], "count": len(matched)}
         total_count += len(matched)
 
@@ -10,6 +10,7 @@ import os
 
 from prometheus_client import Counter as PrometheusCounter
 from prometheus_client import Gauge, Histogram, REGISTRY
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
 
 
 class _NoOpMetric:
@@ -41,6 +42,40 @@ def _clear_registry():
         pass
 
 
+class MemoryCacheCollector:
+    """プロセス内キャッシュ（memory_cache.MemoryCache）の統計をスクレイプ時に出力"""
+
+    def collect(self):
+        from memory_cache import cache_stats_by_name
+
+        requests = CounterMetricFamily(
+            "mks_memory_cache_requests",
+            "In-process cache lookups",
+            labels=["cache", "result"],
+        )
+        evictions = CounterMetricFamily(
+            "mks_memory_cache_evictions",
+            "In-process cache entries removed by size limits or expiry",
+            labels=["cache", "reason"],
+        )
+        entries = GaugeMetricFamily(
+            "mks_memory_cache_entries", "In-process cache entries", labels=["cache"]
+        )
+        size = GaugeMetricFamily(
+            "mks_memory_cache_bytes",
+            "Estimated in-process cache memory usage",
+            labels=["cache"],
+        )
+        for name, stats in cache_stats_by_name().items():
+            requests.add_metric([name, "hit"], stats["hits"])
+            requests.add_metric([name, "miss"], stats["misses"])
+            evictions.add_metric([name, "capacity"], stats["evictions"])
+            evictions.add_metric([name, "expired"], stats["expirations"])
+            entries.add_metric([name], stats["entries"])
+            size.add_metric([name], stats["bytes"])
+        yield from (requests, evictions, entries, size)
+
+
 _noop = _NoOpMetric()
 
 if os.environ.get("TESTING") == "true":
@@ -62,6 +97,10 @@ if os.environ.get("TESTING") == "true":
     MS365_SYNC_DURATION = _noop
     MS365_FILES_PROCESSED = _noop
     MS365_SYNC_ERRORS = _noop
+    AUDIT_LOG_QUEUE_DEPTH = _noop
+    AUDIT_LOG_WRITTEN = _noop
+    AUDIT_LOG_DROPPED = _noop
+    AUDIT_LOG_FLUSH_DURATION = _noop
 else:
     # ---- 本番/開発環境: Prometheus メトリクス登録 ----
     _clear_registry()
@@ -139,3 +178,23 @@ else:
         "Total MS365 sync errors",
         ["config_id", "error_type"],
     )
+
+    AUDIT_LOG_QUEUE_DEPTH = Gauge(
+        "mks_audit_log_queue_depth", "Number of audit log entries waiting to be written"
+    )
+
+    AUDIT_LOG_WRITTEN = PrometheusCounter(
+        "mks_audit_log_written_total", "Total audit log entries written"
+    )
+
+    AUDIT_LOG_DROPPED = PrometheusCounter(
+        "mks_audit_log_dropped_total",
+        "Total audit log entries dropped",
+        ["reason"],  # reason: overflow/write_error
+    )
+
+    AUDIT_LOG_FLUSH_DURATION = Histogram(
+        "mks_audit_log_flush_duration_seconds", "Audit log batch flush duration"
+    )
+
+    REGISTRY.register(MemoryCacheCollector())
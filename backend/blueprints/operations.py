@@ -32,9 +32,13 @@ from app_helpers import (
     check_permission,
     get_cache_key,
     get_dal,
+    list_page_args,
     load_data,
+    load_item,
+    load_page,
     load_users,
     log_access,
+    page_cache_token,
     save_data,
 )
 
@@ -56,16 +60,23 @@ def get_incidents():
         current_user_id = get_jwt_identity()
         log_access(current_user_id, "incidents.list", "incidents")
 
-        cache_key = get_cache_key("incidents_list")
-        cached_result = cache_get(cache_key)
-        if cached_result:
-            return jsonify(cached_result)
-
-        incidents_list = load_data("incidents.json") or []
+        try:
+            page_args = list_page_args(("project", "severity", "status"))
+            cache_key = get_cache_key("incidents_list", page_cache_token(page_args))
+            cached_result = cache_get(cache_key)
+            if cached_result:
+                return jsonify(cached_result)
+
+            incidents_list, next_cursor, total = load_page("incidents.json", **page_args)
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": {"code": "INVALID_PARAMETER", "message": str(e)},
+            }), 400
         response_data = {
             "success": True,
             "data": incidents_list,
-            "pagination": {"total_items": len(incidents_list)},
+            "pagination": {"total_items": total, "next_cursor": next_cursor},
         }
         cache_set(cache_key, response_data, ttl=3600)
 
@@ -81,8 +92,7 @@ def get_incident_detail(incident_id):
     current_user_id = get_jwt_identity()
     log_access(current_user_id, "incidents.view", "incidents", incident_id)
 
-    incidents_list = load_data("incidents.json")
-    incident = next((i for i in incidents_list if i["id"] == incident_id), None)
+    incident = load_item("incidents.json", incident_id)
 
     if not incident:
         return jsonify({"success": False, "error": "Incident not found"}), 404
@@ -103,11 +113,19 @@ def get_approvals():
         current_user_id = get_jwt_identity()
         log_access(current_user_id, "approvals.list", "approvals")
 
-        approvals = load_data("approvals.json") or []
+        try:
+            approvals, next_cursor, total = load_page(
+                "approvals.json", **list_page_args(("status", "type", "requester_id", "priority"))
+            )
+        except ValueError as e:
+            return jsonify({
+                "success": False,
+                "error": {"code": "INVALID_PARAMETER", "message": str(e)},
+            }), 400
         return jsonify({
             "success": True,
             "data": approvals,
-            "pagination": {"total_items": len(approvals)},
+            "pagination": {"total_items": total, "next_cursor": next_cursor},
         })
     except Exception:
         raise
@@ -189,7 +207,7 @@ def get_regulation_detail(reg_id):
         return jsonify({"success": False, "error": "Regulation not found"}), 404
 
     response_data = {"success": True, "data": regulation}
-    cache_set(cache_key, response_data, ttl=86400)
+    cache_set(cache_key, response_data, ttl=86400, tags=(f"regulations:{reg_id}",))
     logger.info("Cache set: regulations_detail - %s", cache_key)
     return jsonify(response_data)
 
@@ -252,7 +270,7 @@ def get_project_detail(project_id):
         return jsonify({"success": False, "error": "Project not found"}), 404
 
     response_data = {"success": True, "data": project}
-    cache_set(cache_key, response_data, ttl=3600)
+    cache_set(cache_key, response_data, ttl=3600, tags=(f"projects:{project_id}",))
     logger.info("Cache set: projects_detail - %s", cache_key)
     return jsonify(response_data)
 
@@ -316,7 +334,7 @@ def get_expert_detail(expert_id):
             return jsonify({"success": False, "error": "Expert not found"}), 404
 
         response_data = {"success": True, "data": expert}
-        cache_set(cache_key, response_data, ttl=7200)
+        cache_set(cache_key, response_data, ttl=7200, tags=(f"experts:{expert_id}",))
         logger.info("Cache set: experts_detail - %s", cache_key)
         return jsonify(response_data)
     except Exception as e:
@@ -16,10 +16,13 @@ from flask_jwt_extended import get_jwt_identity, jwt_required
 
 from app_helpers import (
     check_permission,
+    get_interaction_matrix,
+    get_popular_ranking,
     load_data,
     log_access,
     recommendation_engine,
 )
+from memory_cache import cache_stats_by_name
 
 logger = logging.getLogger(__name__)
 
@@ -91,7 +94,9 @@ def get_personalized_recommendations():
             400,
         )
 
-    access_logs = load_data("access_logs.json")
+    # 閲覧行列（監査ログの追記分のみ取り込み）。NumPy 未導入時はログを全件走査
+    matrix = get_interaction_matrix()
+    access_logs = load_data("access_logs.json") if matrix is None else []
     knowledge_list = load_data("knowledge.json")
     sop_list = load_data("sop.json")
 
@@ -105,6 +110,9 @@ def get_personalized_recommendations():
                 all_items=knowledge_list,
                 limit=limit,
                 days=days,
+                matrix=matrix,
+                resource="knowledge",
+                popularity=lambda n: get_popular_ranking("knowledge", n),
             )
         )
         results["knowledge"] = {
@@ -119,6 +127,9 @@ def get_personalized_recommendations():
             all_items=sop_list,
             limit=limit,
             days=days,
+            matrix=matrix,
+            resource="sop",
+            popularity=lambda n: get_popular_ranking("sop", n),
         )
         results["sop"] = {
             "items": sop_recommendations,
@@ -134,11 +145,15 @@ def get_personalized_recommendations():
 @jwt_required()
 @check_permission("admin")
 def get_recommendation_cache_stats():
-    """推薦エンジンのキャッシュ統計を取得（管理者のみ）"""
+    """推薦エンジンのキャッシュ統計を取得（管理者のみ）
+
+    process_caches にはこのワーカーのプロセス内キャッシュ全体の統計を含める。
+    """
     current_user_id = get_jwt_identity()
     log_access(current_user_id, "recommendations.cache_stats", "recommendations")
 
     stats = recommendation_engine.get_cache_stats()
+    stats["process_caches"] = cache_stats_by_name()
 
     return jsonify({"success": True, "data": stats})
 
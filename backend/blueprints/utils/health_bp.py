@@ -38,7 +38,7 @@ def get_metrics():
         text/plain: Prometheus形式のメトリクスデータ
     """
     # metrics_storage は app_v2 モジュールレベルに存在するため遅延インポート
-    from app_helpers import load_data
+    from app_helpers import iter_access_logs, load_data
     import app_v2 as _app_v2
 
     metrics_storage = _app_v2.metrics_storage
@@ -52,8 +52,7 @@ def get_metrics():
     knowledge_list = load_data("knowledge.json")
     sop_list = load_data("sop.json")
 
-    # アクセスログ分析
-    access_logs = load_data("access_logs.json")
+    # アクセスログ分析（監査ログストアからストリーミングで集計）
 
     # アクティブユーザー計算（過去15分以内にアクセスがあったユーザー）
     from datetime import datetime
@@ -63,7 +62,7 @@ def get_metrics():
     login_success = 0
     login_failure = 0
 
-    for log in access_logs:
+    for log in iter_access_logs():
         try:
             log_time = datetime.fromisoformat(log.get("timestamp", ""))
             if (now - log_time).total_seconds() < 900:  # 15分以内
@@ -11,6 +11,7 @@ backend/dal/ パッケージ構成:
   logs.py             - LogsMixin（アクセスログ）
   ms365.py            - MS365Mixin（MS365同期DAL）
   consultations.py    - ConsultationsMixin（専門家相談CRUD）
+  view_counters.py    - ViewCountersMixin（閲覧数カウンタ）
 """
 
 from .base import BaseDAL
@@ -22,6 +23,7 @@ from .ms365 import MS365Mixin
 from .notifications import NotificationMixin
 from .operations import OperationsMixin
 from .projects import ProjectsMixin
+from .view_counters import ViewCountersMixin
 
 
 class DataAccessLayer(
@@ -33,6 +35,7 @@ class DataAccessLayer(
     LogsMixin,
     MS365Mixin,
     ConsultationsMixin,
+    ViewCountersMixin,
     BaseDAL,
 ):
     """データアクセス抽象化レイヤー（統合クラス）
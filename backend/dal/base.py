@@ -3,15 +3,53 @@ BaseDAL - インフラストラクチャ基盤
 JSON/PostgreSQL切り替えの基底クラス
 """
 
+import base64
 import json
 import logging
 import os
-from typing import Any, Dict, List, Optional
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 
+import json_snapshots
 from config import Config
+from database import get_request_session
 
 logger = logging.getLogger(__name__)
 
+# 一覧ページ: (要素リスト, 次ページのカーソル（最終ページは None）, 総件数の見積もり)
+Page = Tuple[List[Dict], Optional[str], int]
+
+
+def encode_cursor(sort_value: Any, item_id: Any) -> str:
+    """キーセットカーソル（直前ページ末尾の ソート値・id）を URL セーフな文字列にする"""
+    raw = json.dumps([sort_value, item_id], ensure_ascii=False, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, Any]:
+    """
+    encode_cursor() の逆変換
+
+    Raises:
+        ValueError: 不正なカーソル
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value = json.loads(raw.decode("utf-8"))
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    if not isinstance(value, list) or len(value) != 2:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return value[0], value[1]
+
+
+def _project(item: Dict, fields: Optional[Sequence[str]]) -> Dict:
+    """射影（fields 指定時は id と指定フィールドのみ）"""
+    if not fields:
+        return item
+    return {field: item[field] for field in ("id", *fields) if field in item}
+
 
 class BaseDAL:
     """データアクセス基底クラス（インフラ層）"""
@@ -38,23 +76,284 @@ class BaseDAL:
             return False
         return db_config.is_postgres_available()
 
+    @contextmanager
+    def _session(self, factory) -> Iterator[Any]:
+        """
+        DBセッション（Flask のリクエスト内ではリクエストスコープのセッションを共有）
+
+        リクエスト内では database.get_request_session() のセッションを使い回し、
+        1リクエストの DAL 呼び出し全体で接続のチェックアウトを1回にする
+        （破棄は teardown_appcontext）。例外時はロールバックだけ行い、
+        後続の DAL 呼び出しが失敗したトランザクションを引き継がないようにする。
+        リクエスト外（スクリプト・バックグラウンドスレッド）では factory() で作成して閉じる。
+
+        Args:
+            factory: get_session_factory() の戻り値
+        """
+        db = get_request_session(factory)
+        if db is None:
+            db = factory()
+            try:
+                yield db
+            finally:
+                db.close()
+            return
+        try:
+            yield db
+        except Exception:
+            db.rollback()
+            raise
+
+    @staticmethod
+    def _select_dicts(db, stmt) -> List[Dict]:
+        """
+        Core の SELECT を実行して行マッピングを dict で返す（ORM エンティティを生成しない）
+
+        日時は ISO 文字列、ARRAY 列の NULL は空リストにする（各 _*_to_dict と同じ表現）。
+        """
+        from sqlalchemy import ARRAY
+
+        arrays = [column.name for column in stmt.selected_columns if isinstance(column.type, ARRAY)]
+        rows = [_row_to_dict(row) for row in db.execute(stmt).mappings()]
+        for row in rows:
+            for name in arrays:
+                if row.get(name) is None:
+                    row[name] = []
+        return rows
+
     def _get_json_path(self, filename):
         """JSONファイルのパスを取得"""
         return os.path.join(self.data_dir, filename)
 
-    def _load_json(self, filename):
-        """JSONファイルからデータを読み込み"""
+    def _json_version(self, filename):
+        """JSONファイルのバージョン（パス, mtime_ns, size, inode）を取得"""
         filepath = self._get_json_path(filename)
-        if os.path.exists(filepath):
-            try:
-                with open(filepath, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    if not isinstance(data, list):
-                        return []
-                    return [item for item in data if isinstance(item, dict)]
-            except (json.JSONDecodeError, ValueError):
-                return []
-        return []
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            return None
+        return (filepath, st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def get_collection_version(self, filename):
+        """
+        PostgreSQLのコレクションの軽量バージョン（件数・最大ID・最終更新日時）
+
+        検索インデックス等の派生データ構造の再構築要否を、全行を読み込まずに
+        集計クエリ1本で判定するために使う。
+
+        Args:
+            filename: JSONモードでのファイル名（knowledge.json / sop.json / incidents.json）
+
+        Returns:
+            ("pg", 件数, 最大ID, 最終更新日時のISO文字列)。PostgreSQLが使えない場合や
+            未対応のコレクションは None
+        """
+        if not self._use_postgresql():
+            return None
+        from sqlalchemy import func
+
+        from database import get_session_factory
+        from models import SOP, Incident, Knowledge
+
+        model = {"knowledge.json": Knowledge, "sop.json": SOP, "incidents.json": Incident}.get(
+            filename
+        )
+        factory = get_session_factory()
+        if model is None or not factory:
+            return None
+        with self._session(factory) as db:
+            count, max_id, max_updated = db.query(
+                func.count(model.id), func.max(model.id), func.max(model.updated_at)
+            ).one()
+        return ("pg", count, max_id, max_updated.isoformat() if max_updated else None)
+
+    # ------------------------------------------------------------
+    # 一覧のページング（get_*_page の共通処理）
+    # ------------------------------------------------------------
+
+    def _page_json(
+        self,
+        filename: str,
+        limit: Optional[int],
+        cursor: Optional[str],
+        sort: str,
+        order: str,
+        fields: Optional[Sequence[str]] = None,
+        offset: int = 0,
+        equals: Optional[Dict[str, Any]] = None,
+        predicate: Optional[Callable[[Dict], bool]] = None,
+        view: Optional[Callable[[Dict], Dict]] = None,
+    ) -> Page:
+        """
+        JSONモードのページ取得（スナップショットごとのソート順・索引を使う）
+
+        view 指定時は、スナップショットごとに事前変換した軽量表現（json_snapshots.page の view）を返す。
+        """
+        after = json_snapshots.sort_key(*decode_cursor(cursor)) if cursor else None
+        try:
+            loaded = json_snapshots.page(
+                self._get_json_path(filename),
+                self._parse_json,
+                sort,
+                limit,
+                descending=(order != "asc"),
+                after=after,
+                offset=offset,
+                equals=equals,
+                predicate=predicate,
+                view=view,
+            )
+        except json.JSONDecodeError:
+            loaded = None
+        if loaded is None:
+            return [], None, 0
+        items, has_more, total = loaded
+        next_cursor = None
+        if has_more and items:
+            next_cursor = encode_cursor(items[-1].get(sort), items[-1].get("id"))
+        return [_project(item, fields) for item in items], next_cursor, total
+
+    def _page_sql(
+        self,
+        model,
+        conditions: List[Any],
+        limit: Optional[int],
+        cursor: Optional[str],
+        sort: str,
+        order: str,
+        fields: Optional[Sequence[str]] = None,
+        offset: int = 0,
+        columns: Sequence[Any] = (),
+    ) -> Page:
+        """
+        PostgreSQLモードのページ取得
+
+        条件・キーセット（ソート値, id）・ORDER BY・LIMIT をSQLで実行し、
+        Core の select で行マッピングを直接受け取る（ORM エンティティを生成しない）。
+        fields 指定時は必要な列だけを取得する。
+        columns には fields に加えて取得する SQL式（label 付き。例: 本文の長さ）を渡せる。
+        NULL はソート上の最小値として扱う（JSONモードと同じ順序）。
+        """
+        from sqlalchemy import and_, or_, select
+
+        from database import get_session_factory
+
+        factory = get_session_factory()
+        if not factory:
+            return [], None, 0
+
+        table = model.__table__
+        column = table.c[sort]
+        descending = order != "asc"
+
+        if fields:
+            names = [name for name in dict.fromkeys(("id", sort, *fields)) if name in table.c]
+            stmt = select(*(table.c[name] for name in names), *columns)
+            fields = [*fields, *(expr.name for expr in columns)]
+        else:
+            stmt = select(table)
+        stmt = stmt.where(*conditions)
+
+        if cursor:
+            value, item_id = decode_cursor(cursor)
+            value = _coerce_cursor_value(column, value)
+            if descending:
+                if value is None:
+                    after = and_(column.is_(None), table.c.id < item_id)
+                else:
+                    after = or_(
+                        column < value,
+                        and_(column == value, table.c.id < item_id),
+                        column.is_(None),
+                    )
+            else:
+                if value is None:
+                    after = or_(and_(column.is_(None), table.c.id > item_id), column.isnot(None))
+                else:
+                    after = or_(column > value, and_(column == value, table.c.id > item_id))
+            stmt = stmt.where(after)
+        if offset:
+            stmt = stmt.offset(offset)
+        if descending:
+            stmt = stmt.order_by(column.desc().nulls_last(), table.c.id.desc())
+        else:
+            stmt = stmt.order_by(column.asc().nulls_first(), table.c.id.asc())
+        if limit is not None:
+            stmt = stmt.limit(limit + 1)
+
+        with self._session(factory) as db:
+            rows = self._select_dicts(db, stmt)
+            total = self._estimate_total(db, model, conditions)
+
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].get(sort), rows[-1].get("id"))
+        return [_project(row, fields) for row in rows], next_cursor, total
+
+    @staticmethod
+    def _estimate_total(db, model, conditions: List[Any]) -> int:
+        """
+        総件数の見積もり
+
+        条件なしの場合は pg_class.reltuples（ANALYZE 時点の推定値）を使い全件数えない。
+        条件ありの場合（インデックスの効く一致条件）は count(*) を実行する。
+        """
+        from sqlalchemy import func, select, text
+
+        if not conditions:
+            estimate = db.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:name AS regclass)"),
+                {"name": model.__table__.fullname},
+            ).scalar()
+            if estimate is not None and estimate >= 0:
+                return int(estimate)
+        return db.execute(select(func.count()).select_from(model).where(*conditions)).scalar()
+
+    def _load_json(self, filename):
+        """JSONファイルからデータを読み込み（パース結果はプロセス内でキャッシュ）"""
+        try:
+            items = json_snapshots.load_list(self._get_json_path(filename), self._parse_json)
+        except (json.JSONDecodeError, ValueError):
+            return []
+        return items if items is not None else []
+
+    def _find_json(self, filename, field, value):
+        """フィールド値が一致する最初の要素を索引で取得（見つからない場合は None）"""
+        try:
+            return json_snapshots.find_one(
+                self._get_json_path(filename), self._parse_json, field, value
+            )
+        except (json.JSONDecodeError, ValueError):
+            return None
+
+    def _filter_json(self, filename, field, value):
+        """フィールド値が一致する全要素を索引で取得"""
+        try:
+            return json_snapshots.find_all(
+                self._get_json_path(filename), self._parse_json, field, value
+            )
+        except (json.JSONDecodeError, ValueError):
+            return []
+
+    def _load_json_indexed(self, filename, field="id"):
+        """要素リストと {フィールド値: 位置リスト} の索引を取得（更新対象の位置を引く用）"""
+        try:
+            loaded = json_snapshots.load_list_indexed(
+                self._get_json_path(filename), self._parse_json, field
+            )
+        except (json.JSONDecodeError, ValueError):
+            loaded = None
+        return loaded if loaded is not None else ([], {})
+
+    @staticmethod
+    def _parse_json(filepath):
+        """JSONファイルをパースし dict の要素だけを返す"""
+        with open(filepath, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, list):
+            return []
+        return [item for item in data if isinstance(item, dict)]
 
     def _save_json(self, filename, data):
         """JSONファイルにデータを保存"""
@@ -71,6 +370,28 @@ class BaseDAL:
             with os.fdopen(fd, "w", encoding="utf-8") as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
             os.replace(tmp_path, filepath)
+            json_snapshots.bump_generation(filepath)
         finally:
             if os.path.exists(tmp_path):
                 os.remove(tmp_path)
+
+
+def _coerce_cursor_value(column, value):
+    """カーソルの値（JSON）を列の型に戻す（日時は ISO 文字列で保持している）"""
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type in (datetime, date) and isinstance(value, str):
+        return python_type.fromisoformat(value)
+    return value
+
+
+def _row_to_dict(row) -> Dict:
+    """Core の行マッピングを dict に変換（日時は ISO 文字列）"""
+    return {
+        key: value.isoformat() if isinstance(value, (datetime, date)) else value
+        for key, value in row.items()
+    }
@@ -49,22 +49,15 @@ class ConsultationsMixin:
 
     def get_consultation_by_id(self, consultation_id):
         """
-        相談詳細取得（閲覧数インクリメント）
+        相談詳細取得
+
+        閲覧数は閲覧のたびに書き換えず、閲覧数カウンタ（services/view_counters.py）で
+        まとめて加算する。
 
         Returns:
             dict | None
         """
-        consultations = self._load_json("consultations.json")
-        idx = next(
-            (i for i, c in enumerate(consultations) if c["id"] == consultation_id),
-            None,
-        )
-        if idx is None:
-            return None
-
-        consultations[idx]["views"] = consultations[idx].get("views", 0) + 1
-        self._save_json("consultations.json", consultations)
-        return consultations[idx]
+        return self._find_json("consultations.json", "id", consultation_id)
 
     # ------------------------------------------------------------------
     # 作成・更新系
@@ -121,11 +114,8 @@ class ConsultationsMixin:
             tuple: (updated_consultation | None, error_code | None)
               error_code: "NOT_FOUND" | "FORBIDDEN" | None
         """
-        consultations = self._load_json("consultations.json")
-        idx = next(
-            (i for i, c in enumerate(consultations) if c["id"] == consultation_id),
-            None,
-        )
+        consultations, positions = self._load_json_indexed("consultations.json")
+        idx = positions.get(consultation_id, [None])[0]
         if idx is None:
             return None, "NOT_FOUND"
 
@@ -149,11 +139,8 @@ class ConsultationsMixin:
         Returns:
             tuple: (new_answer | None, requester_id | None, consultation_title | None, error_code | None)
         """
-        consultations = self._load_json("consultations.json")
-        idx = next(
-            (i for i, c in enumerate(consultations) if c["id"] == consultation_id),
-            None,
-        )
+        consultations, positions = self._load_json_indexed("consultations.json")
+        idx = positions.get(consultation_id, [None])[0]
         if idx is None:
             return None, None, None, "NOT_FOUND"
 
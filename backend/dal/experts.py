@@ -32,8 +32,7 @@ class ExpertsMixin:
             factory = get_session_factory()
             if not factory:
                 return []
-            db = factory()
-            try:
+            with self._session(factory) as db:
                 query = db.query(Expert)
 
                 # フィルタリング
@@ -49,16 +48,14 @@ class ExpertsMixin:
 
                 results = query.order_by(Expert.rating.desc()).all()
                 return [self._expert_to_dict(e) for e in results]
-            finally:
-                db.close()
         else:
             # 専門家はJSONベースのみ
             filter_hash = hashlib.md5(
                 _json.dumps(filters or {}, sort_keys=True).encode()
             ).hexdigest()[:8]
-            cache_key = f"experts:list:{filter_hash}"
             # 循環インポート回避のため遅延インポート
-            from app_helpers import cache_get, cache_set  # noqa: PLC0415
+            from app_helpers import cache_get, cache_set, get_cache_key  # noqa: PLC0415
+            cache_key = get_cache_key("experts_dal_list", filter_hash)
             cached = cache_get(cache_key)
             if cached is not None:
                 return cached
@@ -98,16 +95,12 @@ class ExpertsMixin:
             factory = get_session_factory()
             if not factory:
                 return None
-            db = factory()
-            try:
+            with self._session(factory) as db:
                 expert = db.query(Expert).filter(Expert.id == expert_id).first()
                 return self._expert_to_dict(expert) if expert else None
-            finally:
-                db.close()
         else:
             # 専門家はJSONベースのみ
-            data = self._load_json("experts.json")
-            return next((e for e in data if e["id"] == expert_id), None)
+            return self._find_json("experts.json", "id", expert_id)
 
     def get_expert_stats(self, expert_id: int = None) -> Dict:
         """
@@ -123,118 +116,116 @@ class ExpertsMixin:
             factory = get_session_factory()
             if not factory:
                 return {}
-            db = factory()
-            try:
-                if expert_id:
-                    # 特定の専門家の統計
-                    expert = db.query(Expert).filter(Expert.id == expert_id).first()
-                    if not expert:
-                        return {}
-
-                    # 評価の平均を計算
-                    ratings = (
-                        db.query(ExpertRating)
-                        .filter(ExpertRating.expert_id == expert_id)
-                        .all()
-                    )
-                    avg_rating = (
-                        sum(r.rating for r in ratings) / len(ratings) if ratings else 0
-                    )
-
-                    # 相談件数を取得
-                    consultations = (
-                        db.query(Consultation)
-                        .filter(Consultation.expert_id == expert.user_id)
-                        .all()
-                    )
-
-                    result = {
-                        "expert_id": expert_id,
-                        "consultation_count": len(consultations),
-                        "average_rating": round(avg_rating, 1),
-                        "total_ratings": len(ratings),
-                        "specialization": expert.specialization,
-                        "experience_years": expert.experience_years,
-                        "is_available": expert.is_available,
-                    }
-                    logger.info(
-                        "get_expert_stats(): クエリ完了 - expert_id=%d", expert_id
-                    )
-                    return result
-                else:
-                    # 全専門家の統計（N+1クエリ最適化版）
-                    # サブクエリで評価データを集計
-                    expert_ratings_subq = (
-                        db.query(
-                            ExpertRating.expert_id,
-                            func.avg(ExpertRating.rating).label("avg_rating"),
-                            func.count(ExpertRating.id).label("rating_count"),
+            with self._session(factory) as db:
+                try:
+                    if expert_id:
+                        # 特定の専門家の統計
+                        expert = db.query(Expert).filter(Expert.id == expert_id).first()
+                        if not expert:
+                            return {}
+
+                        # 評価の平均を計算
+                        ratings = (
+                            db.query(ExpertRating)
+                            .filter(ExpertRating.expert_id == expert_id)
+                            .all()
+                        )
+                        avg_rating = (
+                            sum(r.rating for r in ratings) / len(ratings) if ratings else 0
                         )
-                        .group_by(ExpertRating.expert_id)
-                        .subquery()
-                    )
 
-                    # サブクエリで相談件数を集計
-                    consultation_counts_subq = (
-                        db.query(
-                            Consultation.expert_id.label("expert_user_id"),
-                            func.count(Consultation.id).label("consultation_count"),
+                        # 相談件数を取得
+                        consultations = (
+                            db.query(Consultation)
+                            .filter(Consultation.expert_id == expert.user_id)
+                            .all()
                         )
-                        .group_by(Consultation.expert_id)
-                        .subquery()
-                    )
 
-                    # Eager Loadingで一発取得（クエリ3回に削減）
-                    experts_with_stats = (
-                        db.query(Expert)
-                        .options(joinedload(Expert.user))  # Userを先読み（1対1）
-                        .outerjoin(
-                            expert_ratings_subq,
-                            Expert.id == expert_ratings_subq.c.expert_id,
+                        result = {
+                            "expert_id": expert_id,
+                            "consultation_count": len(consultations),
+                            "average_rating": round(avg_rating, 1),
+                            "total_ratings": len(ratings),
+                            "specialization": expert.specialization,
+                            "experience_years": expert.experience_years,
+                            "is_available": expert.is_available,
+                        }
+                        logger.info(
+                            "get_expert_stats(): クエリ完了 - expert_id=%d", expert_id
                         )
-                        .outerjoin(
-                            consultation_counts_subq,
-                            Expert.user_id == consultation_counts_subq.c.expert_user_id,
+                        return result
+                    else:
+                        # 全専門家の統計（N+1クエリ最適化版）
+                        # サブクエリで評価データを集計
+                        expert_ratings_subq = (
+                            db.query(
+                                ExpertRating.expert_id,
+                                func.avg(ExpertRating.rating).label("avg_rating"),
+                                func.count(ExpertRating.id).label("rating_count"),
+                            )
+                            .group_by(ExpertRating.expert_id)
+                            .subquery()
                         )
-                        .add_columns(
-                            expert_ratings_subq.c.avg_rating,
-                            expert_ratings_subq.c.rating_count,
-                            consultation_counts_subq.c.consultation_count,
+
+                        # サブクエリで相談件数を集計
+                        consultation_counts_subq = (
+                            db.query(
+                                Consultation.expert_id.label("expert_user_id"),
+                                func.count(Consultation.id).label("consultation_count"),
+                            )
+                            .group_by(Consultation.expert_id)
+                            .subquery()
                         )
-                        .all()
-                    )
 
-                    # ループ内でクエリ不要（既に全データ取得済み）
-                    stats = []
-                    for expert, avg_rating, rating_count, consultation_count in (
-                        experts_with_stats
-                    ):
-                        stats.append(
-                            {
-                                "expert_id": expert.id,
-                                "name": (
-                                    expert.user.full_name if expert.user else "Unknown"
-                                ),
-                                "specialization": expert.specialization,
-                                "consultation_count": consultation_count or 0,
-                                "average_rating": (
-                                    round(float(avg_rating), 1) if avg_rating else 0
-                                ),
-                                "total_ratings": rating_count or 0,
-                                "experience_years": expert.experience_years,
-                                "is_available": expert.is_available,
-                            }
+                        # Eager Loadingで一発取得（クエリ3回に削減）
+                        experts_with_stats = (
+                            db.query(Expert)
+                            .options(joinedload(Expert.user))  # Userを先読み（1対1）
+                            .outerjoin(
+                                expert_ratings_subq,
+                                Expert.id == expert_ratings_subq.c.expert_id,
+                            )
+                            .outerjoin(
+                                consultation_counts_subq,
+                                Expert.user_id == consultation_counts_subq.c.expert_user_id,
+                            )
+                            .add_columns(
+                                expert_ratings_subq.c.avg_rating,
+                                expert_ratings_subq.c.rating_count,
+                                consultation_counts_subq.c.consultation_count,
+                            )
+                            .all()
                         )
 
-                    logger.info(
-                        "get_expert_stats(): N+1最適化クエリ完了 - %d件取得", len(stats)
-                    )
-                    return {"experts": stats}
-            except Exception as e:
-                logger.error("get_expert_stats(): クエリ実行エラー: %s", str(e))
-                raise
-            finally:
-                db.close()
+                        # ループ内でクエリ不要（既に全データ取得済み）
+                        stats = []
+                        for expert, avg_rating, rating_count, consultation_count in (
+                            experts_with_stats
+                        ):
+                            stats.append(
+                                {
+                                    "expert_id": expert.id,
+                                    "name": (
+                                        expert.user.full_name if expert.user else "Unknown"
+                                    ),
+                                    "specialization": expert.specialization,
+                                    "consultation_count": consultation_count or 0,
+                                    "average_rating": (
+                                        round(float(avg_rating), 1) if avg_rating else 0
+                                    ),
+                                    "total_ratings": rating_count or 0,
+                                    "experience_years": expert.experience_years,
+                                    "is_available": expert.is_available,
+                                }
+                            )
+
+                        logger.info(
+                            "get_expert_stats(): N+1最適化クエリ完了 - %d件取得", len(stats)
+                        )
+                        return {"experts": stats}
+                except Exception as e:
+                    logger.error("get_expert_stats(): クエリ実行エラー: %s", str(e))
+                    raise
         else:
             # JSONベースの実装
             experts = self._load_json("experts.json")
@@ -325,8 +316,7 @@ class ExpertsMixin:
             factory = get_session_factory()
             if not factory:
                 return 0.0
-            db = factory()
-            try:
+            with self._session(factory) as db:
                 expert = db.query(Expert).filter(Expert.id == expert_id).first()
                 if not expert:
                     return 0.0
@@ -364,8 +354,6 @@ class ExpertsMixin:
                 final_rating = max(0.0, min(5.0, final_rating))
 
                 return round(final_rating, 1)
-            finally:
-                db.close()
         else:
             # JSONベースの実装: 計算結果をキャッシュして繰り返し呼び出しを回避
             cache_key = f"experts:rating:{expert_id}"
@@ -375,16 +363,13 @@ class ExpertsMixin:
             if cached is not None:
                 return cached
 
-            # 両ファイルを一括ロード
-            experts = self._load_json("experts.json")
-            ratings = self._load_json("expert_ratings.json")
-
-            expert = next((e for e in experts if e["id"] == expert_id), None)
+            # 専門家・評価とも索引で該当分だけ取得
+            expert = self._find_json("experts.json", "id", expert_id)
             if not expert:
                 return 0.0
 
             # ユーザーレビュー平均
-            expert_ratings = [r for r in ratings if r.get("expert_id") == expert_id]
+            expert_ratings = self._filter_json("expert_ratings.json", "expert_id", expert_id)
             user_rating_avg = (
                 sum(r.get("rating", 0) for r in expert_ratings) / len(expert_ratings)
                 if expert_ratings
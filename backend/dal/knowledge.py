@@ -5,11 +5,59 @@ KnowledgeMixin - ナレッジドメインDAL
 import hashlib
 import json as _json
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from database import get_session_factory
+from knowledge_events import CREATED, DELETED, UPDATED, publish_knowledge_change
 from models import Knowledge
 
+from .base import Page, _row_to_dict
+
+# 一覧のソート基準（views / rating は JSONモードのみの項目。PostgreSQLモードでは updated_at）
+KNOWLEDGE_SORT_FIELDS = ("created_at", "updated_at", "views", "rating", "title", "id")
+
+# 一覧・検索・推薦で返すサマリービューの項目（本文 content は含めず、長さと冒頭だけ返す）
+KNOWLEDGE_SUMMARY_FIELDS = (
+    "title", "summary", "category", "tags", "status", "priority", "project", "owner",
+    "created_at", "updated_at",
+)
+# JSONモードのみの軽量な集計項目（あればサマリーに含める）
+KNOWLEDGE_SUMMARY_COUNTERS = ("views", "likes", "comments_count", "rating")
+CONTENT_SNIPPET_LENGTH = 160
+
+
+def knowledge_summary(item: Dict, extra: Tuple[str, ...] = ()) -> Dict:
+    """
+    ナレッジのサマリービュー（一覧用の軽量表現）
+
+    Args:
+        item: ナレッジ（全フィールド）
+        extra: そのまま残す追加項目（relevance_score など呼び出し元が付与した項目）
+
+    Returns:
+        id・サマリー項目・content_length・content_snippet の dict
+    """
+    summary = {
+        field: item[field]
+        for field in ("id", *KNOWLEDGE_SUMMARY_FIELDS, *KNOWLEDGE_SUMMARY_COUNTERS, *extra)
+        if field in item
+    }
+    content = item.get("content") or ""
+    summary["content_length"] = len(content)
+    summary["content_snippet"] = content[:CONTENT_SNIPPET_LENGTH]
+    return summary
+
+
+def _summary_columns() -> List[Any]:
+    """サマリービューの本文由来の列（PostgreSQL側で長さと冒頭だけ計算する）"""
+    from sqlalchemy import func
+
+    content = func.coalesce(Knowledge.content, "")
+    return [
+        func.char_length(content).label("content_length"),
+        func.left(content, CONTENT_SNIPPET_LENGTH).label("content_snippet"),
+    ]
+
 
 class KnowledgeMixin:
     """ナレッジCRUD操作"""
@@ -30,40 +78,33 @@ class KnowledgeMixin:
             factory = get_session_factory()
             if not factory:
                 return []
-            db = factory()
-            try:
-                from sqlalchemy.orm import selectinload
+            with self._session(factory) as db:
+                from sqlalchemy import select
 
-                # N+1クエリ最適化: リレーションを先読み
-                query = db.query(Knowledge).options(
-                    selectinload(Knowledge.created_by),
-                    selectinload(Knowledge.updated_by),
-                )
+                # Core の select で行マッピングを直接 dict にする（ORM エンティティを生成しない）
+                stmt = select(Knowledge.__table__)
 
                 # フィルタリング
                 if filters:
                     if "category" in filters:
-                        query = query.filter(Knowledge.category == filters["category"])
+                        stmt = stmt.where(Knowledge.category == filters["category"])
                     if "search" in filters:
                         search_term = f"%{filters['search']}%"
-                        query = query.filter(
+                        stmt = stmt.where(
                             (Knowledge.title.ilike(search_term))
                             | (Knowledge.summary.ilike(search_term))
                             | (Knowledge.content.ilike(search_term))
                         )
 
-                results = query.order_by(Knowledge.updated_at.desc()).all()
-                return [self._knowledge_to_dict(k) for k in results]
-            finally:
-                db.close()
+                return self._select_dicts(db, stmt.order_by(Knowledge.updated_at.desc()))
         else:
             # キャッシュキー（フィルタ内容を含む）
             filter_hash = hashlib.md5(
                 _json.dumps(filters or {}, sort_keys=True).encode()
             ).hexdigest()[:8]
-            cache_key = f"knowledge:list:{filter_hash}"
             # 循環インポート回避のため遅延インポート
-            from app_helpers import cache_get, cache_set  # noqa: PLC0415
+            from app_helpers import cache_get, cache_set, get_cache_key  # noqa: PLC0415
+            cache_key = get_cache_key("knowledge_dal_list", filter_hash)
             cached = cache_get(cache_key)
             if cached is not None:
                 return cached
@@ -88,6 +129,184 @@ class KnowledgeMixin:
             cache_set(cache_key, data, ttl=3600)  # CACHE_TTL_LONG: 静的データ用
             return data
 
+    def get_knowledge_page(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = 50,
+        cursor: Optional[str] = None,
+        sort: str = "updated_at",
+        order: str = "desc",
+        fields: Optional[List[str]] = None,
+        offset: int = 0,
+        summary: bool = False,
+    ) -> Page:
+        """
+        ナレッジ一覧を1ページ分取得
+
+        Args:
+            filters: フィルタ条件 (category, status, tags（いずれかを含む）, ids（IDのいずれか）)
+            limit: 取得件数（None の場合は全件）
+            cursor: 前ページの next_cursor（キーセットページング）
+            sort: ソート基準（KNOWLEDGE_SORT_FIELDS。それ以外は updated_at）
+            order: ソート順（asc, desc）
+            fields: 取得するフィールド（None の場合は全フィールド。id は常に含む）
+            offset: 読み飛ばす件数（ページ番号指定との互換用）
+            summary: サマリービュー（knowledge_summary）で返す（fields より優先）。
+                PostgreSQLモードでは content を読まず長さと冒頭だけを SELECT する
+
+        Returns:
+            (ナレッジリスト, 次ページのカーソル, 総件数の見積もり)
+
+        Raises:
+            ValueError: 不正なカーソル
+        """
+        filters = filters or {}
+        tags = filters.get("tags")
+        ids = filters.get("ids")
+        equals = {key: filters[key] for key in ("category", "status") if key in filters}
+
+        if self._use_postgresql():
+            if sort not in KNOWLEDGE_SORT_FIELDS or sort not in Knowledge.__table__.c:
+                sort = "updated_at"
+            conditions = [getattr(Knowledge, key) == value for key, value in equals.items()]
+            if tags:
+                conditions.append(Knowledge.tags.overlap(list(tags)))
+            if ids is not None:
+                conditions.append(Knowledge.id.in_(list(ids)))
+            if summary:
+                return self._page_sql(
+                    Knowledge, conditions, limit, cursor, sort, order,
+                    KNOWLEDGE_SUMMARY_FIELDS, offset, _summary_columns(),
+                )
+            return self._page_sql(Knowledge, conditions, limit, cursor, sort, order, fields, offset)
+
+        if sort not in KNOWLEDGE_SORT_FIELDS:
+            sort = "updated_at"
+        checks = []
+        if tags:
+            wanted = set(tags)
+            checks.append(lambda k: not wanted.isdisjoint(k.get("tags") or []))
+        if ids is not None:
+            wanted_ids = set(ids)
+            checks.append(lambda k: k.get("id") in wanted_ids)
+        predicate = (lambda k: all(check(k) for check in checks)) if checks else None
+        if summary:
+            return self._page_json(
+                "knowledge.json", limit, cursor, sort, order, None, offset, equals, predicate,
+                knowledge_summary,
+            )
+        return self._page_json(
+            "knowledge.json", limit, cursor, sort, order, fields, offset, equals, predicate
+        )
+
+    def search_knowledge(
+        self,
+        terms: List[str],
+        limit: int = 20,
+        offset: int = 0,
+        sort: str = "relevance_score",
+        order: str = "desc",
+        summary: bool = False,
+    ) -> Optional[Tuple[List[Dict], int]]:
+        """
+        ナレッジのランク付き全文検索（PostgreSQLモード）
+
+        全語を title / summary / content のいずれかに含むナレッジを、
+        pg_trgm の word_similarity をフィールド重み（1.0/0.7/0.5）で合計したスコア順に返す。
+        部分一致は GIN トライグラム索引（add_knowledge_trgm_search マイグレーション）で絞り込み、
+        ソート・LIMIT/OFFSET・総件数（count(*) OVER ()）はすべてSQL側で行う。
+
+        Args:
+            terms: 検索語（小文字化済み。services.search_index.parse_query の結果）
+            limit: 取得件数
+            offset: 取得開始位置
+            sort: ソート基準（relevance_score, updated_at, created_at）
+            order: ソート順（asc, desc）
+            summary: サマリービュー（knowledge_summary）で返す（content を SELECT しない）
+
+        Returns:
+            (ナレッジリスト（relevance_score 付き）, 総件数)。
+            JSONモード・DB接続不可の場合は None（呼び出し元がプロセス内索引で検索する）
+        """
+        if not self._use_postgresql():
+            return None
+        factory = get_session_factory()
+        if not factory:
+            return None
+        if not terms:
+            return [], 0
+
+        with self._session(factory) as db:
+            rows = db.execute(
+                self._knowledge_search_statement(terms, sort, order, summary)
+                .limit(limit)
+                .offset(offset)
+            ).all()
+            if rows:
+                total = rows[0].total
+            elif offset:
+                # 範囲外のページでは総件数が取れないため件数だけ数え直す
+                from sqlalchemy import func, select
+
+                stmt = self._knowledge_search_statement(terms, sort, order).subquery()
+                total = db.execute(select(func.count()).select_from(stmt)).scalar()
+            else:
+                total = 0
+
+        results = []
+        for row in rows:
+            if summary:
+                item = _row_to_dict(row._mapping)
+                item.pop("total")
+                item["tags"] = item.get("tags") or []
+            else:
+                item = self._knowledge_to_dict(row.Knowledge)
+            item["relevance_score"] = round(float(row.relevance_score), 4)
+            results.append(item)
+        return results, total
+
+    @staticmethod
+    def _knowledge_search_statement(terms: List[str], sort: str, order: str, summary: bool = False):
+        """search_knowledge の SELECT 文（LIMIT/OFFSET 以外）"""
+        from sqlalchemy import and_, func, literal, or_, select
+
+        # 索引（idx_knowledge_*_trgm）を使えるよう、条件は列そのものに対して書く
+        content = func.coalesce(Knowledge.content, "")
+        conditions = []
+        score = literal(0.0)
+        for term in terms:
+            pattern = "%" + _escape_like(term) + "%"
+            conditions.append(
+                or_(
+                    Knowledge.title.ilike(pattern, escape="\\"),
+                    Knowledge.summary.ilike(pattern, escape="\\"),
+                    Knowledge.content.ilike(pattern, escape="\\"),
+                )
+            )
+            score = (
+                score
+                + 1.0 * func.word_similarity(term, Knowledge.title)
+                + 0.7 * func.word_similarity(term, Knowledge.summary)
+                + 0.5 * func.word_similarity(term, content)
+            )
+        relevance = score.label("relevance_score")
+
+        sort_column = {
+            "updated_at": Knowledge.updated_at,
+            "created_at": Knowledge.created_at,
+        }.get(sort, relevance)
+        primary = sort_column.asc() if order == "asc" else sort_column.desc()
+        if summary:
+            table = Knowledge.__table__
+            selected = [table.c.id, *(table.c[f] for f in KNOWLEDGE_SUMMARY_FIELDS), *_summary_columns()]
+        else:
+            selected = [Knowledge]
+        return (
+            select(*selected, relevance, func.count().over().label("total"))
+            .where(and_(*conditions))
+            .order_by(primary, Knowledge.updated_at.desc(), Knowledge.id.desc())
+        )
+
     def get_knowledge_by_id(self, knowledge_id: int) -> Optional[Dict]:
         """
         ナレッジをIDで取得
@@ -102,8 +321,7 @@ class KnowledgeMixin:
             factory = get_session_factory()
             if not factory:
                 return []
-            db = factory()
-            try:
+            with self._session(factory) as db:
                 from sqlalchemy.orm import selectinload
 
                 # N+1クエリ最適化: リレーションを先読み
@@ -117,11 +335,8 @@ class KnowledgeMixin:
                     .first()
                 )
                 return self._knowledge_to_dict(knowledge) if knowledge else None
-            finally:
-                db.close()
         else:
-            data = self._load_json("knowledge.json")
-            return next((k for k in data if k["id"] == knowledge_id), None)
+            return self._find_json("knowledge.json", "id", knowledge_id)
 
     def get_related_knowledge_by_tags(
         self, tags: List[str], limit: int = 5, exclude_id: Optional[int] = None
@@ -141,8 +356,7 @@ class KnowledgeMixin:
             factory = get_session_factory()
             if not factory:
                 return []
-            db = factory()
-            try:
+            with self._session(factory) as db:
                 # N+1クエリ最適化: PostgreSQLのCTE（Common Table Expression）と配列関数を使用
                 from sqlalchemy import func
                 from sqlalchemy.orm import selectinload
@@ -219,8 +433,6 @@ class KnowledgeMixin:
 
                 return [self._knowledge_to_dict(k) for k in knowledge_list]
 
-            finally:
-                db.close()
         else:
             # JSON: タグベースフィルタリング
             data = self._load_json("knowledge.json")
@@ -272,29 +484,29 @@ class KnowledgeMixin:
             factory = get_session_factory()
             if not factory:
                 return []
-            db = factory()
-            try:
-                knowledge = Knowledge(
-                    title=knowledge_data["title"],
-                    summary=knowledge_data["summary"],
-                    content=knowledge_data.get("content"),
-                    category=knowledge_data["category"],
-                    tags=knowledge_data.get("tags", []),
-                    status=knowledge_data.get("status", "draft"),
-                    priority=knowledge_data.get("priority", "medium"),
-                    project=knowledge_data.get("project"),
-                    owner=knowledge_data["owner"],
-                    created_by_id=knowledge_data.get("created_by_id"),
-                )
-                db.add(knowledge)
-                db.commit()
-                db.refresh(knowledge)
-                return self._knowledge_to_dict(knowledge)
-            except Exception:
-                db.rollback()
-                raise
-            finally:
-                db.close()
+            with self._session(factory) as db:
+                try:
+                    knowledge = Knowledge(
+                        title=knowledge_data["title"],
+                        summary=knowledge_data["summary"],
+                        content=knowledge_data.get("content"),
+                        category=knowledge_data["category"],
+                        tags=knowledge_data.get("tags", []),
+                        status=knowledge_data.get("status", "draft"),
+                        priority=knowledge_data.get("priority", "medium"),
+                        project=knowledge_data.get("project"),
+                        owner=knowledge_data["owner"],
+                        created_by_id=knowledge_data.get("created_by_id"),
+                    )
+                    db.add(knowledge)
+                    db.commit()
+                    db.refresh(knowledge)
+                    created = self._knowledge_to_dict(knowledge)
+                    publish_knowledge_change(CREATED, created)
+                    return created
+                except Exception:
+                    db.rollback()
+                    raise
         else:
             data = self._load_json("knowledge.json")
             new_id = max([k["id"] for k in data], default=0) + 1
@@ -316,7 +528,14 @@ class KnowledgeMixin:
             }
 
             data.append(new_knowledge)
+            version_before = self._json_version("knowledge.json")
             self._save_json("knowledge.json", data)
+            publish_knowledge_change(
+                CREATED,
+                new_knowledge,
+                data_dir=self.data_dir,
+                version_before=version_before,
+            )
             return new_knowledge
 
     def update_knowledge(
@@ -336,40 +555,50 @@ class KnowledgeMixin:
             factory = get_session_factory()
             if not factory:
                 return []
-            db = factory()
-            try:
-                knowledge = (
-                    db.query(Knowledge).filter(Knowledge.id == knowledge_id).first()
-                )
-                if not knowledge:
-                    return None
-
-                for key, value in knowledge_data.items():
-                    if hasattr(knowledge, key) and key not in ["id", "created_at"]:
-                        setattr(knowledge, key, value)
-
-                knowledge.updated_at = datetime.now(timezone.utc)
-                db.commit()
-                db.refresh(knowledge)
-                return self._knowledge_to_dict(knowledge)
-            except Exception:
-                db.rollback()
-                raise
-            finally:
-                db.close()
+            with self._session(factory) as db:
+                try:
+                    knowledge = (
+                        db.query(Knowledge).filter(Knowledge.id == knowledge_id).first()
+                    )
+                    if not knowledge:
+                        return None
+                    previous = self._knowledge_to_dict(knowledge)
+
+                    for key, value in knowledge_data.items():
+                        if hasattr(knowledge, key) and key not in ["id", "created_at"]:
+                            setattr(knowledge, key, value)
+
+                    knowledge.updated_at = datetime.now(timezone.utc)
+                    db.commit()
+                    db.refresh(knowledge)
+                    updated = self._knowledge_to_dict(knowledge)
+                    publish_knowledge_change(UPDATED, updated, previous=previous)
+                    return updated
+                except Exception:
+                    db.rollback()
+                    raise
         else:
             data = self._load_json("knowledge.json")
             knowledge = next((k for k in data if k["id"] == knowledge_id), None)
 
             if not knowledge:
                 return None
+            previous = dict(knowledge)
 
             for key, value in knowledge_data.items():
                 if key != "id":
                     knowledge[key] = value
 
             knowledge["updated_at"] = datetime.now().isoformat()
+            version_before = self._json_version("knowledge.json")
             self._save_json("knowledge.json", data)
+            publish_knowledge_change(
+                UPDATED,
+                knowledge,
+                previous=previous,
+                data_dir=self.data_dir,
+                version_before=version_before,
+            )
             return knowledge
 
     def delete_knowledge(self, knowledge_id: int) -> bool:
@@ -386,29 +615,36 @@ class KnowledgeMixin:
             factory = get_session_factory()
             if not factory:
                 return []
-            db = factory()
-            try:
-                knowledge = (
-                    db.query(Knowledge).filter(Knowledge.id == knowledge_id).first()
-                )
-                if not knowledge:
-                    return False
-
-                db.delete(knowledge)
-                db.commit()
-                return True
-            except Exception:
-                db.rollback()
-                raise
-            finally:
-                db.close()
+            with self._session(factory) as db:
+                try:
+                    knowledge = (
+                        db.query(Knowledge).filter(Knowledge.id == knowledge_id).first()
+                    )
+                    if not knowledge:
+                        return False
+                    previous = self._knowledge_to_dict(knowledge)
+
+                    db.delete(knowledge)
+                    db.commit()
+                    publish_knowledge_change(DELETED, previous=previous)
+                    return True
+                except Exception:
+                    db.rollback()
+                    raise
         else:
             data = self._load_json("knowledge.json")
-            original_length = len(data)
+            previous = next((k for k in data if k["id"] == knowledge_id), None)
             data = [k for k in data if k["id"] != knowledge_id]
 
-            if len(data) < original_length:
+            if previous is not None:
+                version_before = self._json_version("knowledge.json")
                 self._save_json("knowledge.json", data)
+                publish_knowledge_change(
+                    DELETED,
+                    previous=previous,
+                    data_dir=self.data_dir,
+                    version_before=version_before,
+                )
                 return True
             return False
 
@@ -437,3 +673,8 @@ class KnowledgeMixin:
             "created_by_id": knowledge.created_by_id,
             "updated_by_id": knowledge.updated_by_id,
         }
+
+
+def _escape_like(term: str) -> str:
+    """LIKE パターンのワイルドカード（% _ \\）をエスケープ"""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
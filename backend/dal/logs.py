@@ -2,12 +2,22 @@
 LogsMixin - アクセスログドメインDAL
 """
 
+import heapq
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
+import json_snapshots
 from database import get_session_factory
 from models import AccessLog
 
+from .base import Page, _project, decode_cursor, encode_cursor
+
+ACCESS_LOG_PAGE_FILTERS = ("user_id", "action", "resource")
+
+
+def _created_at_key(log: Dict) -> str:
+    return log.get("created_at", "")
+
 
 class LogsMixin:
     """アクセスログCRUD操作"""
@@ -17,7 +27,8 @@ class LogsMixin:
         アクセスログを取得
 
         Args:
-            filters: フィルタ条件 (user_id, action, resource など)
+            filters: フィルタ条件 (user_id, action, resource など。
+                PostgreSQLモードでは since_id より大きいIDのみにID昇順で絞り込める)
 
         Returns:
             アクセスログリスト
@@ -26,8 +37,7 @@ class LogsMixin:
             factory = get_session_factory()
             if not factory:
                 return []
-            db = factory()
-            try:
+            with self._session(factory) as db:
                 query = db.query(AccessLog)
 
                 # フィルタリング
@@ -38,41 +48,100 @@ class LogsMixin:
                         query = query.filter(AccessLog.action == filters["action"])
                     if "resource" in filters:
                         query = query.filter(AccessLog.resource == filters["resource"])
-                    if "limit" in filters:
-                        query = query.limit(filters["limit"])
-
-                results = query.order_by(AccessLog.created_at.desc()).all()
+                    if "since_id" in filters:
+                        query = query.filter(AccessLog.id > filters["since_id"])
+
+                # since_id 指定時はカーソル読み取りのためID昇順（limit でバッチ取得できる）
+                if filters and "since_id" in filters:
+                    query = query.order_by(AccessLog.id.asc())
+                else:
+                    query = query.order_by(AccessLog.created_at.desc())
+                if filters and "limit" in filters:
+                    query = query.limit(filters["limit"])
+
+                results = query.all()
                 return [self._access_log_to_dict(log) for log in results]
-            finally:
-                db.close()
         else:
-            data = self._load_json("access_logs.json")
-
-            # フィルタリング
-            if filters:
-                if "user_id" in filters:
-                    data = [
-                        log for log in data if log.get("user_id") == filters["user_id"]
-                    ]
-                if "action" in filters:
-                    data = [
-                        log for log in data if log.get("action") == filters["action"]
-                    ]
-                if "resource" in filters:
-                    data = [
-                        log
-                        for log in data
-                        if log.get("resource") == filters["resource"]
-                    ]
-
-            # ソート
-            data = sorted(data, key=lambda x: x.get("created_at", ""), reverse=True)
-
-            # リミット
-            if filters and "limit" in filters:
-                data = data[: filters["limit"]]
-
-            return data
+            # 循環インポート回避のため遅延インポート（services → data_access → dal）
+            from services.audit_log_store import (  # noqa: PLC0415
+                get_audit_log_store,
+                iter_filtered,
+            )
+
+            store = get_audit_log_store(self.data_dir)
+            filters = filters or {}
+
+            # フィルタリング（ストリーミング）
+            records = iter_filtered(
+                store.iter_records(),
+                user_id=filters.get("user_id"),
+                action=filters.get("action"),
+                resource=filters.get("resource"),
+            )
+
+            # ソート + リミット（リミット指定時は上位N件のみ保持）
+            if "limit" in filters:
+                return heapq.nlargest(filters["limit"], records, key=_created_at_key)
+            return sorted(records, key=_created_at_key, reverse=True)
+
+    def get_access_logs_page(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        order: str = "desc",
+        fields: Optional[List[str]] = None,
+    ) -> Page:
+        """
+        アクセスログを1ページ分取得（created_at → id 順のキーセットページング）
+
+        Args:
+            filters: 一致フィルタ (user_id, action, resource)
+            limit: 取得件数
+            cursor: 前ページの next_cursor
+            order: ソート順（asc, desc）
+            fields: 取得するフィールド（None の場合は全フィールド）
+
+        Returns:
+            (アクセスログリスト, 次ページのカーソル, 総件数)
+        """
+        equals = {
+            key: filters[key] for key in ACCESS_LOG_PAGE_FILTERS if filters and key in filters
+        }
+        if self._use_postgresql():
+            conditions = [getattr(AccessLog, key) == value for key, value in equals.items()]
+            return self._page_sql(AccessLog, conditions, limit, cursor, "created_at", order, fields)
+
+        # 循環インポート回避のため遅延インポート（services → data_access → dal）
+        from services.audit_log_store import (  # noqa: PLC0415
+            get_audit_log_store,
+            iter_filtered,
+        )
+
+        descending = order != "asc"
+        after = json_snapshots.sort_key(*decode_cursor(cursor)) if cursor else None
+
+        def _key(log):
+            return json_snapshots.sort_key(log.get("created_at"), log.get("id"))
+
+        # 全件を保持せず、ストリーミングで件数を数えつつ上位 limit+1 件だけ残す
+        total = 0
+
+        def _candidates():
+            nonlocal total
+            records = iter_filtered(get_audit_log_store(self.data_dir).iter_records(), **equals)
+            for log in records:
+                total += 1
+                if after is None or (_key(log) < after if descending else _key(log) > after):
+                    yield log
+
+        pick = heapq.nlargest if descending else heapq.nsmallest
+        logs = pick(limit + 1, _candidates(), key=_key)
+        next_cursor = None
+        if len(logs) > limit:
+            logs = logs[:limit]
+            next_cursor = encode_cursor(logs[-1].get("created_at"), logs[-1].get("id"))
+        return [_project(log, fields) for log in logs], next_cursor, total
 
     def create_access_log(self, log_data: Dict) -> Dict:
         """
@@ -88,32 +157,26 @@ class LogsMixin:
             factory = get_session_factory()
             if not factory:
                 return []
-            db = factory()
-            try:
-                access_log = AccessLog(
-                    user_id=log_data.get("user_id"),
-                    username=log_data.get("username"),
-                    action=log_data["action"],
-                    resource=log_data.get("resource"),
-                    resource_id=log_data.get("resource_id"),
-                    ip_address=log_data.get("ip_address"),
-                    user_agent=log_data.get("user_agent"),
-                )
-                db.add(access_log)
-                db.commit()
-                db.refresh(access_log)
-                return self._access_log_to_dict(access_log)
-            except Exception:
-                db.rollback()
-                raise
-            finally:
-                db.close()
+            with self._session(factory) as db:
+                try:
+                    access_log = AccessLog(
+                        user_id=log_data.get("user_id"),
+                        username=log_data.get("username"),
+                        action=log_data["action"],
+                        resource=log_data.get("resource"),
+                        resource_id=log_data.get("resource_id"),
+                        ip_address=log_data.get("ip_address"),
+                        user_agent=log_data.get("user_agent"),
+                    )
+                    db.add(access_log)
+                    db.commit()
+                    db.refresh(access_log)
+                    return self._access_log_to_dict(access_log)
+                except Exception:
+                    db.rollback()
+                    raise
         else:
-            data = self._load_json("access_logs.json")
-            new_id = max([log["id"] for log in data], default=0) + 1
-
             new_log = {
-                "id": new_id,
                 "user_id": log_data.get("user_id"),
                 "username": log_data.get("username"),
                 "action": log_data["action"],
@@ -124,9 +187,9 @@ class LogsMixin:
                 "created_at": datetime.now().isoformat(),
             }
 
-            data.append(new_log)
-            self._save_json("access_logs.json", data)
-            return new_log
+            from services.audit_log_store import get_audit_log_store  # noqa: PLC0415
+
+            return get_audit_log_store(self.data_dir).append(new_log)
 
     @staticmethod
     def _access_log_to_dict(log: AccessLog) -> Dict:
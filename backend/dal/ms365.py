@@ -23,12 +23,9 @@ class MS365Mixin:
             factory = get_session_factory()
             if not factory:
                 return []
-            db = factory()
-            try:
+            with self._session(factory) as db:
                 configs = db.query(MS365SyncConfig).all()
                 return [self._ms365_sync_config_to_dict(c) for c in configs]
-            finally:
-                db.close()
         else:
             return self._load_json("ms365_sync_configs.json")
 
@@ -38,19 +35,15 @@ class MS365Mixin:
             factory = get_session_factory()
             if not factory:
                 return None
-            db = factory()
-            try:
+            with self._session(factory) as db:
                 config = (
                     db.query(MS365SyncConfig)
                     .filter(MS365SyncConfig.id == config_id)
                     .first()
                 )
                 return self._ms365_sync_config_to_dict(config) if config else None
-            finally:
-                db.close()
         else:
-            configs = self._load_json("ms365_sync_configs.json")
-            return next((c for c in configs if c["id"] == config_id), None)
+            return self._find_json("ms365_sync_configs.json", "id", config_id)
 
     def create_ms365_sync_config(self, config_data: Dict) -> Dict:
         """MS365同期設定を作成"""
@@ -58,15 +51,12 @@ class MS365Mixin:
             factory = get_session_factory()
             if not factory:
                 raise Exception("データベース接続エラー")
-            db = factory()
-            try:
+            with self._session(factory) as db:
                 config = MS365SyncConfig(**config_data)
                 db.add(config)
                 db.commit()
                 db.refresh(config)
                 return self._ms365_sync_config_to_dict(config)
-            finally:
-                db.close()
         else:
             configs = self._load_json("ms365_sync_configs.json")
             new_id = max([c.get("id", 0) for c in configs], default=0) + 1
@@ -87,8 +77,7 @@ class MS365Mixin:
             factory = get_session_factory()
             if not factory:
                 return None
-            db = factory()
-            try:
+            with self._session(factory) as db:
                 config = (
                     db.query(MS365SyncConfig)
                     .filter(MS365SyncConfig.id == config_id)
@@ -101,8 +90,6 @@ class MS365Mixin:
                     db.refresh(config)
                     return self._ms365_sync_config_to_dict(config)
                 return None
-            finally:
-                db.close()
         else:
             configs = self._load_json("ms365_sync_configs.json")
             for config in configs:
@@ -119,8 +106,7 @@ class MS365Mixin:
             factory = get_session_factory()
             if not factory:
                 return False
-            db = factory()
-            try:
+            with self._session(factory) as db:
                 config = (
                     db.query(MS365SyncConfig)
                     .filter(MS365SyncConfig.id == config_id)
@@ -131,8 +117,6 @@ class MS365Mixin:
                     db.commit()
                     return True
                 return False
-            finally:
-                db.close()
         else:
             configs = self._load_json("ms365_sync_configs.json")
             original_len = len(configs)
@@ -152,15 +136,12 @@ class MS365Mixin:
             factory = get_session_factory()
             if not factory:
                 raise Exception("データベース接続エラー")
-            db = factory()
-            try:
+            with self._session(factory) as db:
                 history = MS365SyncHistory(**history_data)
                 db.add(history)
                 db.commit()
                 db.refresh(history)
                 return self._ms365_sync_history_to_dict(history)
-            finally:
-                db.close()
         else:
             histories = self._load_json("ms365_sync_histories.json")
             new_id = max([h.get("id", 0) for h in histories], default=0) + 1
@@ -181,8 +162,7 @@ class MS365Mixin:
             factory = get_session_factory()
             if not factory:
                 return None
-            db = factory()
-            try:
+            with self._session(factory) as db:
                 history = (
                     db.query(MS365SyncHistory)
                     .filter(MS365SyncHistory.id == history_id)
@@ -195,8 +175,6 @@ class MS365Mixin:
                     db.refresh(history)
                     return self._ms365_sync_history_to_dict(history)
                 return None
-            finally:
-                db.close()
         else:
             histories = self._load_json("ms365_sync_histories.json")
             for history in histories:
@@ -214,8 +192,7 @@ class MS365Mixin:
             factory = get_session_factory()
             if not factory:
                 return []
-            db = factory()
-            try:
+            with self._session(factory) as db:
                 histories = (
                     db.query(MS365SyncHistory)
                     .filter(MS365SyncHistory.config_id == config_id)
@@ -224,11 +201,8 @@ class MS365Mixin:
                     .all()
                 )
                 return [self._ms365_sync_history_to_dict(h) for h in histories]
-            finally:
-                db.close()
         else:
-            histories = self._load_json("ms365_sync_histories.json")
-            filtered = [h for h in histories if h.get("config_id") == config_id]
+            filtered = self._filter_json("ms365_sync_histories.json", "config_id", config_id)
             filtered.sort(key=lambda x: x.get("sync_started_at", ""), reverse=True)
             return filtered[:limit]
 
@@ -242,8 +216,7 @@ class MS365Mixin:
             factory = get_session_factory()
             if not factory:
                 return []
-            db = factory()
-            try:
+            with self._session(factory) as db:
                 from sqlalchemy import func
 
                 subq = (
@@ -266,8 +239,6 @@ class MS365Mixin:
                     .all()
                 )
                 return [self._ms365_sync_history_to_dict(h) for h in histories]
-            finally:
-                db.close()
         else:
             all_histories = self._load_json("ms365_sync_histories.json")
             config_id_set = set(config_ids)
@@ -294,19 +265,15 @@ class MS365Mixin:
             factory = get_session_factory()
             if not factory:
                 return []
-            db = factory()
-            try:
+            with self._session(factory) as db:
                 mappings = (
                     db.query(MS365FileMapping)
                     .filter(MS365FileMapping.config_id == config_id)
                     .all()
                 )
                 return [self._ms365_file_mapping_to_dict(m) for m in mappings]
-            finally:
-                db.close()
         else:
-            mappings = self._load_json("ms365_file_mappings.json")
-            return [m for m in mappings if m.get("config_id") == config_id]
+            return self._filter_json("ms365_file_mappings.json", "config_id", config_id)
 
     def get_ms365_file_mapping_by_sp_id(self, file_id: str) -> Optional[Dict]:
         """SharePointファイルIDでマッピングを取得"""
@@ -314,21 +281,15 @@ class MS365Mixin:
             factory = get_session_factory()
             if not factory:
                 return None
-            db = factory()
-            try:
+            with self._session(factory) as db:
                 mapping = (
                     db.query(MS365FileMapping)
                     .filter(MS365FileMapping.sharepoint_file_id == file_id)
                     .first()
                 )
                 return self._ms365_file_mapping_to_dict(mapping) if mapping else None
-            finally:
-                db.close()
         else:
-            mappings = self._load_json("ms365_file_mappings.json")
-            return next(
-                (m for m in mappings if m.get("sharepoint_file_id") == file_id), None
-            )
+            return self._find_json("ms365_file_mappings.json", "sharepoint_file_id", file_id)
 
     def create_ms365_file_mapping(self, mapping_data: Dict) -> Dict:
         """MS365ファイルマッピングを作成"""
@@ -336,15 +297,12 @@ class MS365Mixin:
             factory = get_session_factory()
             if not factory:
                 raise Exception("データベース接続エラー")
-            db = factory()
-            try:
+            with self._session(factory) as db:
                 mapping = MS365FileMapping(**mapping_data)
                 db.add(mapping)
                 db.commit()
                 db.refresh(mapping)
                 return self._ms365_file_mapping_to_dict(mapping)
-            finally:
-                db.close()
         else:
             mappings = self._load_json("ms365_file_mappings.json")
             new_id = max([m.get("id", 0) for m in mappings], default=0) + 1
@@ -365,8 +323,7 @@ class MS365Mixin:
             factory = get_session_factory()
             if not factory:
                 return None
-            db = factory()
-            try:
+            with self._session(factory) as db:
                 mapping = (
                     db.query(MS365FileMapping)
                     .filter(MS365FileMapping.id == mapping_id)
@@ -379,8 +336,6 @@ class MS365Mixin:
                     db.refresh(mapping)
                     return self._ms365_file_mapping_to_dict(mapping)
                 return None
-            finally:
-                db.close()
         else:
             mappings = self._load_json("ms365_file_mappings.json")
             for mapping in mappings:
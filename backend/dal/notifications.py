@@ -29,8 +29,7 @@ class NotificationMixin:
             factory = get_session_factory()
             if not factory:
                 return []
-            db = factory()
-            try:
+            with self._session(factory) as db:
                 query = db.query(Notification)
 
                 if user_id:
@@ -39,8 +38,6 @@ class NotificationMixin:
 
                 results = query.order_by(Notification.created_at.desc()).all()
                 return [self._notification_to_dict(n) for n in results]
-            finally:
-                db.close()
         else:
             data = self._load_json("notifications.json")
 
@@ -64,28 +61,26 @@ class NotificationMixin:
             factory = get_session_factory()
             if not factory:
                 return []
-            db = factory()
-            try:
-                notification = Notification(
-                    title=notification_data["title"],
-                    message=notification_data["message"],
-                    type=notification_data["type"],
-                    target_users=notification_data.get("target_users", []),
-                    target_roles=notification_data.get("target_roles", []),
-                    priority=notification_data.get("priority", "medium"),
-                    related_entity_type=notification_data.get("related_entity_type"),
-                    related_entity_id=notification_data.get("related_entity_id"),
-                    status="sent",
-                )
-                db.add(notification)
-                db.commit()
-                db.refresh(notification)
-                return self._notification_to_dict(notification)
-            except Exception:
-                db.rollback()
-                raise
-            finally:
-                db.close()
+            with self._session(factory) as db:
+                try:
+                    notification = Notification(
+                        title=notification_data["title"],
+                        message=notification_data["message"],
+                        type=notification_data["type"],
+                        target_users=notification_data.get("target_users", []),
+                        target_roles=notification_data.get("target_roles", []),
+                        priority=notification_data.get("priority", "medium"),
+                        related_entity_type=notification_data.get("related_entity_type"),
+                        related_entity_id=notification_data.get("related_entity_id"),
+                        status="sent",
+                    )
+                    db.add(notification)
+                    db.commit()
+                    db.refresh(notification)
+                    return self._notification_to_dict(notification)
+                except Exception:
+                    db.rollback()
+                    raise
         else:
             data = self._load_json("notifications.json")
             new_id = max([n["id"] for n in data], default=0) + 1
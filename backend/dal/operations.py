@@ -12,6 +12,16 @@ from models import (
     Incident,
 )
 
+from .base import Page
+
+# 一覧ページの一致フィルタとソート基準（先頭が既定）
+SOP_PAGE_FILTERS = ("category", "status")
+SOP_SORT_FIELDS = ("updated_at", "created_at", "revision_date", "title", "id")
+INCIDENT_PAGE_FILTERS = ("project", "severity", "status")
+INCIDENT_SORT_FIELDS = ("incident_date", "created_at", "updated_at", "id")
+APPROVAL_PAGE_FILTERS = ("status", "type", "requester_id", "priority")
+APPROVAL_SORT_FIELDS = ("created_at", "updated_at", "id")
+
 
 class OperationsMixin:
     """SOP・インシデント・承認・法令CRUD操作"""
@@ -34,32 +44,26 @@ class OperationsMixin:
             factory = get_session_factory()
             if not factory:
                 return []
-            db = factory()
-            try:
-                from sqlalchemy.orm import selectinload
+            with self._session(factory) as db:
+                from sqlalchemy import select
 
-                # N+1クエリ最適化: リレーションを先読み
-                query = db.query(SOP).options(
-                    selectinload(SOP.created_by), selectinload(SOP.updated_by)
-                )
+                # Core の select で行マッピングを直接 dict にする（ORM エンティティを生成しない）
+                stmt = select(SOP.__table__)
 
                 # フィルタリング
                 if filters:
                     if "category" in filters:
-                        query = query.filter(SOP.category == filters["category"])
+                        stmt = stmt.where(SOP.category == filters["category"])
                     if "status" in filters:
-                        query = query.filter(SOP.status == filters["status"])
+                        stmt = stmt.where(SOP.status == filters["status"])
                     if "search" in filters:
                         search_term = f"%{filters['search']}%"
-                        query = query.filter(
+                        stmt = stmt.where(
                             (SOP.title.ilike(search_term))
                             | (SOP.content.ilike(search_term))
                         )
 
-                results = query.order_by(SOP.updated_at.desc()).all()
-                return [self._sop_to_dict(s) for s in results]
-            finally:
-                db.close()
+                return self._select_dicts(db, stmt.order_by(SOP.updated_at.desc()))
         else:
             data = self._load_json("sop.json")
 
@@ -80,6 +84,28 @@ class OperationsMixin:
 
             return data
 
+    def get_sop_page(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = 50,
+        cursor: Optional[str] = None,
+        sort: str = "updated_at",
+        order: str = "desc",
+        fields: Optional[List[str]] = None,
+        offset: int = 0,
+    ) -> Page:
+        """
+        SOP一覧を1ページ分取得（引数・戻り値は get_knowledge_page と同じ）
+
+        Args:
+            filters: 一致フィルタ (category, status)
+            sort: ソート基準（SOP_SORT_FIELDS。それ以外は updated_at）
+        """
+        return self._operations_page(
+            SOP, "sop.json", SOP_PAGE_FILTERS, SOP_SORT_FIELDS,
+            filters, limit, cursor, sort, order, fields, offset,
+        )
+
     def get_sop_by_id(self, sop_id: int) -> Optional[Dict]:
         """
         SOPをIDで取得
@@ -94,8 +120,7 @@ class OperationsMixin:
             factory = get_session_factory()
             if not factory:
                 return []
-            db = factory()
-            try:
+            with self._session(factory) as db:
                 from sqlalchemy.orm import selectinload
 
                 # N+1クエリ最適化: リレーションを先読み
@@ -106,11 +131,8 @@ class OperationsMixin:
                     .first()
                 )
                 return self._sop_to_dict(sop) if sop else None
-            finally:
-                db.close()
         else:
-            data = self._load_json("sop.json")
-            return next((s for s in data if s["id"] == sop_id), None)
+            return self._find_json("sop.json", "id", sop_id)
 
     # ============================================================
     # Incident（事故・ヒヤリレポート）
@@ -132,32 +154,28 @@ class OperationsMixin:
             factory = get_session_factory()
             if not factory:
                 return []
-            db = factory()
-            try:
-                from sqlalchemy.orm import selectinload
+            with self._session(factory) as db:
+                from sqlalchemy import select
 
-                # N+1クエリ最適化: リレーションを先読み
-                query = db.query(Incident).options(selectinload(Incident.reporter))
+                # Core の select で行マッピングを直接 dict にする（ORM エンティティを生成しない）
+                stmt = select(Incident.__table__)
 
                 # フィルタリング
                 if filters:
                     if "project" in filters:
-                        query = query.filter(Incident.project == filters["project"])
+                        stmt = stmt.where(Incident.project == filters["project"])
                     if "severity" in filters:
-                        query = query.filter(Incident.severity == filters["severity"])
+                        stmt = stmt.where(Incident.severity == filters["severity"])
                     if "status" in filters:
-                        query = query.filter(Incident.status == filters["status"])
+                        stmt = stmt.where(Incident.status == filters["status"])
                     if "search" in filters:
                         search_term = f"%{filters['search']}%"
-                        query = query.filter(
+                        stmt = stmt.where(
                             (Incident.title.ilike(search_term))
                             | (Incident.description.ilike(search_term))
                         )
 
-                results = query.order_by(Incident.incident_date.desc()).all()
-                return [self._incident_to_dict(i) for i in results]
-            finally:
-                db.close()
+                return self._select_dicts(db, stmt.order_by(Incident.incident_date.desc()))
         else:
             data = self._load_json("incidents.json")
 
@@ -180,6 +198,28 @@ class OperationsMixin:
 
             return sorted(data, key=lambda x: x.get("incident_date", ""), reverse=True)
 
+    def get_incidents_page(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = 50,
+        cursor: Optional[str] = None,
+        sort: str = "incident_date",
+        order: str = "desc",
+        fields: Optional[List[str]] = None,
+        offset: int = 0,
+    ) -> Page:
+        """
+        インシデント一覧を1ページ分取得（引数・戻り値は get_knowledge_page と同じ）
+
+        Args:
+            filters: 一致フィルタ (project, severity, status)
+            sort: ソート基準（INCIDENT_SORT_FIELDS。それ以外は incident_date）
+        """
+        return self._operations_page(
+            Incident, "incidents.json", INCIDENT_PAGE_FILTERS, INCIDENT_SORT_FIELDS,
+            filters, limit, cursor, sort, order, fields, offset,
+        )
+
     def get_incident_by_id(self, incident_id: int) -> Optional[Dict]:
         """
         インシデントをIDで取得
@@ -194,8 +234,7 @@ class OperationsMixin:
             factory = get_session_factory()
             if not factory:
                 return []
-            db = factory()
-            try:
+            with self._session(factory) as db:
                 from sqlalchemy.orm import selectinload
 
                 # N+1クエリ最適化: リレーションを先読み
@@ -206,11 +245,8 @@ class OperationsMixin:
                     .first()
                 )
                 return self._incident_to_dict(incident) if incident else None
-            finally:
-                db.close()
         else:
-            data = self._load_json("incidents.json")
-            return next((i for i in data if i["id"] == incident_id), None)
+            return self._find_json("incidents.json", "id", incident_id)
 
     # ============================================================
     # Approval（承認フロー）
@@ -232,32 +268,24 @@ class OperationsMixin:
             factory = get_session_factory()
             if not factory:
                 return []
-            db = factory()
-            try:
-                from sqlalchemy.orm import selectinload
+            with self._session(factory) as db:
+                from sqlalchemy import select
 
-                # N+1最適化: requesterとapproverを事前ロード
-                query = db.query(Approval).options(
-                    selectinload(Approval.requester), selectinload(Approval.approver)
-                )
+                # Core の select で行マッピングを直接 dict にする（ORM エンティティを生成しない）
+                stmt = select(Approval.__table__)
 
                 # フィルタリング
                 if filters:
                     if "status" in filters:
-                        query = query.filter(Approval.status == filters["status"])
+                        stmt = stmt.where(Approval.status == filters["status"])
                     if "type" in filters:
-                        query = query.filter(Approval.type == filters["type"])
+                        stmt = stmt.where(Approval.type == filters["type"])
                     if "requester_id" in filters:
-                        query = query.filter(
-                            Approval.requester_id == filters["requester_id"]
-                        )
+                        stmt = stmt.where(Approval.requester_id == filters["requester_id"])
                     if "priority" in filters:
-                        query = query.filter(Approval.priority == filters["priority"])
+                        stmt = stmt.where(Approval.priority == filters["priority"])
 
-                results = query.order_by(Approval.created_at.desc()).all()
-                return [self._approval_to_dict(a) for a in results]
-            finally:
-                db.close()
+                return self._select_dicts(db, stmt.order_by(Approval.created_at.desc()))
         else:
             data = self._load_json("approvals.json")
 
@@ -278,6 +306,28 @@ class OperationsMixin:
 
             return sorted(data, key=lambda x: x.get("created_at", ""), reverse=True)
 
+    def get_approvals_page(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = 50,
+        cursor: Optional[str] = None,
+        sort: str = "created_at",
+        order: str = "desc",
+        fields: Optional[List[str]] = None,
+        offset: int = 0,
+    ) -> Page:
+        """
+        承認一覧を1ページ分取得（引数・戻り値は get_knowledge_page と同じ）
+
+        Args:
+            filters: 一致フィルタ (status, type, requester_id, priority)
+            sort: ソート基準（APPROVAL_SORT_FIELDS。それ以外は created_at）
+        """
+        return self._operations_page(
+            Approval, "approvals.json", APPROVAL_PAGE_FILTERS, APPROVAL_SORT_FIELDS,
+            filters, limit, cursor, sort, order, fields, offset,
+        )
+
     # ============================================================
     # Regulation（法令・規格）
     # ============================================================
@@ -296,19 +346,27 @@ class OperationsMixin:
             factory = get_session_factory()
             if not factory:
                 return None
-            db = factory()
-            try:
+            with self._session(factory) as db:
                 from models import Regulation
 
                 regulation = (
                     db.query(Regulation).filter(Regulation.id == regulation_id).first()
                 )
                 return self._regulation_to_dict(regulation) if regulation else None
-            finally:
-                db.close()
         else:
-            data = self._load_json("regulations.json")
-            return next((r for r in data if r["id"] == regulation_id), None)
+            return self._find_json("regulations.json", "id", regulation_id)
+
+    def _operations_page(
+        self, model, filename, filter_fields, sort_fields,
+        filters, limit, cursor, sort, order, fields, offset,
+    ) -> Page:
+        equals = {key: filters[key] for key in filter_fields if filters and key in filters}
+        if sort not in sort_fields:
+            sort = sort_fields[0]
+        if self._use_postgresql():
+            conditions = [getattr(model, key) == value for key, value in equals.items()]
+            return self._page_sql(model, conditions, limit, cursor, sort, order, fields, offset)
+        return self._page_json(filename, limit, cursor, sort, order, fields, offset, equals)
 
     # ============================================================
     # Serializers
@@ -30,8 +30,7 @@ class ProjectsMixin:
             factory = get_session_factory()
             if not factory:
                 return []
-            db = factory()
-            try:
+            with self._session(factory) as db:
                 query = db.query(Project).options(selectinload(Project.manager))
 
                 # フィルタリング
@@ -43,8 +42,6 @@ class ProjectsMixin:
 
                 results = query.all()
                 return [self._project_to_dict(project) for project in results]
-            finally:
-                db.close()
         else:
             data = self._load_json("projects.json")
 
@@ -71,8 +68,7 @@ class ProjectsMixin:
             factory = get_session_factory()
             if not factory:
                 return None
-            db = factory()
-            try:
+            with self._session(factory) as db:
                 project = (
                     db.query(Project)
                     .options(selectinload(Project.manager))
@@ -80,11 +76,8 @@ class ProjectsMixin:
                     .first()
                 )
                 return self._project_to_dict(project)
-            finally:
-                db.close()
         else:
-            projects = self._load_json("projects.json")
-            return next((p for p in projects if p["id"] == project_id), None)
+            return self._find_json("projects.json", "id", project_id)
 
     def get_project_progress(self, project_id: int) -> Dict:
         """
@@ -105,62 +98,57 @@ class ProjectsMixin:
                     "tasks_completed": 0,
                     "total_tasks": 0,
                 }
-            db = factory()
-            try:
-                # PostgreSQL側で集計を完結（クエリ1回）
-                task_stats = (
-                    db.query(
-                        func.count(ProjectTask.id).label("total_tasks"),
-                        func.count(
-                            case((ProjectTask.status == "completed", 1))
-                        ).label("completed_tasks"),
+            with self._session(factory) as db:
+                try:
+                    # PostgreSQL側で集計を完結（クエリ1回）
+                    task_stats = (
+                        db.query(
+                            func.count(ProjectTask.id).label("total_tasks"),
+                            func.count(
+                                case((ProjectTask.status == "completed", 1))
+                            ).label("completed_tasks"),
+                        )
+                        .filter(ProjectTask.project_id == project_id)
+                        .first()
+                    )
+
+                    if not task_stats or task_stats.total_tasks == 0:
+                        return {
+                            "project_id": project_id,
+                            "progress_percentage": 0,
+                            "tasks_completed": 0,
+                            "total_tasks": 0,
+                        }
+
+                    progress_percentage = (
+                        int((task_stats.completed_tasks / task_stats.total_tasks) * 100)
+                        if task_stats.total_tasks > 0
+                        else 0
                     )
-                    .filter(ProjectTask.project_id == project_id)
-                    .first()
-                )
 
-                if not task_stats or task_stats.total_tasks == 0:
-                    return {
+                    result = {
                         "project_id": project_id,
-                        "progress_percentage": 0,
-                        "tasks_completed": 0,
-                        "total_tasks": 0,
+                        "progress_percentage": progress_percentage,
+                        "tasks_completed": task_stats.completed_tasks,
+                        "total_tasks": task_stats.total_tasks,
                     }
-
-                progress_percentage = (
-                    int((task_stats.completed_tasks / task_stats.total_tasks) * 100)
-                    if task_stats.total_tasks > 0
-                    else 0
-                )
-
-                result = {
-                    "project_id": project_id,
-                    "progress_percentage": progress_percentage,
-                    "tasks_completed": task_stats.completed_tasks,
-                    "total_tasks": task_stats.total_tasks,
-                }
-                logger.info(
-                    "get_project_progress(): N+1最適化クエリ完了 - project_id=%d, progress=%d%%",
-                    project_id,
-                    progress_percentage,
-                )
-                return result
-            except Exception as e:
-                logger.error(
-                    "get_project_progress(): クエリ実行エラー - project_id=%d: %s",
-                    project_id,
-                    str(e),
-                )
-                raise
-            finally:
-                db.close()
+                    logger.info(
+                        "get_project_progress(): N+1最適化クエリ完了 - project_id=%d, progress=%d%%",
+                        project_id,
+                        progress_percentage,
+                    )
+                    return result
+                except Exception as e:
+                    logger.error(
+                        "get_project_progress(): クエリ実行エラー - project_id=%d: %s",
+                        project_id,
+                        str(e),
+                    )
+                    raise
         else:
             # JSONベースの実装
-            self._load_json("projects.json")
-            project_tasks = self._load_json("project_tasks.json")
-
             # プロジェクトのタスクを取得
-            tasks = [t for t in project_tasks if t.get("project_id") == project_id]
+            tasks = self._filter_json("project_tasks.json", "project_id", project_id)
 
             if not tasks:
                 return {
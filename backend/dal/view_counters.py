@@ -0,0 +1,155 @@
+"""
+ViewCountersMixin - 閲覧数カウンタDAL
+
+閲覧のたびにデータを書き換えず、services/view_counters.py がワーカーごとに
+まとめた差分を add_view_counts() で一括加算する。
+JSONモードでは view_counters.json（{resource, resource_id, views} のリスト）に保存する。
+"""
+
+import os
+from datetime import datetime, timezone
+from typing import Dict
+
+from database import get_session_factory
+from models import ViewCounter
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+VIEW_COUNTERS_FILE = "view_counters.json"
+
+
+class ViewCountersMixin:
+    """閲覧数カウンタの読み込み・一括加算"""
+
+    def get_view_counts(self, resource: str) -> Dict[int, int]:
+        """
+        永続化済みの閲覧数を取得
+
+        Args:
+            resource: リソース種別（knowledge / sop / consultation）
+
+        Returns:
+            {リソースID: 閲覧数}
+        """
+        if self._use_postgresql():
+            factory = get_session_factory()
+            if not factory:
+                return {}
+            with self._session(factory) as db:
+                rows = (
+                    db.query(ViewCounter.resource_id, ViewCounter.views)
+                    .filter(ViewCounter.resource == resource)
+                    .all()
+                )
+                return {resource_id: views for resource_id, views in rows}
+        else:
+            return {
+                row["resource_id"]: row.get("views", 0)
+                for row in self._filter_json(VIEW_COUNTERS_FILE, "resource", resource)
+            }
+
+    def get_view_count(self, resource: str, resource_id: int) -> int:
+        """永続化済みの閲覧数（1件）"""
+        if self._use_postgresql():
+            factory = get_session_factory()
+            if not factory:
+                return 0
+            with self._session(factory) as db:
+                counter = db.get(ViewCounter, (resource, resource_id))
+                return counter.views if counter else 0
+        else:
+            rows = self._filter_json(VIEW_COUNTERS_FILE, "resource_id", resource_id)
+            return next((row.get("views", 0) for row in rows if row.get("resource") == resource), 0)
+
+    def get_view_counts_version(self):
+        """永続化済み閲覧数のバージョン（変化したら人気ランキングを再構築する）"""
+        if self._use_postgresql():
+            from sqlalchemy import func
+
+            factory = get_session_factory()
+            if not factory:
+                return None
+            with self._session(factory) as db:
+                count, total, updated = db.query(
+                    func.count(), func.sum(ViewCounter.views), func.max(ViewCounter.updated_at)
+                ).one()
+            return ("pg", count, int(total or 0), updated.isoformat() if updated else None)
+        return self._json_version(VIEW_COUNTERS_FILE)
+
+    def add_view_counts(self, resource: str, deltas: Dict[int, int]):
+        """
+        閲覧数の差分を一括加算
+
+        Args:
+            resource: リソース種別
+            deltas: {リソースID: 加算する閲覧数}
+        """
+        if not deltas:
+            return
+        if self._use_postgresql():
+            from sqlalchemy.dialects.postgresql import insert
+
+            factory = get_session_factory()
+            if not factory:
+                raise Exception("データベース接続エラー")
+            with self._session(factory) as db:
+                stmt = insert(ViewCounter.__table__).values(
+                    [
+                        {"resource": resource, "resource_id": resource_id, "views": delta}
+                        for resource_id, delta in deltas.items()
+                    ]
+                )
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["resource", "resource_id"],
+                    set_={
+                        "views": ViewCounter.__table__.c.views + stmt.excluded.views,
+                        "updated_at": datetime.utcnow(),
+                    },
+                )
+                db.execute(stmt)
+                db.commit()
+        else:
+            # 複数ワーカーが同時にフラッシュしても加算を失わないようプロセス間で排他する
+            with self._view_counters_lock():
+                rows = self._load_json(VIEW_COUNTERS_FILE)
+                by_key = {(row.get("resource"), row.get("resource_id")): row for row in rows}
+                now = datetime.now(timezone.utc).isoformat()
+                for resource_id, delta in deltas.items():
+                    row = by_key.get((resource, resource_id))
+                    if row is None:
+                        row = {"resource": resource, "resource_id": resource_id, "views": 0}
+                        rows.append(row)
+                    row["views"] = row.get("views", 0) + delta
+                    row["updated_at"] = now
+                self._save_json(VIEW_COUNTERS_FILE, rows)
+
+    def _view_counters_lock(self):
+        return _FileLock(self._get_json_path(VIEW_COUNTERS_FILE) + ".lock")
+
+
+class _FileLock:
+    """fcntl.flock によるプロセス間ロック（fcntl が無い環境では何もしない）"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd = None
+
+    def __enter__(self):
+        if fcntl is None:
+            return self
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o640)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._fd is not None:
+            try:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            finally:
+                os.close(self._fd)
+                self._fd = None
+        return False
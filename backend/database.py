@@ -22,6 +22,8 @@ from datetime import date, datetime
 from pathlib import Path
 from typing import Generator, Optional
 
+from flask import has_app_context
+from flask.globals import app_ctx
 from models import (SOP, AccessLog, Approval, Base, Consultation, Incident,
                     Knowledge, Notification, Regulation, User)
 from sqlalchemy import create_engine, event, text
@@ -133,12 +135,53 @@ engine = property(lambda self: get_engine())
 SessionLocal = property(lambda self: get_session_factory())
 
 
+def _app_context_scope() -> int:
+    """スコープドセッションのスコープ（Flask のアプリケーションコンテキスト = 1リクエスト）"""
+    return id(app_ctx._get_current_object())
+
+
 def _init_scoped_session():
-    """スコープドセッションを初期化"""
+    """スコープドセッションを初期化（Flask のリクエストごとに1つ）"""
     global db_session
     factory = get_session_factory()
     if factory:
-        db_session = scoped_session(factory)
+        db_session = scoped_session(factory, scopefunc=_app_context_scope)
+
+
+def get_request_session(factory=None) -> Optional[Session]:
+    """
+    リクエストスコープのセッションを取得
+
+    同一リクエスト内の DAL 呼び出しは同じセッション（= 同じプール接続）を使い回す。
+    セッションは teardown_appcontext（remove_request_session）で破棄する。
+
+    Args:
+        factory: 呼び出し元が取得したセッションファクトリ。
+            get_session_factory() 以外（テスト用のモックなど）の場合は None を返す
+
+    Returns:
+        セッション。Flask のコンテキスト外・JSONモードの場合は None
+    """
+    if not has_app_context():
+        return None
+    if factory is not None and factory is not get_session_factory():
+        return None
+    if db_session is None:
+        _init_scoped_session()
+    if db_session is None:
+        return None
+    return db_session()
+
+
+def remove_request_session(exception=None):
+    """リクエストスコープのセッションを破棄して接続をプールに返す（teardown_appcontext 用）"""
+    if db_session is not None and has_app_context():
+        db_session.remove()
+
+
+def init_app(app):
+    """Flask アプリにリクエストスコープのセッションの後処理を登録"""
+    app.teardown_appcontext(remove_request_session)
 
 
 @contextmanager
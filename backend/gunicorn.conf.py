@@ -166,14 +166,46 @@ def post_fork(server, worker):
     server.log.info(f"Worker spawned (pid: {worker.pid})")
 
 
+def post_worker_init(worker):
+    """ワーカー初期化後（リクエスト受付前）"""
+    try:
+        from app_helpers import start_interaction_matrix_warmup
+
+        start_interaction_matrix_warmup()
+    except Exception as e:
+        worker.log.warning(f"Interaction matrix warmup not started (pid: {worker.pid}): {e}")
+
+
 def pre_exec(server):
     """サーバー再起動前"""
     server.log.info("Forked child, re-executing.")
 
 
+def _drain_audit_log(worker):
+    """監査ログキューと閲覧数の差分を書き出す（未書き込みのエントリを失わないため）"""
+    try:
+        from app_helpers import shutdown_audit_log_writer
+
+        shutdown_audit_log_writer()
+    except Exception as e:
+        worker.log.warning(f"Audit log drain failed (pid: {worker.pid}): {e}")
+    try:
+        from app_helpers import shutdown_view_counter_writer
+
+        shutdown_view_counter_writer()
+    except Exception as e:
+        worker.log.warning(f"View counter drain failed (pid: {worker.pid}): {e}")
+
+
 def worker_int(worker):
     """ワーカー割り込み時（SIGINT）"""
     worker.log.info(f"Worker received INT or QUIT signal (pid: {worker.pid})")
+    _drain_audit_log(worker)
+
+
+def worker_exit(server, worker):
+    """ワーカー終了時（max_requests による再起動や SIGTERM を含む）"""
+    _drain_audit_log(worker)
 
 
 def worker_abort(worker):
@@ -16,6 +16,8 @@ import os
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Union
 
+from knowledge_events import CREATED, KnowledgeChange, file_version, publish_knowledge_changes
+
 logger = logging.getLogger(__name__)
 
 # オプションの依存関係
@@ -553,16 +555,28 @@ class DataImporter:
         # 既存IDのセット
         existing_ids = {item.get("id") for item in existing if isinstance(item, dict)}
 
+        version_before = file_version(file_path)
+
         # 重複を除いて追加
+        added = []
         for record in new_records:
             if record.get("id") not in existing_ids:
                 existing.append(record)
                 existing_ids.add(record.get("id"))
+                added.append(record)
 
         # 保存
         with open(file_path, "w", encoding="utf-8") as f:
             json.dump(existing, f, ensure_ascii=False, indent=2)
 
+        # ナレッジの追加分を変更イベントとして発行（検索インデックス等の差分更新）
+        if entity_type == "knowledge":
+            publish_knowledge_changes(
+                [KnowledgeChange(CREATED, r.get("id"), r) for r in added],
+                data_dir=self.data_dir,
+                version_before=version_before,
+            )
+
     # =========================================================================
     # エクスポート機能
     # =========================================================================
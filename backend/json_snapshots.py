@@ -0,0 +1,312 @@
+"""JSONデータファイルのプロセス内スナップショットキャッシュ
+
+JSONモードでは app_helpers.load_data と BaseDAL._load_json が毎回ファイル全体を
+json.load していた。ここではパース結果をファイルパスごとに保持し、
+(mtime_ns, サイズ, inode, 書き込み世代) が一致する間は再パースせずに返す。
+
+- 書き込み世代は save_data / _save_json が bump_generation() で進める
+  （mtime の分解能が粗いファイルシステムでも同一プロセス内の書き込みを確実に検出する）
+- 呼び出し元には「リストと各要素 dict の浅いコピー」を返す（コピーオンライト）。
+  要素の追加・削除・フィールドの書き換えはキャッシュに影響しない。
+  ネストしたリスト・dict はキャッシュと共有するため、その場で変更しないこと
+- 他プロセスや外部ツールによる書き換えは stat の変化で検出する
+- ID などのフィールド索引はスナップショットごとに初回参照時に構築し、
+  find_one / find_all で O(1) に引けるようにする
+- 一覧のソート順（フィールド値, id）も同様に初回参照時に構築し、
+  page() でキーセットカーソルから1ページ分だけ取り出す
+- 一覧用の軽量表現（本文を除いたサマリーなど）もスナップショットごとに1回だけ変換して保持し、
+  page(view=...) / load_view() はそこからコピーする
+
+app_helpers と dal の両方から import するため、標準ライブラリと memory_cache 以外に
+依存しないトップレベルモジュールとしている。
+"""
+
+import bisect
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from memory_cache import MemoryCache
+
+# パース後のオブジェクトはJSONテキストの数倍のメモリを使う（推定サイズの係数）
+PARSED_SIZE_FACTOR = 4
+
+MAX_ENTRIES = int(os.environ.get("MKS_JSON_CACHE_MAX_ENTRIES", "64"))
+MAX_BYTES = int(os.environ.get("MKS_JSON_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+class _Snapshot:
+    """パース済みファイル1バージョン分（要素リストと遅延構築するフィールド索引）"""
+
+    __slots__ = ("version", "items", "size", "indexes", "orders", "views", "lock")
+
+    def __init__(self, version: tuple, items: List[dict]):
+        self.version = version
+        self.items = items
+        self.size = version[1] * PARSED_SIZE_FACTOR
+        # フィールド名 -> {値: 要素位置のリスト}
+        self.indexes: Dict[str, Dict[Hashable, List[int]]] = {}
+        # フィールド名 -> (昇順のソートキー, 対応する要素位置)
+        self.orders: Dict[str, Tuple[List[tuple], List[int]]] = {}
+        # 変換関数 -> 各要素を変換したリスト（要素位置は items と同じ）
+        self.views: Dict[Callable[[dict], dict], List[dict]] = {}
+        self.lock = threading.Lock()
+
+    def index(self, field: str) -> Dict[Hashable, List[int]]:
+        """フィールドの索引（スナップショットごとに初回参照時に1回だけ構築）"""
+        index = self.indexes.get(field)
+        if index is None:
+            with self.lock:
+                index = self.indexes.get(field)
+                if index is None:
+                    index = {}
+                    for pos, item in enumerate(self.items):
+                        value = item.get(field)
+                        if value is not None and isinstance(value, Hashable):
+                            index.setdefault(value, []).append(pos)
+                    self.indexes[field] = index
+        return index
+
+    def order(self, field: str) -> Tuple[List[tuple], List[int]]:
+        """(フィールド値, id) 昇順のソート順（スナップショットごとに初回参照時に1回だけ構築）"""
+        order = self.orders.get(field)
+        if order is None:
+            with self.lock:
+                order = self.orders.get(field)
+                if order is None:
+                    keyed = sorted(
+                        (sort_key(item.get(field), item.get("id")), pos)
+                        for pos, item in enumerate(self.items)
+                    )
+                    order = ([key for key, _ in keyed], [pos for _, pos in keyed])
+                    self.orders[field] = order
+        return order
+
+    def view(self, build: Callable[[dict], dict]) -> List[dict]:
+        """全要素を build で変換したリスト（スナップショットごとに初回参照時に1回だけ構築）"""
+        rows = self.views.get(build)
+        if rows is None:
+            with self.lock:
+                rows = self.views.get(build)
+                if rows is None:
+                    rows = [build(item) for item in self.items]
+                    self.views[build] = rows
+        return rows
+
+
+def _value_key(value: Any) -> tuple:
+    # None を最小とし、型の異なる値（数値と文字列など）も比較できるようにする
+    if value is None:
+        return (0, 0)
+    if isinstance(value, bool):
+        return (1, int(value))
+    if isinstance(value, (int, float)):
+        return (1, value)
+    return (2, str(value))
+
+
+def sort_key(value: Any, item_id: Any) -> tuple:
+    """一覧のソートキー（フィールド値 → id の順に比較。None は最小）"""
+    return (_value_key(value), _value_key(item_id))
+
+
+_snapshots = MemoryCache(
+    "json_snapshots",
+    max_entries=MAX_ENTRIES,
+    max_bytes=MAX_BYTES,
+    sizeof=lambda snapshot: snapshot.size,
+)
+_generations: Dict[str, int] = {}
+_generations_lock = threading.Lock()
+
+
+def bump_generation(filepath: str):
+    """ファイルの書き込み世代を進める（書き込み直後に呼ぶ）"""
+    filepath = os.path.abspath(filepath)
+    with _generations_lock:
+        _generations[filepath] = _generations.get(filepath, 0) + 1
+    _snapshots.delete(filepath)
+
+
+def snapshot_version(filepath: str) -> Optional[tuple]:
+    """ファイルの現在のバージョン（存在しない場合は None）"""
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return None
+    with _generations_lock:
+        generation = _generations.get(os.path.abspath(filepath), 0)
+    return (st.st_mtime_ns, st.st_size, st.st_ino, generation)
+
+
+def _snapshot(filepath: str, parse: Callable[[str], List[dict]]) -> Optional[_Snapshot]:
+    key = os.path.abspath(filepath)
+    version = snapshot_version(key)
+    if version is None:
+        _snapshots.delete(key)
+        return None
+
+    snapshot = _snapshots.get(key)
+    if snapshot is None or snapshot.version != version:
+        # stat → パースの間に置き換えられた場合は古いバージョンで保存されるが、
+        # 次回の stat で不一致になり読み直される
+        snapshot = _Snapshot(version, parse(filepath))
+        _snapshots.set(key, snapshot)
+    return snapshot
+
+
+def load_list(filepath: str, parse: Callable[[str], List[dict]]) -> Optional[List[dict]]:
+    """
+    JSONリストファイルをキャッシュ経由で読み込む
+
+    Args:
+        filepath: JSONファイルのパス
+        parse: キャッシュミス時に呼ぶパース関数（dict のリストを返す。例外はそのまま伝播する）
+
+    Returns:
+        要素 dict の浅いコピーのリスト。ファイルが存在しない場合は None
+    """
+    snapshot = _snapshot(filepath, parse)
+    if snapshot is None:
+        return None
+    return [dict(item) for item in snapshot.items]
+
+
+def load_list_indexed(
+    filepath: str, parse: Callable[[str], List[dict]], field: str
+) -> Optional[Tuple[List[dict], Dict[Hashable, List[int]]]]:
+    """
+    要素リストとフィールド索引を同じスナップショットから取得（更新系で位置を引く用）
+
+    Returns:
+        (要素 dict の浅いコピーのリスト, {値: 要素位置のリスト})。
+        索引はキャッシュと共有するため変更しないこと。ファイルが存在しない場合は None
+    """
+    snapshot = _snapshot(filepath, parse)
+    if snapshot is None:
+        return None
+    return [dict(item) for item in snapshot.items], snapshot.index(field)
+
+
+def load_view(
+    filepath: str, parse: Callable[[str], List[dict]], build: Callable[[dict], dict]
+) -> Optional[List[dict]]:
+    """
+    全要素の軽量表現を取得（変換結果はスナップショットごとにキャッシュする）
+
+    Args:
+        filepath: JSONファイルのパス
+        parse: キャッシュミス時に呼ぶパース関数
+        build: 要素 dict から軽量表現を作る関数（同じ関数オブジェクトを渡すこと）
+
+    Returns:
+        変換後の dict の浅いコピーのリスト（ファイル内の順序）。ファイルが存在しない場合は None
+    """
+    snapshot = _snapshot(filepath, parse)
+    if snapshot is None:
+        return None
+    return [dict(row) for row in snapshot.view(build)]
+
+
+def find_one(
+    filepath: str, parse: Callable[[str], List[dict]], field: str, value: Any
+) -> Optional[dict]:
+    """フィールド値が一致する最初の要素（浅いコピー）を索引で取得"""
+    snapshot = _snapshot(filepath, parse)
+    if snapshot is None:
+        return None
+    positions = snapshot.index(field).get(value) if isinstance(value, Hashable) else None
+    return dict(snapshot.items[positions[0]]) if positions else None
+
+
+def find_all(
+    filepath: str, parse: Callable[[str], List[dict]], field: str, value: Any
+) -> List[dict]:
+    """フィールド値が一致する全要素（浅いコピー、ファイル内の順序）を索引で取得"""
+    snapshot = _snapshot(filepath, parse)
+    if snapshot is None or not isinstance(value, Hashable):
+        return []
+    return [dict(snapshot.items[pos]) for pos in snapshot.index(field).get(value, [])]
+
+
+def page(
+    filepath: str,
+    parse: Callable[[str], List[dict]],
+    sort: str,
+    limit: Optional[int],
+    descending: bool = True,
+    after: Optional[tuple] = None,
+    offset: int = 0,
+    equals: Optional[Dict[str, Any]] = None,
+    predicate: Optional[Callable[[dict], bool]] = None,
+    view: Optional[Callable[[dict], dict]] = None,
+) -> Optional[Tuple[List[dict], bool, int]]:
+    """
+    ソート済みの1ページ分を取得（全件のコピー・ソートをしない）
+
+    Args:
+        filepath: JSONファイルのパス
+        parse: キャッシュミス時に呼ぶパース関数
+        sort: ソートするフィールド（同値は id 順）
+        limit: 取得件数（None の場合は全件）
+        descending: 降順で返すか
+        after: このソートキー（sort_key()）より後ろから返す（キーセットカーソル）
+        offset: 先頭から読み飛ばす件数（after 指定時は after の後ろから数える）
+        equals: {フィールド: 値} の一致条件（フィールド索引で絞り込む）
+        predicate: 索引で扱えない条件（各要素に対して呼ぶ）
+        view: 返す要素の軽量表現を作る関数（load_view() と同じくスナップショットごとに変換を保持）
+
+    Returns:
+        (要素 dict の浅いコピーのリスト, 続きがあるか, 条件に一致する総件数)。
+        ファイルが存在しない場合は None
+    """
+    snapshot = _snapshot(filepath, parse)
+    if snapshot is None:
+        return None
+
+    allowed = None
+    for field, value in (equals or {}).items():
+        positions = snapshot.index(field).get(value, []) if isinstance(value, Hashable) else []
+        allowed = set(positions) if allowed is None else allowed.intersection(positions)
+
+    keys, order = snapshot.order(sort)
+    if descending:
+        end = bisect.bisect_left(keys, after) if after is not None else len(keys)
+        indexes = range(end - 1, -1, -1)
+    else:
+        start = bisect.bisect_right(keys, after) if after is not None else 0
+        indexes = range(start, len(keys))
+
+    if allowed is None and predicate is None:
+        # 条件なしならソート順の位置で直接読み飛ばせる
+        indexes, offset = indexes[offset:], 0
+
+    items = snapshot.items
+    rows = snapshot.view(view) if view is not None else items
+    results: List[dict] = []
+    has_more = False
+    for i in indexes:
+        pos = order[i]
+        if allowed is not None and pos not in allowed:
+            continue
+        if predicate is not None and not predicate(items[pos]):
+            continue
+        if offset:
+            offset -= 1
+            continue
+        if len(results) == limit:
+            has_more = True
+            break
+        results.append(dict(rows[pos]))
+
+    candidates = range(len(items)) if allowed is None else allowed
+    if predicate is None:
+        total = len(candidates)
+    else:
+        total = sum(1 for pos in candidates if predicate(items[pos]))
+    return results, has_more, total
+
+
+def clear():
+    """全スナップショットを破棄（テスト用）"""
+    _snapshots.clear()
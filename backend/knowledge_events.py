@@ -0,0 +1,168 @@
+"""ナレッジ変更イベントバス
+
+ナレッジの書き込み経路（DAL・Blueprint・データインポート・MS365同期）から
+作成/更新/削除の差分イベントを発行し、検索インデックスやタグ集計などの
+派生データ構造が購読して O(差分) で自身を更新する。
+
+JSONモードではイベントに書き込み前後のファイルバージョン
+（パス, mtime_ns, size, inode）を含める。購読側は自身が保持するバージョンが
+書き込み前と一致する場合のみ差分を適用し、一致しない場合（別プロセスの書き込みを
+見逃した場合など）は破棄して次回アクセス時に再構築する。
+
+発行元の DAL（dal/knowledge.py）やデータインポートから直接 import できるよう、
+標準ライブラリ以外に依存しないトップレベルモジュールとしている
+（services パッケージは data_access に依存するため、そこに置くと循環する）。
+購読者が登録されていないプロセス（CLI スクリプト等）では発行しても何もしない。
+"""
+
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+KNOWLEDGE_FILENAME = "knowledge.json"
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+
+
+@dataclass
+class KnowledgeChange:
+    """1件分のナレッジ変更"""
+
+    action: str
+    knowledge_id: Any
+    item: Optional[Dict[str, Any]] = None
+    previous: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class KnowledgeChangeEvent:
+    """1回の書き込みに対応する変更イベント（一括インポートでは複数件）"""
+
+    changes: List[KnowledgeChange] = field(default_factory=list)
+    data_dir: Optional[str] = None
+    version_before: Optional[Tuple] = None
+    version_after: Optional[Tuple] = None
+
+
+def file_version(filepath: str) -> Optional[Tuple]:
+    """
+    ファイルのバージョン（パス, mtime_ns, size, inode）を取得
+
+    Returns:
+        Optional[Tuple]: ファイルが存在しない場合は None
+    """
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return None
+    return (filepath, st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def knowledge_file_version(data_dir: Optional[str]) -> Optional[Tuple]:
+    """データディレクトリ内の knowledge.json のバージョンを取得"""
+    if data_dir is None:
+        return None
+    return file_version(os.path.join(data_dir, KNOWLEDGE_FILENAME))
+
+
+def apply_changes(target: Any, changes: List[KnowledgeChange]):
+    """
+    add(item) / remove(doc_id) を持つ派生データ構造に変更を適用
+
+    Args:
+        target: 派生データ構造（SearchIndex, KnowledgeFacets など）
+        changes: 変更リスト
+    """
+    for change in changes:
+        if change.action == DELETED or change.item is None:
+            target.remove(change.knowledge_id)
+        else:
+            target.add(dict(change.item))
+
+
+class ChangeEventBus:
+    """プロセス内の同期イベントバス（購読者の例外は発行元に伝播しない）"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._subscribers: List[Callable[[KnowledgeChangeEvent], None]] = []
+
+    def subscribe(self, handler: Callable[[KnowledgeChangeEvent], None]):
+        """購読者を登録（デコレータとしても使用可能）"""
+        with self._lock:
+            if handler not in self._subscribers:
+                self._subscribers.append(handler)
+        return handler
+
+    def unsubscribe(self, handler: Callable[[KnowledgeChangeEvent], None]):
+        """購読者を解除"""
+        with self._lock:
+            if handler in self._subscribers:
+                self._subscribers.remove(handler)
+
+    def publish(self, event: KnowledgeChangeEvent):
+        """イベントを全購読者に配信"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for handler in subscribers:
+            try:
+                handler(event)
+            except Exception as e:
+                logger.warning(
+                    "%s event handler %s failed: %s: %s",
+                    self.name,
+                    getattr(handler, "__name__", handler),
+                    type(e).__name__,
+                    e,
+                )
+
+
+knowledge_events = ChangeEventBus("knowledge")
+
+
+def publish_knowledge_changes(
+    changes: List[KnowledgeChange],
+    data_dir: Optional[str] = None,
+    version_before: Optional[Tuple] = None,
+):
+    """
+    ナレッジ変更イベントを発行
+
+    Args:
+        changes: 変更リスト
+        data_dir: JSONモードの書き込み先ディレクトリ（PostgreSQLモードは None）
+        version_before: 書き込み前の knowledge.json のバージョン
+    """
+    if not changes:
+        return
+    knowledge_events.publish(
+        KnowledgeChangeEvent(
+            changes=list(changes),
+            data_dir=data_dir,
+            version_before=version_before,
+            version_after=knowledge_file_version(data_dir),
+        )
+    )
+
+
+def publish_knowledge_change(
+    action: str,
+    item: Optional[Dict[str, Any]] = None,
+    previous: Optional[Dict[str, Any]] = None,
+    data_dir: Optional[str] = None,
+    version_before: Optional[Tuple] = None,
+):
+    """1件分のナレッジ変更イベントを発行"""
+    source = item if item is not None else previous or {}
+    publish_knowledge_changes(
+        [KnowledgeChange(action, source.get("id"), item, previous)],
+        data_dir=data_dir,
+        version_before=version_before,
+    )
@@ -0,0 +1,224 @@
+"""プロセス内キャッシュ（LRU + TTL + 推定メモリ上限）
+
+推薦結果などのプロセス内メモ化に使う共通キャッシュ。件数上限・推定バイト数上限・
+TTL を持ち、上限を超えた場合は最も長く参照されていないエントリから追い出す。
+ヒット/ミス/追い出し件数を保持し、/recommendations/cache/stats と
+Prometheus（blueprints/metrics_defs.py）に公開する。
+
+gunicorn のワーカーごとに独立したキャッシュになるため、上限はワーカーあたりの値。
+推薦エンジン（recommendation_engine.py）からも import するため、
+標準ライブラリ以外に依存しないトップレベルモジュールとしている。
+"""
+
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+_MISSING = object()
+
+# 推定サイズ計算で辿るコンテナの深さ上限
+_MAX_SIZE_DEPTH = 8
+
+_registry: "weakref.WeakSet[MemoryCache]" = weakref.WeakSet()
+_registry_lock = threading.Lock()
+
+
+def estimate_size(value: Any, _depth: int = 0, _seen: Optional[set] = None) -> int:
+    """
+    値のおおよそのメモリ使用量（バイト）
+
+    dict / list / tuple / set の要素を再帰的に合計する（同一オブジェクトは1回だけ数える）。
+    """
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+    size = sys.getsizeof(value)
+    if _depth >= _MAX_SIZE_DEPTH:
+        return size
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += estimate_size(key, _depth + 1, _seen)
+            size += estimate_size(item, _depth + 1, _seen)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += estimate_size(item, _depth + 1, _seen)
+    return size
+
+
+class MemoryCache:
+    """件数・推定バイト数・TTL で上限を設けた LRU キャッシュ（スレッドセーフ）"""
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 1024,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        sizeof: Callable[[Any], int] = estimate_size,
+    ):
+        """
+        初期化
+
+        Args:
+            name: キャッシュ名（統計・メトリクスのラベル）
+            max_entries: 最大エントリ数
+            max_bytes: 推定メモリ使用量の上限（None の場合は無制限）
+            ttl: 既定の有効期限（秒、None の場合は無期限）
+            sizeof: 値の推定サイズを返す関数
+        """
+        self.name = name
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self._lock = threading.Lock()
+        # key -> (有効期限（monotonic）, 推定サイズ, 値)
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        with _registry_lock:
+            _registry.add(self)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """値を取得（期限切れは削除してミス扱い）"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is not None and entry[0] <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = _MISSING):
+        """
+        値を保存（上限を超えた分は古いものから追い出す）
+
+        Args:
+            ttl: このエントリの有効期限（秒）。省略時はキャッシュの既定値
+        """
+        ttl = self.ttl if ttl is _MISSING else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                # 単体で上限を超える値は保存しない
+                self.evictions += 1
+                return
+            self._entries[key] = (expires_at, size, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> bool:
+        """エントリを削除"""
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+
+    def clear(self):
+        """全エントリを削除（統計カウンタは保持）"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def purge_expired(self) -> int:
+        """期限切れエントリをまとめて削除"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                key
+                for key, (expires_at, _, _) in self._entries.items()
+                if expires_at is not None and expires_at <= now
+            ]
+            for key in expired:
+                self._remove(key)
+            self.expirations += len(expired)
+        return len(expired)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """有効なエントリが存在するか（統計・LRU順は変えない）"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and (entry[0] is None or entry[0] > time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def keys(self) -> List[Hashable]:
+        with self._lock:
+            return list(self._entries)
+
+    @property
+    def bytes(self) -> int:
+        """推定メモリ使用量（バイト）"""
+        return self._bytes
+
+    def stats(self) -> Dict[str, Any]:
+        """キャッシュ統計"""
+        now = time.monotonic()
+        with self._lock:
+            expired = sum(
+                1
+                for expires_at, _, _ in self._entries.values()
+                if expires_at is not None and expires_at <= now
+            )
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "expired_entries": expired,
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def _remove(self, key: Hashable):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
+def all_caches() -> List[MemoryCache]:
+    """生成済み（参照が残っている）キャッシュの一覧"""
+    with _registry_lock:
+        return list(_registry)
+
+
+def cache_stats_by_name() -> Dict[str, Dict[str, Any]]:
+    """キャッシュ名ごとに合算した統計（同名のキャッシュが複数あってもラベルが重複しない）"""
+    totals: Dict[str, Dict[str, Any]] = {}
+    for cache in all_caches():
+        stats = cache.stats()
+        total = totals.setdefault(
+            cache.name,
+            {key: 0 for key in ("entries", "bytes", "hits", "misses", "evictions", "expirations")},
+        )
+        for key in total:
+            total[key] += stats[key]
+    return totals
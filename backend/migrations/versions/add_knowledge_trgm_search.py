@@ -0,0 +1,38 @@
+"""Add pg_trgm GIN indexes for knowledge search
+
+Revision ID: a3b4c5d6e7f8
+Revises: f2a3b4c5d6e7
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a3b4c5d6e7f8"
+down_revision = "f2a3b4c5d6e7"
+branch_labels = None
+depends_on = None
+
+# title / summary / content の部分一致検索（ILIKE '%語%'）と word_similarity 用。
+# 日本語は tsvector（'simple' 設定）では単語分割されないため、文字 N-gram の pg_trgm を使う。
+SEARCH_COLUMNS = ("title", "summary", "content")
+
+
+def upgrade():
+    """Create pg_trgm extension and GIN trigram indexes on public.knowledge"""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # 大きなテーブルで書き込みを止めないよう CONCURRENTLY で作成する（トランザクション外）
+    with op.get_context().autocommit_block():
+        for column in SEARCH_COLUMNS:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_knowledge_{column}_trgm "
+                f"ON public.knowledge USING gin ({column} gin_trgm_ops)"
+            )
+
+
+def downgrade():
+    """Drop GIN trigram indexes on public.knowledge"""
+    with op.get_context().autocommit_block():
+        for column in SEARCH_COLUMNS:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS public.idx_knowledge_{column}_trgm")
@@ -0,0 +1,36 @@
+"""Add view_counters table
+
+Revision ID: f2a3b4c5d6e7
+Revises: e1f2a3b4c5d6
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "f2a3b4c5d6e7"
+down_revision = "e1f2a3b4c5d6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create public.view_counters (buffered view counts per resource)"""
+    op.create_table(
+        "view_counters",
+        sa.Column("resource", sa.String(length=50), nullable=False),
+        sa.Column("resource_id", sa.Integer(), nullable=False),
+        sa.Column("views", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.text("NOW()"), nullable=True
+        ),
+        sa.PrimaryKeyConstraint("resource", "resource_id"),
+        schema="public",
+    )
+
+
+def downgrade():
+    """Drop public.view_counters"""
+    op.drop_table("view_counters", schema="public")
@@ -478,6 +478,18 @@ class ExpertRating(Base):
     )
 
 
+class ViewCounter(Base):
+    """閲覧数カウンタ（services/view_counters.py がまとめて加算する）"""
+
+    __tablename__ = "view_counters"
+    __table_args__ = {"schema": "public"}
+
+    resource = Column(String(50), primary_key=True)  # knowledge / sop / consultation
+    resource_id = Column(Integer, primary_key=True)
+    views = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 # ============================================================
 # Audit Schema - 監査
 # ============================================================
@@ -9,25 +9,356 @@
 """
 
 import math
+import os
 import re
 from collections import Counter, defaultdict
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from memory_cache import MemoryCache
+
+# オプションの依存関係（未導入時は従来の逐次計算にフォールバック）
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+JP_TOKEN_PATTERN = re.compile(r"[ぁ-んァ-ヶー一-龥]+")
+EN_TOKEN_PATTERN = re.compile(r"[a-zA-Z0-9]{2,}")
+
+# 推薦結果キャッシュの上限（ワーカーごと）
+CACHE_MAX_ENTRIES = int(os.environ.get("MKS_RECOMMENDATION_CACHE_MAX_ENTRIES", 2000))
+CACHE_MAX_BYTES = int(os.environ.get("MKS_RECOMMENDATION_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    テキストをトークンに分割（Bi-gram方式）
+
+    日本語は2文字ずつのBi-gramと元の文字列、英数字は2文字以上の単語を
+    小文字化してトークンとする。推薦エンジンと検索インデックスで共用する。
+
+    Args:
+        text: 対象テキスト
+
+    Returns:
+        List[str]: トークンリスト
+    """
+    if not text:
+        return []
+
+    tokens = []
+
+    # まず全ての日本語文字列を抽出
+    jp_parts = JP_TOKEN_PATTERN.findall(text)
+    for part in jp_parts:
+        # Bi-gram（2文字ずつ）で分割
+        for i in range(len(part) - 1):
+            bigram = part[i : i + 2]
+            tokens.append(bigram)
+        # 3文字以上の場合は元の単語も追加
+        if len(part) >= 2:
+            tokens.append(part)
+
+    # 英数字トークン（2文字以上）
+    en_tokens = EN_TOKEN_PATTERN.findall(text.lower())
+    tokens.extend(en_tokens)
+
+    return tokens
+
+
+def item_text(item: Dict[str, Any]) -> str:
+    """類似度計算の対象テキスト（title / summary / content の連結）"""
+    return " ".join(
+        [item.get("title") or "", item.get("summary") or "", item.get("content") or ""]
+    )
+
+
+def _term_frequencies(text: str) -> Dict[str, float]:
+    tokens = tokenize(text)
+    if not tokens:
+        return {}
+    total = len(tokens)
+    return {word: count / total for word, count in Counter(tokens).items()}
+
+
+class TfidfModel:
+    """
+    コーパス全体で学習済みのTF-IDFモデル
+
+    語彙・IDF表・L2正規化済み文書ベクトルを NumPy 配列の疎行列（CSR形式）で保持する。
+    文書ベクトルは語ごとの行（転置CSR: 語 → 文書の posting）として格納し、
+    対象文書との類似度は疎行列×疎ベクトル積1回で全文書分を求める。
+    IDF は calculate_content_similarity と同じ log((N+1)/(df+1)) + 1。
+
+    タグ（小文字化）とカテゴリも同様に配列化し、ハイブリッドスコアの
+    タグJaccard係数・カテゴリ一致もベクトル演算で求める。
+    """
+
+    def __init__(self, items: List[Dict[str, Any]]):
+        """
+        初期化（学習は fit() を使用）
+
+        Args:
+            items: コーパスのアイテム一覧（行番号順）
+        """
+        self.items = items
+        self.rows_by_id: Dict[Any, List[int]] = defaultdict(list)
+        for row, item in enumerate(items):
+            self.rows_by_id[item.get("id")].append(row)
+
+        self.vocabulary: Dict[str, int] = {}
+        self.idf = np.zeros(0)
+        self.term_indptr = np.zeros(1, dtype=np.int64)
+        self.term_rows = np.zeros(0, dtype=np.int32)
+        self.term_weights = np.zeros(0, dtype=np.float32)
+
+        self.tag_vocabulary: Dict[str, int] = {}
+        self.tag_indptr = np.zeros(1, dtype=np.int64)
+        self.tag_rows = np.zeros(0, dtype=np.int32)
+        self.tag_counts = np.zeros(len(items), dtype=np.int32)
+        self.category_codes = np.full(len(items), -1, dtype=np.int32)
+        self.category_vocabulary: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @classmethod
+    def fit(cls, items: Iterable[Dict[str, Any]]) -> "TfidfModel":
+        """
+        アイテム一覧からモデルを学習
+
+        Args:
+            items: コーパスのアイテム一覧
+
+        Returns:
+            TfidfModel: 学習済みモデル
+        """
+        model = cls(list(items))
+        n_docs = len(model.items)
+
+        # 文書行優先（CSR）で TF を集計
+        doc_indptr = [0]
+        doc_cols: List[int] = []
+        doc_tf: List[float] = []
+        tag_doc_rows: List[int] = []
+        tag_cols: List[int] = []
+        for row, item in enumerate(model.items):
+            for word, tf in _term_frequencies(item_text(item)).items():
+                doc_cols.append(model.vocabulary.setdefault(word, len(model.vocabulary)))
+                doc_tf.append(tf)
+            doc_indptr.append(len(doc_cols))
+
+            tags = {str(tag).lower() for tag in item.get("tags") or []}
+            for tag in tags:
+                tag_doc_rows.append(row)
+                tag_cols.append(
+                    model.tag_vocabulary.setdefault(tag, len(model.tag_vocabulary))
+                )
+            model.tag_counts[row] = len(tags)
+
+            category = item.get("category")
+            if category:
+                model.category_codes[row] = model.category_vocabulary.setdefault(
+                    str(category).lower(), len(model.category_vocabulary)
+                )
+
+        cols = np.asarray(doc_cols, dtype=np.int32)
+        rows = np.repeat(
+            np.arange(n_docs, dtype=np.int32), np.diff(np.asarray(doc_indptr))
+        )
+        n_terms = len(model.vocabulary)
+
+        df = np.bincount(cols, minlength=n_terms)
+        model.idf = np.log((n_docs + 1) / (df + 1)) + 1
+        weights = np.asarray(doc_tf) * model.idf[cols]
+        norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=n_docs))
+        weights = weights / norms[rows]
+
+        # 語ごとの行（転置CSR）に並べ替え
+        model.term_indptr, model.term_rows, model.term_weights = cls._transpose(
+            cols, rows, weights, n_terms
+        )
+        model.tag_indptr, model.tag_rows, _ = cls._transpose(
+            np.asarray(tag_cols, dtype=np.int32),
+            np.asarray(tag_doc_rows, dtype=np.int32),
+            np.ones(len(tag_cols)),
+            len(model.tag_vocabulary),
+        )
+        return model
+
+    @staticmethod
+    def _transpose(cols, rows, weights, n_cols):
+        order = np.argsort(cols, kind="stable")
+        indptr = np.zeros(n_cols + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cols, minlength=n_cols), out=indptr[1:])
+        return (
+            indptr,
+            rows[order].astype(np.int32),
+            weights[order].astype(np.float32),
+        )
+
+    def _gather(self, indptr, rows, values, cols, col_weights):
+        """疎行列（列ごとの posting）× 疎ベクトルの積を全文書分まとめて計算
+
+        各列の posting 内で文書行は重複しないため、列ごとにスライス加算する。
+        """
+        result = np.zeros(len(self.items), dtype=np.float32)
+        for col, weight in zip(cols.tolist(), col_weights.tolist()):
+            start, end = indptr[col], indptr[col + 1]
+            if values is None:
+                result[rows[start:end]] += np.float32(weight)
+            else:
+                result[rows[start:end]] += values[start:end] * np.float32(weight)
+        return result.astype(np.float64)
+
+    def transform(self, item: Dict[str, Any]) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        アイテムをL2正規化済みTF-IDFの疎ベクトル（列番号, 重み）に変換
+
+        語彙にない語はIDF=1.0としてノルムにのみ寄与する。
+        """
+        tf = _term_frequencies(item_text(item))
+        cols, weights, norm_sq = [], [], 0.0
+        for word, value in tf.items():
+            col = self.vocabulary.get(word)
+            weight = value * (self.idf[col] if col is not None else 1.0)
+            norm_sq += weight * weight
+            if col is not None:
+                cols.append(col)
+                weights.append(weight)
+        cols = np.asarray(cols, dtype=np.int64)
+        weights = np.asarray(weights)
+        if norm_sq > 0:
+            weights = weights / math.sqrt(norm_sq)
+        return cols, weights
+
+    def content_scores(self, item: Dict[str, Any]) -> "np.ndarray":
+        """全文書とのコサイン類似度"""
+        cols, weights = self.transform(item)
+        return self._gather(
+            self.term_indptr, self.term_rows, self.term_weights, cols, weights
+        )
+
+    def tag_scores(self, tags: List[str]) -> "np.ndarray":
+        """全文書とのタグJaccard係数（calculate_tag_similarity と同じ定義）"""
+        if not tags:
+            return np.zeros(len(self.items))
+        tag_set = {str(tag).lower() for tag in tags}
+        cols = np.asarray(
+            [self.tag_vocabulary[t] for t in tag_set if t in self.tag_vocabulary],
+            dtype=np.int64,
+        )
+        intersection = self._gather(
+            self.tag_indptr, self.tag_rows, None, cols, np.ones(len(cols))
+        )
+        union = len(tag_set) + self.tag_counts - intersection
+        scores = np.zeros(len(self.items))
+        valid = (self.tag_counts > 0) & (union > 0)
+        scores[valid] = intersection[valid] / union[valid]
+        return scores
+
+    def category_scores(self, category: str) -> "np.ndarray":
+        """全文書とのカテゴリ一致（一致:1.0、不一致:0.0）"""
+        if not category:
+            return np.zeros(len(self.items))
+        code = self.category_vocabulary.get(str(category).lower())
+        if code is None:
+            return np.zeros(len(self.items))
+        return (self.category_codes == code).astype(np.float64)
+
+    def common_keywords(
+        self, item1: Dict[str, Any], item2: Dict[str, Any], limit: int = 5
+    ) -> List[str]:
+        """共通キーワード（TF-IDFスコアが高い順）"""
+        return common_keywords(item1, item2, self.idf_of, limit)
+
+    def idf_of(self, word: str) -> float:
+        """語のIDF（語彙にない場合は 1.0）"""
+        col = self.vocabulary.get(word)
+        return float(self.idf[col]) if col is not None else 1.0
+
+    def matches(self, items: List[Dict[str, Any]]) -> bool:
+        """
+        候補アイテム一覧がこのモデルの学習コーパスそのものか
+
+        件数や先頭・末尾の比較では中間の編集を見逃すため、学習に使った一覧
+        （model.items）が渡された場合のみ True とする。別に読み込んだ一覧は
+        同じ内容でも判定できないため False（呼び出し側で再学習する）。
+        """
+        return items is self.items
+
+
+def common_keywords(
+    item1: Dict[str, Any],
+    item2: Dict[str, Any],
+    idf: Callable[[str], float],
+    limit: int = 5,
+) -> List[str]:
+    """共通キーワード（TF-IDFスコアが高い順）"""
+    tf1 = _term_frequencies(item_text(item1))
+    tf2 = _term_frequencies(item_text(item2))
+    common = set(tf1) & set(tf2)
+    return sorted(common, key=lambda w: (tf1[w] + tf2[w]) * idf(w), reverse=True)[:limit]
+
+
+def related_item_result(
+    item: Dict[str, Any],
+    score: float,
+    tag_similarity: float = 0.0,
+    category_match: bool = False,
+    content_similarity: float = 0.0,
+    common_keywords: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """関連アイテムのレスポンス要素（スコア・推薦理由・詳細を付与したコピー）"""
+    reasons = []
+    details = {}
+    if tag_similarity > 0:
+        reasons.append(f"同じタグ（類似度: {tag_similarity:.2f}）")
+        details["tag_similarity"] = tag_similarity
+    if category_match:
+        reasons.append("同じカテゴリ")
+        details["category_match"] = True
+    if content_similarity > 0:
+        keywords = common_keywords or []
+        if keywords:
+            reasons.append(f"共通キーワード: {', '.join(keywords[:3])}")
+        details["content_similarity"] = content_similarity
+        details["common_keywords"] = keywords
+
+    item_copy = item.copy()
+    item_copy["recommendation_score"] = score
+    item_copy["recommendation_reasons"] = reasons
+    item_copy["recommendation_details"] = details
+    return item_copy
 
 
 class RecommendationEngine:
     """推薦エンジンクラス"""
 
-    def __init__(self, cache_ttl: int = 300):
+    def __init__(
+        self,
+        cache_ttl: int = 300,
+        cache_max_entries: int = CACHE_MAX_ENTRIES,
+        cache_max_bytes: Optional[int] = CACHE_MAX_BYTES,
+    ):
         """
         初期化
 
         Args:
             cache_ttl: キャッシュの有効期限（秒）、デフォルト5分
+            cache_max_entries: キャッシュの最大エントリ数
+            cache_max_bytes: キャッシュの推定メモリ上限（バイト）
         """
-        self.cache = {}
         self.cache_ttl = cache_ttl
-        self.cache_timestamps = {}
+        self.cache = MemoryCache(
+            "recommendations",
+            max_entries=cache_max_entries,
+            max_bytes=cache_max_bytes,
+            ttl=cache_ttl,
+        )
 
     def calculate_tag_similarity(self, tags1: List[str], tags2: List[str]) -> float:
         """
@@ -80,27 +411,7 @@ class RecommendationEngine:
         Returns:
             List[str]: トークンリスト
         """
-        if not text:
-            return []
-
-        tokens = []
-
-        # まず全ての日本語文字列を抽出
-        jp_parts = re.findall(r"[ぁ-んァ-ヶー一-龥]+", text)
-        for part in jp_parts:
-            # Bi-gram（2文字ずつ）で分割
-            for i in range(len(part) - 1):
-                bigram = part[i : i + 2]
-                tokens.append(bigram)
-            # 3文字以上の場合は元の単語も追加
-            if len(part) >= 2:
-                tokens.append(part)
-
-        # 英数字トークン（2文字以上）
-        en_tokens = re.findall(r"[a-zA-Z0-9]{2,}", text.lower())
-        tokens.extend(en_tokens)
-
-        return tokens
+        return tokenize(text)
 
     def _calculate_tf(self, tokens: List[str]) -> Dict[str, float]:
         """
@@ -167,12 +478,8 @@ class RecommendationEngine:
                 - 詳細情報（共通キーワードなど）
         """
         # テキスト抽出
-        text1 = " ".join(
-            [item1.get("title", ""), item1.get("summary", ""), item1.get("content", "")]
-        )
-        text2 = " ".join(
-            [item2.get("title", ""), item2.get("summary", ""), item2.get("content", "")]
-        )
+        text1 = item_text(item1)
+        text2 = item_text(item2)
 
         # トークン化
         tokens1 = self._tokenize(text1)
@@ -189,14 +496,7 @@ class RecommendationEngine:
         if all_items:
             all_tokens = []
             for item in all_items:
-                text = " ".join(
-                    [
-                        item.get("title", ""),
-                        item.get("summary", ""),
-                        item.get("content", ""),
-                    ]
-                )
-                all_tokens.append(self._tokenize(text))
+                all_tokens.append(self._tokenize(item_text(item)))
             idf = self._calculate_idf(all_tokens)
         else:
             # IDFなしの場合はTFのみ使用
@@ -239,6 +539,7 @@ class RecommendationEngine:
         limit: int = 5,
         algorithm: str = "hybrid",
         min_score: float = 0.1,
+        model: Optional[TfidfModel] = None,
     ) -> List[Dict[str, Any]]:
         """
         関連アイテムを取得
@@ -249,27 +550,127 @@ class RecommendationEngine:
             limit: 取得数上限
             algorithm: アルゴリズム（'tag', 'category', 'keyword', 'hybrid'）
             min_score: 最小スコア閾値
+            model: 学習済みの TfidfModel。candidate_items に model.items を渡した場合のみ
+                使用し、それ以外（省略時を含む）はその場で学習する
 
         Returns:
             List[Dict[str, Any]]: 関連アイテムリスト（スコア順）
         """
         # 自分自身を除外
         target_id = target_item.get("id")
-        candidates = [item for item in candidate_items if item.get("id") != target_id]
-
-        if not candidates:
+        if not any(item.get("id") != target_id for item in candidate_items):
             return []
 
         # キャッシュキー生成
         cache_key = f"related_{target_id}_{algorithm}_{limit}"
 
         # キャッシュチェック
-        if cache_key in self.cache:
-            timestamp = self.cache_timestamps.get(cache_key, 0)
-            if datetime.now().timestamp() - timestamp < self.cache_ttl:
-                return self.cache[cache_key]
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        if NUMPY_AVAILABLE:
+            if model is None or not model.matches(candidate_items):
+                model = TfidfModel.fit(candidate_items)
+            result = self._score_related_with_model(
+                model, target_item, limit, algorithm, min_score
+            )
+        else:
+            candidates = [
+                item for item in candidate_items if item.get("id") != target_id
+            ]
+            result = self._score_related_items(
+                target_item, candidates, candidate_items, limit, algorithm, min_score
+            )
 
-        # スコア計算
+        # キャッシュに保存
+        self.cache.set(cache_key, result)
+
+        return result
+
+    def related_score_vectors(
+        self, model: TfidfModel, target_item: Dict[str, Any], algorithm: str
+    ) -> Tuple["np.ndarray", Optional["np.ndarray"], Optional["np.ndarray"], Optional["np.ndarray"]]:
+        """
+        学習済みモデルで全文書との関連スコアをベクトル計算
+
+        Returns:
+            (総合スコア, タグ類似度, カテゴリ一致, コンテンツ類似度)。
+            アルゴリズムで使用しない要素は None。対象自身のスコアは -inf。
+        """
+        scores = np.zeros(len(model))
+        tag_sim = category_sim = content_sim = None
+
+        if algorithm in ["tag", "hybrid"]:
+            tag_sim = model.tag_scores(target_item.get("tags", []))
+            scores += tag_sim * 0.4  # 重み: 40%
+        if algorithm in ["category", "hybrid"]:
+            category_sim = model.category_scores(target_item.get("category", ""))
+            scores += category_sim * 0.3  # 重み: 30%
+        if algorithm in ["keyword", "hybrid"]:
+            content_sim = model.content_scores(target_item)
+            scores += content_sim * 0.3  # 重み: 30%
+
+        # 自分自身を除外
+        scores[model.rows_by_id.get(target_item.get("id"), [])] = -np.inf
+        return scores, tag_sim, category_sim, content_sim
+
+    def _score_related_with_model(
+        self,
+        model: TfidfModel,
+        target_item: Dict[str, Any],
+        limit: int,
+        algorithm: str,
+        min_score: float,
+    ) -> List[Dict[str, Any]]:
+        """学習済みモデルで全候補のスコアをベクトル計算し、上位 limit 件を返す"""
+        scores, tag_sim, category_sim, content_sim = self.related_score_vectors(
+            model, target_item, algorithm
+        )
+
+        # 最小スコア閾値でフィルタ
+        eligible = np.flatnonzero(scores >= min_score)
+        if len(eligible) == 0:
+            return []
+        rounded = np.round(scores[eligible], 3)
+
+        # 上位 limit 件を部分ソートで抽出（同点は元の順序を維持）
+        if len(eligible) > limit:
+            kth = np.partition(rounded, len(rounded) - limit)[len(rounded) - limit]
+            keep = rounded >= kth
+            eligible, rounded = eligible[keep], rounded[keep]
+        order = np.lexsort((eligible, -rounded))[:limit]
+
+        result = []
+        for pos in order:
+            row = int(eligible[pos])
+            item = model.items[row]
+            content = content_sim[row] if content_sim is not None else 0.0
+            result.append(
+                related_item_result(
+                    item,
+                    float(rounded[pos]),
+                    tag_similarity=float(tag_sim[row]) if tag_sim is not None else 0.0,
+                    category_match=category_sim is not None and category_sim[row] > 0,
+                    content_similarity=float(content),
+                    common_keywords=(
+                        model.common_keywords(target_item, item) if content > 0 else None
+                    ),
+                )
+            )
+
+        return result
+
+    def _score_related_items(
+        self,
+        target_item: Dict[str, Any],
+        candidates: List[Dict[str, Any]],
+        candidate_items: List[Dict[str, Any]],
+        limit: int,
+        algorithm: str,
+        min_score: float,
+    ) -> List[Dict[str, Any]]:
+        """候補ごとに類似度を計算（NumPy 未導入時のフォールバック）"""
         scored_items = []
 
         for item in candidates:
@@ -323,13 +724,7 @@ class RecommendationEngine:
         scored_items.sort(key=lambda x: x["recommendation_score"], reverse=True)
 
         # 上限数まで取得
-        result = scored_items[:limit]
-
-        # キャッシュに保存
-        self.cache[cache_key] = result
-        self.cache_timestamps[cache_key] = datetime.now().timestamp()
-
-        return result
+        return scored_items[:limit]
 
     def get_personalized_recommendations(
         self,
@@ -338,28 +733,44 @@ class RecommendationEngine:
         all_items: List[Dict[str, Any]],
         limit: int = 5,
         days: int = 30,
+        matrix=None,
+        resource: Optional[str] = None,
+        popularity: Optional[Callable[[int], List[Tuple[Any, float]]]] = None,
     ) -> List[Dict[str, Any]]:
         """
         パーソナライズ推薦を取得（協調フィルタリング）
 
         Args:
             user_id: ユーザーID
-            access_logs: アクセスログリスト
+            access_logs: アクセスログリスト（matrix 指定時は未使用）
             all_items: 全アイテムリスト
             limit: 取得数上限
             days: 対象期間（日数）
+            matrix: 閲覧行列（services.interaction_matrix.InteractionMatrix）。
+                指定時はログを走査せず疎行列で計算する
+            resource: アイテム種別（knowledge / sop）。matrix 使用時に閲覧履歴を絞り込む
+            popularity: 閲覧数上位 [(ID, 閲覧数)] を返す関数（閲覧数カウンタ）。
+                指定時は閲覧履歴がないユーザー向けの人気アイテムをログ走査せずに求める
 
         Returns:
             List[Dict[str, Any]]: 推薦アイテムリスト
         """
         # キャッシュキー
         cache_key = f"personalized_{user_id}_{limit}_{days}"
+        if resource:
+            cache_key += f"_{resource}"
 
         # キャッシュチェック
-        if cache_key in self.cache:
-            timestamp = self.cache_timestamps.get(cache_key, 0)
-            if datetime.now().timestamp() - timestamp < self.cache_ttl:
-                return self.cache[cache_key]
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        if matrix is not None:
+            result = self._personalized_from_matrix(
+                matrix, user_id, all_items, limit, days, resource
+            )
+            self.cache.set(cache_key, result)
+            return result
 
         # 対象期間のログをフィルタ
         cutoff_date = datetime.now() - timedelta(days=days)
@@ -399,7 +810,7 @@ class RecommendationEngine:
 
         if not user_viewed:
             # 閲覧履歴がない場合は人気アイテムを返す
-            return self._get_popular_items(all_items, access_logs, limit)
+            return self._get_popular_items(all_items, access_logs, limit, popularity)
 
         # 類似ユーザーを見つける（協調フィルタリング）
         similar_users = self._find_similar_users(
@@ -454,9 +865,85 @@ class RecommendationEngine:
                 result.append(item_copy)
 
         # キャッシュに保存
-        self.cache[cache_key] = result
-        self.cache_timestamps[cache_key] = datetime.now().timestamp()
+        self.cache.set(cache_key, result)
+
+        return result
+
+    def _personalized_from_matrix(
+        self,
+        matrix,
+        user_id: int,
+        all_items: List[Dict[str, Any]],
+        limit: int,
+        days: int,
+        resource: Optional[str],
+    ) -> List[Dict[str, Any]]:
+        """閲覧行列を使ったパーソナライズ推薦（スコアの考え方は逐次計算と同じ）"""
+        items_by_id = {item.get("id"): item for item in all_items}
+
+        viewed = matrix.user_items(user_id, days=days)
+        user_viewed = {
+            resource_id
+            for (kind, resource_id) in viewed
+            if resource is None or kind == resource
+        }
+        if not viewed:
+            # 閲覧履歴がない場合は人気アイテムを返す
+            result = []
+            for item_id, score in matrix.popular_items(resource, limit=len(items_by_id)):
+                item = items_by_id.get(item_id)
+                if item:
+                    item_copy = item.copy()
+                    item_copy["recommendation_score"] = round(score, 3)
+                    item_copy["recommendation_reasons"] = ["人気のアイテム"]
+                    result.append(item_copy)
+                    if len(result) >= limit:
+                        break
+            return result
+
+        user_categories = Counter()
+        user_tags = Counter()
+        for item_id in user_viewed:
+            item = items_by_id.get(item_id)
+            if item:
+                if item.get("category"):
+                    user_categories[item["category"]] += 1
+                for tag in item.get("tags") or []:
+                    user_tags[tag] += 1
+
+        # 類似ユーザー上位10名の閲覧アイテムをスコアリング（協調フィルタリング）
+        similar_users = matrix.similar_users(user_id, days=days, limit=10)
+        candidate_scores = defaultdict(float)
+        for item_id, score in matrix.candidate_scores(
+            similar_users, kind=resource, days=days
+        ).items():
+            if item_id not in user_viewed:
+                candidate_scores[item_id] += score
+
+        # コンテンツベースのスコアを追加
+        for item_id, item in items_by_id.items():
+            if item_id in user_viewed:
+                continue
+            content_score = 0.0
+            if item.get("category") in user_categories:
+                content_score += 0.5
+            tag_matches = sum(1 for tag in item.get("tags") or [] if tag in user_tags)
+            if tag_matches > 0:
+                content_score += tag_matches * 0.3
+            candidate_scores[item_id] += content_score
 
+        result = []
+        for item_id, score in sorted(
+            candidate_scores.items(), key=lambda x: x[1], reverse=True
+        ):
+            item = items_by_id.get(item_id)
+            if item:
+                item_copy = item.copy()
+                item_copy["recommendation_score"] = round(score, 3)
+                item_copy["recommendation_reasons"] = ["あなたの閲覧履歴に基づく推薦"]
+                result.append(item_copy)
+                if len(result) >= limit:
+                    break
         return result
 
     def _find_similar_users(
@@ -514,36 +1001,41 @@ class RecommendationEngine:
         all_items: List[Dict[str, Any]],
         access_logs: List[Dict[str, Any]],
         limit: int,
+        popularity: Optional[Callable[[int], List[Tuple[Any, float]]]] = None,
     ) -> List[Dict[str, Any]]:
         """
         人気アイテムを取得
 
         Args:
             all_items: 全アイテム
-            access_logs: アクセスログ
+            access_logs: アクセスログ（popularity 指定時は未使用）
             limit: 取得数上限
+            popularity: 閲覧数上位 [(ID, 閲覧数)] を返す関数
 
         Returns:
             List[Dict[str, Any]]: 人気アイテムリスト
         """
-        # 閲覧数をカウント
-        view_counts = Counter()
+        if popularity is not None:
+            ranked = popularity(limit)
+        else:
+            # 閲覧数をカウント
+            view_counts = Counter()
 
-        for log in access_logs:
-            if log.get("action") in ["knowledge.view", "sop.view"]:
-                resource_id = log.get("resource_id")
-                if resource_id:
-                    view_counts[resource_id] += 1
+            for log in access_logs:
+                if log.get("action") in ["knowledge.view", "sop.view"]:
+                    resource_id = log.get("resource_id")
+                    if resource_id:
+                        view_counts[resource_id] += 1
 
-        # 上位アイテムを取得
-        popular_ids = [item_id for item_id, _ in view_counts.most_common(limit)]
+            ranked = view_counts.most_common(limit)
 
+        items_by_id = {item.get("id"): item for item in all_items}
         result = []
-        for item_id in popular_ids:
-            item = next((i for i in all_items if i.get("id") == item_id), None)
+        for item_id, score in ranked:
+            item = items_by_id.get(item_id)
             if item:
                 item_copy = item.copy()
-                item_copy["recommendation_score"] = view_counts[item_id]
+                item_copy["recommendation_score"] = score
                 item_copy["recommendation_reasons"] = ["人気のアイテム"]
                 result.append(item_copy)
 
@@ -552,25 +1044,26 @@ class RecommendationEngine:
     def clear_cache(self):
         """キャッシュをクリア"""
         self.cache.clear()
-        self.cache_timestamps.clear()
 
     def get_cache_stats(self) -> Dict[str, Any]:
         """
         キャッシュ統計を取得
 
         Returns:
-            Dict[str, Any]: キャッシュ統計情報
+            Dict[str, Any]: キャッシュ統計情報（件数・推定メモリ・ヒット/ミス/追い出し件数）
         """
-        now = datetime.now().timestamp()
-        valid_count = sum(
-            1
-            for key, timestamp in self.cache_timestamps.items()
-            if now - timestamp < self.cache_ttl
-        )
-
+        stats = self.cache.stats()
         return {
-            "total_entries": len(self.cache),
-            "valid_entries": valid_count,
-            "expired_entries": len(self.cache) - valid_count,
+            "total_entries": stats["entries"],
+            "valid_entries": stats["entries"] - stats["expired_entries"],
+            "expired_entries": stats["expired_entries"],
             "cache_ttl": self.cache_ttl,
+            "max_entries": stats["max_entries"],
+            "estimated_bytes": stats["bytes"],
+            "max_bytes": stats["max_bytes"],
+            "hits": stats["hits"],
+            "misses": stats["misses"],
+            "evictions": stats["evictions"],
+            "expirations": stats["expirations"],
+            "hit_ratio": stats["hit_ratio"],
         }
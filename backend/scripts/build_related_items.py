@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+関連アイテム事前計算テーブルの構築
+
+ナレッジ・SOPごとにハイブリッドスコア上位K件の近傍を計算し、
+data/related_items/<collection>.json に保存する。
+/api/v1/knowledge/<id>/related と /api/v1/sop/<id>/related はこのテーブルを参照する。
+
+既定では増分更新（前回構築時から変更された文書とその近傍のみ再計算）。
+テーブルがない場合は全件を計算する。
+
+使用例:
+    python scripts/build_related_items.py              # 増分更新
+    python scripts/build_related_items.py --full       # 全件再計算
+    python scripts/build_related_items.py --collection sop --k 10
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# パスを追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_access import DataAccessLayer
+from services.related_items import COLLECTIONS, DEFAULT_K
+from services.related_items_jobs import RelatedItemsJobs
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="関連アイテム事前計算テーブルを構築")
+    parser.add_argument(
+        "--collection",
+        choices=[*COLLECTIONS, "all"],
+        default="all",
+        help="対象コレクション（デフォルト: all）",
+    )
+    parser.add_argument("--full", action="store_true", help="全件再計算")
+    parser.add_argument(
+        "--k", type=int, default=DEFAULT_K, help=f"近傍数（デフォルト: {DEFAULT_K}）"
+    )
+    parser.add_argument("--data-dir", help="出力先データディレクトリ（デフォルト: MKS_DATA_DIR）")
+    args = parser.parse_args()
+
+    collections = list(COLLECTIONS) if args.collection == "all" else [args.collection]
+    jobs = RelatedItemsJobs(
+        DataAccessLayer(), data_dir=args.data_dir, k=args.k, collections=collections
+    )
+
+    started = time.perf_counter()
+    results = jobs.run(full=args.full)
+    elapsed = time.perf_counter() - started
+
+    failed = False
+    for collection, stats in results.items():
+        if "error" in stats:
+            failed = True
+            print(f"❌ {collection}: {stats['error']}")
+        else:
+            print(f"✅ {collection}: {stats}")
+    print(f"所要時間: {elapsed:.1f}秒")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
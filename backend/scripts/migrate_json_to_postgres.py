@@ -3,37 +3,65 @@
 JSON to PostgreSQL データ移行スクリプト
 Mirai Knowledge Systems - Phase B-10
 
+移行元 JSON はストリーミングで読み、テーブルごとに COPY でチャンク単位にロードする
+（services/bulk_migration.py）。users を先に移行して id 対応表を作った後、
+残りのテーブルは並列に移行する。チャンクごとのチェックポイントを記録するため、
+中断しても再実行すれば続きから再開する（--restart で最初からやり直す）。
+
 Usage:
-    python migrate_json_to_postgres.py [--dry-run] [--verbose]
+    python migrate_json_to_postgres.py [--dry-run] [--verbose] [--chunk-size N] [--workers N]
+                                       [--access-logs-limit N] [--restart]
 """
 
 import argparse
+import heapq
 import json
 import os
 import sys
 from datetime import date, datetime
 from pathlib import Path
+from typing import Dict, Iterator, Sequence
 
 # プロジェクトルートをパスに追加
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 from werkzeug.security import generate_password_hash
 
+from services.bulk_migration import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_WORKERS,
+    BulkMigrator,
+    MigrationCheckpoint,
+    TableSpec,
+)
+from services.json_stream import iter_json_array
+
 # データディレクトリ
 DATA_DIR = Path(__file__).parent.parent / "data"
 
+# チェックポイントファイル（再開用）
+DEFAULT_CHECKPOINT = DATA_DIR / "migration_checkpoint.json"
+
 
-def load_json(filename: str) -> list:
-    """JSONファイルを読み込む"""
+def iter_json(filename: str) -> Iterator[Dict]:
+    """JSONファイル（配列）の要素をストリーミングで読み込む"""
     filepath = DATA_DIR / filename
     if not filepath.exists():
         print(f"[WARN] File not found: {filepath}")
-        return []
-    with open(filepath, "r", encoding="utf-8") as f:
-        return json.load(f)
+        return iter(())
+    return iter_json_array(str(filepath))
+
+
+def load_details(filename: str, fields: Sequence[str]) -> Dict:
+    """詳細ファイルを id → 必要なフィールドだけの辞書として読み込む"""
+    details = {}
+    for detail in iter_json(filename):
+        details[detail["id"]] = {k: detail[k] for k in fields if k in detail}
+    return details
 
 
 def parse_date(date_str: str) -> date | None:
@@ -60,7 +88,7 @@ def parse_datetime(dt_str: str) -> datetime | None:
 
 def migrate_users(session, dry_run: bool, verbose: bool) -> dict:
     """ユーザーデータを移行"""
-    users = load_json("users.json")
+    users = list(iter_json("users.json"))
     user_id_map = {}
 
     print(f"\n[INFO] Migrating {len(users)} users...")
@@ -128,452 +156,280 @@ def migrate_users(session, dry_run: bool, verbose: bool) -> dict:
     return user_id_map
 
 
-def migrate_knowledge(session, user_id_map: dict, dry_run: bool, verbose: bool):
-    """ナレッジデータを移行"""
-    items = load_json("knowledge.json")
-    details = {d["id"]: d for d in load_json("knowledge_details.json")}
-
-    print(f"\n[INFO] Migrating {len(items)} knowledge items...")
+def _split(value, convert=str.strip) -> list:
+    """カンマ区切り文字列をリストに変換（リストはそのまま返す）"""
+    if isinstance(value, str):
+        return [convert(v) for v in value.split(",")]
+    return value or []
 
-    for item in items:
-        detail = details.get(item["id"], {})
-        content = detail.get("content", "")
-
-        tags = item.get("tags", [])
-        if isinstance(tags, str):
-            tags = [t.strip() for t in tags.split(",")]
-
-        created_by_id = user_id_map.get(item.get("created_by_id"))
-
-        if not dry_run:
-            session.execute(
-                text("""
-                INSERT INTO public.knowledge (id, title, summary, content, category, tags, status, priority, project, owner, created_at, updated_at, created_by_id)
-                VALUES (:id, :title, :summary, :content, :category, :tags, :status, :priority, :project, :owner, :created_at, :updated_at, :created_by_id)
-                ON CONFLICT (id) DO UPDATE SET
-                    title = EXCLUDED.title,
-                    summary = EXCLUDED.summary,
-                    content = EXCLUDED.content,
-                    category = EXCLUDED.category,
-                    tags = EXCLUDED.tags,
-                    status = EXCLUDED.status,
-                    updated_at = EXCLUDED.updated_at
-            """),
-                {
-                    "id": item["id"],
-                    "title": item.get("title", ""),
-                    "summary": item.get("summary", item.get("content", "")[:200]),
-                    "content": content,
-                    "category": item.get("category", "その他"),
-                    "tags": tags,
-                    "status": item.get("status", "draft"),
-                    "priority": item.get("priority", "medium"),
-                    "project": item.get("project"),
-                    "owner": item.get("owner", "システム"),
-                    "created_at": parse_datetime(item.get("created_at"))
-                    or datetime.now(),
-                    "updated_at": parse_datetime(item.get("updated_at"))
-                    or datetime.now(),
-                    "created_by_id": created_by_id,
-                },
-            )
 
-        if verbose:
-            print(f"  - Knowledge: {item.get('title', '')[:50]}")
+def knowledge_spec(user_id_map: dict) -> TableSpec:
+    """ナレッジの移行定義"""
+    details = load_details("knowledge_details.json", ("content",))
 
-    if not dry_run:
-        # シーケンスをリセット
-        session.execute(
-            text(
-                "SELECT setval('public.knowledge_id_seq', (SELECT COALESCE(MAX(id), 0) FROM public.knowledge))"
-            )
+    def transform(item):
+        detail = details.get(item["id"], {})
+        return (
+            item["id"],
+            item.get("title", ""),
+            item.get("summary", item.get("content", "")[:200]),
+            detail.get("content", ""),
+            item.get("category", "その他"),
+            _split(item.get("tags", [])),
+            item.get("status", "draft"),
+            item.get("priority", "medium"),
+            item.get("project"),
+            item.get("owner", "システム"),
+            parse_datetime(item.get("created_at")) or datetime.now(),
+            parse_datetime(item.get("updated_at")) or datetime.now(),
+            user_id_map.get(item.get("created_by_id")),
         )
-        session.commit()
-
-    print(f"[OK] Migrated {len(items)} knowledge items")
 
+    return TableSpec(
+        name="knowledge",
+        table="public.knowledge",
+        columns=(
+            "id", "title", "summary", "content", "category", "tags", "status", "priority",
+            "project", "owner", "created_at", "updated_at", "created_by_id",
+        ),
+        source=lambda: iter_json("knowledge.json"),
+        transform=transform,
+        update_columns=("title", "summary", "content", "category", "tags", "status", "updated_at"),
+        sequence="public.knowledge_id_seq",
+    )
 
-def migrate_sop(session, user_id_map: dict, dry_run: bool, verbose: bool):
-    """SOPデータを移行"""
-    items = load_json("sop.json")
-    details = {d["id"]: d for d in load_json("sop_details.json")}
 
-    print(f"\n[INFO] Migrating {len(items)} SOP items...")
+def sop_spec() -> TableSpec:
+    """SOPの移行定義"""
+    details = load_details("sop_details.json", ("content",))
 
-    for item in items:
+    def transform(item):
         detail = details.get(item["id"], {})
-        content = detail.get("content", item.get("content", ""))
-
-        tags = item.get("tags", [])
-        if isinstance(tags, str):
-            tags = [t.strip() for t in tags.split(",")]
-
-        revision_date = parse_date(item.get("revision_date") or item.get("updated_at"))
-        if not revision_date:
-            revision_date = date.today()
-
-        if not dry_run:
-            session.execute(
-                text("""
-                INSERT INTO public.sop (id, title, category, version, revision_date, target, tags, content, status, attachments, created_at, updated_at)
-                VALUES (:id, :title, :category, :version, :revision_date, :target, :tags, :content, :status, :attachments, :created_at, :updated_at)
-                ON CONFLICT (id) DO UPDATE SET
-                    title = EXCLUDED.title,
-                    category = EXCLUDED.category,
-                    version = EXCLUDED.version,
-                    content = EXCLUDED.content,
-                    updated_at = EXCLUDED.updated_at
-            """),
-                {
-                    "id": item["id"],
-                    "title": item.get("title", ""),
-                    "category": item.get("category", "その他"),
-                    "version": item.get("version", "1.0"),
-                    "revision_date": revision_date,
-                    "target": item.get("target"),
-                    "tags": tags,
-                    "content": content,
-                    "status": item.get("status", "active"),
-                    "attachments": json.dumps(item.get("attachments", [])),
-                    "created_at": parse_datetime(item.get("created_at"))
-                    or datetime.now(),
-                    "updated_at": parse_datetime(item.get("updated_at"))
-                    or datetime.now(),
-                },
-            )
-
-        if verbose:
-            print(f"  - SOP: {item.get('title', '')[:50]}")
-
-    if not dry_run:
-        session.execute(
-            text(
-                "SELECT setval('public.sop_id_seq', (SELECT COALESCE(MAX(id), 0) FROM public.sop))"
-            )
+        return (
+            item["id"],
+            item.get("title", ""),
+            item.get("category", "その他"),
+            item.get("version", "1.0"),
+            parse_date(item.get("revision_date") or item.get("updated_at")) or date.today(),
+            item.get("target"),
+            _split(item.get("tags", [])),
+            detail.get("content", item.get("content", "")),
+            item.get("status", "active"),
+            json.dumps(item.get("attachments", [])),
+            parse_datetime(item.get("created_at")) or datetime.now(),
+            parse_datetime(item.get("updated_at")) or datetime.now(),
         )
-        session.commit()
 
-    print(f"[OK] Migrated {len(items)} SOP items")
-
-
-def migrate_regulations(session, dry_run: bool, verbose: bool):
-    """法令・規格データを移行"""
-    items = load_json("regulations.json")
-
-    print(f"\n[INFO] Migrating {len(items)} regulations...")
-
-    for item in items:
-        revision_date = parse_date(item.get("revision_date") or item.get("updated_at"))
-        if not revision_date:
-            revision_date = date.today()
-
-        applicable_scope = item.get("applicable_scope", [])
-        if isinstance(applicable_scope, str):
-            applicable_scope = [s.strip() for s in applicable_scope.split(",")]
-
-        if not dry_run:
-            session.execute(
-                text("""
-                INSERT INTO public.regulations (id, title, issuer, category, revision_date, applicable_scope, summary, content, status, effective_date, url, created_at, updated_at)
-                VALUES (:id, :title, :issuer, :category, :revision_date, :applicable_scope, :summary, :content, :status, :effective_date, :url, :created_at, :updated_at)
-                ON CONFLICT (id) DO UPDATE SET
-                    title = EXCLUDED.title,
-                    summary = EXCLUDED.summary,
-                    updated_at = EXCLUDED.updated_at
-            """),
-                {
-                    "id": item["id"],
-                    "title": item.get("title", ""),
-                    "issuer": item.get("issuer", "不明"),
-                    "category": item.get("category", "その他"),
-                    "revision_date": revision_date,
-                    "applicable_scope": applicable_scope,
-                    "summary": item.get("summary", ""),
-                    "content": item.get("content"),
-                    "status": item.get("status", "active"),
-                    "effective_date": parse_date(item.get("effective_date")),
-                    "url": item.get("url"),
-                    "created_at": parse_datetime(item.get("created_at"))
-                    or datetime.now(),
-                    "updated_at": parse_datetime(item.get("updated_at"))
-                    or datetime.now(),
-                },
-            )
+    return TableSpec(
+        name="sop",
+        table="public.sop",
+        columns=(
+            "id", "title", "category", "version", "revision_date", "target", "tags", "content",
+            "status", "attachments", "created_at", "updated_at",
+        ),
+        source=lambda: iter_json("sop.json"),
+        transform=transform,
+        update_columns=("title", "category", "version", "content", "updated_at"),
+        sequence="public.sop_id_seq",
+    )
 
-        if verbose:
-            print(f"  - Regulation: {item.get('title', '')[:50]}")
 
-    if not dry_run:
-        session.execute(
-            text(
-                "SELECT setval('public.regulations_id_seq', (SELECT COALESCE(MAX(id), 0) FROM public.regulations))"
-            )
+def regulations_spec() -> TableSpec:
+    """法令・規格の移行定義"""
+
+    def transform(item):
+        return (
+            item["id"],
+            item.get("title", ""),
+            item.get("issuer", "不明"),
+            item.get("category", "その他"),
+            parse_date(item.get("revision_date") or item.get("updated_at")) or date.today(),
+            _split(item.get("applicable_scope", [])),
+            item.get("summary", ""),
+            item.get("content"),
+            item.get("status", "active"),
+            parse_date(item.get("effective_date")),
+            item.get("url"),
+            parse_datetime(item.get("created_at")) or datetime.now(),
+            parse_datetime(item.get("updated_at")) or datetime.now(),
         )
-        session.commit()
-
-    print(f"[OK] Migrated {len(items)} regulations")
 
+    return TableSpec(
+        name="regulations",
+        table="public.regulations",
+        columns=(
+            "id", "title", "issuer", "category", "revision_date", "applicable_scope", "summary",
+            "content", "status", "effective_date", "url", "created_at", "updated_at",
+        ),
+        source=lambda: iter_json("regulations.json"),
+        transform=transform,
+        update_columns=("title", "summary", "updated_at"),
+        sequence="public.regulations_id_seq",
+    )
 
-def migrate_incidents(session, user_id_map: dict, dry_run: bool, verbose: bool):
-    """インシデントデータを移行"""
-    items = load_json("incidents.json")
-    details = {d["id"]: d for d in load_json("incidents_details.json")}
 
-    print(f"\n[INFO] Migrating {len(items)} incidents...")
+def incidents_spec(user_id_map: dict) -> TableSpec:
+    """インシデントの移行定義"""
+    details = load_details("incidents_details.json", ("description", "corrective_actions", "root_cause"))
 
-    for item in items:
+    def transform(item):
         detail = details.get(item["id"], {})
-
-        incident_date = parse_date(item.get("incident_date") or item.get("date"))
-        if not incident_date:
-            incident_date = date.today()
-
-        tags = item.get("tags", [])
-        if isinstance(tags, str):
-            tags = [t.strip() for t in tags.split(",")]
-
-        involved_parties = item.get("involved_parties", [])
-        if isinstance(involved_parties, str):
-            involved_parties = [p.strip() for p in involved_parties.split(",")]
-
-        reporter_id = user_id_map.get(item.get("reporter_id"))
-
-        if not dry_run:
-            session.execute(
-                text("""
-                INSERT INTO public.incidents (id, title, description, project, incident_date, severity, status, corrective_actions, root_cause, tags, location, involved_parties, created_at, updated_at, reporter_id)
-                VALUES (:id, :title, :description, :project, :incident_date, :severity, :status, :corrective_actions, :root_cause, :tags, :location, :involved_parties, :created_at, :updated_at, :reporter_id)
-                ON CONFLICT (id) DO UPDATE SET
-                    title = EXCLUDED.title,
-                    description = EXCLUDED.description,
-                    status = EXCLUDED.status,
-                    updated_at = EXCLUDED.updated_at
-            """),
-                {
-                    "id": item["id"],
-                    "title": item.get("title", ""),
-                    "description": detail.get(
-                        "description", item.get("description", "")
-                    ),
-                    "project": item.get("project", "不明"),
-                    "incident_date": incident_date,
-                    "severity": item.get("severity", "medium"),
-                    "status": item.get("status", "reported"),
-                    "corrective_actions": json.dumps(
-                        detail.get(
-                            "corrective_actions", item.get("corrective_actions", [])
-                        )
-                    ),
-                    "root_cause": detail.get("root_cause", item.get("root_cause")),
-                    "tags": tags,
-                    "location": item.get("location"),
-                    "involved_parties": involved_parties,
-                    "created_at": parse_datetime(item.get("created_at"))
-                    or datetime.now(),
-                    "updated_at": parse_datetime(item.get("updated_at"))
-                    or datetime.now(),
-                    "reporter_id": reporter_id,
-                },
-            )
-
-        if verbose:
-            print(f"  - Incident: {item.get('title', '')[:50]}")
-
-    if not dry_run:
-        session.execute(
-            text(
-                "SELECT setval('public.incidents_id_seq', (SELECT COALESCE(MAX(id), 0) FROM public.incidents))"
-            )
+        return (
+            item["id"],
+            item.get("title", ""),
+            detail.get("description", item.get("description", "")),
+            item.get("project", "不明"),
+            parse_date(item.get("incident_date") or item.get("date")) or date.today(),
+            item.get("severity", "medium"),
+            item.get("status", "reported"),
+            json.dumps(detail.get("corrective_actions", item.get("corrective_actions", []))),
+            detail.get("root_cause", item.get("root_cause")),
+            _split(item.get("tags", [])),
+            item.get("location"),
+            _split(item.get("involved_parties", [])),
+            parse_datetime(item.get("created_at")) or datetime.now(),
+            parse_datetime(item.get("updated_at")) or datetime.now(),
+            user_id_map.get(item.get("reporter_id")),
         )
-        session.commit()
-
-    print(f"[OK] Migrated {len(items)} incidents")
 
+    return TableSpec(
+        name="incidents",
+        table="public.incidents",
+        columns=(
+            "id", "title", "description", "project", "incident_date", "severity", "status",
+            "corrective_actions", "root_cause", "tags", "location", "involved_parties",
+            "created_at", "updated_at", "reporter_id",
+        ),
+        source=lambda: iter_json("incidents.json"),
+        transform=transform,
+        update_columns=("title", "description", "status", "updated_at"),
+        sequence="public.incidents_id_seq",
+    )
 
-def migrate_consultations(session, user_id_map: dict, dry_run: bool, verbose: bool):
-    """相談データを移行"""
-    items = load_json("consultations.json")
-    details = {d["id"]: d for d in load_json("consultations_details.json")}
 
-    print(f"\n[INFO] Migrating {len(items)} consultations...")
+def consultations_spec(user_id_map: dict) -> TableSpec:
+    """相談の移行定義"""
+    details = load_details("consultations_details.json", ("question", "answer"))
 
-    for item in items:
+    def transform(item):
         detail = details.get(item["id"], {})
-
-        requester_id = user_id_map.get(item.get("requester_id"))
-        expert_id = user_id_map.get(item.get("expert_id"))
-
-        if not dry_run:
-            session.execute(
-                text("""
-                INSERT INTO public.consultations (id, title, question, category, priority, status, requester_id, expert_id, answer, answered_at, created_at, updated_at)
-                VALUES (:id, :title, :question, :category, :priority, :status, :requester_id, :expert_id, :answer, :answered_at, :created_at, :updated_at)
-                ON CONFLICT (id) DO UPDATE SET
-                    title = EXCLUDED.title,
-                    question = EXCLUDED.question,
-                    status = EXCLUDED.status,
-                    answer = EXCLUDED.answer,
-                    updated_at = EXCLUDED.updated_at
-            """),
-                {
-                    "id": item["id"],
-                    "title": item.get("title", ""),
-                    "question": detail.get("question", item.get("question", "")),
-                    "category": item.get("category", "その他"),
-                    "priority": item.get("priority", "medium"),
-                    "status": item.get("status", "pending"),
-                    "requester_id": requester_id,
-                    "expert_id": expert_id,
-                    "answer": detail.get("answer", item.get("answer")),
-                    "answered_at": parse_datetime(item.get("answered_at")),
-                    "created_at": parse_datetime(item.get("created_at"))
-                    or datetime.now(),
-                    "updated_at": parse_datetime(item.get("updated_at"))
-                    or datetime.now(),
-                },
-            )
-
-        if verbose:
-            print(f"  - Consultation: {item.get('title', '')[:50]}")
-
-    if not dry_run:
-        session.execute(
-            text(
-                "SELECT setval('public.consultations_id_seq', (SELECT COALESCE(MAX(id), 0) FROM public.consultations))"
-            )
+        return (
+            item["id"],
+            item.get("title", ""),
+            detail.get("question", item.get("question", "")),
+            item.get("category", "その他"),
+            item.get("priority", "medium"),
+            item.get("status", "pending"),
+            user_id_map.get(item.get("requester_id")),
+            user_id_map.get(item.get("expert_id")),
+            detail.get("answer", item.get("answer")),
+            parse_datetime(item.get("answered_at")),
+            parse_datetime(item.get("created_at")) or datetime.now(),
+            parse_datetime(item.get("updated_at")) or datetime.now(),
         )
-        session.commit()
-
-    print(f"[OK] Migrated {len(items)} consultations")
-
-
-def migrate_approvals(session, user_id_map: dict, dry_run: bool, verbose: bool):
-    """承認データを移行"""
-    items = load_json("approvals.json")
-
-    print(f"\n[INFO] Migrating {len(items)} approvals...")
-
-    for item in items:
-        requester_id = user_id_map.get(item.get("requester_id"))
-        approver_id = user_id_map.get(item.get("approver_id"))
 
-        if not dry_run:
-            session.execute(
-                text("""
-                INSERT INTO public.approvals (id, title, type, description, requester_id, status, priority, related_entity_type, related_entity_id, approval_flow, created_at, updated_at, approved_at, approver_id)
-                VALUES (:id, :title, :type, :description, :requester_id, :status, :priority, :related_entity_type, :related_entity_id, :approval_flow, :created_at, :updated_at, :approved_at, :approver_id)
-                ON CONFLICT (id) DO UPDATE SET
-                    title = EXCLUDED.title,
-                    status = EXCLUDED.status,
-                    updated_at = EXCLUDED.updated_at
-            """),
-                {
-                    "id": item["id"],
-                    "title": item.get("title", ""),
-                    "type": item.get("type", "general"),
-                    "description": item.get("description"),
-                    "requester_id": requester_id,
-                    "status": item.get("status", "pending"),
-                    "priority": item.get("priority", "medium"),
-                    "related_entity_type": item.get("related_entity_type"),
-                    "related_entity_id": item.get("related_entity_id"),
-                    "approval_flow": json.dumps(item.get("approval_flow", {})),
-                    "created_at": parse_datetime(item.get("created_at"))
-                    or datetime.now(),
-                    "updated_at": parse_datetime(item.get("updated_at"))
-                    or datetime.now(),
-                    "approved_at": parse_datetime(item.get("approved_at")),
-                    "approver_id": approver_id,
-                },
-            )
+    return TableSpec(
+        name="consultations",
+        table="public.consultations",
+        columns=(
+            "id", "title", "question", "category", "priority", "status", "requester_id",
+            "expert_id", "answer", "answered_at", "created_at", "updated_at",
+        ),
+        source=lambda: iter_json("consultations.json"),
+        transform=transform,
+        update_columns=("title", "question", "status", "answer", "updated_at"),
+        sequence="public.consultations_id_seq",
+    )
 
-        if verbose:
-            print(f"  - Approval: {item.get('title', '')[:50]}")
 
-    if not dry_run:
-        session.execute(
-            text(
-                "SELECT setval('public.approvals_id_seq', (SELECT COALESCE(MAX(id), 0) FROM public.approvals))"
-            )
+def approvals_spec(user_id_map: dict) -> TableSpec:
+    """承認の移行定義"""
+
+    def transform(item):
+        return (
+            item["id"],
+            item.get("title", ""),
+            item.get("type", "general"),
+            item.get("description"),
+            user_id_map.get(item.get("requester_id")),
+            item.get("status", "pending"),
+            item.get("priority", "medium"),
+            item.get("related_entity_type"),
+            item.get("related_entity_id"),
+            json.dumps(item.get("approval_flow", {})),
+            parse_datetime(item.get("created_at")) or datetime.now(),
+            parse_datetime(item.get("updated_at")) or datetime.now(),
+            parse_datetime(item.get("approved_at")),
+            user_id_map.get(item.get("approver_id")),
         )
-        session.commit()
-
-    print(f"[OK] Migrated {len(items)} approvals")
 
+    return TableSpec(
+        name="approvals",
+        table="public.approvals",
+        columns=(
+            "id", "title", "type", "description", "requester_id", "status", "priority",
+            "related_entity_type", "related_entity_id", "approval_flow", "created_at",
+            "updated_at", "approved_at", "approver_id",
+        ),
+        source=lambda: iter_json("approvals.json"),
+        transform=transform,
+        update_columns=("title", "status", "updated_at"),
+        sequence="public.approvals_id_seq",
+    )
 
-def migrate_notifications(session, dry_run: bool, verbose: bool):
-    """通知データを移行"""
-    items = load_json("notifications.json")
 
-    print(f"\n[INFO] Migrating {len(items)} notifications...")
+def notifications_spec() -> TableSpec:
+    """通知の移行定義"""
 
-    for item in items:
+    def transform(item):
         target_users = item.get("target_users", [])
         if isinstance(target_users, str):
-            target_users = [
-                int(u) for u in target_users.split(",") if u.strip().isdigit()
-            ]
-
-        target_roles = item.get("target_roles", [])
-        if isinstance(target_roles, str):
-            target_roles = [r.strip() for r in target_roles.split(",")]
-
-        delivery_channels = item.get("delivery_channels", ["in_app"])
-        if isinstance(delivery_channels, str):
-            delivery_channels = [c.strip() for c in delivery_channels.split(",")]
-
-        if not dry_run:
-            session.execute(
-                text("""
-                INSERT INTO public.notifications (id, title, message, type, target_users, target_roles, delivery_channels, related_entity_type, related_entity_id, created_at, sent_at, status)
-                VALUES (:id, :title, :message, :type, :target_users, :target_roles, :delivery_channels, :related_entity_type, :related_entity_id, :created_at, :sent_at, :status)
-                ON CONFLICT (id) DO UPDATE SET
-                    title = EXCLUDED.title,
-                    status = EXCLUDED.status
-            """),
-                {
-                    "id": item["id"],
-                    "title": item.get("title", ""),
-                    "message": item.get("message", ""),
-                    "type": item.get("type", "info"),
-                    "target_users": target_users,
-                    "target_roles": target_roles,
-                    "delivery_channels": delivery_channels,
-                    "related_entity_type": item.get("related_entity_type"),
-                    "related_entity_id": item.get("related_entity_id"),
-                    "created_at": parse_datetime(item.get("created_at"))
-                    or datetime.now(),
-                    "sent_at": parse_datetime(item.get("sent_at")),
-                    "status": item.get("status", "pending"),
-                },
-            )
-
-        if verbose:
-            print(f"  - Notification: {item.get('title', '')[:50]}")
-
-    if not dry_run:
-        session.execute(
-            text(
-                "SELECT setval('public.notifications_id_seq', (SELECT COALESCE(MAX(id), 0) FROM public.notifications))"
-            )
+            target_users = [int(u) for u in target_users.split(",") if u.strip().isdigit()]
+        return (
+            item["id"],
+            item.get("title", ""),
+            item.get("message", ""),
+            item.get("type", "info"),
+            target_users,
+            _split(item.get("target_roles", [])),
+            _split(item.get("delivery_channels", ["in_app"])),
+            item.get("related_entity_type"),
+            item.get("related_entity_id"),
+            parse_datetime(item.get("created_at")) or datetime.now(),
+            parse_datetime(item.get("sent_at")),
+            item.get("status", "pending"),
         )
-        session.commit()
-
-    print(f"[OK] Migrated {len(items)} notifications")
 
+    return TableSpec(
+        name="notifications",
+        table="public.notifications",
+        columns=(
+            "id", "title", "message", "type", "target_users", "target_roles", "delivery_channels",
+            "related_entity_type", "related_entity_id", "created_at", "sent_at", "status",
+        ),
+        source=lambda: iter_json("notifications.json"),
+        transform=transform,
+        update_columns=("title", "status"),
+        sequence="public.notifications_id_seq",
+    )
 
-def migrate_access_logs(session, user_id_map: dict, dry_run: bool, verbose: bool):
-    """アクセスログを移行（最新1000件のみ）"""
-    items = load_json("access_logs.json")
 
-    # 最新1000件のみ移行
-    items = sorted(items, key=lambda x: x.get("timestamp", ""), reverse=True)[:1000]
+def access_logs_spec(user_id_map: dict, limit: int) -> TableSpec:
+    """
+    アクセスログの移行定義
 
-    print(f"\n[INFO] Migrating {len(items)} access logs (latest 1000)...")
+    limit > 0 の場合は最新 limit 件のみ（ヒープで抽出するため全件をメモリに載せない）、
+    0 の場合は全件を古い順にストリーミングで移行する。
+    """
+    from services.audit_log_store import AuditLogStore
 
-    for item in items:
-        user_id = user_id_map.get(item.get("user_id"))
+    def source():
+        records = AuditLogStore(str(DATA_DIR)).iter_records()
+        if limit > 0:
+            return heapq.nlargest(limit, records, key=lambda x: x.get("timestamp", ""))
+        return records
 
+    def transform(item):
         # resource_idを整数に変換（文字列の場合はNone）
         resource_id = item.get("resource_id")
         if resource_id is not None:
@@ -581,40 +437,35 @@ def migrate_access_logs(session, user_id_map: dict, dry_run: bool, verbose: bool
                 resource_id = int(resource_id)
             except (ValueError, TypeError):
                 resource_id = None
+        return (
+            user_id_map.get(item.get("user_id")),
+            item.get("username"),
+            item.get("action", "unknown"),
+            item.get("resource"),
+            resource_id,
+            item.get("ip_address"),
+            item.get("user_agent"),
+            item.get("request_method"),
+            item.get("request_path"),
+            item.get("session_id"),
+            item.get("status", "success"),
+            json.dumps(item.get("details")) if item.get("details") else None,
+            json.dumps(item.get("changes")) if item.get("changes") else None,
+            parse_datetime(item.get("timestamp")) or datetime.now(),
+        )
 
-        if not dry_run:
-            session.execute(
-                text("""
-                INSERT INTO audit.access_logs (user_id, username, action, resource, resource_id, ip_address, user_agent, request_method, request_path, session_id, status, details, changes, created_at)
-                VALUES (:user_id, :username, :action, :resource, :resource_id, :ip_address, :user_agent, :request_method, :request_path, :session_id, :status, :details, :changes, :created_at)
-            """),
-                {
-                    "user_id": user_id,
-                    "username": item.get("username"),
-                    "action": item.get("action", "unknown"),
-                    "resource": item.get("resource"),
-                    "resource_id": resource_id,
-                    "ip_address": item.get("ip_address"),
-                    "user_agent": item.get("user_agent"),
-                    "request_method": item.get("request_method"),
-                    "request_path": item.get("request_path"),
-                    "session_id": item.get("session_id"),
-                    "status": item.get("status", "success"),
-                    "details": (
-                        json.dumps(item.get("details")) if item.get("details") else None
-                    ),
-                    "changes": (
-                        json.dumps(item.get("changes")) if item.get("changes") else None
-                    ),
-                    "created_at": parse_datetime(item.get("timestamp"))
-                    or datetime.now(),
-                },
-            )
-
-    if not dry_run:
-        session.commit()
-
-    print(f"[OK] Migrated {len(items)} access logs")
+    return TableSpec(
+        name="access_logs",
+        table="audit.access_logs",
+        columns=(
+            "user_id", "username", "action", "resource", "resource_id", "ip_address", "user_agent",
+            "request_method", "request_path", "session_id", "status", "details", "changes",
+            "created_at",
+        ),
+        source=source,
+        transform=transform,
+        conflict_key=None,
+    )
 
 
 def main():
@@ -624,6 +475,24 @@ def main():
     )
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
     parser.add_argument("--database-url", default=None, help="Database URL")
+    parser.add_argument(
+        "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per COPY batch"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=DEFAULT_WORKERS, help="Tables migrated in parallel"
+    )
+    parser.add_argument(
+        "--access-logs-limit",
+        type=int,
+        default=1000,
+        help="Migrate only the latest N access logs (0 = all)",
+    )
+    parser.add_argument(
+        "--checkpoint", default=str(DEFAULT_CHECKPOINT), help="Checkpoint file for resuming"
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="Ignore the checkpoint and start over"
+    )
     args = parser.parse_args()
 
     # データベース接続URL
@@ -640,31 +509,48 @@ def main():
     )
     print(f"Dry Run: {args.dry_run}")
     print(f"Data Directory: {DATA_DIR}")
+    print(f"Chunk Size: {args.chunk_size} / Workers: {args.workers}")
     print("=" * 60)
 
     if args.dry_run:
         print("\n[DRY RUN MODE] No actual changes will be made\n")
 
-    # データベース接続
-    engine = create_engine(database_url)
+    # データベース接続（並列ワーカーがそれぞれ接続を使うためプールを広げる）
+    engine = create_engine(database_url, pool_size=args.workers + 1)
     Session = sessionmaker(bind=engine)
     session = Session()
 
+    checkpoint = MigrationCheckpoint(None if args.dry_run else args.checkpoint)
+    if args.restart:
+        checkpoint.reset()
+
     try:
         # 接続テスト
         session.execute(text("SELECT 1"))
         print("[OK] Database connection successful")
 
-        # 移行実行
+        # users は id 対応表を作るため先に移行する（冪等な upsert なので再開時も毎回実行）
         user_id_map = migrate_users(session, args.dry_run, args.verbose)
-        migrate_knowledge(session, user_id_map, args.dry_run, args.verbose)
-        migrate_sop(session, user_id_map, args.dry_run, args.verbose)
-        migrate_regulations(session, args.dry_run, args.verbose)
-        migrate_incidents(session, user_id_map, args.dry_run, args.verbose)
-        migrate_consultations(session, user_id_map, args.dry_run, args.verbose)
-        migrate_approvals(session, user_id_map, args.dry_run, args.verbose)
-        migrate_notifications(session, args.dry_run, args.verbose)
-        migrate_access_logs(session, user_id_map, args.dry_run, args.verbose)
+
+        migrator = BulkMigrator(
+            engine,
+            checkpoint,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            dry_run=args.dry_run,
+        )
+        migrator.run(
+            [
+                knowledge_spec(user_id_map),
+                sop_spec(),
+                regulations_spec(),
+                incidents_spec(user_id_map),
+                consultations_spec(user_id_map),
+                approvals_spec(user_id_map),
+                notifications_spec(),
+                access_logs_spec(user_id_map, args.access_logs_limit),
+            ]
+        )
 
         print("\n" + "=" * 60)
         print("[SUCCESS] Migration completed!")
@@ -672,10 +558,12 @@ def main():
 
     except Exception as e:
         print(f"\n[ERROR] Migration failed: {e}")
+        print(f"[INFO] Re-run to resume from the checkpoint: {args.checkpoint}")
         session.rollback()
         raise
     finally:
         session.close()
+        engine.dispose()
 
 
 if __name__ == "__main__":
@@ -7,7 +7,6 @@ Mirai Knowledge Systems - Phase C-2-3
 実行: python scripts/validate_migration.py
 """
 
-import json
 import os
 import sys
 from datetime import datetime
@@ -15,8 +14,12 @@ from datetime import datetime
 # パスを追加
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
+from sqlalchemy import text
+
 from database import get_session_factory
 from models import SOP, Expert, Incident, Knowledge, Project
+from services.bulk_migration import aggregates_sql, json_aggregates
+from services.json_stream import iter_json_array
 
 # カラー出力
 GREEN = "\033[92m"
@@ -26,29 +29,40 @@ BLUE = "\033[94m"
 NC = "\033[0m"
 
 
-def load_json_data(filename):
-    """JSONファイルを読み込む"""
+def iter_json_data(filename):
+    """JSONファイル（配列）の要素をストリーミングで読み込む"""
     filepath = os.path.join(os.path.dirname(__file__), "..", "data", filename)
-    if not os.path.exists(filepath):
-        return []
-    with open(filepath, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return iter_json_array(filepath)
+
 
+def validate_table(model, json_file, name, key_field):
+    """
+    テーブルとJSONデータを件数・チェックサムの集計値で比較
 
-def validate_table(model, json_file, name):
-    """テーブルとJSONデータの件数を比較"""
-    json_data = load_json_data(json_file)
-    json_count = len(json_data)
+    JSON 側はストリーミングで集計し、DB 側は同じ定義の集計を1クエリで行う
+    （行単位の比較はしない）。移行後に追加された行を除くため、DB 側は JSON の
+    id 範囲に限定して集計する。
+    """
+    expected = json_aggregates(iter_json_data(json_file), key_field)
+    json_count = expected["count"]
 
     session_factory = get_session_factory()
     db = session_factory()
 
     try:
-        db_count = db.query(model).count()
+        if json_count:
+            row = db.execute(
+                text(aggregates_sql(model.__table__.fullname, key_field)),
+                {"min_id": expected["min_id"], "max_id": expected["max_id"]},
+            ).one()
+            db_count, db_checksum = row.count, int(row.checksum)
+        else:
+            db_count, db_checksum = 0, 0
+        total_count = db.query(model).count()
     finally:
         db.close()
 
-    if db_count >= json_count:
+    if db_count == json_count and db_checksum == expected["checksum"]:
         status = f"{GREEN}✓{NC}"
         result = "OK"
     elif db_count >= json_count * 0.9:
@@ -58,7 +72,11 @@ def validate_table(model, json_file, name):
         status = f"{RED}✗{NC}"
         result = "FAIL"
 
-    print(f"  {status} {name}: JSON={json_count}, DB={db_count} [{result}]")
+    checksum = "一致" if db_checksum == expected["checksum"] else "不一致"
+    print(
+        f"  {status} {name}: JSON={json_count}, DB={db_count} (全体 {total_count}), "
+        f"チェックサム{checksum} [{result}]"
+    )
     return result == "OK" or result == "WARNING"
 
 
@@ -146,17 +164,18 @@ def main():
     # 1. 件数検証
     print(f"{BLUE}[1] データ件数検証{NC}")
 
+    # (モデル, JSONファイル, 表示名, チェックサムに含める代表列 ※None は id のみ)
     validations = [
-        (Knowledge, "knowledge.json", "ナレッジ"),
-        (SOP, "sop.json", "SOP"),
-        (Incident, "incidents.json", "インシデント"),
-        (Project, "projects.json", "プロジェクト"),
-        (Expert, "experts.json", "専門家"),
+        (Knowledge, "knowledge.json", "ナレッジ", "title"),
+        (SOP, "sop.json", "SOP", "title"),
+        (Incident, "incidents.json", "インシデント", "title"),
+        (Project, "projects.json", "プロジェクト", "name"),
+        (Expert, "experts.json", "専門家", None),
     ]
 
-    for model, json_file, name in validations:
+    for model, json_file, name, key_field in validations:
         try:
-            if not validate_table(model, json_file, name):
+            if not validate_table(model, json_file, name, key_field):
                 all_passed = False
         except Exception as e:
             print(f"  {RED}✗{NC} {name}: エラー - {e}")
@@ -167,7 +186,7 @@ def main():
     # 2. サンプルデータ確認
     print(f"{BLUE}[2] サンプルデータ確認{NC}")
 
-    for model, _, name in validations:
+    for model, _, name, _ in validations:
         try:
             validate_sample_data(model, name)
         except Exception as e:
@@ -1,13 +1,27 @@
 """
 Microsoft 365連携サービスモジュール
+
+MS365 系サービスは app_v2（メトリクス定義）を読み込むため、属性アクセス時に遅延 import する。
+移行スクリプトなど Flask アプリを起動しない利用側が services.* のサブモジュールだけを
+読み込めるようにするため。
 """
 
-from .metadata_extractor import MetadataExtractor
-from .ms365_scheduler_service import MS365SchedulerService
-from .ms365_sync_service import MS365SyncService
+import importlib
+
+_LAZY_EXPORTS = {
+    "MS365SyncService": ".ms365_sync_service",
+    "MS365SchedulerService": ".ms365_scheduler_service",
+    "MetadataExtractor": ".metadata_extractor",
+}
 
 __all__ = [
     "MS365SyncService",
     "MS365SchedulerService",
     "MetadataExtractor",
 ]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        return getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
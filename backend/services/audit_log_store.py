@@ -0,0 +1,521 @@
+"""監査ログストア（追記専用セグメント方式）
+
+access_logs.json 全体を読み込んで書き戻す方式では、1リクエストあたりの
+書き込みコストがログ総量に比例していた。本モジュールは JSON Lines 形式の
+セグメントファイルへ追記するだけのストアを提供する。
+
+ディレクトリ構成（データディレクトリ配下）:
+  access_logs.json          - 旧形式（読み取り専用のベースとして扱う）
+  access_logs.d/
+    segment-00000001.jsonl  - 追記セグメント（サイズ/経過時間でロールオーバー）
+    state.json              - 採番カウンタと現在のセグメント（サイドカー）
+    .lock                   - プロセス間排他用ロックファイル
+
+書き込みは O(1)（1行追記 + サイドカー更新）で、fsync は件数/間隔でまとめて
+実行する。読み取りは iter_records() によるストリーミングで行う。
+"""
+
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from services.json_stream import iter_json_array
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+LEGACY_FILENAME = "access_logs.json"
+SEGMENT_DIRNAME = "access_logs.d"
+STATE_FILENAME = "state.json"
+LOCK_FILENAME = ".lock"
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".jsonl"
+
+DEFAULT_MAX_SEGMENT_BYTES = int(
+    os.environ.get("MKS_AUDIT_SEGMENT_MAX_BYTES", 64 * 1024 * 1024)
+)
+DEFAULT_MAX_SEGMENT_AGE = int(os.environ.get("MKS_AUDIT_SEGMENT_MAX_AGE", 86400))
+DEFAULT_FSYNC_EVERY = int(os.environ.get("MKS_AUDIT_FSYNC_EVERY", 100))
+DEFAULT_FSYNC_INTERVAL = float(os.environ.get("MKS_AUDIT_FSYNC_INTERVAL", 1.0))
+
+# プロセス内で保持するストア数の上限（テスト等でデータディレクトリが
+# 頻繁に切り替わってもファイルディスクリプタを溜め込まないため）
+_MAX_OPEN_STORES = 16
+
+# 採番カウンタ補正時に読むセグメント末尾のバイト数
+_TAIL_READ_BYTES = 64 * 1024
+
+
+class AuditLogStore:
+    """追記専用の監査ログストア"""
+
+    def __init__(
+        self,
+        base_dir: str,
+        max_segment_bytes: int = DEFAULT_MAX_SEGMENT_BYTES,
+        max_segment_age: int = DEFAULT_MAX_SEGMENT_AGE,
+        fsync_every: int = DEFAULT_FSYNC_EVERY,
+        fsync_interval: float = DEFAULT_FSYNC_INTERVAL,
+    ):
+        """
+        初期化
+
+        Args:
+            base_dir: データディレクトリ
+            max_segment_bytes: セグメントのロールオーバーサイズ（バイト）
+            max_segment_age: セグメントのロールオーバー間隔（秒）
+            fsync_every: fsync をまとめる件数
+            fsync_interval: fsync をまとめる最大間隔（秒）
+        """
+        self.base_dir = base_dir
+        self.legacy_path = os.path.join(base_dir, LEGACY_FILENAME)
+        self.segment_dir = os.path.join(base_dir, SEGMENT_DIRNAME)
+        self.state_path = os.path.join(self.segment_dir, STATE_FILENAME)
+        self.lock_path = os.path.join(self.segment_dir, LOCK_FILENAME)
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = max_segment_age
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_interval = fsync_interval
+
+        self._lock = threading.Lock()
+        self._fd: Optional[int] = None
+        self._segment: Optional[str] = None
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+
+    # ------------------------------------------------------------
+    # 書き込み
+    # ------------------------------------------------------------
+
+    def append(self, entry: Dict) -> Dict:
+        """
+        1件追記する
+
+        Args:
+            entry: ログエントリ（id は採番して上書きする）
+
+        Returns:
+            id 付きのログエントリ
+        """
+        return self.append_many([entry])[0]
+
+    def append_many(self, entries: List[Dict]) -> List[Dict]:
+        """
+        複数件をまとめて追記する（1回の write で書き込む）
+
+        Args:
+            entries: ログエントリのリスト
+
+        Returns:
+            id 付きのログエントリのリスト
+        """
+        if not entries:
+            return []
+
+        with self._lock, self._process_lock():
+            state = self._read_state()
+            self._ensure_segment(state)
+
+            next_id = state["next_id"]
+            lines = []
+            for entry in entries:
+                entry["id"] = next_id
+                next_id += 1
+                lines.append(
+                    json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+                )
+            payload = ("\n".join(lines) + "\n").encode("utf-8")
+            if self._has_torn_tail():
+                # 書き込み途中でクラッシュした行を閉じ、次の行と連結させない
+                payload = b"\n" + payload
+
+            # 採番を先に確定させる（データ書き込み後にクラッシュしても ID は重複せず欠番になる）
+            state["next_id"] = next_id
+            self._write_state(state)
+            os.write(self._fd, payload)
+
+            self._unsynced += len(entries)
+            if (
+                self._unsynced >= self.fsync_every
+                or time.monotonic() - self._last_fsync >= self.fsync_interval
+            ):
+                self._fsync()
+
+        return entries
+
+    def flush(self):
+        """未同期の追記を fsync する"""
+        with self._lock:
+            if self._fd is not None and self._unsynced:
+                self._fsync()
+
+    def close(self):
+        """セグメントを閉じる（未同期分は fsync する）"""
+        with self._lock:
+            self._close_segment()
+
+    # ------------------------------------------------------------
+    # 読み取り
+    # ------------------------------------------------------------
+
+    def iter_records(self) -> Iterator[Dict]:
+        """
+        全レコードを古い順にストリーミングで返す
+
+        旧形式の access_logs.json（存在する場合）→ セグメント（番号順）の順に読む。
+        書き込み途中の不完全な行はスキップする。
+        """
+        yield from self._iter_legacy()
+        for path in self._segment_paths():
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            logger.debug("Skipping torn audit log line in %s", path)
+                            continue
+                        if isinstance(record, dict):
+                            yield record
+            except FileNotFoundError:
+                continue
+
+    def new_cursor(self) -> Dict:
+        """iter_since() 用の読み取りカーソル（先頭から）"""
+        return {"legacy": None, "segment": None, "offset": 0, "started": False}
+
+    def cursor_valid(self, cursor: Dict) -> bool:
+        """
+        カーソル位置から続きを読めるか
+
+        旧形式ファイルが書き換えられた、または読み取り中のセグメントが
+        削除・切り詰められた場合は False（先頭から読み直す必要がある）。
+        """
+        if not cursor.get("started"):
+            return True
+        if self._legacy_version() != cursor.get("legacy"):
+            return False
+        segment = cursor.get("segment")
+        if segment is None:
+            return True
+        try:
+            size = os.path.getsize(os.path.join(self.segment_dir, segment))
+        except OSError:
+            return False
+        return size >= cursor.get("offset", 0)
+
+    def iter_since(self, cursor: Dict) -> Iterator[Dict]:
+        """
+        カーソル以降に追記されたレコードを古い順に返す（差分読み取り）
+
+        cursor は読み進めた位置に更新される。書き込み途中の行（改行で終わらない行）は
+        読まずに次回に回す。
+
+        Args:
+            cursor: new_cursor() で作成したカーソル
+        """
+        if not cursor.get("started"):
+            cursor["legacy"] = self._legacy_version()
+            yield from self._iter_legacy()
+            cursor["started"] = True
+
+        for path in self._segment_paths():
+            segment = os.path.basename(path)
+            if cursor.get("segment") is not None and segment < cursor["segment"]:
+                continue
+            offset = cursor["offset"] if segment == cursor.get("segment") else 0
+            try:
+                with open(path, "rb") as f:
+                    f.seek(offset)
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            break
+                        offset += len(line)
+                        cursor["segment"], cursor["offset"] = segment, offset
+                        if not line.strip():
+                            continue
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            logger.debug("Skipping torn audit log line in %s", path)
+                            continue
+                        if isinstance(record, dict):
+                            yield record
+            except FileNotFoundError:
+                continue
+            cursor["segment"], cursor["offset"] = segment, offset
+
+    def read_all(self) -> List[Dict]:
+        """全レコードをリストで返す（load_data 互換）"""
+        return list(self.iter_records())
+
+    def count(self) -> int:
+        """レコード件数"""
+        return sum(1 for _ in self.iter_records())
+
+    # ------------------------------------------------------------
+    # 内部処理
+    # ------------------------------------------------------------
+
+    def _iter_legacy(self) -> Iterator[Dict]:
+        if not os.path.exists(self.legacy_path):
+            return
+        # 数百万件規模になり得るため、全体を json.load せず要素単位でストリーミングする
+        try:
+            for item in iter_json_array(self.legacy_path):
+                if isinstance(item, dict):
+                    yield item
+        except (ValueError, OSError) as e:
+            logger.error("Failed to read legacy audit log %s: %s", self.legacy_path, e)
+
+    def _legacy_version(self) -> Optional[List]:
+        try:
+            st = os.stat(self.legacy_path)
+        except OSError:
+            return None
+        return [st.st_mtime_ns, st.st_size]
+
+    def _segment_paths(self) -> List[str]:
+        if not os.path.isdir(self.segment_dir):
+            return []
+        names = sorted(
+            name
+            for name in os.listdir(self.segment_dir)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        )
+        return [os.path.join(self.segment_dir, name) for name in names]
+
+    def _process_lock(self):
+        """プロセス間排他（fcntl が無い環境ではスレッドロックのみ）"""
+        os.makedirs(self.segment_dir, exist_ok=True)
+        return _FileLock(self.lock_path)
+
+    def _read_state(self) -> Dict:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if isinstance(state, dict) and "next_id" in state:
+                return state
+        except FileNotFoundError:
+            pass
+        except ValueError as e:
+            logger.warning("Audit log state file is corrupt, rebuilding: %s", e)
+        return self._bootstrap_state()
+
+    def _bootstrap_state(self) -> Dict:
+        """サイドカーが無い場合に既存データから採番カウンタを復元する（初回のみ O(N)）"""
+        max_id = 0
+        for record in self.iter_records():
+            record_id = record.get("id")
+            if isinstance(record_id, int) and record_id > max_id:
+                max_id = record_id
+        paths = self._segment_paths()
+        seq = 0
+        if paths:
+            name = os.path.basename(paths[-1])
+            seq = int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+        return {
+            "next_id": max_id + 1,
+            "segment_seq": seq,
+            "segment": os.path.basename(paths[-1]) if paths else None,
+            "segment_opened_at": time.time(),
+        }
+
+    def _write_state(self, state: Dict):
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=".state.", suffix=".tmp", dir=self.segment_dir
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _ensure_segment(self, state: Dict):
+        """現在のセグメントを開く（必要に応じてロールオーバー）"""
+        segment = state.get("segment")
+        if segment and segment != self._segment:
+            # 他プロセスがロールオーバーした
+            self._close_segment()
+
+        if segment and self._fd is None:
+            self._open_segment(segment)
+            self._recover_next_id(state)
+
+        needs_rollover = segment is None
+        if not needs_rollover:
+            size = os.fstat(self._fd).st_size
+            age = time.time() - state.get("segment_opened_at", 0)
+            needs_rollover = (
+                size >= self.max_segment_bytes or age >= self.max_segment_age
+            ) and size > 0
+
+        if needs_rollover:
+            self._close_segment()
+            seq = state.get("segment_seq", 0) + 1
+            segment = f"{SEGMENT_PREFIX}{seq:08d}{SEGMENT_SUFFIX}"
+            state["segment_seq"] = seq
+            state["segment"] = segment
+            state["segment_opened_at"] = time.time()
+            self._open_segment(segment)
+
+    def _open_segment(self, segment: str):
+        path = os.path.join(self.segment_dir, segment)
+        self._fd = os.open(path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o640)
+        self._segment = segment
+
+    def _has_torn_tail(self) -> bool:
+        """現在のセグメントが改行で終わっていないか（書き込み途中のクラッシュ）"""
+        size = os.fstat(self._fd).st_size
+        return size > 0 and os.pread(self._fd, 1, size - 1) != b"\n"
+
+    def _recover_next_id(self, state: Dict):
+        """
+        セグメント末尾の ID から採番カウンタを補正する
+
+        サイドカーは fsync していないため、電源断などでデータより古い内容に
+        戻っている可能性がある。セグメントを開くときに末尾の行を確認し、
+        既存の ID と重複しないようにする。
+        """
+        size = os.fstat(self._fd).st_size
+        if size == 0:
+            return
+        start = max(0, size - _TAIL_READ_BYTES)
+        tail = os.pread(self._fd, size - start, start)
+        lines = tail.split(b"\n")
+        if start > 0:
+            lines = lines[1:]  # 先頭は行の途中
+        max_id = 0
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            record_id = record.get("id") if isinstance(record, dict) else None
+            if isinstance(record_id, int) and record_id > max_id:
+                max_id = record_id
+        if max_id >= state["next_id"]:
+            logger.warning(
+                "Audit log state is behind segment tail, advancing next_id to %d",
+                max_id + 1,
+            )
+            state["next_id"] = max_id + 1
+
+    def _close_segment(self):
+        if self._fd is None:
+            return
+        try:
+            if self._unsynced:
+                self._fsync()
+            os.close(self._fd)
+        except OSError as e:
+            logger.warning("Failed to close audit log segment: %s", e)
+        self._fd = None
+        self._segment = None
+
+    def _fsync(self):
+        try:
+            os.fsync(self._fd)
+        except OSError as e:
+            logger.warning("Audit log fsync failed: %s", e)
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+
+
+class _FileLock:
+    """fcntl.flock によるプロセス間ロック"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd = None
+
+    def __enter__(self):
+        if fcntl is None:
+            return self
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o640)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._fd is not None:
+            try:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            finally:
+                os.close(self._fd)
+                self._fd = None
+        return False
+
+
+# ================================================================
+# データディレクトリごとのストア管理
+# ================================================================
+
+_stores: "OrderedDict[str, AuditLogStore]" = OrderedDict()
+_stores_lock = threading.Lock()
+
+
+def get_audit_log_store(base_dir: str) -> AuditLogStore:
+    """
+    データディレクトリに対応するストアを取得（プロセス内で共有）
+
+    Args:
+        base_dir: データディレクトリ
+
+    Returns:
+        AuditLogStore
+    """
+    key = os.path.realpath(base_dir)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is not None:
+            _stores.move_to_end(key)
+            return store
+        store = AuditLogStore(key)
+        _stores[key] = store
+        while len(_stores) > _MAX_OPEN_STORES:
+            _, evicted = _stores.popitem(last=False)
+            evicted.close()
+        return store
+
+
+def iter_filtered(records: Iterable[Dict], **equals) -> Iterator[Dict]:
+    """
+    完全一致フィルタをストリーミングで適用する
+
+    Args:
+        records: レコードのイテラブル
+        **equals: フィールド名=期待値（None の条件は無視）
+    """
+    conditions = [(k, v) for k, v in equals.items() if v is not None]
+    for record in records:
+        if all(record.get(k) == v for k, v in conditions):
+            yield record
+
+
+def flush_all_stores():
+    """プロセス内の全ストアの未同期分を fsync する"""
+    with _stores_lock:
+        stores = list(_stores.values())
+    for store in stores:
+        store.flush()
+
+
+@atexit.register
+def _close_all_stores():
+    with _stores_lock:
+        for store in _stores.values():
+            store.close()
@@ -0,0 +1,88 @@
+"""監査ログのバックグラウンド書き込み
+
+リクエスト処理中は app_helpers._access_log_queue にエントリを積むだけにし、
+実際のディスク書き込みはこのモジュールのワーカーが件数/間隔でまとめて行う。
+
+gunicorn の gevent ワーカーでは threading がモンキーパッチされるため、
+ワーカースレッドはそのまま greenlet として動作する。
+"""
+
+import logging
+import os
+import threading
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class AuditLogWriter:
+    """フラッシュ関数を定期実行するバックグラウンドワーカー"""
+
+    def __init__(
+        self,
+        flush_func: Callable[[], None],
+        flush_interval: float = 1.0,
+        name: str = "audit-log-writer",
+    ):
+        """
+        初期化
+
+        Args:
+            flush_func: キューを書き出す関数（キューが空なら何もしないこと）
+            flush_interval: 定期フラッシュ間隔（秒）
+            name: スレッド名
+        """
+        self.flush_func = flush_func
+        self.flush_interval = flush_interval
+        self.name = name
+        self.pid = None
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """ワーカーを起動"""
+        if self.is_alive():
+            return
+        self.pid = os.getpid()
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def is_alive(self) -> bool:
+        """現在のプロセスでワーカーが稼働中か（fork 後の子プロセスでは False）"""
+        return (
+            self._thread is not None
+            and self._thread.is_alive()
+            and self.pid == os.getpid()
+        )
+
+    def notify(self):
+        """バッチサイズ到達時などに即時フラッシュを要求"""
+        self._wakeup.set()
+
+    def stop(self, timeout: float = 5.0):
+        """
+        ワーカーを停止し、残りのエントリを書き出す
+
+        Args:
+            timeout: ワーカー終了の待機時間（秒）
+        """
+        self._stopping.set()
+        self._wakeup.set()
+        if self.is_alive():
+            self._thread.join(timeout)
+        self._thread = None
+        self._safe_flush()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._safe_flush()
+
+    def _safe_flush(self):
+        try:
+            self.flush_func()
+        except Exception as e:
+            logger.warning("Audit log flush failed: %s: %s", type(e).__name__, e)
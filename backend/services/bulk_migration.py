@@ -0,0 +1,350 @@
+"""JSON→PostgreSQL 一括移行エンジン
+
+行単位の INSERT では数百万件規模のテーブル（監査ログなど）の移行に数時間かかる。
+本モジュールは次の方式でテーブル単位の一括移行を行う。
+
+- 移行元はイテレータで受け取り、chunk_size 件ずつ変換・ロードする（全件をメモリに載せない）
+- ロードは COPY FROM STDIN（psycopg2）。upsert が必要なテーブルは一時テーブルへ COPY してから
+  INSERT ... SELECT ... ON CONFLICT で反映する。COPY できないドライバでは executemany にフォールバック
+- チャンクごとにコミットし、処理済みの移行元件数をチェックポイントファイルに記録する
+  （中断後の再実行はチェックポイントの続きから再開し、完了済みテーブルはスキップ）
+- 互いに依存しないテーブルはスレッドプールで並列に移行する
+- 進捗を rows/s 付きで出力する
+
+移行検証用に、id と代表列から順序に依存しないチェックサムを JSON 側・DB 側で
+同じ定義で集計する関数も提供する。
+"""
+
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from services.json_stream import chunked
+
+DEFAULT_CHUNK_SIZE = int(os.environ.get("MKS_MIGRATION_CHUNK_SIZE", 5000))
+DEFAULT_WORKERS = int(os.environ.get("MKS_MIGRATION_WORKERS", 4))
+
+# 進捗を出力する最小間隔（秒）
+PROGRESS_INTERVAL = 2.0
+
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+@dataclass
+class TableSpec:
+    """移行対象テーブルの定義"""
+
+    name: str  # チェックポイント・進捗表示のキー
+    table: str  # スキーマ修飾したテーブル名（例: public.knowledge）
+    columns: Sequence[str]
+    source: Callable[[], Iterable[Dict]]  # 移行元レコードのイテレータを返す
+    transform: Callable[[Dict], Optional[Tuple]]  # columns 順のタプル（None はスキップ）
+    conflict_key: Optional[str] = "id"  # None の場合は単純 INSERT（COPY 直接）
+    update_columns: Sequence[str] = ()  # 競合時に更新する列（空なら DO NOTHING）
+    sequence: Optional[str] = None  # 移行後に MAX(id) へ合わせるシーケンス
+
+
+class MigrationCheckpoint:
+    """
+    テーブル単位の移行チェックポイント
+
+    {"knowledge": {"rows": 15000, "done": false}, ...} の形式で JSON ファイルに保存する。
+    rows はコミット済みの移行元レコード件数（変換でスキップした件も含む）。
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self._lock = threading.Lock()
+        self._state: Dict[str, Dict] = {}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self._state = json.load(f)
+
+    def get(self, name: str) -> Dict:
+        with self._lock:
+            return dict(self._state.get(name, {"rows": 0, "done": False}))
+
+    def advance(self, name: str, rows: int):
+        self._update(name, rows=rows, done=False)
+
+    def complete(self, name: str, rows: int):
+        self._update(name, rows=rows, done=True)
+
+    def reset(self):
+        with self._lock:
+            self._state = {}
+            self._save()
+
+    def _update(self, name: str, **values):
+        with self._lock:
+            self._state[name] = values
+            self._save()
+
+    def _save(self):
+        if not self.path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self._state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class ProgressReporter:
+    """移行件数と rows/s を一定間隔で出力する"""
+
+    def __init__(self, name: str, out: Callable[[str], None] = print, interval: float = PROGRESS_INTERVAL):
+        self.name = name
+        self.out = out
+        self.interval = interval
+        self.rows = 0
+        self.started = time.monotonic()
+        self._last_report = self.started
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    def update(self, rows: int):
+        self.rows += rows
+        now = time.monotonic()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self.out(f"  [{self.name}] {self.rows:,} rows ({self.rate:,.0f} rows/s)")
+
+    def finish(self, resumed_from: int = 0):
+        elapsed = time.monotonic() - self.started
+        resumed = f", resumed after {resumed_from:,}" if resumed_from else ""
+        self.out(
+            f"[OK] {self.name}: {self.rows:,} rows in {elapsed:.1f}s ({self.rate:,.0f} rows/s{resumed})"
+        )
+
+
+class BulkMigrator:
+    """TableSpec をチャンク単位でロードする移行エンジン"""
+
+    def __init__(
+        self,
+        engine,
+        checkpoint: Optional[MigrationCheckpoint] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        workers: int = DEFAULT_WORKERS,
+        dry_run: bool = False,
+        out: Callable[[str], None] = print,
+    ):
+        """
+        Args:
+            engine: SQLAlchemy Engine（raw_connection() で DBAPI 接続を取得する）
+            checkpoint: 再開用チェックポイント（None の場合は記録しない）
+            chunk_size: 1回のロード（1トランザクション）あたりの件数
+            workers: 並列に移行するテーブル数
+            dry_run: True の場合は変換のみ行い DB へ書き込まない
+            out: 進捗の出力先
+        """
+        self.engine = engine
+        self.checkpoint = checkpoint or MigrationCheckpoint(None)
+        self.chunk_size = max(1, chunk_size)
+        self.workers = max(1, workers)
+        self.dry_run = dry_run
+        self.out = out
+
+    def run(self, specs: Sequence[TableSpec]) -> Dict[str, int]:
+        """
+        互いに依存しないテーブル群を並列に移行する
+
+        すべてのテーブルの完了を待ってから、失敗があれば最初の例外を送出する
+        （成功したテーブルのチェックポイントは完了として残る）。
+
+        Returns:
+            テーブル名 → 今回移行した件数
+        """
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="migrate") as pool:
+            futures = {spec.name: pool.submit(self.run_table, spec) for spec in specs}
+        errors = [f.exception() for f in futures.values() if f.exception() is not None]
+        if errors:
+            raise errors[0]
+        return {name: f.result() for name, f in futures.items()}
+
+    def run_table(self, spec: TableSpec) -> int:
+        """1テーブルを移行し、今回処理した移行元件数を返す"""
+        state = self.checkpoint.get(spec.name)
+        if state["done"]:
+            self.out(f"[SKIP] {spec.name}: already migrated ({state['rows']:,} rows)")
+            return 0
+
+        resumed_from = state["rows"]
+        progress = ProgressReporter(spec.name, self.out)
+        records = islice(iter(spec.source()), resumed_from, None)
+
+        conn = None if self.dry_run else self.engine.raw_connection()
+        try:
+            for chunk in chunked(records, self.chunk_size):
+                rows = [row for row in map(spec.transform, chunk) if row is not None]
+                if conn is not None and rows:
+                    try:
+                        load_rows(conn, spec, rows)
+                        conn.commit()
+                    except Exception:
+                        conn.rollback()
+                        raise
+                progress.update(len(chunk))
+                if not self.dry_run:
+                    self.checkpoint.advance(spec.name, resumed_from + progress.rows)
+
+            if conn is not None:
+                if spec.sequence:
+                    reset_sequence(conn, spec)
+                    conn.commit()
+                self.checkpoint.complete(spec.name, resumed_from + progress.rows)
+        finally:
+            if conn is not None:
+                conn.close()
+
+        progress.finish(resumed_from)
+        return progress.rows
+
+
+def load_rows(conn, spec: TableSpec, rows: List[Tuple]):
+    """
+    変換済みの行を DBAPI 接続へロードする（コミットは呼び出し側）
+
+    psycopg2 のカーソル（copy_expert あり）は COPY、それ以外は executemany を使う。
+    """
+    cursor = conn.cursor()
+    try:
+        columns = ", ".join(spec.columns)
+        if not hasattr(cursor, "copy_expert"):
+            placeholders = ", ".join(["%s"] * len(spec.columns))
+            cursor.executemany(
+                f"INSERT INTO {spec.table} ({columns}) VALUES ({placeholders}){_conflict_clause(spec)}",
+                [tuple(_adapt_param(v) for v in row) for row in rows],
+            )
+            return
+
+        buffer = io.StringIO("".join(copy_line(row) for row in rows))
+        if spec.conflict_key is None:
+            cursor.copy_expert(f"COPY {spec.table} ({columns}) FROM STDIN", buffer)
+            return
+
+        stage = f"_migrate_{spec.name}"
+        cursor.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {stage} (LIKE {spec.table} INCLUDING DEFAULTS) "
+            "ON COMMIT DELETE ROWS"
+        )
+        cursor.copy_expert(f"COPY {stage} ({columns}) FROM STDIN", buffer)
+        cursor.execute(
+            f"INSERT INTO {spec.table} ({columns}) SELECT {columns} FROM {stage}{_conflict_clause(spec)}"
+        )
+    finally:
+        cursor.close()
+
+
+def reset_sequence(conn, spec: TableSpec):
+    """シーケンスを移行後の MAX(id) に合わせる"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            f"SELECT setval('{spec.sequence}', (SELECT COALESCE(MAX(id), 0) FROM {spec.table}))"
+        )
+    finally:
+        cursor.close()
+
+
+def copy_line(row: Sequence[Any]) -> str:
+    """1行を COPY のテキスト形式（タブ区切り・\\N が NULL）にエンコードする"""
+    return "\t".join(_copy_value(value) for value in row) + "\n"
+
+
+def _copy_value(value: Any) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return _array_literal(value).translate(_COPY_ESCAPES)
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False).translate(_COPY_ESCAPES)
+    return str(value).translate(_COPY_ESCAPES)
+
+
+def _array_literal(values: Sequence[Any]) -> str:
+    """PostgreSQL の配列リテラル（{"a","b"}）"""
+    elements = []
+    for value in values:
+        if value is None:
+            elements.append("NULL")
+        else:
+            text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+            elements.append(f'"{text}"')
+    return "{" + ",".join(elements) + "}"
+
+
+def _adapt_param(value: Any) -> Any:
+    return json.dumps(value, ensure_ascii=False) if isinstance(value, dict) else value
+
+
+def _conflict_clause(spec: TableSpec) -> str:
+    if spec.conflict_key is None:
+        return ""
+    if not spec.update_columns:
+        return f" ON CONFLICT ({spec.conflict_key}) DO NOTHING"
+    updates = ", ".join(f"{col} = EXCLUDED.{col}" for col in spec.update_columns)
+    return f" ON CONFLICT ({spec.conflict_key}) DO UPDATE SET {updates}"
+
+
+# ------------------------------------------------------------
+# 移行検証（件数・チェックサム集計）
+# ------------------------------------------------------------
+
+
+def row_checksum(row_id: Any, key: Any) -> int:
+    """id と代表列から行のチェックサム（md5 先頭32ビット）を計算する"""
+    digest = hashlib.md5(f"{row_id}|{'' if key is None else key}".encode("utf-8")).hexdigest()
+    return int(digest[:8], 16)
+
+
+def json_aggregates(records: Iterable[Dict], key_field: Optional[str]) -> Dict[str, Any]:
+    """
+    移行元レコードの件数・id 範囲・チェックサム合計をストリーミングで集計する
+
+    チェックサムは行ごとの row_checksum の合計なので、行の順序に依存しない。
+    key_field が None の場合は id だけでチェックサムを計算する。
+    """
+    count, checksum, min_id, max_id = 0, 0, None, None
+    for record in records:
+        row_id = record.get("id")
+        if row_id is None:
+            continue
+        count += 1
+        checksum += row_checksum(row_id, record.get(key_field) if key_field else None)
+        min_id = row_id if min_id is None else min(min_id, row_id)
+        max_id = row_id if max_id is None else max(max_id, row_id)
+    return {"count": count, "checksum": checksum, "min_id": min_id, "max_id": max_id}
+
+
+def aggregates_sql(table: str, key_column: Optional[str]) -> str:
+    """
+    json_aggregates と同じ定義の集計を行う SQL
+
+    移行後に作成された行を含めないよう :min_id〜:max_id の範囲で集計する。
+    """
+    key = f"COALESCE({key_column}::text, '')" if key_column else "''"
+    return (
+        "SELECT COUNT(*) AS count, "
+        f"COALESCE(SUM(('x' || SUBSTR(MD5(id::text || '|' || {key}), 1, 8))"
+        "::bit(32)::bigint), 0) AS checksum "
+        f"FROM {table} WHERE id BETWEEN :min_id AND :max_id"
+    )
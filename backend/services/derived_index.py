@@ -0,0 +1,75 @@
+"""バージョン付き派生データ構造のレジストリ
+
+検索インデックスやタグ集計など、コーパスから構築する派生データ構造を
+コーパスのバージョンとともに保持する。バージョンが変わった場合のみ再構築し、
+変更イベントを受けた場合は apply() で差分を適用してバージョンを進める。
+"""
+
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class DerivedIndexRegistry:
+    """コーパスのバージョンごとに派生データ構造を保持するレジストリ"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Any, Tuple[Any, Any]] = {}
+
+    def get(
+        self,
+        key: Any,
+        version: Any,
+        loader: Callable[[], List[Dict[str, Any]]],
+        builder: Callable[[List[Dict[str, Any]]], Any],
+    ) -> Any:
+        """
+        派生データ構造を取得（バージョンが変わった場合のみ再構築）
+
+        Args:
+            key: 派生データ構造の識別子
+            version: コーパスのバージョン（None の場合は毎回再構築）
+            loader: アイテム一覧を返す関数
+            builder: アイテム一覧から派生データ構造を構築する関数
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and version is not None and entry[0] == version:
+                return entry[1]
+            index = builder(loader() or [])
+            self._entries[key] = (version, index)
+            return index
+
+    def apply(
+        self,
+        key: Any,
+        mutate: Callable[[Any], None],
+        next_version: Callable[[Any], Optional[Any]],
+    ) -> bool:
+        """
+        差分を適用してバージョンを進める
+
+        Args:
+            key: 派生データ構造の識別子
+            mutate: 派生データ構造に差分を適用する関数
+            next_version: 現在のバージョンから適用後のバージョンを返す関数。
+                None を返した場合（差分を適用できない場合）はエントリを破棄する
+
+        Returns:
+            bool: 差分を適用した場合 True
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            version = next_version(entry[0])
+            if version is None:
+                del self._entries[key]
+                return False
+            mutate(entry[1])
+            self._entries[key] = (version, entry[1])
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
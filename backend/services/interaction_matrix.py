@@ -0,0 +1,324 @@
+"""ユーザー×アイテムの閲覧行列（協調フィルタリング用）
+
+監査ログの閲覧イベント（knowledge.view / sop.view）を (ユーザー, アイテム, 日) 単位で
+集計した疎行列。監査ログストアのカーソル読み取り（AuditLogStore.iter_since）から
+追記分だけを ingest() で取り込み、全ログの再走査を避ける。
+
+照会時は対象期間で絞り込み、閲覧数に時間減衰（半減期）を掛けて
+ユーザー行（CSR）とアイテム列（CSC）の配列を組み立てる（スナップショット）。
+類似ユーザー（Jaccard係数）は対象ユーザーの閲覧アイテム列のスライスを連結して
+bincount するだけで、全ユーザーとの集合演算を行わない。
+
+スナップショットは追記のたびではなく一定間隔（SNAPSHOT_TTL 秒）で作り直すため、
+直近の閲覧が推薦に反映されるまで最大でその間隔だけ遅れる。
+
+閲覧セルはキー昇順の NumPy 配列（int64 キー + int32 件数）で保持する。追記分は
+一時バッファに溜め、一定件数ごとまたはスナップショット作成時にまとめてマージする。
+照会できる期間の上限（MAX_WINDOW_DAYS）より古いセルはマージ時に破棄するため、
+長時間稼働してもセル数は直近の閲覧量で頭打ちになる。
+"""
+
+import os
+import threading
+import time
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+VIEW_ACTIONS = {"knowledge.view": "knowledge", "sop.view": "sop"}
+
+DEFAULT_HALF_LIFE_DAYS = float(os.environ.get("MKS_RECOMMENDATION_HALF_LIFE_DAYS", 14))
+SNAPSHOT_TTL = float(os.environ.get("MKS_INTERACTION_SNAPSHOT_TTL", 60))
+# 保持する閲覧セルの期間（/recommendations/personalized の days 上限と同じ）
+MAX_WINDOW_DAYS = 365
+# 追記バッファをセル配列にマージする件数
+_MERGE_THRESHOLD = 65536
+
+# 閲覧セルのキー: ユーザー番号(23bit)・アイテム番号(24bit)・日(16bit)を int64 に詰める
+_DAY_BITS = 16
+_ITEM_BITS = 24
+_DAY_EPOCH = date(2000, 1, 1).toordinal()
+
+
+def day_number(day: date) -> int:
+    """日付の通し番号（2000-01-01 を 0 とする日数）"""
+    return day.toordinal() - _DAY_EPOCH
+
+
+def _log_day(timestamp: Any) -> Optional[int]:
+    """ISO形式タイムスタンプの日付部分の通し番号。不正・範囲外の値は None"""
+    if not isinstance(timestamp, str) or len(timestamp) < 10:
+        return None
+    try:
+        day = day_number(date.fromisoformat(timestamp[:10]))
+    except ValueError:
+        return None
+    return day if 0 <= day < (1 << _DAY_BITS) else None
+
+
+class _Snapshot:
+    """対象期間・減衰適用済みの疎行列（ユーザー行 CSR とアイテム列 CSC）"""
+
+    def __init__(self, users, items, weights, n_users: int, n_items: int):
+        order = np.lexsort((items, users))
+        self.user_items = items[order]
+        self.user_weights = weights[order]
+        self.user_indptr = np.zeros(n_users + 1, dtype=np.int64)
+        np.cumsum(np.bincount(users, minlength=n_users), out=self.user_indptr[1:])
+
+        order = np.lexsort((users, items))
+        self.item_users = users[order]
+        self.item_indptr = np.zeros(n_items + 1, dtype=np.int64)
+        np.cumsum(np.bincount(items, minlength=n_items), out=self.item_indptr[1:])
+
+        self.user_degree = np.diff(self.user_indptr)
+        self.item_totals = np.bincount(items, weights=weights, minlength=n_items)
+
+    def row(self, user: int) -> Tuple["np.ndarray", "np.ndarray"]:
+        start, end = self.user_indptr[user], self.user_indptr[user + 1]
+        return self.user_items[start:end], self.user_weights[start:end]
+
+    def users_of(self, items: "np.ndarray") -> "np.ndarray":
+        """アイテム列を閲覧したユーザー番号（重複あり）"""
+        if len(items) == 0:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate(
+            [self.item_users[self.item_indptr[i]:self.item_indptr[i + 1]] for i in items]
+        )
+
+
+class InteractionMatrix:
+    """閲覧イベントのユーザー×アイテム疎行列（追記で増分更新）"""
+
+    def __init__(
+        self,
+        half_life_days: float = DEFAULT_HALF_LIFE_DAYS,
+        max_window_days: int = MAX_WINDOW_DAYS,
+    ):
+        self.half_life_days = half_life_days
+        self.max_window_days = max_window_days
+        self._lock = threading.Lock()
+        self._user_index: Dict[Any, int] = {}
+        self._user_ids: List[Any] = []
+        self._item_index: Dict[Tuple[str, Any], int] = {}
+        self._item_keys: List[Tuple[str, Any]] = []
+        # 閲覧セル（キー昇順・重複なし）と未マージの追記分（1閲覧1キー）
+        self._keys = np.zeros(0, dtype=np.int64)
+        self._counts = np.zeros(0, dtype=np.int32)
+        self._pending: List[int] = []
+        self._latest_day = 0
+        self._version = 0
+        self._snapshots: Dict[Tuple, Tuple[float, int, _Snapshot]] = {}
+
+    @classmethod
+    def from_records(
+        cls, records: Iterable[Dict[str, Any]], half_life_days: float = DEFAULT_HALF_LIFE_DAYS
+    ) -> "InteractionMatrix":
+        matrix = cls(half_life_days)
+        matrix.ingest(records)
+        return matrix
+
+    def __len__(self) -> int:
+        """閲覧セル（ユーザー・アイテム・日）の数"""
+        with self._lock:
+            self._merge()
+            return len(self._keys)
+
+    def ingest(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        監査ログレコードを取り込む（閲覧イベント以外・保持期間外は無視）
+
+        Returns:
+            int: 取り込んだ閲覧イベント数
+        """
+        added = 0
+        with self._lock:
+            for record in records:
+                kind = VIEW_ACTIONS.get(record.get("action"))
+                resource_id = record.get("resource_id")
+                user_id = record.get("user_id")
+                if kind is None or not resource_id or user_id is None:
+                    continue
+                day = _log_day(record.get("timestamp") or record.get("created_at"))
+                if day is None or day < self._latest_day - self.max_window_days:
+                    continue
+                self._latest_day = max(self._latest_day, day)
+
+                user = self._user_index.get(user_id)
+                if user is None:
+                    user = self._user_index[user_id] = len(self._user_ids)
+                    self._user_ids.append(user_id)
+                item_key = (kind, resource_id)
+                item = self._item_index.get(item_key)
+                if item is None:
+                    item = self._item_index[item_key] = len(self._item_keys)
+                    self._item_keys.append(item_key)
+
+                self._pending.append((((user << _ITEM_BITS) | item) << _DAY_BITS) | day)
+                if len(self._pending) >= _MERGE_THRESHOLD:
+                    self._merge()
+                added += 1
+            if added:
+                self._version += 1
+        return added
+
+    def _merge(self):
+        """追記バッファをセル配列にマージし、保持期間外のセルを破棄する（ロック内で呼ぶ）"""
+        keys, counts = self._keys, self._counts
+        if self._pending:
+            new_keys, new_counts = np.unique(
+                np.array(self._pending, dtype=np.int64), return_counts=True
+            )
+            self._pending = []
+            positions = np.searchsorted(keys, new_keys)
+            found = positions < len(keys)
+            found[found] = keys[positions[found]] == new_keys[found]
+            counts = counts.copy()
+            counts[positions[found]] += new_counts[found].astype(np.int32)
+            keys = np.insert(keys, positions[~found], new_keys[~found])
+            counts = np.insert(counts, positions[~found], new_counts[~found].astype(np.int32))
+
+        cutoff = self._latest_day - self.max_window_days
+        if len(keys) and cutoff > 0:
+            recent = (keys & ((1 << _DAY_BITS) - 1)) >= cutoff
+            if not recent.all():
+                keys, counts = keys[recent], counts[recent]
+        self._keys, self._counts = keys, counts
+
+    # ------------------------------------------------------------------
+    # スナップショット
+    # ------------------------------------------------------------------
+
+    def _snapshot(self, days: Optional[int], today: int) -> _Snapshot:
+        cache_key = (days, today)
+        with self._lock:
+            cached = self._snapshots.get(cache_key)
+            now = time.monotonic()
+            if cached is not None and (
+                cached[1] == self._version or now - cached[0] < SNAPSHOT_TTL
+            ):
+                return cached[2]
+
+            self._merge()
+            keys, counts = self._keys, self._counts.astype(np.float64)
+            n_users, n_items, version = len(self._user_ids), len(self._item_keys), self._version
+
+        day = keys & ((1 << _DAY_BITS) - 1)
+        pair = keys >> _DAY_BITS
+        if days is not None:
+            recent = day >= today - days
+            day, pair, counts = day[recent], pair[recent], counts[recent]
+        # 時間減衰: 半減期ごとに重みが半分になる
+        weights = counts * np.exp2(-np.maximum(today - day, 0) / self.half_life_days)
+        pairs, inverse = np.unique(pair, return_inverse=True)
+        pair_weights = np.bincount(inverse, weights=weights, minlength=len(pairs))
+        users = pairs >> _ITEM_BITS
+        items = pairs & ((1 << _ITEM_BITS) - 1)
+        snapshot = _Snapshot(users, items, pair_weights, n_users, n_items)
+
+        with self._lock:
+            # 期間・日付が変わったキーは不要なので最新の数件だけ保持
+            if len(self._snapshots) >= 8:
+                self._snapshots.clear()
+            self._snapshots[cache_key] = (time.monotonic(), version, snapshot)
+        return snapshot
+
+    # ------------------------------------------------------------------
+    # 照会
+    # ------------------------------------------------------------------
+
+    def user_items(
+        self, user_id: Any, days: Optional[int] = None, today: Optional[int] = None
+    ) -> Dict[Tuple[str, Any], float]:
+        """ユーザーが期間内に閲覧したアイテム {(種別, ID): 減衰後の閲覧数}"""
+        user = self._user_index.get(user_id)
+        if user is None:
+            return {}
+        snapshot = self._snapshot(days, today or day_number(date.today()))
+        if user >= len(snapshot.user_indptr) - 1:
+            return {}
+        items, weights = snapshot.row(user)
+        return {self._item_keys[i]: float(w) for i, w in zip(items, weights)}
+
+    def similar_users(
+        self,
+        user_id: Any,
+        days: Optional[int] = None,
+        min_similarity: float = 0.1,
+        limit: Optional[int] = None,
+        today: Optional[int] = None,
+    ) -> List[Tuple[Any, float]]:
+        """
+        閲覧アイテム集合の Jaccard 係数が閾値を超えるユーザー（類似度降順）
+
+        対象ユーザーの閲覧アイテムを共有するユーザーだけを bincount で数える。
+        limit 指定時は部分ソートで上位のみ返す。
+        """
+        user = self._user_index.get(user_id)
+        if user is None:
+            return []
+        snapshot = self._snapshot(days, today or day_number(date.today()))
+        if user >= len(snapshot.user_indptr) - 1:
+            return []
+        items, _ = snapshot.row(user)
+        neighbors = snapshot.users_of(items)
+        if len(neighbors) == 0:
+            return []
+
+        intersection = np.bincount(neighbors, minlength=len(snapshot.user_degree))
+        candidates = np.flatnonzero(intersection)
+        candidates = candidates[candidates != user]
+        union = snapshot.user_degree[candidates] + len(items) - intersection[candidates]
+        similarity = intersection[candidates] / union
+        keep = similarity > min_similarity
+        candidates, similarity = candidates[keep], similarity[keep]
+        if limit is not None and len(candidates) > limit:
+            kth = np.partition(similarity, len(similarity) - limit)[len(similarity) - limit]
+            keep = similarity >= kth
+            candidates, similarity = candidates[keep], similarity[keep]
+        order = np.lexsort((candidates, -similarity))[:limit]
+        return [
+            (self._user_ids[user], score)
+            for user, score in zip(candidates[order].tolist(), similarity[order].tolist())
+        ]
+
+    def candidate_scores(
+        self,
+        neighbors: List[Tuple[Any, float]],
+        kind: Optional[str] = None,
+        days: Optional[int] = None,
+        today: Optional[int] = None,
+    ) -> Dict[Any, float]:
+        """
+        類似ユーザーの閲覧アイテムのスコア（類似度 × 減衰後の閲覧数の合計）
+
+        Args:
+            neighbors: similar_users() の結果
+            kind: アイテム種別（knowledge / sop）。None の場合は全種別
+        """
+        snapshot = self._snapshot(days, today or day_number(date.today()))
+        totals = np.zeros(len(snapshot.item_totals))
+        for neighbor_id, similarity in neighbors:
+            user = self._user_index.get(neighbor_id)
+            if user is None or user >= len(snapshot.user_indptr) - 1:
+                continue
+            items, weights = snapshot.row(user)
+            totals[items] += weights * similarity
+        return self._by_resource_id(totals, kind)
+
+    def popular_items(
+        self, kind: Optional[str] = None, limit: int = 5, today: Optional[int] = None
+    ) -> List[Tuple[Any, float]]:
+        """全期間の減衰後閲覧数が多いアイテム [(リソースID, スコア)]"""
+        snapshot = self._snapshot(None, today or day_number(date.today()))
+        scores = self._by_resource_id(snapshot.item_totals, kind)
+        return sorted(scores.items(), key=lambda x: x[1], reverse=True)[:limit]
+
+    def _by_resource_id(self, values: "np.ndarray", kind: Optional[str]) -> Dict[Any, float]:
+        result: Dict[Any, float] = {}
+        for i in np.flatnonzero(values > 0):
+            item_kind, resource_id = self._item_keys[i]
+            if kind is None or item_kind == kind:
+                result[resource_id] = result.get(resource_id, 0.0) + float(values[i])
+        return result
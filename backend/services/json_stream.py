@@ -0,0 +1,113 @@
+"""JSON 配列ファイルのストリーミング読み込み
+
+json.load() はファイル全体をメモリに展開するため、数百万件規模の
+access_logs.json などでは読み込みだけでプロセスのメモリを使い切る。
+本モジュールはトップレベルの JSON 配列を要素単位で逐次パースして返す。
+
+ijson がインストールされていればそれを使い、なければ標準ライブラリの
+JSONDecoder.raw_decode による逐次パースにフォールバックする。
+"""
+
+import json
+import os
+from typing import Any, Iterable, Iterator, List, TextIO
+
+try:
+    import ijson
+
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# フォールバック実装で1回に読み込む文字数
+READ_CHARS = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+
+
+def iter_json_array(filepath: str) -> Iterator[Any]:
+    """
+    JSON 配列ファイルの要素を先頭から1件ずつ返す
+
+    ファイルが存在しない場合は何も返さない。トップレベルが配列でない、
+    または途中で壊れている場合は ValueError を送出する（それまでに返した要素は有効）。
+
+    Args:
+        filepath: JSON ファイルのパス
+    """
+    if not os.path.exists(filepath):
+        return
+    if IJSON_AVAILABLE:
+        with open(filepath, "rb") as f:
+            try:
+                yield from ijson.items(f, "item", use_float=True)
+            except ijson.JSONError as e:
+                raise ValueError(f"Invalid JSON array in {filepath}: {e}") from e
+        return
+    with open(filepath, "r", encoding="utf-8") as f:
+        yield from _iter_array(f)
+
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """イテラブルを size 件ずつのリストに分割して返す"""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _iter_array(f: TextIO) -> Iterator[Any]:
+    """raw_decode による JSON 配列の逐次パース（ijson がない場合のフォールバック）"""
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def read_more():
+        nonlocal buf, pos, eof
+        data = f.read(READ_CHARS)
+        buf, pos, eof = buf[pos:] + data, 0, not data
+
+    def peek() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if eof:
+                return ""
+            read_more()
+
+    if peek() != "[":
+        raise ValueError("JSON array expected")
+    pos += 1
+    if peek() == "]":
+        return
+
+    while True:
+        peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                read_more()
+                continue
+            # バッファ末尾で終わった値（数値など）は続きがあり得るため読み足して再パースする
+            if end == len(buf) and not eof:
+                read_more()
+                continue
+            break
+        pos = end
+        yield value
+
+        separator = peek()
+        pos += 1
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError(f"Unexpected character in JSON array: {separator!r}")
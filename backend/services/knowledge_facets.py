@@ -0,0 +1,72 @@
+"""ナレッジのタグ・カテゴリ集計
+
+/knowledge/tags のタグクラウドとカテゴリ件数を保持する派生データ構造。
+ナレッジ変更イベントから add/remove で差分更新し、全件走査を避ける。
+"""
+
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+class KnowledgeFacets:
+    """タグ件数・カテゴリ件数の集計（文書IDキーで増分更新可能）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._docs: Dict[Any, Tuple[Tuple[str, ...], Any]] = {}
+        self._tag_counts: Counter = Counter()
+        self._category_counts: Counter = Counter()
+
+    @classmethod
+    def build(cls, items: Iterable[Dict[str, Any]]) -> "KnowledgeFacets":
+        """アイテム一覧から集計を構築"""
+        facets = cls()
+        for item in items:
+            if item:
+                facets.add(item)
+        return facets
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, item: Dict[str, Any]):
+        """文書を追加（同じIDが存在する場合は置き換え）"""
+        doc_id = item.get("id")
+        tags = tuple(tag for tag in (item.get("tags") or []) if tag)
+        category = item.get("category")
+        with self._lock:
+            self._discard(doc_id)
+            self._docs[doc_id] = (tags, category)
+            self._tag_counts.update(tags)
+            if category:
+                self._category_counts[category] += 1
+
+    def remove(self, doc_id: Any):
+        """文書を削除"""
+        with self._lock:
+            self._discard(doc_id)
+
+    def _discard(self, doc_id: Any):
+        entry = self._docs.pop(doc_id, None)
+        if entry is None:
+            return
+        tags, category = entry
+        self._tag_counts.subtract(tags)
+        for tag in tags:
+            if self._tag_counts[tag] <= 0:
+                del self._tag_counts[tag]
+        if category:
+            self._category_counts[category] -= 1
+            if self._category_counts[category] <= 0:
+                del self._category_counts[category]
+
+    def tag_counts(self) -> List[Tuple[str, int]]:
+        """タグ件数（件数降順）"""
+        with self._lock:
+            return self._tag_counts.most_common()
+
+    def category_counts(self) -> List[Tuple[str, int]]:
+        """カテゴリ件数（件数降順）"""
+        with self._lock:
+            return self._category_counts.most_common()
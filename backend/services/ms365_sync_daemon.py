@@ -19,6 +19,7 @@ sys.path.insert(0, str(BACKEND_DIR))
 
 from data_access import DataAccessLayer
 from services.ms365_scheduler_service import MS365SchedulerService
+from services.related_items_jobs import RelatedItemsJobs
 
 # ロギング設定
 logging.basicConfig(
@@ -79,6 +80,9 @@ def main():
         if scheduler_service.start():
             logger.info("スケジューラー起動成功")
 
+            # 関連アイテム事前計算テーブルの夜間・増分ジョブ
+            RelatedItemsJobs(dal).register(scheduler_service.scheduler)
+
             # スケジュール一覧表示
             jobs = scheduler_service.get_scheduled_jobs()
             logger.info(f"登録されたジョブ: {len(jobs)}件")
@@ -0,0 +1,419 @@
+"""関連アイテムの事前計算テーブル（オフライン近傍テーブル）
+
+ナレッジ・SOPごとにハイブリッドスコア上位 K 件の近傍をバッチで事前計算し、
+データディレクトリ配下の JSON に保存する。/related エンドポイントは
+テーブルを参照するだけで済み、リクエストごとの類似度計算を省略できる。
+
+- build(): 全件を再計算（夜間ジョブ）
+- refresh(): 前回構築時からの文書指紋の差分を検出し、変更・削除された文書と
+  その近傍の行だけを再計算する（増分ジョブ）
+
+ハイブリッドスコア（タグJaccard・カテゴリ一致・コサイン類似度）は対称なので、
+変更文書 X のスコアベクトル1本から「X の近傍」と「X を近傍に含みうる行」の
+両方を更新できる。増分更新では IDF の変化による他文書間のスコアの揺れは
+反映しないため、夜間の全件再計算で補正する。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from recommendation_engine import (
+    NUMPY_AVAILABLE,
+    RecommendationEngine,
+    TfidfModel,
+    common_keywords,
+    related_item_result,
+)
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 事前計算する近傍数（/related の limit 上限と同じ）
+DEFAULT_K = 20
+TABLE_DIR = "related_items"
+TABLE_FORMAT_VERSION = 1
+
+# コレクション名 → データファイル名
+COLLECTIONS = {"knowledge": "knowledge.json", "sop": "sop.json"}
+
+# 近傍エントリ: (近傍ID, 総合スコア, タグ類似度, カテゴリ一致, コンテンツ類似度)
+Neighbor = Tuple[Any, float, float, bool, float]
+
+# スコア計算用（推薦キャッシュは使わないため件数上限は最小にする）
+_scoring_engine = RecommendationEngine(cache_max_entries=1)
+
+
+def related_items_path(data_dir: str, collection: str) -> str:
+    """事前計算テーブルの保存先"""
+    return os.path.join(data_dir, TABLE_DIR, f"{collection}.json")
+
+
+def item_fingerprint(item: Dict[str, Any]) -> str:
+    """類似度計算に使うフィールドの指紋（変更検出用）"""
+    payload = json.dumps(
+        [
+            item.get("title"),
+            item.get("summary"),
+            item.get("content"),
+            item.get("category"),
+            item.get("tags"),
+        ],
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.md5(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class RelatedItemsTable:
+    """文書IDごとのハイブリッドスコア上位 K 件"""
+
+    def __init__(self, k: int = DEFAULT_K):
+        self.k = k
+        self.built_at: Optional[str] = None
+        self.rows: Dict[Any, List[Neighbor]] = {}
+        self.fingerprints: Dict[Any, str] = {}
+        self.idf: Dict[str, float] = {}
+        self._referrers: Dict[Any, Set[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    # ------------------------------------------------------------------
+    # 構築・増分更新
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def build(
+        cls, items: List[Dict[str, Any]], k: int = DEFAULT_K
+    ) -> "RelatedItemsTable":
+        """全文書の近傍を計算してテーブルを構築"""
+        table = cls(k)
+        model = table._fit(items)
+        for row, item in enumerate(model.items):
+            table._set_row(item.get("id"), table._top_k(model, item, row))
+        table.fingerprints = {i.get("id"): item_fingerprint(i) for i in model.items}
+        table.built_at = datetime.now().isoformat()
+        return table
+
+    def refresh(self, items: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        前回構築時から変更された文書とその近傍だけを再計算
+
+        Returns:
+            Dict[str, int]: changed / deleted / recomputed（全件再計算した行数）/
+            updated（差分適用した行数）
+        """
+        current = {i.get("id"): i for i in items if i}
+        fingerprints = {doc_id: item_fingerprint(i) for doc_id, i in current.items()}
+        changed = [
+            doc_id
+            for doc_id, fp in fingerprints.items()
+            if self.fingerprints.get(doc_id) != fp
+        ]
+        deleted = [doc_id for doc_id in self.rows if doc_id not in current]
+        stats = {"changed": len(changed), "deleted": len(deleted), "recomputed": 0, "updated": 0}
+        if not changed and not deleted:
+            return stats
+
+        model = self._fit(list(current.values()))
+        positions = {doc_id: row for row, doc_id in enumerate(current)}
+        dirty: Set[Any] = set()
+        touched: Set[Any] = set()
+
+        # 削除: 削除文書を近傍に含む行から除く（満杯だった行は次点が不明なので再計算）
+        deleted_set = set(deleted)
+        for doc_id in deleted:
+            for referrer in list(self._referrers.get(doc_id, ())):
+                neighbors = self.rows.get(referrer)
+                if neighbors is None or referrer in deleted_set:
+                    continue
+                if len(neighbors) >= self.k:
+                    dirty.add(referrer)
+                self._set_row(referrer, [n for n in neighbors if n[0] != doc_id])
+                touched.add(referrer)
+            self._set_row(doc_id, None)
+
+        # 変更・追加: X のスコアベクトルで X の行と、X を近傍に含みうる行を更新
+        changed_set = set(changed)
+        thresholds = self._thresholds(model)
+        for doc_id in changed:
+            row = positions[doc_id]
+            item = model.items[row]
+            vectors = self._score_vectors(model, item)
+            rounded = np.round(vectors[0], 3)
+            candidates = set(self._referrers.get(doc_id, ()))
+            candidates.update(
+                model.items[r].get("id")
+                for r in np.flatnonzero((rounded > 0) & (rounded >= thresholds))
+                if r != row
+            )
+            for other in candidates - changed_set - dirty:
+                other_row = positions.get(other)
+                if other_row is None or other not in self.rows:
+                    continue
+                neighbor = self._neighbor(doc_id, vectors, other_row)
+                if self._update_row(other, neighbor, positions):
+                    touched.add(other)
+                else:
+                    dirty.add(other)
+                thresholds[other_row] = self._threshold(other)
+            self._set_row(doc_id, self._top_k(model, item, row, vectors))
+
+        for doc_id in dirty - changed_set:
+            row = positions[doc_id]
+            self._set_row(doc_id, self._top_k(model, model.items[row], row))
+
+        self.fingerprints = fingerprints
+        self.built_at = datetime.now().isoformat()
+        stats["recomputed"] = len(changed_set | dirty)
+        stats["updated"] = len(touched - changed_set - dirty)
+        return stats
+
+    def _fit(self, items: List[Dict[str, Any]]) -> TfidfModel:
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("関連アイテムテーブルの構築には NumPy が必要です")
+        model = TfidfModel.fit(items)
+        self.idf = {
+            word: round(float(model.idf[col]), 6)
+            for word, col in model.vocabulary.items()
+        }
+        return model
+
+    @staticmethod
+    def _score_vectors(model: TfidfModel, item: Dict[str, Any]):
+        return _scoring_engine.related_score_vectors(model, item, "hybrid")
+
+    @staticmethod
+    def _neighbor(doc_id: Any, vectors, row: int) -> Neighbor:
+        scores, tag_sim, category_sim, content_sim = vectors
+        return (
+            doc_id,
+            round(float(scores[row]), 3),
+            round(float(tag_sim[row]), 4),
+            bool(category_sim[row] > 0),
+            round(float(content_sim[row]), 4),
+        )
+
+    def _top_k(
+        self, model: TfidfModel, item: Dict[str, Any], row: int, vectors=None
+    ) -> List[Neighbor]:
+        """1文書の近傍上位 K 件（同点は元の順序を維持）"""
+        vectors = vectors or self._score_vectors(model, item)
+        scores = vectors[0].copy()
+        scores[row] = -np.inf
+        eligible = np.flatnonzero(np.round(scores, 3) > 0)
+        if len(eligible) == 0:
+            return []
+        rounded = np.round(scores[eligible], 3)
+        if len(eligible) > self.k:
+            kth = np.partition(rounded, len(rounded) - self.k)[len(rounded) - self.k]
+            keep = rounded >= kth
+            eligible, rounded = eligible[keep], rounded[keep]
+        order = np.lexsort((eligible, -rounded))[: self.k]
+        return [
+            self._neighbor(model.items[int(eligible[pos])].get("id"), vectors, int(eligible[pos]))
+            for pos in order
+        ]
+
+    def _threshold(self, doc_id: Any) -> float:
+        """この行に新たに入るために超える必要があるスコア"""
+        neighbors = self.rows.get(doc_id) or []
+        if len(neighbors) < self.k:
+            return 0.0
+        return neighbors[-1][1]
+
+    def _thresholds(self, model: TfidfModel) -> "np.ndarray":
+        thresholds = np.full(len(model), np.inf)
+        for row, item in enumerate(model.items):
+            if item.get("id") in self.rows:
+                thresholds[row] = self._threshold(item.get("id"))
+        return thresholds
+
+    def _update_row(
+        self, doc_id: Any, neighbor: Neighbor, positions: Dict[Any, int]
+    ) -> bool:
+        """
+        近傍エントリを差し替えて並べ直す
+
+        Returns:
+            bool: 差分適用できた場合 True（満杯の行でスコアが下がり、
+            圏外の文書が繰り上がりうる場合は False = 全件再計算が必要）
+        """
+        neighbors = self.rows[doc_id]
+        previous = next((n for n in neighbors if n[0] == neighbor[0]), None)
+        rest = [n for n in neighbors if n[0] != neighbor[0]]
+        if (
+            previous is not None
+            and len(neighbors) >= self.k
+            and neighbor[1] < previous[1]
+            and (not rest or neighbor[1] <= rest[-1][1])
+        ):
+            return False
+        if neighbor[1] > 0:
+            rest.append(neighbor)
+        rest.sort(key=lambda n: (-n[1], positions.get(n[0], len(positions))))
+        self._set_row(doc_id, rest[: self.k])
+        return True
+
+    def _set_row(self, doc_id: Any, neighbors: Optional[List[Neighbor]]):
+        for neighbor in self.rows.get(doc_id, ()):
+            referrers = self._referrers.get(neighbor[0])
+            if referrers is not None:
+                referrers.discard(doc_id)
+        if neighbors is None:
+            self.rows.pop(doc_id, None)
+            return
+        self.rows[doc_id] = neighbors
+        for neighbor in neighbors:
+            self._referrers.setdefault(neighbor[0], set()).add(doc_id)
+
+    # ------------------------------------------------------------------
+    # 参照
+    # ------------------------------------------------------------------
+
+    def lookup(
+        self,
+        target_item: Dict[str, Any],
+        items: Iterable[Dict[str, Any]],
+        limit: int,
+        min_score: float,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        事前計算済みの関連アイテムを返す
+
+        対象文書がテーブルにない、または構築後に編集されている場合、
+        limit が K を超える場合、min_score が 0 以下の場合は None
+        （呼び出し側でオンデマンド計算にフォールバックする）。
+        """
+        doc_id = target_item.get("id")
+        if limit > self.k or min_score <= 0 or doc_id not in self.rows:
+            return None
+        if self.fingerprints.get(doc_id) != item_fingerprint(target_item):
+            return None
+
+        neighbors = [n for n in self.rows[doc_id] if n[1] >= min_score]
+        wanted = {n[0] for n in neighbors}
+        by_id = {i.get("id"): i for i in items if i and i.get("id") in wanted}
+
+        result = []
+        for neighbor_id, score, tag_sim, category_match, content_sim in neighbors:
+            item = by_id.get(neighbor_id)
+            if item is None:  # 構築後に削除された文書
+                continue
+            keywords = (
+                common_keywords(target_item, item, self._idf_of) if content_sim > 0 else None
+            )
+            result.append(
+                related_item_result(
+                    item,
+                    score,
+                    tag_similarity=tag_sim,
+                    category_match=category_match,
+                    content_similarity=content_sim,
+                    common_keywords=keywords,
+                )
+            )
+            if len(result) >= limit:
+                break
+        return result
+
+    def _idf_of(self, word: str) -> float:
+        return self.idf.get(word, 1.0)
+
+    # ------------------------------------------------------------------
+    # 永続化
+    # ------------------------------------------------------------------
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "format": TABLE_FORMAT_VERSION,
+            "k": self.k,
+            "built_at": self.built_at,
+            "idf": self.idf,
+            "rows": [
+                [doc_id, self.fingerprints.get(doc_id), [list(n) for n in neighbors]]
+                for doc_id, neighbors in self.rows.items()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RelatedItemsTable":
+        if data.get("format") != TABLE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported related items table format: {data.get('format')}")
+        table = cls(int(data.get("k", DEFAULT_K)))
+        table.built_at = data.get("built_at")
+        table.idf = data.get("idf") or {}
+        for doc_id, fingerprint, neighbors in data.get("rows", []):
+            table.fingerprints[doc_id] = fingerprint
+            table._set_row(doc_id, [tuple(n) for n in neighbors])
+        return table
+
+    def save(self, path: str):
+        """テーブルをアトミックに保存（読み手が書き込み途中のファイルを見ないよう置き換え）"""
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".related-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "RelatedItemsTable":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+def refresh_related_items(
+    collection: str,
+    items: List[Dict[str, Any]],
+    data_dir: str,
+    k: int = DEFAULT_K,
+    full: bool = False,
+) -> Dict[str, Any]:
+    """
+    コレクションの事前計算テーブルを更新して保存（CLI・スケジューラー共用）
+
+    Args:
+        collection: "knowledge" または "sop"
+        items: コレクションの全アイテム
+        data_dir: データディレクトリ
+        k: 近傍数
+        full: True の場合は全件再計算（テーブルがない・K が異なる場合も全件）
+
+    Returns:
+        Dict[str, Any]: mode（full/incremental）と件数の統計
+    """
+    path = related_items_path(data_dir, collection)
+    table = None
+    if not full and os.path.exists(path):
+        try:
+            table = RelatedItemsTable.load(path)
+        except (OSError, ValueError) as e:
+            logger.warning("Related items table unreadable, rebuilding: %s: %s", path, e)
+        if table is not None and table.k != k:
+            table = None
+
+    if table is None:
+        table = RelatedItemsTable.build(items, k)
+        stats = {"mode": "full", "items": len(table)}
+    else:
+        stats = {"mode": "incremental", **table.refresh(items)}
+        stats["items"] = len(table)
+        if not stats["changed"] and not stats["deleted"]:
+            return stats
+
+    table.save(path)
+    logger.info("Related items table updated: %s %s", collection, stats)
+    return stats
@@ -0,0 +1,123 @@
+"""関連アイテム事前計算テーブルの定期ジョブ
+
+MS365同期デーモン（services/ms365_sync_daemon.py）のスケジューラーに
+夜間の全件再計算と、数分おきの増分更新（変更文書とその近傍のみ）を登録する。
+"""
+
+import logging
+import os
+from typing import Any, Dict, Iterable, List
+
+from data_access import DataAccessLayer
+from services.related_items import COLLECTIONS, DEFAULT_K, refresh_related_items
+
+logger = logging.getLogger(__name__)
+
+# オプション依存関係の遅延インポート
+try:
+    from apscheduler.triggers.cron import CronTrigger
+    from apscheduler.triggers.interval import IntervalTrigger
+
+    APSCHEDULER_AVAILABLE = True
+except ImportError:
+    APSCHEDULER_AVAILABLE = False
+
+DEFAULT_REBUILD_CRON = "30 3 * * *"
+DEFAULT_REFRESH_MINUTES = 10
+
+
+def load_collection_items(dal: DataAccessLayer, collection: str) -> List[Dict[str, Any]]:
+    """コレクションの全アイテムを読み込む（JSON/PostgreSQL 透過）"""
+    if collection == "knowledge":
+        return dal.get_knowledge_list()
+    if collection == "sop":
+        return dal.get_sop_list()
+    raise ValueError(f"Unknown collection: {collection}")
+
+
+class RelatedItemsJobs:
+    """関連アイテムテーブルの再計算ジョブ"""
+
+    def __init__(
+        self,
+        dal: DataAccessLayer,
+        data_dir: str = None,
+        k: int = DEFAULT_K,
+        collections: Iterable[str] = tuple(COLLECTIONS),
+    ):
+        self.dal = dal
+        self.data_dir = data_dir or dal.data_dir
+        self.k = k
+        self.collections = list(collections)
+
+    def run(self, full: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        全コレクションのテーブルを更新
+
+        Args:
+            full: True の場合は全件再計算、False の場合は増分更新
+
+        Returns:
+            Dict[str, Dict[str, Any]]: コレクションごとの統計
+        """
+        results = {}
+        for collection in self.collections:
+            try:
+                items = load_collection_items(self.dal, collection)
+                results[collection] = refresh_related_items(
+                    collection, items, self.data_dir, k=self.k, full=full
+                )
+            except Exception as e:
+                logger.error(
+                    "Related items job failed: %s: %s: %s",
+                    collection,
+                    type(e).__name__,
+                    e,
+                )
+                results[collection] = {"error": str(e)}
+        return results
+
+    def register(self, scheduler) -> bool:
+        """
+        スケジューラーにジョブを登録（既存ジョブは置き換え）
+
+        Args:
+            scheduler: APScheduler の BackgroundScheduler
+
+        Returns:
+            bool: 登録できた場合 True
+        """
+        if not APSCHEDULER_AVAILABLE or scheduler is None:
+            logger.warning("APSchedulerが利用できないため関連アイテムジョブを登録しません")
+            return False
+
+        rebuild_cron = os.environ.get("MKS_RELATED_ITEMS_REBUILD_CRON", DEFAULT_REBUILD_CRON)
+        refresh_minutes = int(
+            os.environ.get("MKS_RELATED_ITEMS_REFRESH_MINUTES", DEFAULT_REFRESH_MINUTES)
+        )
+
+        scheduler.add_job(
+            func=self.run,
+            kwargs={"full": True},
+            trigger=CronTrigger.from_crontab(rebuild_cron),
+            id="related_items_rebuild",
+            name="Related Items: full rebuild",
+            replace_existing=True,
+            max_instances=1,
+        )
+        if refresh_minutes > 0:
+            scheduler.add_job(
+                func=self.run,
+                trigger=IntervalTrigger(minutes=refresh_minutes),
+                id="related_items_refresh",
+                name="Related Items: incremental refresh",
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True,
+            )
+        logger.info(
+            "関連アイテムジョブを登録: 全件 %s / 増分 %d分ごと",
+            rebuild_cron,
+            refresh_minutes,
+        )
+        return True
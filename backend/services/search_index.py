@@ -0,0 +1,321 @@
+"""全文検索用の転置インデックス
+
+ナレッジ・SOP・インシデントの title/summary/content/description を
+RecommendationEngine と同じトークナイザ（日本語Bi-gram + 英数字単語）で索引し、
+フィールド重み付きBM25（BM25F簡易版）でスコアリングする。
+
+クエリ仕様:
+  - 空白区切りの語は AND 条件（全語を含む文書のみヒット）
+  - "..." で囲んだ語句はフレーズとして扱う
+  - 各語は posting list の積集合で候補を絞り、部分文字列一致で確定する
+  - 英数字の語は語彙の部分一致で展開する（"sql" → "postgresql", "mysql" など）
+    （従来の部分一致検索と同じヒット判定を保ちつつ、全件走査を避ける）
+  - 索引できない語（1文字のみの語など）は候補文書の部分一致走査にフォールバック
+"""
+
+import bisect
+import math
+import re
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from recommendation_engine import EN_TOKEN_PATTERN, JP_TOKEN_PATTERN, tokenize
+
+# 検索対象フィールドと重み（従来の search_in_fields の 1.0/0.7/0.5 に対応）
+KNOWLEDGE_FIELD_WEIGHTS = {"title": 1.0, "summary": 0.7, "content": 0.5}
+SOP_FIELD_WEIGHTS = {"title": 1.0, "content": 0.5}
+INCIDENT_FIELD_WEIGHTS = {"title": 1.0, "description": 0.5}
+
+_ASCII_TERM = re.compile(r"[a-z0-9]+")
+_QUERY_TERM = re.compile(r'"([^"]+)"|(\S+)')
+
+# 英数字トークンの展開結果をキャッシュする語数の上限
+_MAX_CACHED_EXPANSIONS = 1024
+
+SearchHit = Tuple[Dict[str, Any], List[str], float]
+
+
+def parse_query(query: str) -> List[str]:
+    """
+    クエリを検索語のリストに分割（小文字化済み）
+
+    Args:
+        query: 検索クエリ
+
+    Returns:
+        List[str]: 検索語（フレーズは1語として扱う）
+    """
+    terms = []
+    for phrase, word in _QUERY_TERM.findall(query or ""):
+        term = (phrase or word).strip().lower()
+        if term:
+            terms.append(term)
+    return terms
+
+
+def query_tokens(term: str) -> Optional[List[str]]:
+    """
+    検索語を posting list 検索用トークンに変換
+
+    日本語は Bi-gram、英数字は2文字以上の単語（前方一致で展開）を返す。
+    1文字の語など索引で絞り込めない部分を含む場合は None を返す。
+    """
+    tokens = []
+    covered = 0
+    for part in JP_TOKEN_PATTERN.findall(term):
+        if len(part) < 2:
+            return None
+        tokens.extend(part[i : i + 2] for i in range(len(part) - 1))
+        covered += len(part)
+    for word in EN_TOKEN_PATTERN.findall(term):
+        tokens.append(word)
+        covered += len(word)
+    if not tokens:
+        return None
+    # 1文字の英数字など、トークンに含まれない英数字・日本語があれば絞り込み不可
+    leftover = len(re.findall(r"[a-z0-9ぁ-んァ-ヶー一-龥]", term)) - covered
+    return tokens if leftover == 0 else None
+
+
+class SearchIndex:
+    """フィールド重み付きBM25の転置インデックス（文書IDキーで増分更新可能）"""
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(
+        self,
+        field_weights: Dict[str, float],
+        tokenizer: Callable[[str], List[str]] = tokenize,
+    ):
+        """
+        初期化
+
+        Args:
+            field_weights: フィールド名 → 重み
+            tokenizer: トークナイザ
+        """
+        self.field_weights = dict(field_weights)
+        self.tokenizer = tokenizer
+        self._lock = threading.RLock()
+        self._docs: Dict[Any, Dict[str, Any]] = {}
+        self._lowered: Dict[Any, Dict[str, str]] = {}
+        # term -> doc_id -> field -> tf
+        self._postings: Dict[str, Dict[Any, Dict[str, int]]] = defaultdict(dict)
+        self._doc_terms: Dict[Any, Set[str]] = {}
+        self._field_len: Dict[str, Dict[Any, int]] = {f: {} for f in field_weights}
+        self._field_total: Dict[str, int] = {f: 0 for f in field_weights}
+        self._sorted_vocab: Optional[List[str]] = None
+        self._ascii_vocab: Optional[List[str]] = None
+        self._expansions: Dict[str, List[str]] = {}
+
+    @classmethod
+    def build(
+        cls,
+        items: Iterable[Dict[str, Any]],
+        field_weights: Dict[str, float],
+        tokenizer: Callable[[str], List[str]] = tokenize,
+    ) -> "SearchIndex":
+        """アイテム一覧からインデックスを構築"""
+        index = cls(field_weights, tokenizer)
+        for position, item in enumerate(items):
+            index.add(item, doc_id=item.get("id", position))
+        return index
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    # ------------------------------------------------------------
+    # 更新
+    # ------------------------------------------------------------
+
+    def add(self, item: Dict[str, Any], doc_id: Any = None):
+        """
+        文書を追加（同じIDが存在する場合は置き換え）
+
+        Args:
+            item: アイテム
+            doc_id: 文書ID（省略時は item["id"]）
+        """
+        doc_id = item.get("id") if doc_id is None else doc_id
+        with self._lock:
+            if doc_id in self._docs:
+                self.remove(doc_id)
+
+            self._docs[doc_id] = item
+            self._lowered[doc_id] = {}
+            terms = set()
+            for field in self.field_weights:
+                text = str(item.get(field) or "")
+                self._lowered[doc_id][field] = text.lower()
+                tokens = self.tokenizer(text)
+                self._field_len[field][doc_id] = len(tokens)
+                self._field_total[field] += len(tokens)
+                counts = defaultdict(int)
+                for token in tokens:
+                    counts[token] += 1
+                for token, tf in counts.items():
+                    self._postings[token].setdefault(doc_id, {})[field] = tf
+                    terms.add(token)
+            self._doc_terms[doc_id] = terms
+            self._invalidate_vocab()
+
+    def remove(self, doc_id: Any):
+        """文書を削除"""
+        with self._lock:
+            if doc_id not in self._docs:
+                return
+            for token in self._doc_terms.pop(doc_id, ()):
+                postings = self._postings.get(token)
+                if postings is None:
+                    continue
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[token]
+            for field in self.field_weights:
+                self._field_total[field] -= self._field_len[field].pop(doc_id, 0)
+            del self._docs[doc_id]
+            del self._lowered[doc_id]
+            self._invalidate_vocab()
+
+    # ------------------------------------------------------------
+    # 検索
+    # ------------------------------------------------------------
+
+    def search(self, query: str) -> List[SearchHit]:
+        """
+        検索を実行
+
+        Args:
+            query: 検索クエリ
+
+        Returns:
+            List[Tuple[item, matched_fields, score]]: スコア降順
+        """
+        terms = parse_query(query)
+        if not terms:
+            return []
+
+        with self._lock:
+            term_tokens = [(term, query_tokens(term)) for term in terms]
+
+            # posting list の積集合で候補を絞る（件数の少ない語から）
+            candidates: Optional[Set[Any]] = None
+            indexed = [
+                (term, self._expand(tokens)) for term, tokens in term_tokens if tokens
+            ]
+            for _, expanded in sorted(indexed, key=lambda t: self._df_estimate(t[1])):
+                for alternatives in expanded:
+                    docs = set()
+                    for token in alternatives:
+                        docs.update(self._postings.get(token, {}))
+                    candidates = docs if candidates is None else candidates & docs
+                    if not candidates:
+                        return []
+            if candidates is None:
+                candidates = set(self._docs)
+
+            hits = []
+            for doc_id in candidates:
+                hit = self._verify_and_score(doc_id, terms, indexed)
+                if hit is not None:
+                    hits.append(hit)
+
+        hits.sort(key=lambda h: h[2], reverse=True)
+        return hits
+
+    def _expand(self, tokens: List[str]) -> List[List[str]]:
+        """英数字トークンを語彙の部分一致で展開（従来の部分一致検索と同じヒットにする）"""
+        expanded = []
+        for token in tokens:
+            if _ASCII_TERM.fullmatch(token):
+                expanded.append(self._ascii_expansion(token) or [token])
+            else:
+                expanded.append([token])
+        return expanded
+
+    def _ascii_expansion(self, token: str) -> List[str]:
+        """
+        token を部分文字列として含む英数字の語彙
+
+        前方一致は二分探索で求め、語中の一致（"ql" → "postgresql"）は
+        英数字語彙を走査して補う。結果は語彙が変わるまでキャッシュする。
+        """
+        cached = self._expansions.get(token)
+        if cached is not None:
+            return cached
+
+        vocab = self._vocab()
+        start = bisect.bisect_left(vocab, token)
+        end = bisect.bisect_left(vocab, token + "\uffff")
+        prefix = vocab[start:end]
+        prefixed = set(prefix)
+        infix = [t for t in self._ascii_terms() if token in t and t not in prefixed]
+        result = prefix + infix
+
+        if len(self._expansions) >= _MAX_CACHED_EXPANSIONS:
+            self._expansions.clear()
+        self._expansions[token] = result
+        return result
+
+    def _vocab(self) -> List[str]:
+        if self._sorted_vocab is None:
+            self._sorted_vocab = sorted(self._postings)
+        return self._sorted_vocab
+
+    def _ascii_terms(self) -> List[str]:
+        if self._ascii_vocab is None:
+            self._ascii_vocab = [t for t in self._vocab() if _ASCII_TERM.fullmatch(t)]
+        return self._ascii_vocab
+
+    def _invalidate_vocab(self):
+        self._sorted_vocab = None
+        self._ascii_vocab = None
+        self._expansions.clear()
+
+    def _df_estimate(self, expanded: List[List[str]]) -> int:
+        return min(
+            sum(len(self._postings.get(t, ())) for t in alternatives)
+            for alternatives in expanded
+        )
+
+    def _verify_and_score(
+        self, doc_id: Any, terms: List[str], indexed: List[Tuple[str, List[List[str]]]]
+    ) -> Optional[SearchHit]:
+        lowered = self._lowered[doc_id]
+        matched_fields = []
+        for field in self.field_weights:
+            if any(term in lowered[field] for term in terms):
+                matched_fields.append(field)
+        # 全ての語がいずれかのフィールドに部分一致すること（AND）
+        for term in terms:
+            if not any(term in lowered[field] for field in matched_fields):
+                return None
+
+        score = 0.0
+        doc_count = len(self._docs)
+        for _, expanded in indexed:
+            for alternatives in expanded:
+                for token in alternatives:
+                    postings = self._postings.get(token)
+                    if not postings or doc_id not in postings:
+                        continue
+                    idf = math.log(
+                        1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5)
+                    )
+                    for field, tf in postings[doc_id].items():
+                        score += self.field_weights[field] * idf * self._bm25_tf(
+                            field, doc_id, tf
+                        )
+        if not indexed:
+            # 索引で絞り込めない語のみの場合は従来どおりフィールド重みの合計
+            score = sum(self.field_weights[f] for f in matched_fields)
+
+        return self._docs[doc_id], matched_fields, round(score, 4)
+
+    def _bm25_tf(self, field: str, doc_id: Any, tf: int) -> float:
+        avg_len = self._field_total[field] / max(len(self._field_len[field]), 1)
+        doc_len = self._field_len[field].get(doc_id, 0)
+        norm = 1 - self.B + self.B * (doc_len / avg_len if avg_len else 0)
+        return tf * (self.K1 + 1) / (tf + self.K1 * norm)
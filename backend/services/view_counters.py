@@ -0,0 +1,295 @@
+"""閲覧数カウンタ（バッファリング）と人気・トレンドの上位K件
+
+閲覧のたびにデータファイルを書き換える代わりに、閲覧イベント
+（監査ログの knowledge.view / sop.view / consultation.view）を差分として積み、
+一定間隔でまとめて永続化する（JSON: view_counters.json、PostgreSQL: view_counters テーブル）。
+
+- 差分: Redis 有効時は HINCRBY で全ワーカー共有のハッシュ、無効時はワーカーごとのメモリ
+- トレンド: 半減期で減衰するスコア。Redis 有効時はソート済みセット（ZINCRBY）
+- 人気: アイテムの views（初期値）+ 永続化済みカウンタの上位K件を PopularityIndex として
+  バージョンごとに1回だけ構築し、読み出し時に未永続化の差分だけを重ねる
+"""
+
+import heapq
+import logging
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 監査ログのアクション → カウンタのリソース種別
+VIEW_ACTIONS = {
+    "knowledge.view": "knowledge",
+    "sop.view": "sop",
+    "consultation.view": "consultation",
+}
+
+# 人気ランキングとして保持する上位件数（/knowledge/popular の limit 上限）
+TOP_K = 50
+
+DEFAULT_HALF_LIFE = 24 * 3600.0
+
+# 減衰スコアは基準時刻からの相対値で保持し、この半減期数ごとに基準を進める
+_REBASE_HALF_LIVES = 16
+
+_DELTAS_KEY = "view_deltas:{}"
+_TRENDING_KEY = "trending:{}:{}"
+
+
+class DecayingScores:
+    """半減期で減衰するスコア（プロセス内）"""
+
+    def __init__(self, half_life: float = DEFAULT_HALF_LIFE):
+        self.half_life = half_life
+        self._lock = threading.Lock()
+        self._base = None
+        self._scores: Dict[Any, float] = {}
+
+    def add(self, key: Any, weight: float = 1.0, now: Optional[float] = None):
+        """イベントを加算（now 時点で weight、以後は半減期ごとに半分になる）"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._rebase(now)
+            self._scores[key] = self._scores.get(key, 0.0) + weight * self._scale(now)
+
+    def top(self, limit: int, now: Optional[float] = None) -> List[Tuple[Any, float]]:
+        """now 時点のスコア上位（スコア降順）"""
+        now = time.time() if now is None else now
+        with self._lock:
+            if self._base is None:
+                return []
+            factor = 1.0 / self._scale(now)
+            return [
+                (key, score * factor)
+                for key, score in heapq.nlargest(limit, self._scores.items(), key=lambda kv: kv[1])
+            ]
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def _scale(self, now: float) -> float:
+        return 2.0 ** ((now - self._base) / self.half_life)
+
+    def _rebase(self, now: float):
+        if self._base is None:
+            self._base = now
+            return
+        if now - self._base < _REBASE_HALF_LIVES * self.half_life:
+            return
+        factor = 1.0 / self._scale(now)
+        # 基準を進めると同時に、無視できるほど小さくなったスコアを捨てる
+        self._scores = {
+            key: score * factor for key, score in self._scores.items() if score * factor >= 1e-3
+        }
+        self._base = now
+
+
+class PopularityIndex:
+    """閲覧数（初期値 + 永続化済みカウンタ）の上位K件"""
+
+    def __init__(self, totals: Dict[Any, int], items_by_id: Dict[Any, Dict[str, Any]], k: int):
+        self.totals = totals
+        self.items_by_id = items_by_id
+        self.top = heapq.nlargest(k, totals.items(), key=lambda kv: kv[1])
+
+    @classmethod
+    def build(
+        cls, items: Iterable[Dict[str, Any]], persisted: Dict[Any, int], k: int = TOP_K
+    ) -> "PopularityIndex":
+        """アイテム一覧と永続化済みカウンタから構築（全件ソートせず上位K件だけ選ぶ）"""
+        items_by_id = {item.get("id"): item for item in items if item}
+        totals = {
+            item_id: (item.get("views") or 0) + persisted.get(item_id, 0)
+            for item_id, item in items_by_id.items()
+        }
+        return cls(totals, items_by_id, k)
+
+    def ranked(self, pending: Dict[Any, int], limit: int) -> List[Tuple[Any, int]]:
+        """
+        未永続化の差分を重ねた上位（閲覧数降順）
+
+        閲覧数は増える一方なので、上位K件の外から順位が上がり得るのは差分のあるアイテムだけ。
+        候補は「保持している上位K件 + 差分のあるアイテム」で足りる。
+        """
+        candidates = {item_id: count for item_id, count in self.top}
+        for item_id, delta in pending.items():
+            if item_id in self.items_by_id:
+                candidates[item_id] = self.totals.get(item_id, 0) + delta
+        return heapq.nlargest(limit, candidates.items(), key=lambda kv: kv[1])
+
+
+class ViewCounters:
+    """閲覧数の差分バッファとトレンドスコア（データディレクトリごとに1つ）"""
+
+    def __init__(
+        self,
+        store_factory: Callable[[], Any],
+        redis_client=None,
+        half_life: float = DEFAULT_HALF_LIFE,
+        namespace: str = "",
+    ):
+        """
+        初期化
+
+        Args:
+            store_factory: 永続化先（get_view_counts / add_view_counts を持つ DAL）を返す関数
+            redis_client: 共有カウンタに使う Redis クライアント（None の場合はプロセス内）
+            half_life: トレンドスコアの半減期（秒）
+            namespace: Redis キーの接頭辞
+        """
+        self.store_factory = store_factory
+        self.redis = redis_client
+        self.half_life = half_life
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[str, Counter] = {}
+        self._trending: Dict[str, DecayingScores] = {}
+
+    # ------------------------------------------------------------
+    # 記録
+    # ------------------------------------------------------------
+
+    def record(self, resource: str, resource_id: Any, now: Optional[float] = None):
+        """閲覧を1件記録"""
+        now = time.time() if now is None else now
+        if self.redis is not None:
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+                pipe.hincrby(self._key(_DELTAS_KEY.format(resource)), resource_id, 1)
+                epoch, weight = self._trending_weight(now)
+                trending_key = self._key(_TRENDING_KEY.format(resource, epoch))
+                pipe.zincrby(trending_key, weight, resource_id)
+                pipe.expire(trending_key, int(self._epoch_seconds() * 2))
+                pipe.execute()
+                return
+            except Exception as e:
+                logger.warning("View counter Redis error, counting locally: %s", e)
+        with self._lock:
+            self._pending.setdefault(resource, Counter())[resource_id] += 1
+            trending = self._trending.get(resource)
+            if trending is None:
+                trending = self._trending[resource] = DecayingScores(self.half_life)
+        trending.add(resource_id, now=now)
+
+    # ------------------------------------------------------------
+    # 読み出し
+    # ------------------------------------------------------------
+
+    def pending(self, resource: str) -> Dict[Any, int]:
+        """未永続化の差分"""
+        result: Counter = Counter()
+        with self._lock:
+            result.update(self._pending.get(resource, {}))
+        if self.redis is not None:
+            try:
+                raw = self.redis.hgetall(self._key(_DELTAS_KEY.format(resource)))
+                result.update({_parse_id(k): int(v) for k, v in raw.items()})
+            except Exception as e:
+                logger.warning("View counter Redis error: %s", e)
+        return dict(result)
+
+    def trending(self, resource: str, limit: int, now: Optional[float] = None) -> List[Tuple[Any, float]]:
+        """トレンドスコア上位（減衰後のスコア降順）"""
+        now = time.time() if now is None else now
+        if self.redis is not None:
+            try:
+                return self._redis_trending(resource, limit, now)
+            except Exception as e:
+                logger.warning("View counter Redis error: %s", e)
+        with self._lock:
+            trending = self._trending.get(resource)
+        return trending.top(limit, now) if trending is not None else []
+
+    # ------------------------------------------------------------
+    # 永続化
+    # ------------------------------------------------------------
+
+    def flush(self) -> int:
+        """差分をまとめて永続化（書き込み失敗時は差分を戻す）"""
+        flushed = 0
+        with self._flush_lock:
+            with self._lock:
+                batches = {resource: dict(c) for resource, c in self._pending.items() if c}
+                self._pending = {}
+            for resource, deltas in batches.items():
+                flushed += self._apply(resource, deltas, self._restore_local)
+            if self.redis is not None:
+                for resource in VIEW_ACTIONS.values():
+                    flushed += self._flush_redis(resource)
+        return flushed
+
+    def _apply(self, resource: str, deltas: Dict[Any, int], restore) -> int:
+        try:
+            self.store_factory().add_view_counts(resource, deltas)
+        except Exception as e:
+            logger.warning("View counter flush failed for %s: %s: %s", resource, type(e).__name__, e)
+            restore(resource, deltas)
+            return 0
+        return sum(deltas.values())
+
+    def _restore_local(self, resource: str, deltas: Dict[Any, int]):
+        with self._lock:
+            self._pending.setdefault(resource, Counter()).update(deltas)
+
+    def _flush_redis(self, resource: str) -> int:
+        # RENAME は原子的なので、複数ワーカーが同時にフラッシュしても同じ差分を二重に加算しない
+        key = self._key(_DELTAS_KEY.format(resource))
+        claimed = f"{key}:flush:{uuid.uuid4().hex}"
+        try:
+            self.redis.rename(key, claimed)
+        except Exception:
+            return 0  # 差分なし（キーが存在しない）
+        try:
+            raw = self.redis.hgetall(claimed)
+            deltas = {_parse_id(k): int(v) for k, v in raw.items()}
+            return self._apply(resource, deltas, self._restore_redis)
+        finally:
+            self.redis.delete(claimed)
+
+    def _restore_redis(self, resource: str, deltas: Dict[Any, int]):
+        pipe = self.redis.pipeline(transaction=False)
+        for resource_id, delta in deltas.items():
+            pipe.hincrby(self._key(_DELTAS_KEY.format(resource)), resource_id, delta)
+        pipe.execute()
+
+    # ------------------------------------------------------------
+    # Redis のトレンドスコア
+    # ------------------------------------------------------------
+
+    def _epoch_seconds(self) -> float:
+        return _REBASE_HALF_LIVES * self.half_life
+
+    def _trending_weight(self, now: float) -> Tuple[int, float]:
+        # 期間（エポック）ごとに別キーとし、エポック開始時刻からの相対値で加算する
+        epoch = int(now // self._epoch_seconds())
+        return epoch, 2.0 ** ((now - epoch * self._epoch_seconds()) / self.half_life)
+
+    def _redis_trending(self, resource: str, limit: int, now: float) -> List[Tuple[Any, float]]:
+        epoch, scale = self._trending_weight(now)
+        current = self._key(_TRENDING_KEY.format(resource, epoch))
+        previous = self._key(_TRENDING_KEY.format(resource, epoch - 1))
+        merged = f"{current}:merged:{uuid.uuid4().hex}"
+        # 前エポックのスコアは今エポックの基準に換算すると 2^-_REBASE_HALF_LIVES 倍
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.zunionstore(merged, {current: 1.0, previous: 2.0 ** -_REBASE_HALF_LIVES})
+        pipe.zrevrange(merged, 0, limit - 1, withscores=True)
+        pipe.delete(merged)
+        _, rows, _ = pipe.execute()
+        return [(_parse_id(member), score / scale) for member, score in rows]
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}{key}"
+
+
+def _parse_id(value: Any) -> Any:
+    """Redis のメンバー（bytes）をリソースIDに戻す"""
+    if isinstance(value, bytes):
+        value = value.decode()
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
@@ -1,6 +1,7 @@
 import json
 import os
 import pathlib
+import shutil
 import sys
 
 import pytest
@@ -110,6 +111,8 @@ def mock_access_logs(tmp_path):
     """アクセスログをモックするフィクスチャ"""
 
     def _mock_logs(logs):
+        # 追記セグメントも破棄し、指定したログだけが存在する状態にする
+        shutil.rmtree(tmp_path / "access_logs.d", ignore_errors=True)
         _write_json(tmp_path / "access_logs.json", logs)
 
     return _mock_logs
@@ -239,6 +239,8 @@ class TestServerErrors:
         monkeypatch.setattr(app_v2, "load_data", mock_load_data)
         monkeypatch.setattr(app_helpers, "load_data", mock_load_data)
         monkeypatch.setattr(knowledge_blueprint, "load_data", mock_load_data)
+        # 一覧は DAL のページング（load_page）経由で読むため、こちらもパッチする
+        monkeypatch.setattr(knowledge_blueprint, "load_page", mock_load_data)
 
         response = client.get("/api/v1/knowledge", headers=auth_headers)
 
@@ -402,10 +402,10 @@ class TestAccessLogging:
 
         client.get("/api/v1/knowledge", headers={"Authorization": f"Bearer {token}"})
 
-        # ログファイルを確認
-        logs_file = tmp_path / "access_logs.json"
-        with open(logs_file, "r", encoding="utf-8") as f:
-            logs = json.load(f)
+        # 監査ログストアを確認
+        from services.audit_log_store import get_audit_log_store
+
+        logs = get_audit_log_store(str(tmp_path)).read_all()
 
         # ログイン + ナレッジリストの2件（ログインでもlog_accessが呼ばれる）
         knowledge_logs = [l for l in logs if l["action"] == "knowledge.list"]
@@ -418,10 +418,10 @@ class TestAccessLogging:
 
         client.get("/api/v1/knowledge/1", headers={"Authorization": f"Bearer {token}"})
 
-        # ログファイルを確認
-        logs_file = tmp_path / "access_logs.json"
-        with open(logs_file, "r", encoding="utf-8") as f:
-            logs = json.load(f)
+        # 監査ログストアを確認
+        from services.audit_log_store import get_audit_log_store
+
+        logs = get_audit_log_store(str(tmp_path)).read_all()
 
         view_logs = [l for l in logs if l["action"] == "knowledge.view"]
         assert len(view_logs) >= 1
@@ -444,10 +444,10 @@ class TestAccessLogging:
             headers={"Authorization": f"Bearer {token}"},
         )
 
-        # ログファイルを確認
-        logs_file = tmp_path / "access_logs.json"
-        with open(logs_file, "r", encoding="utf-8") as f:
-            logs = json.load(f)
+        # 監査ログストアを確認
+        from services.audit_log_store import get_audit_log_store
+
+        logs = get_audit_log_store(str(tmp_path)).read_all()
 
         create_logs = [l for l in logs if l["action"] == "knowledge.create"]
         assert len(create_logs) >= 1
@@ -259,10 +259,10 @@ class TestKnowledgeDelete:
             "/api/v1/knowledge/1", headers={"Authorization": f"Bearer {token}"}
         )
 
-        # ログファイルを確認
-        logs_file = tmp_path / "access_logs.json"
-        with open(logs_file, "r", encoding="utf-8") as f:
-            logs = json.load(f)
+        # 監査ログストアを確認
+        from services.audit_log_store import get_audit_log_store
+
+        logs = get_audit_log_store(str(tmp_path)).read_all()
 
         delete_logs = [l for l in logs if l["action"] == "knowledge.delete"]
         assert len(delete_logs) >= 1
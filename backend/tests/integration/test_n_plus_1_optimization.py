@@ -107,7 +107,8 @@ class TestN1Optimization:
 
     def test_knowledge_search_uses_load_data_once(self, client):
         """
-        /knowledge/search は knowledge.json を1回だけ読み込む
+        /knowledge/search は knowledge.json を高々1回だけ読み込む
+        （検索インデックスが最新ならデータの読み込み自体を行わない）
         """
         token = _login(client)
 
@@ -130,8 +131,8 @@ class TestN1Optimization:
         data = response.get_json()
         assert data["success"] is True
         assert data["data"]["total"] > 0
-        assert call_count["n"] == 1, (
-            f"knowledge.json が {call_count['n']} 回読み込まれました（期待: 1回）"
+        assert call_count["n"] <= 1, (
+            f"knowledge.json が {call_count['n']} 回読み込まれました（期待: 1回以下）"
         )
 
     def test_search_returns_correct_results(self, client):
@@ -77,11 +77,11 @@ class TestGetAccessLogsEndDateValueError:
 
 
 class TestGetAccessLogsInternalError:
-    """load_data が例外を投げた場合、500 エラーが返る"""
+    """iter_access_logs が例外を投げた場合、500 エラーが返る"""
 
     def test_load_data_raises_returns_500(self, client, auth_headers):
-        """load_data が RuntimeError を送出すると 500 が返る"""
-        with patch("blueprints.admin.load_data", side_effect=RuntimeError("disk error")):
+        """iter_access_logs が RuntimeError を送出すると 500 が返る"""
+        with patch("blueprints.admin.iter_access_logs", side_effect=RuntimeError("disk error")):
             resp = client.get("/api/v1/logs/access", headers=auth_headers)
         assert resp.status_code == 500
         data = resp.get_json()
@@ -89,8 +89,8 @@ class TestGetAccessLogsInternalError:
         assert data["error"] == "Failed to retrieve access logs"
 
     def test_load_data_raises_ioerror_returns_500(self, client, auth_headers):
-        """load_data が IOError を送出しても 500 が返る"""
-        with patch("blueprints.admin.load_data", side_effect=IOError("read failed")):
+        """iter_access_logs が IOError を送出しても 500 が返る"""
+        with patch("blueprints.admin.iter_access_logs", side_effect=IOError("read failed")):
             resp = client.get("/api/v1/logs/access", headers=auth_headers)
         assert resp.status_code == 500
         assert resp.get_json()["error"] == "Failed to retrieve access logs"
@@ -184,11 +184,11 @@ class TestGetAccessLogsStatsInvalidTimestamp:
 
 
 class TestGetAccessLogsStatsInternalError:
-    """load_data が例外を投げた場合、500 エラーが返る"""
+    """iter_access_logs が例外を投げた場合、500 エラーが返る"""
 
     def test_load_data_raises_returns_500(self, client, auth_headers):
-        """load_data が RuntimeError を送出すると 500 が返る"""
-        with patch("blueprints.admin.load_data", side_effect=RuntimeError("corruption")):
+        """iter_access_logs が RuntimeError を送出すると 500 が返る"""
+        with patch("blueprints.admin.iter_access_logs", side_effect=RuntimeError("corruption")):
             resp = client.get("/api/v1/logs/access/stats", headers=auth_headers)
         assert resp.status_code == 500
         data = resp.get_json()
@@ -53,42 +53,38 @@ class TestCacheInvalidatorKnowledge:
     """CacheInvalidator.invalidate_knowledge の正常系・例外系"""
 
     def test_invalidate_knowledge_no_id(self):
-        """knowledge_id=None で全パターン走査"""
+        """knowledge_id=None で世代番号を1回だけ進める（キー走査なし）"""
         mock_redis = MagicMock()
-        mock_redis.scan_iter.return_value = [b"knowledge_list:page1", b"knowledge_tags"]
         with patch.object(app_helpers, "redis_client", mock_redis):
             CacheInvalidator.invalidate_knowledge()
-        assert mock_redis.scan_iter.call_count == 4  # 4 patterns
-        # scan_iter returns same 2 keys for each of the 4 patterns = 8 deletes
-        assert mock_redis.delete.call_count == 8
+        mock_redis.incr.assert_called_once_with("cache_gen:knowledge")
+        mock_redis.scan_iter.assert_not_called()
+        mock_redis.delete.assert_not_called()
 
     def test_invalidate_knowledge_with_id(self):
-        """knowledge_id指定で追加パターン走査"""
+        """knowledge_id指定でもファミリー全体の世代番号を進める"""
         mock_redis = MagicMock()
-        mock_redis.scan_iter.return_value = []
         with patch.object(app_helpers, "redis_client", mock_redis):
             CacheInvalidator.invalidate_knowledge(knowledge_id="42")
-        # 4 base patterns + 1 for knowledge_related:42:*
-        assert mock_redis.scan_iter.call_count == 5
+        mock_redis.incr.assert_called_once_with("cache_gen:knowledge")
+        mock_redis.scan_iter.assert_not_called()
 
-    def test_invalidate_knowledge_with_keys_deleted(self):
-        """走査で見つかったキーが全て削除されることを確認"""
+    def test_generation_is_folded_into_cache_key(self):
+        """世代番号が変わるとファミリーのキーが変わり、他のキーは変わらない"""
         mock_redis = MagicMock()
-        keys_map = {
-            "knowledge_list:*": [b"knowledge_list:1", b"knowledge_list:2"],
-            "knowledge_popular:*": [b"knowledge_popular:all"],
-            "knowledge_tags": [],
-            "knowledge_recent:*": [],
-        }
-        mock_redis.scan_iter.side_effect = lambda p: keys_map.get(p, [])
-        with patch.object(app_helpers, "redis_client", mock_redis):
-            CacheInvalidator.invalidate_knowledge()
-        assert mock_redis.delete.call_count == 3
+        mock_redis.get.return_value = b"3"
+        with patch.object(app_helpers, "redis_client", mock_redis), patch.object(
+            app_helpers, "CACHE_ENABLED", True
+        ):
+            assert app_helpers.get_cache_key("knowledge_list", 1) == "knowledge_list@3:1"
+            assert app_helpers.get_cache_key("regulations_detail", 1) == "regulations_detail:1"
+            mock_redis.get.return_value = b"4"
+            assert app_helpers.get_cache_key("knowledge_list", 1) == "knowledge_list@4:1"
 
     def test_invalidate_knowledge_exception(self):
         """Redis例外時にwarningログが出力されクラッシュしない"""
         mock_redis = MagicMock()
-        mock_redis.scan_iter.side_effect = ConnectionError("Redis down")
+        mock_redis.incr.side_effect = ConnectionError("Redis down")
         with patch.object(app_helpers, "redis_client", mock_redis):
             CacheInvalidator.invalidate_knowledge()  # should not raise
 
@@ -103,22 +99,27 @@ class TestCacheInvalidatorProjects:
 
     def test_invalidate_projects_no_id(self):
         mock_redis = MagicMock()
-        mock_redis.scan_iter.return_value = []
-        with patch.object(app_helpers, "redis_client", mock_redis):
+        with patch.object(app_helpers, "redis_client", mock_redis), patch.object(
+            app_helpers, "purge_cache_tags"
+        ) as purge:
             CacheInvalidator.invalidate_projects()
-        assert mock_redis.scan_iter.call_count == 1  # projects_list:*
+        mock_redis.incr.assert_called_once_with("cache_gen:projects")
+        mock_redis.scan_iter.assert_not_called()
+        purge.assert_not_called()
 
     def test_invalidate_projects_with_id(self):
         mock_redis = MagicMock()
-        mock_redis.scan_iter.return_value = []
-        with patch.object(app_helpers, "redis_client", mock_redis):
+        with patch.object(app_helpers, "redis_client", mock_redis), patch.object(
+            app_helpers, "purge_cache_tags"
+        ) as purge:
             CacheInvalidator.invalidate_projects(project_id="7")
-        # projects_list:*, projects_detail:7, projects_progress:7
-        assert mock_redis.scan_iter.call_count == 3
+        mock_redis.incr.assert_called_once_with("cache_gen:projects")
+        purge.assert_called_once_with("projects:7")
+        mock_redis.scan_iter.assert_not_called()
 
     def test_invalidate_projects_exception(self):
         mock_redis = MagicMock()
-        mock_redis.scan_iter.side_effect = RuntimeError("fail")
+        mock_redis.incr.side_effect = RuntimeError("fail")
         with patch.object(app_helpers, "redis_client", mock_redis):
             CacheInvalidator.invalidate_projects()
 
@@ -132,23 +133,25 @@ class TestCacheInvalidatorExperts:
 
     def test_invalidate_experts_no_id(self):
         mock_redis = MagicMock()
-        mock_redis.scan_iter.return_value = []
-        with patch.object(app_helpers, "redis_client", mock_redis):
+        with patch.object(app_helpers, "redis_client", mock_redis), patch.object(
+            app_helpers, "purge_cache_tags"
+        ) as purge:
             CacheInvalidator.invalidate_experts()
-        # experts_list:*, experts_stats
-        assert mock_redis.scan_iter.call_count == 2
+        mock_redis.incr.assert_called_once_with("cache_gen:experts")
+        purge.assert_not_called()
 
     def test_invalidate_experts_with_id(self):
         mock_redis = MagicMock()
-        mock_redis.scan_iter.return_value = []
-        with patch.object(app_helpers, "redis_client", mock_redis):
+        with patch.object(app_helpers, "redis_client", mock_redis), patch.object(
+            app_helpers, "purge_cache_tags"
+        ) as purge:
             CacheInvalidator.invalidate_experts(expert_id="99")
-        # experts_list:*, experts_stats, experts_detail:99
-        assert mock_redis.scan_iter.call_count == 3
+        mock_redis.incr.assert_called_once_with("cache_gen:experts")
+        purge.assert_called_once_with("experts:99")
 
     def test_invalidate_experts_exception(self):
         mock_redis = MagicMock()
-        mock_redis.scan_iter.side_effect = Exception("oops")
+        mock_redis.incr.side_effect = Exception("oops")
         with patch.object(app_helpers, "redis_client", mock_redis):
             CacheInvalidator.invalidate_experts()
 
@@ -161,25 +164,28 @@ class TestCacheInvalidatorRegulations:
     """CacheInvalidator.invalidate_regulations"""
 
     def test_invalidate_regulations_no_id(self):
-        """reg_id=None: patterns は空リストなのでscan_iterは呼ばれない"""
+        """reg_id=None: 一覧キャッシュがないため何もしない"""
         mock_redis = MagicMock()
-        mock_redis.scan_iter.return_value = []
-        with patch.object(app_helpers, "redis_client", mock_redis):
+        with patch.object(app_helpers, "redis_client", mock_redis), patch.object(
+            app_helpers, "purge_cache_tags"
+        ) as purge:
             CacheInvalidator.invalidate_regulations()
-        assert mock_redis.scan_iter.call_count == 0
+        purge.assert_not_called()
+        mock_redis.scan_iter.assert_not_called()
 
     def test_invalidate_regulations_with_id(self):
         mock_redis = MagicMock()
-        mock_redis.scan_iter.return_value = [b"regulations_detail:5"]
-        with patch.object(app_helpers, "redis_client", mock_redis):
+        with patch.object(app_helpers, "redis_client", mock_redis), patch.object(
+            app_helpers, "purge_cache_tags"
+        ) as purge:
             CacheInvalidator.invalidate_regulations(reg_id="5")
-        assert mock_redis.scan_iter.call_count == 1
-        mock_redis.delete.assert_called_once_with(b"regulations_detail:5")
+        purge.assert_called_once_with("regulations:5")
+        mock_redis.scan_iter.assert_not_called()
 
     def test_invalidate_regulations_exception(self):
-        mock_redis = MagicMock()
-        mock_redis.scan_iter.side_effect = TimeoutError("timeout")
-        with patch.object(app_helpers, "redis_client", mock_redis):
+        with patch.object(app_helpers, "redis_client", MagicMock()), patch.object(
+            app_helpers, "purge_cache_tags", side_effect=TimeoutError("timeout")
+        ):
             CacheInvalidator.invalidate_regulations(reg_id="1")
 
     def test_invalidate_regulations_redis_none(self):
@@ -192,23 +198,25 @@ class TestCacheInvalidatorSop:
 
     def test_invalidate_sop_no_id(self):
         mock_redis = MagicMock()
-        mock_redis.scan_iter.return_value = [b"sop_list"]
-        with patch.object(app_helpers, "redis_client", mock_redis):
+        with patch.object(app_helpers, "redis_client", mock_redis), patch.object(
+            app_helpers, "purge_cache_tags"
+        ) as purge:
             CacheInvalidator.invalidate_sop()
-        assert mock_redis.scan_iter.call_count == 1  # sop_list
-        mock_redis.delete.assert_called_once()
+        mock_redis.incr.assert_called_once_with("cache_gen:sop")
+        purge.assert_not_called()
 
     def test_invalidate_sop_with_id(self):
         mock_redis = MagicMock()
-        mock_redis.scan_iter.return_value = []
-        with patch.object(app_helpers, "redis_client", mock_redis):
+        with patch.object(app_helpers, "redis_client", mock_redis), patch.object(
+            app_helpers, "purge_cache_tags"
+        ) as purge:
             CacheInvalidator.invalidate_sop(sop_id="10")
-        # sop_list, sop_related:10:*
-        assert mock_redis.scan_iter.call_count == 2
+        mock_redis.incr.assert_called_once_with("cache_gen:sop")
+        purge.assert_called_once_with("sop:10")
 
     def test_invalidate_sop_exception(self):
         mock_redis = MagicMock()
-        mock_redis.scan_iter.side_effect = ValueError("bad")
+        mock_redis.incr.side_effect = ValueError("bad")
         with patch.object(app_helpers, "redis_client", mock_redis):
             CacheInvalidator.invalidate_sop()
 
@@ -228,57 +236,123 @@ class TestFlushAccessLogs:
     def test_flush_empty_queue_returns_immediately(self):
         """キューが空なら何もしない"""
         app_helpers._access_log_queue = []
-        with patch.object(app_helpers, "load_data") as mock_load:
+        with patch.object(app_helpers, "get_audit_log_store") as mock_store:
             _flush_access_logs()
-            mock_load.assert_not_called()
-
-    def test_flush_writes_entries_to_file(self):
-        """キューにエントリがある場合、load_data→save_dataが呼ばれる"""
-        entries = [
-            {"user_id": 1, "action": "login"},
-            {"user_id": 2, "action": "view"},
+            mock_store.assert_not_called()
+
+    def test_flush_writes_entries_to_store(self, tmp_path, monkeypatch):
+        """キューにエントリがある場合、監査ログストアに追記され連番IDが付く"""
+        monkeypatch.setenv("MKS_DATA_DIR", str(tmp_path))
+        (tmp_path / "access_logs.json").write_text(
+            json.dumps([{"id": 1, "action": "old"}]), encoding="utf-8"
+        )
+        app_helpers._access_log_queue = [
+            (str(tmp_path), {"user_id": 1, "action": "login"}),
+            (str(tmp_path), {"user_id": 2, "action": "view"}),
         ]
-        app_helpers._access_log_queue = entries[:]
-        existing_logs = [{"id": 1, "action": "old"}]
 
-        with patch.object(app_helpers, "load_data", return_value=existing_logs[:]) as mock_load, \
-             patch.object(app_helpers, "save_data") as mock_save:
-            _flush_access_logs()
+        _flush_access_logs()
 
-            mock_load.assert_called_once_with("access_logs.json")
-            mock_save.assert_called_once()
-            saved_data = mock_save.call_args[0][1]
-            # existing 1 + 2 new entries = 3
-            assert len(saved_data) == 3
-            # IDs should be sequential: existing has 1, new get 2 and 3
-            assert saved_data[1]["id"] == 2
-            assert saved_data[2]["id"] == 3
+        saved = load_data("access_logs.json")
+        # existing 1 + 2 new entries = 3
+        assert len(saved) == 3
+        # IDs should be sequential: existing has 1, new get 2 and 3
+        assert saved[1]["id"] == 2
+        assert saved[2]["id"] == 3
 
         # Queue should be cleared after flush
         assert app_helpers._access_log_queue == []
 
+    def test_flush_groups_by_data_dir(self, tmp_path):
+        """データディレクトリごとに書き分けられる"""
+        dir_a = tmp_path / "a"
+        dir_b = tmp_path / "b"
+        app_helpers._access_log_queue = [
+            (str(dir_a), {"action": "a1"}),
+            (str(dir_b), {"action": "b1"}),
+            (str(dir_a), {"action": "a2"}),
+        ]
+
+        _flush_access_logs()
+
+        from services.audit_log_store import get_audit_log_store
+
+        assert [l["action"] for l in get_audit_log_store(str(dir_a)).read_all()] == ["a1", "a2"]
+        assert [l["action"] for l in get_audit_log_store(str(dir_b)).read_all()] == ["b1"]
+
+    def test_flush_splits_into_batches(self):
+        """AUDIT_LOG_BATCH_SIZE 件ごとに append_many される"""
+        app_helpers._access_log_queue = [("/tmp/x", {"action": str(i)}) for i in range(5)]
+        mock_store = MagicMock()
+        with patch.object(app_helpers, "AUDIT_LOG_BATCH_SIZE", 2), \
+             patch.object(app_helpers, "get_audit_log_store", return_value=mock_store):
+            _flush_access_logs()
+        assert [len(c.args[0]) for c in mock_store.append_many.call_args_list] == [2, 2, 1]
+
     def test_flush_clears_queue_before_write(self):
         """フラッシュ後にキューが空であることを確認"""
-        app_helpers._access_log_queue = [{"user_id": 1, "action": "test"}]
-        with patch.object(app_helpers, "load_data", return_value=[]), \
-             patch.object(app_helpers, "save_data"):
+        app_helpers._access_log_queue = [("/tmp/x", {"user_id": 1, "action": "test"})]
+        with patch.object(app_helpers, "get_audit_log_store"):
             _flush_access_logs()
         assert app_helpers._access_log_queue == []
 
     def test_flush_exception_does_not_crash(self):
-        """save_data例外時にクラッシュしない"""
-        app_helpers._access_log_queue = [{"user_id": 1, "action": "test"}]
-        with patch.object(app_helpers, "load_data", side_effect=IOError("disk full")):
+        """ストア取得時の例外でクラッシュしない"""
+        app_helpers._access_log_queue = [("/tmp/x", {"user_id": 1, "action": "test"})]
+        with patch.object(
+            app_helpers, "get_audit_log_store", side_effect=IOError("disk full")
+        ):
             _flush_access_logs()  # should not raise
 
-    def test_flush_exception_from_save_data(self):
-        """save_data がExceptionを投げた場合"""
-        app_helpers._access_log_queue = [{"user_id": 1, "action": "test"}]
-        with patch.object(app_helpers, "load_data", return_value=[]), \
-             patch.object(app_helpers, "save_data", side_effect=PermissionError("denied")):
+    def test_flush_exception_from_append(self):
+        """append_many がExceptionを投げた場合"""
+        app_helpers._access_log_queue = [("/tmp/x", {"user_id": 1, "action": "test"})]
+        mock_store = MagicMock()
+        mock_store.append_many.side_effect = PermissionError("denied")
+        with patch.object(app_helpers, "get_audit_log_store", return_value=mock_store):
             _flush_access_logs()  # should not raise
 
 
+class TestEnqueueAccessLog:
+    """_enqueue_access_log() のバックプレッシャーと非同期モード"""
+
+    def setup_method(self):
+        app_helpers._access_log_queue = []
+
+    def teardown_method(self):
+        app_helpers.shutdown_audit_log_writer()
+
+    def test_overflow_drops_entry(self, tmp_path, monkeypatch):
+        """キュー満杯時はエントリを破棄しカウンタを増やす"""
+        monkeypatch.setenv("MKS_DATA_DIR", str(tmp_path))
+        app_helpers._access_log_queue = [(str(tmp_path), {"action": "queued"})]
+        mock_dropped = MagicMock()
+        with patch.object(app_helpers, "AUDIT_LOG_QUEUE_MAX", 1), \
+             patch.object(app_helpers, "AUDIT_LOG_DROPPED", mock_dropped), \
+             patch.object(app_helpers, "_flush_access_logs") as mock_flush:
+            app_helpers._enqueue_access_log({"action": "dropped"})
+        mock_dropped.labels.assert_called_once_with(reason="overflow")
+        mock_flush.assert_not_called()
+        assert len(app_helpers._access_log_queue) == 1
+
+    def test_sync_mode_flushes_immediately(self, tmp_path, monkeypatch):
+        """pytest 実行中は同期的に書き込まれる"""
+        monkeypatch.setenv("MKS_DATA_DIR", str(tmp_path))
+        app_helpers._enqueue_access_log({"action": "sync"})
+        assert [l["action"] for l in load_data("access_logs.json")] == ["sync"]
+
+    def test_async_mode_uses_writer(self, tmp_path, monkeypatch):
+        """非同期モードではワーカーが書き込み、停止時にキューを書き出す"""
+        monkeypatch.setenv("MKS_DATA_DIR", str(tmp_path))
+        with patch.object(app_helpers, "_audit_log_async_enabled", return_value=True), \
+             patch.object(app_helpers, "AUDIT_LOG_FLUSH_INTERVAL", 60):
+            app_helpers._enqueue_access_log({"action": "async"})
+            assert app_helpers._audit_log_writer.is_alive()
+            app_helpers.shutdown_audit_log_writer()
+        assert app_helpers._audit_log_writer is None
+        assert [l["action"] for l in load_data("access_logs.json")] == ["async"]
+
+
 # ============================================================
 # 3. load_data PostgreSQL パス テスト
 # ============================================================
@@ -0,0 +1,181 @@
+"""services/audit_log_store.py のユニットテスト"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from services.audit_log_store import AuditLogStore, iter_filtered
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = AuditLogStore(str(tmp_path))
+    yield s
+    s.close()
+
+
+def _segments(tmp_path):
+    return sorted(os.listdir(tmp_path / "access_logs.d"))
+
+
+class TestAppend:
+    def test_assigns_monotonic_ids(self, store):
+        first = store.append({"action": "login"})
+        second = store.append({"action": "view"})
+        assert first["id"] == 1
+        assert second["id"] == 2
+
+    def test_append_many_single_batch(self, store):
+        result = store.append_many([{"action": "a"}, {"action": "b"}, {"action": "c"}])
+        assert [r["id"] for r in result] == [1, 2, 3]
+        assert [r["action"] for r in store.iter_records()] == ["a", "b", "c"]
+
+    def test_append_many_empty(self, store):
+        assert store.append_many([]) == []
+
+    def test_counter_shared_between_instances(self, tmp_path, store):
+        store.append({"action": "a"})
+        other = AuditLogStore(str(tmp_path))
+        try:
+            assert other.append({"action": "b"})["id"] == 2
+        finally:
+            other.close()
+        assert store.append({"action": "c"})["id"] == 3
+        assert store.count() == 3
+
+    def test_counter_seeded_from_legacy_file(self, tmp_path):
+        (tmp_path / "access_logs.json").write_text(
+            json.dumps([{"id": 5, "action": "old"}]), encoding="utf-8"
+        )
+        s = AuditLogStore(str(tmp_path))
+        try:
+            assert s.append({"action": "new"})["id"] == 6
+        finally:
+            s.close()
+
+
+class TestRollover:
+    def test_size_based_rollover(self, tmp_path):
+        s = AuditLogStore(str(tmp_path), max_segment_bytes=1)
+        try:
+            for i in range(3):
+                s.append({"action": f"a{i}"})
+            assert len([n for n in _segments(tmp_path) if n.endswith(".jsonl")]) == 3
+            assert [r["id"] for r in s.iter_records()] == [1, 2, 3]
+        finally:
+            s.close()
+
+    def test_age_based_rollover(self, tmp_path):
+        s = AuditLogStore(str(tmp_path), max_segment_age=0)
+        try:
+            s.append({"action": "a"})
+            s.append({"action": "b"})
+            assert len([n for n in _segments(tmp_path) if n.endswith(".jsonl")]) == 2
+        finally:
+            s.close()
+
+    def test_no_rollover_within_limits(self, store, tmp_path):
+        for i in range(10):
+            store.append({"action": f"a{i}"})
+        assert len([n for n in _segments(tmp_path) if n.endswith(".jsonl")]) == 1
+
+
+class TestRead:
+    def test_empty_store(self, store):
+        assert store.read_all() == []
+        assert store.count() == 0
+
+    def test_legacy_records_come_first(self, tmp_path, store):
+        store.append({"action": "new"})
+        (tmp_path / "access_logs.json").write_text(
+            json.dumps([{"id": 1, "action": "old"}, "not-a-dict"]), encoding="utf-8"
+        )
+        assert [r["action"] for r in store.iter_records()] == ["old", "new"]
+
+    def test_torn_line_is_skipped(self, tmp_path, store):
+        store.append({"action": "ok"})
+        store.flush()
+        segment = tmp_path / "access_logs.d" / _segments(tmp_path)[0]
+        with open(segment, "a", encoding="utf-8") as f:
+            f.write('{"action": "tor')
+        assert [r["action"] for r in store.iter_records()] == ["ok"]
+
+    def test_append_after_torn_line_starts_new_line(self, tmp_path, store):
+        store.append({"action": "ok"})
+        store.flush()
+        segment = tmp_path / "access_logs.d" / [
+            n for n in _segments(tmp_path) if n.endswith(".jsonl")
+        ][0]
+        with open(segment, "a", encoding="utf-8") as f:
+            f.write('{"action": "tor')
+        store.append({"action": "next"})
+        assert [r["action"] for r in store.iter_records()] == ["ok", "next"]
+
+    def test_next_id_recovered_from_segment_tail(self, tmp_path, store):
+        store.append_many([{"action": "a"}, {"action": "b"}])
+        store.close()
+        # サイドカーがデータより古い状態（書き込み後・状態更新前のクラッシュ）
+        state_path = tmp_path / "access_logs.d" / "state.json"
+        state = json.loads(state_path.read_text(encoding="utf-8"))
+        state["next_id"] = 1
+        state_path.write_text(json.dumps(state), encoding="utf-8")
+
+        reopened = AuditLogStore(str(tmp_path))
+        try:
+            assert reopened.append({"action": "c"})["id"] == 3
+        finally:
+            reopened.close()
+        ids = [r["id"] for r in store.iter_records()]
+        assert ids == [1, 2, 3]
+
+    def test_iter_filtered_ignores_none_conditions(self):
+        records = [{"user_id": 1, "action": "a"}, {"user_id": 2, "action": "a"}]
+        assert len(list(iter_filtered(records, user_id=None, action="a"))) == 2
+        assert len(list(iter_filtered(records, user_id=2))) == 1
+
+
+class TestIterSince:
+    def test_reads_only_appended_records(self, tmp_path):
+        store = AuditLogStore(str(tmp_path), max_segment_bytes=60)
+        try:
+            (tmp_path / "access_logs.json").write_text(
+                json.dumps([{"id": 1, "action": "old"}]), encoding="utf-8"
+            )
+            store.append({"action": "a"})
+            cursor = store.new_cursor()
+            assert [r["action"] for r in store.iter_since(cursor)] == ["old", "a"]
+            assert list(store.iter_since(cursor)) == []
+
+            # ロールオーバーをまたいでも続きから読む
+            for action in ["b", "c", "d"]:
+                store.append({"action": action})
+            assert len([n for n in _segments(tmp_path) if n.endswith(".jsonl")]) > 1
+            assert store.cursor_valid(cursor)
+            assert [r["action"] for r in store.iter_since(cursor)] == ["b", "c", "d"]
+        finally:
+            store.close()
+
+    def test_torn_line_is_read_after_completion(self, tmp_path, store):
+        store.append({"action": "ok"})
+        store.flush()
+        cursor = store.new_cursor()
+        segment = tmp_path / "access_logs.d" / [
+            n for n in _segments(tmp_path) if n.endswith(".jsonl")
+        ][0]
+        with open(segment, "a", encoding="utf-8") as f:
+            f.write('{"action": "tor')
+        assert [r["action"] for r in store.iter_since(cursor)] == ["ok"]
+        with open(segment, "a", encoding="utf-8") as f:
+            f.write('n"}\n')
+        assert [r["action"] for r in store.iter_since(cursor)] == ["torn"]
+
+    def test_cursor_invalidated_by_legacy_rewrite(self, tmp_path, store):
+        store.append({"action": "a"})
+        cursor = store.new_cursor()
+        list(store.iter_since(cursor))
+        (tmp_path / "access_logs.json").write_text("[]", encoding="utf-8")
+        assert not store.cursor_valid(cursor)
@@ -0,0 +1,64 @@
+"""services/audit_log_writer.py のユニットテスト"""
+
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from services.audit_log_writer import AuditLogWriter
+
+
+class TestAuditLogWriter:
+    def test_notify_triggers_flush(self):
+        flushed = threading.Event()
+        writer = AuditLogWriter(flushed.set, flush_interval=60)
+        writer.start()
+        try:
+            writer.notify()
+            assert flushed.wait(2)
+        finally:
+            writer.stop()
+
+    def test_periodic_flush(self):
+        calls = []
+        done = threading.Event()
+
+        def flush():
+            calls.append(1)
+            if len(calls) >= 2:
+                done.set()
+
+        writer = AuditLogWriter(flush, flush_interval=0.01)
+        writer.start()
+        try:
+            assert done.wait(2)
+        finally:
+            writer.stop()
+
+    def test_stop_performs_final_flush(self):
+        calls = []
+        writer = AuditLogWriter(lambda: calls.append(1), flush_interval=60)
+        writer.start()
+        writer.stop()
+        assert not writer.is_alive()
+        assert calls
+
+    def test_flush_exception_is_swallowed(self):
+        def boom():
+            raise IOError("disk full")
+
+        writer = AuditLogWriter(boom, flush_interval=60)
+        writer.start()
+        writer.stop()  # should not raise
+        assert not writer.is_alive()
+
+    def test_not_alive_after_fork(self):
+        writer = AuditLogWriter(lambda: None, flush_interval=60)
+        writer.start()
+        try:
+            writer.pid = -1  # 別プロセスで生成されたワーカーを模擬
+            assert not writer.is_alive()
+        finally:
+            writer.pid = os.getpid()
+            writer.stop()
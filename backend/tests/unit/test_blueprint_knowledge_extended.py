@@ -230,6 +230,18 @@ class TestGetKnowledgeTags:
         resp = client.get("/api/v1/knowledge/tags", headers=partner_auth_headers)
         assert resp.status_code == 200
 
+    def test_tags_served_from_cache(self, client, auth_headers):
+        """キャッシュヒット時はタグ集計を参照しない"""
+        from unittest.mock import patch
+
+        cached = {"success": True, "data": [{"name": "cached", "count": 1, "size": 1}]}
+        with patch("blueprints.knowledge.cache_get", return_value=cached), patch(
+            "blueprints.knowledge.get_knowledge_facets",
+            side_effect=AssertionError("facets read"),
+        ):
+            resp = client.get("/api/v1/knowledge/tags", headers=auth_headers)
+        assert resp.get_json() == cached
+
 
 # ============================================================
 # GET /api/v1/knowledge/<id>/related
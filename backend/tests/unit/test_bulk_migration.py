@@ -0,0 +1,199 @@
+"""JSON→PostgreSQL 一括移行エンジンのテスト
+
+- JSON 配列のストリーミングパース（フォールバック実装）
+- COPY テキスト形式のエンコード
+- チャンク単位のロード・チェックポイントからの再開・失敗時の扱い
+- 件数/チェックサム集計
+"""
+
+import json
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from services import json_stream
+from services.bulk_migration import (
+    BulkMigrator,
+    MigrationCheckpoint,
+    TableSpec,
+    aggregates_sql,
+    copy_line,
+    json_aggregates,
+    row_checksum,
+)
+
+
+@pytest.fixture
+def no_ijson(monkeypatch):
+    monkeypatch.setattr(json_stream, "IJSON_AVAILABLE", False)
+    monkeypatch.setattr(json_stream, "READ_CHARS", 7)
+
+
+class TestIterJsonArray:
+    def test_streams_items_across_small_reads(self, tmp_path, no_ijson):
+        items = [{"id": i, "title": f"配管 {i}", "tags": ["a", "b"]} for i in range(20)] + [12345, "x, ]"]
+        path = tmp_path / "items.json"
+        path.write_text(json.dumps(items, ensure_ascii=False, indent=2), encoding="utf-8")
+        assert list(json_stream.iter_json_array(str(path))) == items
+
+    def test_empty_missing_and_invalid(self, tmp_path, no_ijson):
+        (tmp_path / "empty.json").write_text(" [ ] ", encoding="utf-8")
+        (tmp_path / "object.json").write_text('{"a": 1}', encoding="utf-8")
+        (tmp_path / "broken.json").write_text('[{"id": 1}, {"id": ', encoding="utf-8")
+
+        assert list(json_stream.iter_json_array(str(tmp_path / "empty.json"))) == []
+        assert list(json_stream.iter_json_array(str(tmp_path / "missing.json"))) == []
+        with pytest.raises(ValueError):
+            list(json_stream.iter_json_array(str(tmp_path / "object.json")))
+        broken = json_stream.iter_json_array(str(tmp_path / "broken.json"))
+        assert next(broken) == {"id": 1}
+        with pytest.raises(ValueError):
+            next(broken)
+
+    def test_chunked(self):
+        assert list(json_stream.chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_copy_line_escapes_text_arrays_and_nulls():
+    line = copy_line([1, "a\tb\\c\nd", ['x"y', None, "p,q"], None, True, {"k": "v"}])
+    assert line == '1\ta\\tb\\\\c\\nd\t{"x\\\\"y",NULL,"p,q"}\t\\N\tt\t{"k": "v"}\n'
+
+
+def _spec(records, **kwargs):
+    return TableSpec(
+        name="knowledge",
+        table="public.knowledge",
+        columns=("id", "title"),
+        source=lambda: iter(records),
+        transform=lambda item: None if item.get("skip") else (item["id"], item["title"]),
+        update_columns=("title",),
+        sequence="public.knowledge_id_seq",
+        **kwargs,
+    )
+
+
+class FakeEngine:
+    """copy_expert に渡された内容と実行 SQL を記録する DBAPI 接続のスタンドイン"""
+
+    def __init__(self, fail_on_copy=None):
+        self.copied = []
+        self.executed = []
+        self.commits = 0
+        self.fail_on_copy = fail_on_copy
+
+    def raw_connection(self):
+        conn = MagicMock()
+        cursor = conn.cursor.return_value
+
+        def copy_expert(sql, buffer):
+            if self.fail_on_copy is not None and len(self.copied) == self.fail_on_copy:
+                raise RuntimeError("connection lost")
+            self.copied.append((sql, buffer.read()))
+
+        def commit():
+            self.commits += 1
+
+        cursor.copy_expert.side_effect = copy_expert
+        cursor.execute.side_effect = lambda sql: self.executed.append(sql)
+        conn.commit.side_effect = commit
+        return conn
+
+
+RECORDS = [{"id": i, "title": f"t{i}"} for i in range(1, 6)]
+
+
+class TestBulkMigrator:
+    def test_copies_chunks_into_stage_and_upserts(self, tmp_path):
+        engine = FakeEngine()
+        checkpoint = MigrationCheckpoint(str(tmp_path / "checkpoint.json"))
+        records = RECORDS + [{"id": 9, "skip": True}]
+        migrated = BulkMigrator(engine, checkpoint, chunk_size=2, out=lambda _: None).run_table(_spec(records))
+
+        assert migrated == 6
+        assert [sql for sql, _ in engine.copied] == ["COPY _migrate_knowledge (id, title) FROM STDIN"] * 3
+        assert "".join(data for _, data in engine.copied) == "".join(f"{i}\tt{i}\n" for i in range(1, 6))
+        assert any(
+            "INSERT INTO public.knowledge (id, title) SELECT id, title FROM _migrate_knowledge "
+            "ON CONFLICT (id) DO UPDATE SET title = EXCLUDED.title" in sql
+            for sql in engine.executed
+        )
+        assert any("setval('public.knowledge_id_seq'" in sql for sql in engine.executed)
+        saved = json.loads((tmp_path / "checkpoint.json").read_text(encoding="utf-8"))
+        assert saved == {"knowledge": {"rows": 6, "done": True}}
+
+    def test_resumes_after_failure_from_checkpoint(self, tmp_path):
+        path = str(tmp_path / "checkpoint.json")
+        failing = FakeEngine(fail_on_copy=1)
+        with pytest.raises(RuntimeError):
+            BulkMigrator(failing, MigrationCheckpoint(path), chunk_size=2, out=lambda _: None).run_table(
+                _spec(RECORDS)
+            )
+        assert MigrationCheckpoint(path).get("knowledge") == {"rows": 2, "done": False}
+
+        engine = FakeEngine()
+        migrator = BulkMigrator(engine, MigrationCheckpoint(path), chunk_size=2, out=lambda _: None)
+        assert migrator.run_table(_spec(RECORDS)) == 3
+        assert "".join(data for _, data in engine.copied) == "3\tt3\n4\tt4\n5\tt5\n"
+
+        assert migrator.run_table(_spec(RECORDS)) == 0
+        assert len(engine.copied) == 2
+
+    def test_append_only_table_copies_directly(self):
+        engine = FakeEngine()
+        spec = _spec(RECORDS, conflict_key=None)
+        BulkMigrator(engine, chunk_size=10, out=lambda _: None).run_table(spec)
+        assert engine.copied[0][0] == "COPY public.knowledge (id, title) FROM STDIN"
+        assert not any("_migrate_" in sql for sql in engine.executed)
+
+    def test_run_migrates_tables_in_parallel_and_reports_errors(self):
+        engine = FakeEngine()
+        ok = _spec(RECORDS)
+        broken = TableSpec("broken", "public.sop", ("id",), lambda: iter([{}]), lambda item: (item["id"],))
+        migrator = BulkMigrator(engine, workers=2, out=lambda _: None)
+
+        assert migrator.run([ok]) == {"knowledge": 5}
+        with pytest.raises(KeyError):
+            migrator.run([ok, broken])
+
+    def test_dry_run_does_not_connect(self):
+        engine = MagicMock()
+        assert BulkMigrator(engine, dry_run=True, out=lambda _: None).run_table(_spec(RECORDS)) == 5
+        engine.raw_connection.assert_not_called()
+
+    def test_executemany_fallback_without_copy(self):
+        conn = MagicMock()
+        conn.cursor.return_value = MagicMock(spec=["executemany", "execute", "close"])
+        engine = MagicMock()
+        engine.raw_connection.return_value = conn
+        BulkMigrator(engine, out=lambda _: None).run_table(_spec(RECORDS))
+
+        sql, params = conn.cursor.return_value.executemany.call_args.args
+        assert sql.startswith("INSERT INTO public.knowledge (id, title) VALUES (%s, %s) ON CONFLICT (id)")
+        assert params[0] == (1, "t1")
+
+
+class TestAggregates:
+    def test_checksum_is_order_independent(self):
+        forward = json_aggregates(RECORDS, "title")
+        assert forward == json_aggregates(list(reversed(RECORDS)), "title")
+        assert forward["count"] == 5
+        assert (forward["min_id"], forward["max_id"]) == (1, 5)
+        assert forward["checksum"] == sum(row_checksum(r["id"], r["title"]) for r in RECORDS)
+        assert forward["checksum"] != json_aggregates(RECORDS[:4] + [{"id": 5, "title": "x"}], "title")["checksum"]
+
+    def test_sql_uses_same_definition(self):
+        sql = aggregates_sql("public.knowledge", "title")
+        assert "MD5(id::text || '|' || COALESCE(title::text, ''))" in sql
+        assert "::bit(32)::bigint" in sql
+        assert "WHERE id BETWEEN :min_id AND :max_id" in sql
+        assert "MD5(id::text || '|' || '')" in aggregates_sql("public.experts", None)
+
+    def test_checksum_matches_postgres_md5_prefix(self):
+        with patch("hashlib.md5") as md5:
+            md5.return_value.hexdigest.return_value = "ffffffff" + "0" * 24
+            assert row_checksum(1, "a") == 0xFFFFFFFF
+        md5.assert_called_once_with("1|a".encode("utf-8"))
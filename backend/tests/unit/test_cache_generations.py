@@ -0,0 +1,123 @@
+"""世代番号・タグによるキャッシュ無効化のテスト
+
+- 複数ファミリーに依存するキー（search / dashboard_stats）はどのファミリーの更新でも変わること
+- 無効化は INCR のみでキー走査をしないこと
+- タグ付きキーはタグ単位でバックグラウンド削除され、他のキーは残ること
+"""
+
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import app_helpers
+from app_helpers import CacheInvalidator, cache_get, cache_set, get_cache_key, purge_cache_tags
+
+
+class FakeRedis:
+    """テストで使う Redis コマンドだけを持つインメモリ実装"""
+
+    def __init__(self):
+        self.data = {}
+        self.scans = 0
+
+    def get(self, key):
+        value = self.data.get(key)
+        return value.encode() if isinstance(value, str) else value
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+
+    def sadd(self, key, member):
+        self.data.setdefault(key, set()).add(member.encode())
+
+    def smembers(self, key):
+        return set(self.data.get(key, set()))
+
+    def expire(self, key, ttl):
+        pass
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key.decode() if isinstance(key, bytes) else key, None)
+
+    def scan_iter(self, pattern):
+        self.scans += 1
+        return iter(())
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args):
+            self.commands.append((name, args))
+            return self
+
+        return queue
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args) for name, args in self.commands]
+
+
+@pytest.fixture
+def redis():
+    fake = FakeRedis()
+    with patch.object(app_helpers, "redis_client", fake), patch.object(app_helpers, "CACHE_ENABLED", True):
+        yield fake
+
+
+def test_multi_family_key_changes_with_any_family(redis):
+    before = get_cache_key("search", "配管")
+    assert before == "search:配管"
+
+    CacheInvalidator.invalidate_sop()
+    after_sop = get_cache_key("search", "配管")
+    CacheInvalidator.invalidate_knowledge()
+    after_knowledge = get_cache_key("search", "配管")
+
+    assert after_sop == "search@0.1.0:配管"
+    assert after_knowledge == "search@1.1.0:配管"
+    assert get_cache_key("knowledge_search", "配管", 1, 20) == "knowledge_search@1:配管:1:20"
+    assert redis.scans == 0
+
+
+def test_invalidated_entries_are_no_longer_read(redis):
+    key = get_cache_key("projects_list", None, None)
+    cache_set(key, {"data": [1]})
+    assert cache_get(get_cache_key("projects_list", None, None)) == {"data": [1]}
+
+    CacheInvalidator.invalidate_projects()
+    assert cache_get(get_cache_key("projects_list", None, None)) is None
+
+
+def test_tag_purge_deletes_only_tagged_keys(redis):
+    cache_set("projects_detail:7", {"id": 7}, tags=("projects:7",))
+    cache_set("projects_detail:8", {"id": 8}, tags=("projects:8",))
+
+    CacheInvalidator.invalidate_projects(project_id=7)
+    app_helpers._cache_purge_pool.submit(lambda: None).result(timeout=5)
+
+    assert cache_get("projects_detail:7") is None
+    assert cache_get("projects_detail:8") == {"id": 8}
+    assert "cache_tag:projects:7" not in redis.data
+    assert redis.scans == 0
+
+
+def test_purge_is_noop_without_redis():
+    with patch.object(app_helpers, "redis_client", None):
+        assert purge_cache_tags("projects:1") is None
@@ -21,6 +21,7 @@ BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
 sys.path.insert(0, BACKEND_DIR)
 
 from dal import DataAccessLayer
+from services.audit_log_store import get_audit_log_store
 
 
 # ============================================================
@@ -1186,11 +1187,11 @@ class TestLogsMixin:
         assert result["id"] == 11
 
     def test_create_access_log_persists(self, tmp_path):
-        """作成ログがJSONに永続化される"""
+        """作成ログが監査ログストアに永続化される"""
         write_json(tmp_path, "access_logs.json", [])
         dal = make_dal(tmp_path)
         dal.create_access_log({"action": "create", "resource": "knowledge"})
-        saved = json.loads((tmp_path / "access_logs.json").read_text(encoding="utf-8"))
+        saved = get_audit_log_store(str(tmp_path)).read_all()
         assert len(saved) == 1
         assert saved[0]["action"] == "create"
 
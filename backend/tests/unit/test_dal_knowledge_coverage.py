@@ -475,17 +475,22 @@ class TestGetKnowledgeListPostgresql:
     def test_returns_list_from_db(self):
         from unittest.mock import MagicMock, patch
 
+        from datetime import datetime
+
         dal = DataAccessLayer(use_postgresql=True)
-        mock_k = _make_mock_knowledge()
-        mock_session = _make_fluent_mock_session(return_value=[mock_k])
+        mock_session = MagicMock()
+        mock_session.execute.return_value.mappings.return_value = [
+            {"id": 1, "title": "a", "tags": None, "updated_at": datetime(2026, 1, 2, 3, 4, 5)}
+        ]
         mock_factory = MagicMock(return_value=mock_session)
 
         with patch.object(dal, "_use_postgresql", return_value=True), patch(
             "dal.knowledge.get_session_factory", return_value=mock_factory
         ):
             result = dal.get_knowledge_list()
-        assert len(result) == 1
-        assert result[0]["id"] == 1
+        assert result == [{"id": 1, "title": "a", "tags": [], "updated_at": "2026-01-02T03:04:05"}]
+        mock_session.query.assert_not_called()
+        mock_session.close.assert_called_once()
 
     def test_filter_by_category_pg(self):
         from unittest.mock import MagicMock, patch
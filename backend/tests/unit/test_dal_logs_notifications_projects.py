@@ -8,6 +8,8 @@ import pytest
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
+from services.audit_log_store import get_audit_log_store
+
 
 @pytest.fixture
 def dal(tmp_path):
@@ -132,7 +134,7 @@ class TestCreateAccessLog:
     def test_persists_to_json(self, dal, tmp_path):
         write_logs(tmp_path, [])
         dal.create_access_log({"action": "test", "user_id": 1, "username": "u"})
-        saved = json.loads((tmp_path / "access_logs.json").read_text(encoding="utf-8"))
+        saved = get_audit_log_store(str(tmp_path)).read_all()
         assert len(saved) == 1
         assert saved[0]["action"] == "test"
 
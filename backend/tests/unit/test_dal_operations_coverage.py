@@ -696,6 +696,15 @@ def _fluent_session(terminal="all", return_value=None):
     return session
 
 
+def _core_session(rows):
+    """Core の select（session.execute(...).mappings()）が rows を返すセッション"""
+    from unittest.mock import MagicMock
+
+    session = MagicMock()
+    session.execute.return_value.mappings.return_value = rows
+    return session
+
+
 class TestGetSopListPostgresql:
     def test_no_factory_returns_empty(self):
         from unittest.mock import patch
@@ -713,27 +722,29 @@ class TestGetSopListPostgresql:
         from dal import DataAccessLayer
 
         dal = DataAccessLayer(use_postgresql=True)
-        mock_sop = MagicMock()
-        mock_sop.id = 1
-        mock_sop.title = "テストSOP"
-        mock_sop.category = "施工"
-        mock_sop.version = "1.0"
-        mock_sop.revision_date = None
-        mock_sop.target = "全員"
-        mock_sop.tags = []
-        mock_sop.content = "内容"
-        mock_sop.status = "active"
-        mock_sop.supersedes_id = None
-        mock_sop.attachments = []
-        mock_sop.created_at = None
-        mock_sop.updated_at = None
-        mock_sop.created_by_id = 1
-        mock_sop.updated_by_id = None
-        mock_session = _fluent_session(return_value=[mock_sop])
+        row = {
+            "id": 1,
+            "title": "テストSOP",
+            "category": "施工",
+            "version": "1.0",
+            "revision_date": None,
+            "target": "全員",
+            "tags": [],
+            "content": "内容",
+            "status": "active",
+            "supersedes_id": None,
+            "attachments": [],
+            "created_at": None,
+            "updated_at": None,
+            "created_by_id": 1,
+            "updated_by_id": None,
+        }
+        mock_session = _core_session([row])
         mock_factory = MagicMock(return_value=mock_session)
         with patch.object(dal, "_use_postgresql", return_value=True), patch("dal.operations.get_session_factory", return_value=mock_factory):
             result = dal.get_sop_list()
         assert len(result) == 1
+        assert result[0]["title"] == "テストSOP"
 
     def test_filter_by_category_pg(self):
         from unittest.mock import MagicMock, patch
@@ -789,27 +800,29 @@ class TestGetIncidentsListPostgresql:
         from dal import DataAccessLayer
 
         dal = DataAccessLayer(use_postgresql=True)
-        mock_i = MagicMock()
-        mock_i.id = 1
-        mock_i.title = "転落事故"
-        mock_i.description = "詳細"
-        mock_i.project = "ProjectA"
-        mock_i.incident_date = None
-        mock_i.severity = "high"
-        mock_i.status = "open"
-        mock_i.corrective_actions = None
-        mock_i.root_cause = None
-        mock_i.tags = []
-        mock_i.location = "現場"
-        mock_i.involved_parties = []
-        mock_i.created_at = None
-        mock_i.updated_at = None
-        mock_i.reporter_id = 1
-        mock_session = _fluent_session(return_value=[mock_i])
+        row = {
+            "id": 1,
+            "title": "転落事故",
+            "description": "詳細",
+            "project": "ProjectA",
+            "incident_date": None,
+            "severity": "high",
+            "status": "open",
+            "corrective_actions": None,
+            "root_cause": None,
+            "tags": [],
+            "location": "現場",
+            "involved_parties": None,
+            "created_at": None,
+            "updated_at": None,
+            "reporter_id": 1,
+        }
+        mock_session = _core_session([row])
         mock_factory = MagicMock(return_value=mock_session)
         with patch.object(dal, "_use_postgresql", return_value=True), patch("dal.operations.get_session_factory", return_value=mock_factory):
             result = dal.get_incidents_list()
         assert len(result) == 1
+        assert result[0]["involved_parties"] == []
 
     def test_filter_pg(self):
         from unittest.mock import MagicMock, patch
@@ -867,26 +880,28 @@ class TestGetApprovalsListPostgresql:
         from dal import DataAccessLayer
 
         dal = DataAccessLayer(use_postgresql=True)
-        mock_a = MagicMock()
-        mock_a.id = 1
-        mock_a.title = "申請"
-        mock_a.type = "design_change"
-        mock_a.description = "詳細"
-        mock_a.requester_id = 2
-        mock_a.status = "pending"
-        mock_a.priority = "high"
-        mock_a.related_entity_type = None
-        mock_a.related_entity_id = None
-        mock_a.approval_flow = []
-        mock_a.created_at = None
-        mock_a.updated_at = None
-        mock_a.approved_at = None
-        mock_a.approver_id = None
-        mock_session = _fluent_session(return_value=[mock_a])
+        row = {
+            "id": 1,
+            "title": "申請",
+            "type": "design_change",
+            "description": "詳細",
+            "requester_id": 2,
+            "status": "pending",
+            "priority": "high",
+            "related_entity_type": None,
+            "related_entity_id": None,
+            "approval_flow": [],
+            "created_at": None,
+            "updated_at": None,
+            "approved_at": None,
+            "approver_id": None,
+        }
+        mock_session = _core_session([row])
         mock_factory = MagicMock(return_value=mock_session)
         with patch.object(dal, "_use_postgresql", return_value=True), patch("dal.operations.get_session_factory", return_value=mock_factory):
             result = dal.get_approvals_list()
         assert len(result) == 1
+        assert result[0]["status"] == "pending"
 
     def test_filter_pg(self):
         from unittest.mock import MagicMock, patch
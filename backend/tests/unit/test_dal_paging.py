@@ -0,0 +1,134 @@
+"""DAL の一覧ページング（get_*_page）のテスト
+
+- キーセットカーソルで全件を重複・欠落なく辿れること（同値は id 順）
+- 一致フィルタ・タグ・射影・オフセット
+- PostgreSQLモードで条件・ORDER BY・LIMIT をSQLに渡すこと
+- 一覧APIの per_page / cursor
+"""
+
+import json
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from sqlalchemy.dialects import postgresql
+
+from dal import DataAccessLayer
+from dal.base import decode_cursor, encode_cursor
+
+KNOWLEDGE = [
+    {"id": 1, "title": "a", "category": "safety", "tags": ["x"], "updated_at": "2026-01-02"},
+    {"id": 2, "title": "b", "category": "quality", "tags": ["y"], "updated_at": "2026-01-03"},
+    {"id": 3, "title": "c", "category": "safety", "tags": ["y"], "updated_at": "2026-01-02"},
+    {"id": 4, "title": "d", "category": "safety", "tags": [], "updated_at": None},
+    {"id": 5, "title": "e", "category": "safety", "tags": ["x", "y"], "updated_at": "2026-01-01"},
+]
+
+
+@pytest.fixture
+def dal(tmp_path):
+    (tmp_path / "knowledge.json").write_text(json.dumps(KNOWLEDGE), encoding="utf-8")
+    instance = DataAccessLayer(use_postgresql=False)
+    instance.data_dir = str(tmp_path)
+    return instance
+
+
+def _all_pages(dal, limit, **kwargs):
+    ids, cursor = [], None
+    while True:
+        items, cursor, total = dal.get_knowledge_page(limit=limit, cursor=cursor, **kwargs)
+        ids.extend(k["id"] for k in items)
+        if cursor is None:
+            return ids, total
+
+
+class TestJsonPaging:
+    def test_cursor_walks_sorted_order(self, dal):
+        assert _all_pages(dal, 2) == ([2, 3, 1, 5, 4], 5)
+        assert _all_pages(dal, 2, order="asc") == ([4, 5, 1, 3, 2], 5)
+
+    def test_filters_and_tags(self, dal):
+        assert _all_pages(dal, 1, filters={"category": "safety", "tags": ["y"]}) == ([3, 5], 2)
+
+    def test_offset_and_projection(self, dal):
+        items, cursor, total = dal.get_knowledge_page(limit=2, offset=1, fields=["title"])
+        assert items == [{"id": 3, "title": "c"}, {"id": 1, "title": "a"}]
+        assert decode_cursor(cursor) == ("2026-01-02", 1)
+        assert total == 5
+
+    def test_unknown_sort_falls_back_to_updated_at(self, dal):
+        items, _, _ = dal.get_knowledge_page(limit=1, sort="content")
+        assert items[0]["id"] == 2
+
+    def test_invalid_cursor(self, dal):
+        with pytest.raises(ValueError):
+            dal.get_knowledge_page(cursor="not-a-cursor")
+
+    def test_access_logs_page(self, tmp_path):
+        dal = DataAccessLayer(use_postgresql=False)
+        dal.data_dir = str(tmp_path)
+        for action in ["a", "b", "a", "a"]:
+            dal.create_access_log({"user_id": 1, "action": action})
+
+        first, cursor, total = dal.get_access_logs_page({"action": "a"}, limit=2)
+        rest, end, _ = dal.get_access_logs_page({"action": "a"}, limit=2, cursor=cursor)
+        assert total == 3
+        assert end is None
+        assert len({log["id"] for log in first + rest}) == 3
+
+
+class TestSqlPaging:
+    def test_keyset_condition_and_limit_in_sql(self):
+        dal = DataAccessLayer(use_postgresql=True)
+        session = MagicMock()
+        session.execute.return_value.scalars.return_value = []
+        session.execute.return_value.scalar.return_value = 0
+        with patch.object(dal, "_use_postgresql", return_value=True), patch(
+            "database.get_session_factory", return_value=lambda: session
+        ):
+            dal.get_sop_page(
+                {"category": "safety"}, limit=20, cursor=encode_cursor("2026-01-02T00:00:00", 7)
+            )
+
+        sql = str(
+            session.execute.call_args_list[0].args[0].compile(
+                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+            )
+        )
+        assert "public.sop.category = 'safety'" in sql
+        assert "public.sop.updated_at < '2026-01-02 00:00:00'" in sql
+        assert "ORDER BY public.sop.updated_at DESC NULLS LAST, public.sop.id DESC" in sql
+        assert "LIMIT 21" in sql
+
+
+class TestListEndpoints:
+    def test_knowledge_list_cursor(self, client, auth_headers, tmp_path):
+        (tmp_path / "knowledge.json").write_text(json.dumps(KNOWLEDGE), encoding="utf-8")
+        url = "/api/v1/knowledge?per_page=3&sort=updated_at"
+        first = client.get(url, headers=auth_headers).get_json()
+        cursor = first["pagination"]["next_cursor"]
+        second = client.get(f"{url}&cursor={cursor}", headers=auth_headers).get_json()
+
+        assert [k["id"] for k in first["data"]] == [2, 3, 1]
+        assert [k["id"] for k in second["data"]] == [5, 4]
+        assert second["pagination"]["next_cursor"] is None
+        assert first["pagination"]["total_items"] == 5
+
+    def test_sop_list_pages_only_when_requested(self, client, auth_headers, tmp_path):
+        sops = [{"id": i, "title": f"s{i}", "category": "c"} for i in range(1, 4)]
+        (tmp_path / "sop.json").write_text(json.dumps(sops), encoding="utf-8")
+
+        full = client.get("/api/v1/sop", headers=auth_headers).get_json()
+        page = client.get("/api/v1/sop?per_page=2", headers=auth_headers).get_json()
+        assert len(full["data"]) == 3
+        assert len(page["data"]) == 2
+        assert page["pagination"]["total_items"] == 3
+        assert page["pagination"]["next_cursor"]
+
+    def test_invalid_cursor_returns_400(self, client, auth_headers):
+        resp = client.get("/api/v1/incidents?cursor=%%%", headers=auth_headers)
+        assert resp.status_code == 400
@@ -33,10 +33,10 @@ class TestDashboardCacheHitPaths:
         """get_sop: 例外発生時にre-raiseする (lines 61-63)"""
         import blueprints.dashboard as mod
 
-        def raise_error(filename):
-            raise RuntimeError("test load_data error")
+        def raise_error(filename, **kwargs):
+            raise RuntimeError("test load_page error")
 
-        monkeypatch.setattr(mod, "load_data", raise_error)
+        monkeypatch.setattr(mod, "load_page", raise_error)
 
         resp = client.get("/api/v1/sop", headers=auth_headers)
         assert resp.status_code == 500
@@ -0,0 +1,150 @@
+"""services/interaction_matrix.py（協調フィルタリング用の閲覧行列）のテスト
+
+- 逐次計算（_find_similar_users）と同じ類似ユーザー・Jaccard係数
+- 対象期間・時間減衰・種別（knowledge / sop）の区別
+- 追記による増分更新と /recommendations/personalized からの利用
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from recommendation_engine import RecommendationEngine
+from services.interaction_matrix import InteractionMatrix
+
+NOW = datetime.now()
+
+
+def _view(user_id, resource_id, days_ago=0, action="knowledge.view"):
+    return {
+        "user_id": user_id,
+        "action": action,
+        "resource_id": resource_id,
+        "timestamp": (NOW - timedelta(days=days_ago)).isoformat(),
+    }
+
+
+LOGS = [
+    _view(1, 1), _view(1, 2),
+    _view(2, 1), _view(2, 2), _view(2, 3),
+    _view(3, 1), _view(3, 4), _view(3, 5), _view(3, 6),
+    _view(4, 9),
+    {"user_id": 5, "action": "knowledge.create", "resource_id": 1, "timestamp": NOW.isoformat()},
+    {"user_id": 6, "action": "knowledge.view", "resource_id": 1, "timestamp": "INVALID"},
+]
+
+ITEMS = [
+    {"id": i, "title": f"item{i}", "category": "c" if i < 4 else "d", "tags": [f"t{i}"]}
+    for i in range(1, 10)
+]
+
+
+class TestInteractionMatrix:
+    def test_similar_users_match_pairwise_jaccard(self):
+        matrix = InteractionMatrix.from_records(LOGS)
+        valid_logs = LOGS[:-1]  # 逐次計算は呼び出し側で期間フィルタ済みのログを受け取る
+        expected = RecommendationEngine()._find_similar_users(1, {1, 2}, valid_logs, [])
+        result = matrix.similar_users(1, days=30)
+        assert [u for u, _ in result] == [u for u, _ in expected]
+        assert [s for _, s in result] == pytest.approx([s for _, s in expected])
+
+    def test_window_and_decay(self):
+        matrix = InteractionMatrix.from_records(
+            [_view(1, 1), _view(1, 2, days_ago=14), _view(1, 3, days_ago=60)],
+            half_life_days=14,
+        )
+        viewed = matrix.user_items(1, days=30)
+        assert viewed[("knowledge", 1)] == pytest.approx(1.0)
+        assert viewed[("knowledge", 2)] == pytest.approx(0.5)
+        assert ("knowledge", 3) not in viewed
+
+    def test_kinds_are_distinct(self):
+        matrix = InteractionMatrix.from_records(
+            [_view(1, 7), _view(2, 7, action="sop.view"), _view(2, 7, action="sop.view")]
+        )
+        assert matrix.similar_users(1, days=30) == []
+        assert matrix.popular_items("sop") == [(7, pytest.approx(2.0))]
+        assert matrix.popular_items("knowledge") == [(7, pytest.approx(1.0))]
+
+    def test_incremental_ingest(self, monkeypatch):
+        monkeypatch.setattr("services.interaction_matrix.SNAPSHOT_TTL", 0)
+        matrix = InteractionMatrix.from_records(LOGS[:2])
+        assert matrix.similar_users(1, days=30) == []
+        matrix.ingest(LOGS[2:5])
+        assert [u for u, _ in matrix.similar_users(1, days=30)] == [2]
+
+
+    def test_merge_accumulates_counts_in_compact_arrays(self, monkeypatch):
+        monkeypatch.setattr("services.interaction_matrix._MERGE_THRESHOLD", 2)
+        matrix = InteractionMatrix.from_records([_view(1, 1), _view(1, 1), _view(1, 2)])
+        matrix.ingest([_view(1, 1), _view(2, 3)])
+        assert len(matrix) == 3
+        assert matrix._counts.dtype.itemsize == 4
+        assert list(matrix._keys) == sorted(matrix._keys)
+        assert matrix.user_items(1)[("knowledge", 1)] == pytest.approx(3.0)
+
+    def test_cells_outside_window_are_pruned(self):
+        matrix = InteractionMatrix.from_records([_view(1, 1, days_ago=400)])
+        matrix.ingest([_view(1, 2, days_ago=10), _view(2, 1, days_ago=500)])
+        assert len(matrix) == 1
+        assert set(matrix.user_items(1)) == {("knowledge", 2)}
+
+
+class TestPersonalizedWithMatrix:
+    def test_collaborative_candidate_is_recommended(self):
+        engine = RecommendationEngine()
+        matrix = InteractionMatrix.from_records(LOGS)
+        result = engine.get_personalized_recommendations(
+            1, [], ITEMS, limit=3, days=30, matrix=matrix, resource="knowledge"
+        )
+        assert result[0]["id"] == 3
+        assert all(r["id"] not in (1, 2) for r in result)
+
+    def test_no_history_returns_popular(self):
+        engine = RecommendationEngine()
+        matrix = InteractionMatrix.from_records(LOGS)
+        result = engine.get_personalized_recommendations(
+            99, [], ITEMS, limit=2, days=30, matrix=matrix, resource="knowledge"
+        )
+        assert [r["id"] for r in result] == [1, 2]
+        assert result[0]["recommendation_reasons"] == ["人気のアイテム"]
+
+
+class TestPersonalizedEndpoint:
+    def test_reads_appended_audit_logs(self, client, auth_headers, tmp_path):
+        import app_helpers
+
+        store = app_helpers.get_audit_log_store(str(tmp_path))
+        store.append_many([_view(1, 1), _view(2, 1), _view(2, 3)])
+        (tmp_path / "knowledge.json").write_text(
+            __import__("json").dumps(ITEMS), encoding="utf-8"
+        )
+
+        resp = client.get(
+            "/api/v1/recommendations/personalized?type=knowledge", headers=auth_headers
+        )
+        assert resp.status_code == 200
+        ids = [r["id"] for r in resp.get_json()["data"]["knowledge"]["items"]]
+        assert ids[0] == 3
+
+    def test_postgresql_hydrates_in_batches(self, monkeypatch):
+        from unittest.mock import MagicMock, patch
+
+        import app_helpers
+
+        logs = [dict(_view(i % 3, i % 4 + 1), id=i) for i in range(1, 8)]
+        dal = MagicMock()
+        dal.use_postgresql = True
+        dal.get_access_logs.side_effect = lambda f: [
+            log for log in logs if log["id"] > f["since_id"]
+        ][: f["limit"]]
+        monkeypatch.setattr(app_helpers, "INTERACTION_BATCH_SIZE", 3)
+        monkeypatch.setattr(app_helpers, "_interaction_matrices", {})
+        with patch.object(app_helpers, "get_dal", return_value=dal):
+            matrix = app_helpers.get_interaction_matrix()
+        assert [c.args[0]["since_id"] for c in dal.get_access_logs.call_args_list] == [0, 3, 6]
+        assert len(matrix) == 7
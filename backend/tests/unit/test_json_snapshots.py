@@ -0,0 +1,125 @@
+"""json_snapshots.py（JSONデータファイルのスナップショットキャッシュ）のテスト
+
+- 変更がなければ再パースしないこと
+- save_data / _save_json / 外部からの書き換えで読み直すこと
+- 呼び出し元の変更がキャッシュに影響しないこと
+"""
+
+import json
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import json_snapshots
+from dal.base import BaseDAL
+
+ITEMS = [{"id": 1, "title": "a", "tags": ["x"]}, {"id": 2, "title": "b"}]
+
+
+def _parser(items):
+    return MagicMock(side_effect=lambda path: [dict(item) for item in items])
+
+
+class TestLoadList:
+    def test_reuses_parsed_data_until_file_changes(self, tmp_path):
+        path = tmp_path / "knowledge.json"
+        path.write_text(json.dumps(ITEMS), encoding="utf-8")
+        parse = _parser(ITEMS)
+
+        assert json_snapshots.load_list(str(path), parse) == ITEMS
+        assert json_snapshots.load_list(str(path), parse) == ITEMS
+        assert parse.call_count == 1
+
+        path.write_text(json.dumps(ITEMS[:1]) + " " * 10, encoding="utf-8")
+        json_snapshots.load_list(str(path), parse)
+        assert parse.call_count == 2
+
+    def test_generation_bump_forces_reparse(self, tmp_path):
+        path = tmp_path / "sop.json"
+        path.write_text("[]", encoding="utf-8")
+        parse = _parser([])
+
+        json_snapshots.load_list(str(path), parse)
+        json_snapshots.bump_generation(str(path))
+        json_snapshots.load_list(str(path), parse)
+        assert parse.call_count == 2
+
+    def test_missing_file_returns_none(self, tmp_path):
+        assert json_snapshots.load_list(str(tmp_path / "none.json"), _parser([])) is None
+
+    def test_caller_mutation_does_not_leak_into_cache(self, tmp_path):
+        path = tmp_path / "knowledge.json"
+        path.write_text(json.dumps(ITEMS), encoding="utf-8")
+        parse = _parser(ITEMS)
+
+        first = json_snapshots.load_list(str(path), parse)
+        first[0]["title"] = "changed"
+        first.append({"id": 3})
+
+        assert json_snapshots.load_list(str(path), parse) == ITEMS
+
+
+class TestLoadDataUsesSnapshots:
+    def test_load_data_parses_once_and_sees_saves(self, tmp_path):
+        import app_helpers
+
+        (tmp_path / "knowledge.json").write_text(json.dumps(ITEMS), encoding="utf-8")
+        with patch.object(app_helpers, "get_data_dir", return_value=str(tmp_path)), patch.object(
+            app_helpers.json, "load", wraps=json.load
+        ) as json_load:
+            assert app_helpers.load_data("knowledge.json") == ITEMS
+            assert app_helpers.load_data("knowledge.json") == ITEMS
+            assert json_load.call_count == 1
+
+            app_helpers.save_data("knowledge.json", ITEMS[:1])
+            assert app_helpers.load_data("knowledge.json") == ITEMS[:1]
+
+    def test_dal_load_json_sees_own_writes(self, tmp_path):
+        dal = BaseDAL(use_postgresql=False)
+        dal.data_dir = str(tmp_path)
+        dal._save_json("incidents.json", ITEMS)
+        assert dal._load_json("incidents.json") == ITEMS
+
+        dal._save_json("incidents.json", ITEMS[1:])
+        assert dal._load_json("incidents.json") == ITEMS[1:]
+
+
+class TestFieldIndexes:
+    def test_find_one_and_find_all_use_index_built_once(self, tmp_path):
+        items = [
+            {"id": 1, "config_id": 10},
+            {"id": 2, "config_id": 20},
+            {"id": 3, "config_id": 10},
+        ]
+        path = tmp_path / "ms365_file_mappings.json"
+        path.write_text(json.dumps(items), encoding="utf-8")
+        parse = _parser(items)
+
+        assert json_snapshots.find_one(str(path), parse, "id", 2) == items[1]
+        assert json_snapshots.find_one(str(path), parse, "id", 99) is None
+        assert json_snapshots.find_all(str(path), parse, "config_id", 10) == [items[0], items[2]]
+        assert parse.call_count == 1
+
+        found = json_snapshots.find_one(str(path), parse, "id", 1)
+        found["config_id"] = 99
+        assert json_snapshots.find_all(str(path), parse, "config_id", 99) == []
+
+    def test_index_follows_writes(self, tmp_path):
+        dal = BaseDAL(use_postgresql=False)
+        dal.data_dir = str(tmp_path)
+        dal._save_json("experts.json", [{"id": 1, "name": "a"}])
+        assert dal._find_json("experts.json", "id", 1)["name"] == "a"
+
+        dal._save_json("experts.json", [{"id": 1, "name": "b"}, {"id": 2, "name": "c"}])
+        assert dal._find_json("experts.json", "id", 1)["name"] == "b"
+        assert dal._find_json("experts.json", "id", 2)["name"] == "c"
+
+    def test_load_json_indexed_positions(self, tmp_path):
+        dal = BaseDAL(use_postgresql=False)
+        dal.data_dir = str(tmp_path)
+        dal._save_json("consultations.json", [{"id": 5}, {"id": 7}])
+        items, positions = dal._load_json_indexed("consultations.json")
+        assert items[positions[7][0]] == {"id": 7}
+        assert dal._load_json_indexed("missing.json") == ([], {})
@@ -0,0 +1,250 @@
+"""ナレッジ変更イベントバスと派生データ構造の差分更新テスト
+
+- knowledge_events.py（イベントバス）
+- services/knowledge_facets.py（タグ・カテゴリ集計）
+- services/derived_index.py（バージョン付きレジストリ）
+- Blueprint / DAL の書き込み経路からの差分反映
+"""
+
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from services.derived_index import DerivedIndexRegistry
+from knowledge_events import (
+    CREATED,
+    DELETED,
+    ChangeEventBus,
+    KnowledgeChange,
+    KnowledgeChangeEvent,
+    apply_changes,
+    knowledge_events,
+)
+from services.knowledge_facets import KnowledgeFacets
+
+DOCS = [
+    {"id": 1, "category": "安全衛生", "tags": ["足場", "点検"]},
+    {"id": 2, "category": "安全衛生", "tags": ["足場"]},
+    {"id": 3, "category": "品質管理", "tags": None},
+]
+
+
+class TestChangeEventBus:
+    def test_publish_delivers_to_subscribers(self):
+        bus = ChangeEventBus("test")
+        received = []
+        bus.subscribe(received.append)
+        bus.publish("event")
+        bus.unsubscribe(received.append)
+        bus.publish("ignored")
+        assert received == ["event"]
+
+    def test_failing_subscriber_does_not_break_others(self):
+        bus = ChangeEventBus("test")
+        received = []
+
+        def boom(event):
+            raise RuntimeError("handler failed")
+
+        bus.subscribe(boom)
+        bus.subscribe(received.append)
+        bus.publish("event")
+        assert received == ["event"]
+
+
+class TestPublishersImportBusDirectly:
+    """DAL・データインポートはアプリの読み込み順に関係なくイベントを発行する"""
+
+    def test_data_import_publishes_created_records(self, tmp_path):
+        from integrations.data_import import DataImporter
+
+        received = []
+        knowledge_events.subscribe(received.append)
+        try:
+            DataImporter(str(tmp_path))._merge_records("knowledge", [{"id": 7, "title": "新規"}])
+            DataImporter(str(tmp_path))._merge_records("sop", [{"id": 8, "title": "SOP"}])
+        finally:
+            knowledge_events.unsubscribe(received.append)
+
+        assert len(received) == 1
+        assert [c.knowledge_id for c in received[0].changes] == [7]
+        assert received[0].changes[0].action == CREATED
+        assert received[0].version_after is not None
+
+
+class TestKnowledgeFacets:
+    def test_build_counts_tags_and_categories(self):
+        facets = KnowledgeFacets.build(DOCS)
+        assert facets.tag_counts() == [("足場", 2), ("点検", 1)]
+        assert facets.category_counts() == [("安全衛生", 2), ("品質管理", 1)]
+
+    def test_apply_changes_updates_counts(self):
+        facets = KnowledgeFacets.build(DOCS)
+        apply_changes(
+            facets,
+            [
+                KnowledgeChange(DELETED, 1, previous=DOCS[0]),
+                KnowledgeChange(CREATED, 4, {"id": 4, "category": "品質管理", "tags": ["配筋"]}),
+            ],
+        )
+        assert dict(facets.tag_counts()) == {"足場": 1, "配筋": 1}
+        assert dict(facets.category_counts()) == {"安全衛生": 1, "品質管理": 2}
+
+
+class TestDerivedIndexRegistry:
+    def test_rebuilds_only_when_version_changes(self):
+        registry = DerivedIndexRegistry()
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return DOCS
+
+        first = registry.get("k", 1, loader, KnowledgeFacets.build)
+        assert registry.get("k", 1, loader, KnowledgeFacets.build) is first
+        assert registry.get("k", 2, loader, KnowledgeFacets.build) is not first
+        assert len(calls) == 2
+
+    def test_apply_advances_version_or_drops_entry(self):
+        registry = DerivedIndexRegistry()
+        facets = registry.get("k", 1, lambda: DOCS, KnowledgeFacets.build)
+
+        assert registry.apply("k", lambda f: f.remove(3), lambda v: v + 1)
+        assert registry.get("k", 2, lambda: [], KnowledgeFacets.build) is facets
+        assert len(facets) == 2
+
+        # バージョンが書き込み前と一致しない場合は破棄して再構築
+        assert not registry.apply("k", lambda f: f.remove(2), lambda v: None)
+        assert registry.get("k", 2, lambda: [], KnowledgeFacets.build) is not facets
+
+
+class TestPostgresCollectionVersion:
+    """PostgreSQLモードでは集計クエリのバージョンが変わった場合のみ一覧を読み込む"""
+
+    def _pg_dal(self, version):
+        dal = MagicMock()
+        dal.use_postgresql = True
+        dal.get_collection_version.return_value = version
+        dal.get_knowledge_list.return_value = [dict(d, updated_at="2026-01-01T00:00:00") for d in DOCS]
+        return dal
+
+    def test_loads_rows_only_when_version_changes(self):
+        import app_helpers
+
+        app_helpers._derived_indexes.clear()
+        dal = self._pg_dal(("pg", 3, 3, "2026-01-01T00:00:00"))
+        with patch.object(app_helpers, "get_dal", return_value=dal):
+            first = app_helpers.get_knowledge_facets()
+            assert app_helpers.get_knowledge_facets() is first
+            assert dal.get_knowledge_list.call_count == 1
+
+            dal.get_collection_version.return_value = ("pg", 4, 4, "2026-01-02T00:00:00")
+            assert app_helpers.get_knowledge_facets() is not first
+            assert dal.get_knowledge_list.call_count == 2
+        app_helpers._derived_indexes.clear()
+
+    def test_event_advances_version_without_reload(self):
+        import app_helpers
+
+        app_helpers._derived_indexes.clear()
+        dal = self._pg_dal(("pg", 3, 3, "2026-01-01T00:00:00"))
+        created = {"id": 4, "tags": ["新規"], "updated_at": "2026-01-02T00:00:00"}
+        with patch.object(app_helpers, "get_dal", return_value=dal):
+            facets = app_helpers.get_knowledge_facets()
+            app_helpers._apply_knowledge_event(
+                KnowledgeChangeEvent(changes=[KnowledgeChange(CREATED, 4, created)])
+            )
+            dal.get_collection_version.return_value = ("pg", 4, 4, "2026-01-02T00:00:00")
+            assert app_helpers.get_knowledge_facets() is facets
+            assert dal.get_knowledge_list.call_count == 1
+
+            # 最大IDの削除は集計と一致しなくなるため再構築される
+            app_helpers._apply_knowledge_event(
+                KnowledgeChangeEvent(changes=[KnowledgeChange(DELETED, 4, None, created)])
+            )
+            dal.get_collection_version.return_value = ("pg", 3, 3, "2026-01-01T00:00:00")
+            assert app_helpers.get_knowledge_facets() is not facets
+            assert dal.get_knowledge_list.call_count == 2
+        app_helpers._derived_indexes.clear()
+
+    def test_version_query_failure_falls_back_to_file_version(self, tmp_path):
+        import app_helpers
+
+        app_helpers._derived_indexes.clear()
+        dal = self._pg_dal(None)
+        dal.get_collection_version.side_effect = RuntimeError("DB down")
+        with patch.object(app_helpers, "get_dal", return_value=dal), patch.object(
+            app_helpers, "get_data_dir", return_value=str(tmp_path)
+        ):
+            (tmp_path / "knowledge.json").write_text("[]", encoding="utf-8")
+            first = app_helpers.get_knowledge_facets()
+            assert app_helpers.get_knowledge_facets() is first
+        app_helpers._derived_indexes.clear()
+
+
+class TestWritePathsApplyDelta:
+    """書き込み経路から派生データ構造に差分が反映される（再読み込みなし）"""
+
+    def _create(self, client, auth_headers, title, tags):
+        resp = client.post(
+            "/api/v1/knowledge",
+            json={
+                "title": title,
+                "summary": "概要",
+                "content": "内容",
+                "category": "安全衛生",
+                "tags": tags,
+            },
+            headers=auth_headers,
+        )
+        assert resp.status_code == 201
+        return resp.get_json()["data"]["id"]
+
+    def test_blueprint_create_update_delete(self, client, auth_headers):
+        import app_helpers
+
+        # 初回アクセスで構築
+        client.get("/api/v1/knowledge/tags", headers=auth_headers)
+        client.get("/api/v1/knowledge/search?query=Test", headers=auth_headers)
+
+        new_id = self._create(client, auth_headers, "足場点検手順", ["足場"])
+        client.put(
+            f"/api/v1/knowledge/{new_id}",
+            json={"title": "足場解体手順"},
+            headers=auth_headers,
+        )
+
+        with patch.object(app_helpers, "load_data", side_effect=AssertionError("rebuilt")):
+            tags = client.get("/api/v1/knowledge/tags", headers=auth_headers)
+            tag_names = [t["name"] for t in tags.get_json()["data"]]
+            assert "足場" in tag_names
+
+            hits = client.get(
+                "/api/v1/knowledge/search?query=解体", headers=auth_headers
+            ).get_json()["data"]["results"]
+            assert [h["id"] for h in hits] == [new_id]
+            old = client.get(
+                "/api/v1/knowledge/search?query=点検", headers=auth_headers
+            ).get_json()["data"]["results"]
+            assert old == []
+
+        client.delete(f"/api/v1/knowledge/{new_id}", headers=auth_headers)
+        with patch.object(app_helpers, "load_data", side_effect=AssertionError("rebuilt")):
+            tags = client.get("/api/v1/knowledge/tags", headers=auth_headers)
+            assert "足場" not in [t["name"] for t in tags.get_json()["data"]]
+
+    def test_external_write_triggers_rebuild(self, client, auth_headers, tmp_path):
+        import json
+
+        client.get("/api/v1/knowledge/tags", headers=auth_headers)
+        # 別プロセスによる書き込み（イベントなし）
+        data = json.loads((tmp_path / "knowledge.json").read_text(encoding="utf-8"))
+        data.append({"id": 99, "title": "外部", "tags": ["外部タグ"]})
+        (tmp_path / "knowledge.json").write_text(
+            json.dumps(data, ensure_ascii=False, indent=4), encoding="utf-8"
+        )
+
+        tags = client.get("/api/v1/knowledge/tags", headers=auth_headers)
+        assert "外部タグ" in [t["name"] for t in tags.get_json()["data"]]
@@ -0,0 +1,81 @@
+"""ナレッジのランク付き検索（PostgreSQL: pg_trgm / JSON: 転置インデックス）のテスト
+
+- SQL側で条件・スコア・ソート・LIMIT/OFFSET を組み立てること
+- app_helpers.search_knowledge_ranked が PostgreSQLモードで DAL を使い、
+  エラー時・JSONモードではプロセス内索引にフォールバックすること
+"""
+
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from sqlalchemy.dialects import postgresql
+
+from dal import DataAccessLayer
+from dal.knowledge import KnowledgeMixin, _escape_like
+
+
+def _compile(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+class TestSearchStatement:
+    def test_terms_are_anded_and_ranked_in_sql(self):
+        sql = _compile(
+            KnowledgeMixin._knowledge_search_statement(["配管", "溶接"], "relevance_score", "desc")
+            .limit(20)
+            .offset(40)
+        )
+        assert sql.count("public.knowledge.title ILIKE") == 2
+        assert "public.knowledge.content ILIKE '%%配管%%'" in sql
+        assert "word_similarity('溶接', public.knowledge.title)" in sql
+        assert "count(*) OVER ()" in sql
+        assert "ORDER BY relevance_score DESC" in sql
+        assert "LIMIT 20 OFFSET 40" in sql
+
+    def test_sort_by_timestamp(self):
+        sql = _compile(KnowledgeMixin._knowledge_search_statement(["a"], "created_at", "asc"))
+        assert "ORDER BY public.knowledge.created_at ASC" in sql
+
+    def test_like_wildcards_are_escaped(self):
+        assert _escape_like("50%_a\\b") == "50\\%\\_a\\\\b"
+
+
+class TestSearchKnowledgeRanked:
+    def test_json_mode_dal_returns_none(self):
+        assert DataAccessLayer(use_postgresql=False).search_knowledge(["a"]) is None
+
+    def test_postgresql_mode_uses_dal_page(self):
+        import app_helpers
+
+        dal = MagicMock(use_postgresql=True)
+        dal.search_knowledge.return_value = ([{"id": 3, "relevance_score": 1.2}], 41)
+        with patch.object(app_helpers, "get_dal", return_value=dal):
+            results, total = app_helpers.search_knowledge_ranked('配管 "safety check"', 20, 40)
+
+        assert (results, total) == ([{"id": 3, "relevance_score": 1.2}], 41)
+        dal.search_knowledge.assert_called_once_with(
+            ["配管", "safety check"], 20, 40, "relevance_score", "desc", summary=False
+        )
+
+    def test_database_error_falls_back_to_index(self):
+        import app_helpers
+
+        dal = MagicMock(use_postgresql=True)
+        dal.search_knowledge.side_effect = RuntimeError("connection refused")
+        index = MagicMock()
+        index.search.return_value = [
+            ({"id": 1, "updated_at": "2026-01-01"}, ["title"], 0.5),
+            ({"id": 2, "updated_at": "2026-02-01"}, ["title"], 2.0),
+        ]
+        with patch.object(app_helpers, "get_dal", return_value=dal), patch.object(
+            app_helpers, "get_search_index", return_value=index
+        ):
+            results, total = app_helpers.search_knowledge_ranked("配管", 1, 0)
+            by_date, _ = app_helpers.search_knowledge_ranked("配管", 5, 0, "updated_at", "asc")
+
+        assert total == 2
+        assert [k["id"] for k in results] == [2]
+        assert [k["id"] for k in by_date] == [1, 2]
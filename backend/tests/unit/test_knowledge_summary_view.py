@@ -0,0 +1,165 @@
+"""ナレッジのサマリービュー（一覧用の軽量表現）のテスト
+
+- 本文 content を含めず content_length / content_snippet を返すこと
+- JSONモードはスナップショットごとに変換結果を保持すること
+- PostgreSQLモードは content 列そのものを SELECT しないこと
+- 一覧・お気に入り・検索・関連の各APIがサマリービューを返し、詳細APIだけが本文を返すこと
+"""
+
+import json
+import os
+import re
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from sqlalchemy.dialects import postgresql
+
+import json_snapshots
+from dal import DataAccessLayer
+from dal.knowledge import CONTENT_SNIPPET_LENGTH, KnowledgeMixin, knowledge_summary
+
+BODY = "本文" * 500
+
+KNOWLEDGE = [
+    {
+        "id": i,
+        "title": f"配管 {i}",
+        "summary": "概要",
+        "content": BODY,
+        "category": "safety",
+        "tags": ["x"],
+        "status": "approved",
+        "created_at": f"2026-01-0{i}T00:00:00",
+        "updated_at": f"2026-01-0{i}T00:00:00",
+        "views": i,
+        "created_by_id": 1,
+    }
+    for i in range(1, 4)
+]
+
+
+def _compile(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def _selects_content_column(sql: str) -> bool:
+    return re.search(r"(SELECT|,) public\.knowledge\.content\b(?!\))", sql.split("FROM")[0]) is not None
+
+
+def test_summary_omits_content():
+    summary = knowledge_summary(dict(KNOWLEDGE[0], relevance_score=1.5), ("relevance_score",))
+    assert "content" not in summary
+    assert "created_by_id" not in summary
+    assert summary["content_length"] == len(BODY)
+    assert summary["content_snippet"] == BODY[:CONTENT_SNIPPET_LENGTH]
+    assert summary["views"] == 1
+    assert summary["relevance_score"] == 1.5
+
+
+class TestJsonSummaryPage:
+    @pytest.fixture
+    def dal(self, tmp_path):
+        json_snapshots.clear()
+        (tmp_path / "knowledge.json").write_text(json.dumps(KNOWLEDGE), encoding="utf-8")
+        instance = DataAccessLayer(use_postgresql=False)
+        instance.data_dir = str(tmp_path)
+        return instance
+
+    def test_page_returns_summaries(self, dal):
+        items, cursor, total = dal.get_knowledge_page(limit=2, summary=True)
+        assert [k["id"] for k in items] == [3, 2]
+        assert all("content" not in k and k["content_length"] == len(BODY) for k in items)
+        rest, _, _ = dal.get_knowledge_page(limit=2, cursor=cursor, summary=True)
+        assert [k["id"] for k in rest] == [1]
+        assert total == 3
+
+    def test_view_is_built_once_per_snapshot(self, dal, tmp_path):
+        path = str(tmp_path / "knowledge.json")
+        calls = []
+
+        def build(item):
+            calls.append(item["id"])
+            return knowledge_summary(item)
+
+        json_snapshots.page(path, dal._parse_json, "id", 1, view=build)
+        json_snapshots.page(path, dal._parse_json, "id", 2, view=build)
+        rows = json_snapshots.load_view(path, dal._parse_json, build)
+        assert len(calls) == 3
+
+        rows[0]["title"] = "changed"
+        assert json_snapshots.load_view(path, dal._parse_json, build)[0]["title"] == "配管 1"
+
+    def test_ids_filter(self, dal):
+        items, _, total = dal.get_knowledge_page({"ids": [1, 3]}, limit=None, summary=True)
+        assert [k["id"] for k in items] == [3, 1]
+        assert total == 2
+
+
+class TestSqlSummary:
+    def test_page_selects_length_and_snippet_instead_of_content(self):
+        dal = DataAccessLayer(use_postgresql=True)
+        session = MagicMock()
+        session.execute.return_value.mappings.return_value = [
+            {"id": 1, "title": "a", "tags": None, "content_length": 3, "content_snippet": "abc"}
+        ]
+        session.execute.return_value.scalar.return_value = 1
+        with patch.object(dal, "_use_postgresql", return_value=True), patch(
+            "database.get_session_factory", return_value=lambda: session
+        ):
+            items, _, _ = dal.get_knowledge_page(limit=20, summary=True)
+
+        sql = _compile(session.execute.call_args_list[0].args[0])
+        assert "char_length(coalesce(public.knowledge.content, ''))" in sql
+        assert f"left(coalesce(public.knowledge.content, ''), {CONTENT_SNIPPET_LENGTH})" in sql
+        assert not _selects_content_column(sql)
+        assert items == [
+            {"id": 1, "title": "a", "tags": [], "content_length": 3, "content_snippet": "abc"}
+        ]
+
+    def test_search_statement_summary_columns(self):
+        sql = _compile(KnowledgeMixin._knowledge_search_statement(["配管"], "relevance_score", "desc", True))
+        assert "AS content_snippet" in sql.split("FROM")[0]
+        assert not _selects_content_column(sql)
+        assert _selects_content_column(
+            _compile(KnowledgeMixin._knowledge_search_statement(["配管"], "relevance_score", "desc"))
+        )
+
+
+class TestEndpoints:
+    @pytest.fixture
+    def data(self, tmp_path):
+        (tmp_path / "knowledge.json").write_text(json.dumps(KNOWLEDGE), encoding="utf-8")
+        (tmp_path / "users_favorites.json").write_text(
+            json.dumps([{"user_id": 1, "knowledge_id": 2}]), encoding="utf-8"
+        )
+
+    def test_list_endpoints_return_summaries(self, client, auth_headers, data):
+        listed = client.get("/api/v1/knowledge", headers=auth_headers).get_json()["data"]
+        searched = client.get("/api/v1/knowledge?search=配管", headers=auth_headers).get_json()["data"]
+        favorites = client.get("/api/v1/knowledge/favorites", headers=auth_headers).get_json()["data"]
+        found = client.get("/api/v1/knowledge/search?query=配管", headers=auth_headers).get_json()
+        popular = client.get("/api/v1/knowledge/popular", headers=auth_headers).get_json()["data"]
+        recent = client.get("/api/v1/knowledge/recent?days=3650&limit=2", headers=auth_headers).get_json()["data"]
+        related = client.get("/api/v1/knowledge/1/related?min_score=0.01", headers=auth_headers).get_json()
+
+        assert len(listed) == 3
+        assert len(searched) == 3
+        assert [k["id"] for k in favorites] == [2]
+        assert found["data"]["total"] == 3
+        assert [k["id"] for k in popular] == [3, 2, 1]
+        assert [k["id"] for k in recent] == [3, 2]
+        related_items = related["data"]["related_items"]
+        assert related_items and "recommendation_score" in related_items[0]
+        for item in [
+            *listed, *searched, *favorites, *found["data"]["results"], *popular, *recent, *related_items
+        ]:
+            assert "content" not in item
+            assert item["content_length"] == len(BODY)
+
+    def test_detail_returns_content(self, client, auth_headers, data):
+        detail = client.get("/api/v1/knowledge/1", headers=auth_headers).get_json()["data"]
+        assert detail["content"] == BODY
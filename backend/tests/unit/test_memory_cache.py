@@ -0,0 +1,115 @@
+"""memory_cache.py（プロセス内 LRU/TTL キャッシュ）のテスト
+
+- 件数上限・推定バイト数上限による LRU 追い出し
+- TTL による期限切れ
+- ヒット/ミス/追い出し件数と名前ごとの集計
+- 推薦エンジンのキャッシュが上限を超えて増えないこと
+"""
+
+import os
+import sys
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import memory_cache
+from memory_cache import MemoryCache, cache_stats_by_name, estimate_size
+from recommendation_engine import RecommendationEngine
+
+
+class TestLruEviction:
+    def test_evicts_least_recently_used_entry(self):
+        cache = MemoryCache("test-lru", max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+        cache.set("c", 3)
+
+        assert "b" not in cache
+        assert cache.keys() == ["a", "c"]
+        assert cache.evictions == 1
+
+    def test_evicts_by_estimated_bytes(self):
+        cache = MemoryCache("test-bytes", max_entries=100, max_bytes=250, sizeof=lambda value: 100)
+        for key in "abc":
+            cache.set(key, key)
+
+        assert cache.keys() == ["b", "c"]
+        assert cache.bytes == 200
+
+    def test_oversized_value_is_not_stored(self):
+        cache = MemoryCache("test-oversize", max_bytes=10, sizeof=lambda value: 100)
+        cache.set("big", "x")
+        assert len(cache) == 0
+        assert cache.bytes == 0
+        assert cache.evictions == 1
+
+    def test_overwrite_updates_size(self):
+        cache = MemoryCache("test-overwrite", sizeof=len)
+        cache.set("a", "xxxx")
+        cache.set("a", "xx")
+        assert len(cache) == 1
+        assert cache.bytes == 2
+
+
+class TestTtl:
+    def test_expired_entry_is_a_miss(self):
+        cache = MemoryCache("test-ttl", ttl=10)
+        with patch.object(memory_cache.time, "monotonic", return_value=100.0):
+            cache.set("a", 1)
+        with patch.object(memory_cache.time, "monotonic", return_value=111.0):
+            assert "a" not in cache
+            assert cache.get("a") is None
+
+        assert len(cache) == 0
+        assert cache.expirations == 1
+        assert cache.misses == 1
+
+    def test_purge_expired_and_per_entry_ttl(self):
+        cache = MemoryCache("test-purge", ttl=10)
+        with patch.object(memory_cache.time, "monotonic", return_value=100.0):
+            cache.set("short", 1)
+            cache.set("forever", 2, ttl=None)
+        with patch.object(memory_cache.time, "monotonic", return_value=200.0):
+            assert cache.stats()["expired_entries"] == 1
+            assert cache.purge_expired() == 1
+            assert cache.get("forever") == 2
+
+
+class TestStats:
+    def test_hit_ratio(self):
+        cache = MemoryCache("test-stats")
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("missing")
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+
+    def test_stats_by_name_sums_live_caches(self):
+        first = MemoryCache("test-shared")
+        second = MemoryCache("test-shared")
+        first.set("a", 1)
+        second.set("b", 2)
+        second.get("b")
+
+        totals = cache_stats_by_name()["test-shared"]
+        assert totals["entries"] == 2
+        assert totals["hits"] == 1
+
+    def test_estimate_size_counts_nested_values(self):
+        shared = "x" * 1000
+        assert estimate_size({"a": [shared]}) > 1000
+        assert estimate_size([shared, shared]) < 2 * sys.getsizeof(shared)
+
+
+class TestRecommendationEngineCache:
+    def test_cache_is_bounded(self):
+        engine = RecommendationEngine(cache_max_entries=3)
+        items = [{"id": i, "title": f"item {i}", "tags": ["共通"]} for i in range(10)]
+        for item in items:
+            engine.get_related_items(item, items, limit=3)
+
+        stats = engine.get_cache_stats()
+        assert stats["total_entries"] == 3
+        assert stats["evictions"] == 7
+        assert stats["max_entries"] == 3
@@ -33,10 +33,10 @@ class TestOperationsCacheHitPaths:
         """get_incidents: 例外発生時にre-raiseする (lines 73-74)"""
         import blueprints.operations as mod
 
-        def raise_error(filename):
-            raise RuntimeError("test load_data error")
+        def raise_error(filename, **kwargs):
+            raise RuntimeError("test load_page error")
 
-        monkeypatch.setattr(mod, "load_data", raise_error)
+        monkeypatch.setattr(mod, "load_page", raise_error)
 
         resp = client.get("/api/v1/incidents", headers=auth_headers)
         assert resp.status_code == 500
@@ -45,10 +45,10 @@ class TestOperationsCacheHitPaths:
         """get_approvals: 例外発生時にre-raiseする (lines 112-113)"""
         import blueprints.operations as mod
 
-        def raise_error(filename):
-            raise RuntimeError("test load_data error")
+        def raise_error(filename, **kwargs):
+            raise RuntimeError("test load_page error")
 
-        monkeypatch.setattr(mod, "load_data", raise_error)
+        monkeypatch.setattr(mod, "load_page", raise_error)
 
         resp = client.get("/api/v1/approvals", headers=auth_headers)
         assert resp.status_code == 500
@@ -499,8 +499,7 @@ class TestClearCacheAndStats:
         engine.get_related_items(items[0], items, limit=3)
         assert len(engine.cache) > 0
         engine.clear_cache()
-        assert engine.cache == {}
-        assert engine.cache_timestamps == {}
+        assert len(engine.cache) == 0
 
     def test_get_cache_stats_returns_dict(self, engine, items):
         """キャッシュ統計が dict として返る"""
@@ -0,0 +1,214 @@
+"""services/related_items.py（関連アイテム事前計算テーブル）のテスト
+
+- 全件構築がオンデマンド計算と同じ関連アイテムを返すこと
+- 増分更新（編集・追加・削除）が全件再構築と同じ近傍になること
+- 保存・読み込み、/related エンドポイントからの参照
+"""
+
+import json
+import os
+import random
+import sys
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from recommendation_engine import RecommendationEngine
+from services.related_items import (
+    RelatedItemsTable,
+    refresh_related_items,
+    related_items_path,
+)
+
+ITEMS = [
+    {
+        "id": 1,
+        "title": "橋梁工事の施工計画",
+        "summary": "橋梁工事の計画",
+        "content": "安全・品質管理が重要",
+        "category": "施工計画",
+        "tags": ["橋梁", "施工計画", "安全"],
+    },
+    {
+        "id": 2,
+        "title": "トンネル掘削の品質管理",
+        "summary": "掘削の品質",
+        "content": "計測管理が重要",
+        "category": "品質管理",
+        "tags": ["トンネル", "品質管理"],
+    },
+    {
+        "id": 3,
+        "title": "橋梁の品質管理 concrete",
+        "summary": "橋梁 品質",
+        "content": "Concrete strength test",
+        "category": "品質管理",
+        "tags": ["橋梁", "安全"],
+    },
+    {
+        "id": 4,
+        "title": "足場の安全点検",
+        "summary": None,
+        "content": "",
+        "category": "",
+        "tags": [],
+    },
+]
+
+
+def _summary(result):
+    return [
+        (r["id"], r["recommendation_score"], r["recommendation_reasons"])
+        for r in result
+    ]
+
+
+def _tag_corpus(n, seed):
+    """タグ・カテゴリのみのコーパス（IDFの揺れがなく増分と全件が完全一致する）"""
+    rng = random.Random(seed)
+    return [
+        {
+            "id": i,
+            "title": "",
+            "category": rng.choice(["A", "B", "C", ""]),
+            "tags": rng.sample(["t1", "t2", "t3", "t4", "t5", "t6"], rng.randint(0, 3)),
+        }
+        for i in range(n)
+    ]
+
+
+class TestBuildAndLookup:
+    def test_lookup_matches_on_demand_hybrid(self):
+        table = RelatedItemsTable.build(ITEMS)
+        engine = RecommendationEngine()
+        for target in ITEMS:
+            expected = engine.get_related_items(target, ITEMS, limit=5, min_score=0.1)
+            assert _summary(table.lookup(target, ITEMS, 5, 0.1)) == _summary(expected)
+
+    def test_lookup_falls_back_when_target_edited_or_unknown(self):
+        table = RelatedItemsTable.build(ITEMS)
+        edited = dict(ITEMS[0], tags=["別タグ"])
+        assert table.lookup(edited, ITEMS, 5, 0.1) is None
+        assert table.lookup({"id": 99, "title": "新規"}, ITEMS, 5, 0.1) is None
+        assert table.lookup(ITEMS[0], ITEMS, table.k + 1, 0.1) is None
+        assert table.lookup(ITEMS[0], ITEMS, 5, 0.0) is None
+
+    def test_deleted_neighbor_is_skipped(self):
+        table = RelatedItemsTable.build(ITEMS)
+        remaining = [i for i in ITEMS if i["id"] != 3]
+        assert 3 not in [r["id"] for r in table.lookup(ITEMS[0], remaining, 5, 0.1)]
+
+    def test_save_and_load_roundtrip(self, tmp_path):
+        table = RelatedItemsTable.build(ITEMS, k=2)
+        path = related_items_path(str(tmp_path), "knowledge")
+        table.save(path)
+        loaded = RelatedItemsTable.load(path)
+        assert loaded.k == 2
+        assert loaded.rows == table.rows
+        assert _summary(loaded.lookup(ITEMS[0], ITEMS, 2, 0.1)) == _summary(
+            table.lookup(ITEMS[0], ITEMS, 2, 0.1)
+        )
+
+
+class TestIncrementalRefresh:
+    @pytest.mark.parametrize("seed", range(5))
+    def test_refresh_matches_full_rebuild(self, seed):
+        rng = random.Random(seed)
+        items = _tag_corpus(60, seed)
+        table = RelatedItemsTable.build(items, k=5)
+
+        for step in range(10):
+            action = rng.choice(["edit", "add", "delete"])
+            if action == "edit":
+                pos = rng.randrange(len(items))
+                items[pos] = dict(
+                    items[pos],
+                    tags=rng.sample(["t1", "t2", "t3", "t4", "t7"], rng.randint(0, 3)),
+                )
+            elif action == "add":
+                items.append(dict(_tag_corpus(1, seed * 100 + step)[0], id=1000 + step))
+            else:
+                items.pop(rng.randrange(len(items)))
+            table.refresh(items)
+
+        expected = RelatedItemsTable.build(items, k=5)
+        assert table.rows == expected.rows
+        assert table.fingerprints == expected.fingerprints
+
+    def test_refresh_deletes_mutually_referencing_items(self):
+        items = [{"id": i, "title": "", "category": "", "tags": ["共通"]} for i in range(4)]
+        table = RelatedItemsTable.build(items, k=2)
+
+        stats = table.refresh(items[2:])
+        assert stats["deleted"] == 2
+        assert table.rows == RelatedItemsTable.build(items[2:], k=2).rows
+        assert 0 not in table.rows and 1 not in table.rows
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_refresh_with_bulk_deletions_matches_full_rebuild(self, seed):
+        rng = random.Random(seed)
+        items = _tag_corpus(30, seed)
+        table = RelatedItemsTable.build(items, k=3)
+        remaining = [i for i in items if rng.random() > 0.4]
+
+        table.refresh(remaining)
+        assert table.rows == RelatedItemsTable.build(remaining, k=3).rows
+
+    def test_refresh_only_recomputes_affected_rows(self):
+        items = _tag_corpus(60, 1)
+        table = RelatedItemsTable.build(items, k=5)
+        assert table.refresh(items)["recomputed"] == 0
+
+        items[0] = dict(items[0], tags=["t9"], category="Z")
+        stats = table.refresh(items)
+        assert stats["changed"] == 1
+        assert stats["recomputed"] < len(items)
+
+
+class TestRefreshRelatedItems:
+    def test_builds_then_refreshes(self, tmp_path):
+        stats = refresh_related_items("knowledge", ITEMS, str(tmp_path))
+        assert stats["mode"] == "full"
+
+        stats = refresh_related_items("knowledge", ITEMS, str(tmp_path))
+        assert stats["mode"] == "incremental"
+        assert stats["changed"] == 0
+
+        stats = refresh_related_items("knowledge", ITEMS[:3], str(tmp_path))
+        assert stats["deleted"] == 1
+        table = RelatedItemsTable.load(related_items_path(str(tmp_path), "knowledge"))
+        assert 4 not in table.rows
+
+
+class TestRelatedEndpointUsesTable:
+    def test_hybrid_served_from_table(self, client, auth_headers, tmp_path):
+        (tmp_path / "knowledge.json").write_text(
+            json.dumps(ITEMS, ensure_ascii=False), encoding="utf-8"
+        )
+        refresh_related_items("knowledge", ITEMS, str(tmp_path))
+
+        import app_helpers
+
+        with patch.object(
+            app_helpers.recommendation_engine,
+            "get_related_items",
+            side_effect=AssertionError("computed on demand"),
+        ):
+            resp = client.get("/api/v1/knowledge/1/related", headers=auth_headers)
+        assert resp.status_code == 200
+        related = resp.get_json()["data"]["related_items"]
+        expected = RecommendationEngine().get_related_items(ITEMS[0], ITEMS)
+        assert _summary(related) == _summary(expected)
+
+    def test_other_algorithms_computed_on_demand(self, client, auth_headers, tmp_path):
+        (tmp_path / "knowledge.json").write_text(
+            json.dumps(ITEMS, ensure_ascii=False), encoding="utf-8"
+        )
+        refresh_related_items("knowledge", ITEMS, str(tmp_path))
+        resp = client.get(
+            "/api/v1/knowledge/1/related?algorithm=tag", headers=auth_headers
+        )
+        assert resp.status_code == 200
+        assert [r["id"] for r in resp.get_json()["data"]["related_items"]] == [3]
@@ -0,0 +1,80 @@
+"""リクエストスコープのDBセッションのテスト
+
+- Flask のリクエスト（アプリケーションコンテキスト）内の DAL 呼び出しは1つのセッションを共有すること
+- teardown_appcontext でセッションを破棄すること
+- コンテキスト外では従来どおり呼び出しごとにセッションを作成して閉じること
+"""
+
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import database
+from dal import DataAccessLayer
+
+
+@pytest.fixture
+def factory(monkeypatch):
+    factory = MagicMock(side_effect=lambda: MagicMock())
+    monkeypatch.setattr(database, "db_session", None)
+    monkeypatch.setattr(database, "get_session_factory", lambda: factory)
+    for module in ("dal.knowledge", "dal.operations"):
+        monkeypatch.setattr(f"{module}.get_session_factory", lambda: factory)
+    return factory
+
+
+@pytest.fixture
+def dal():
+    dal = DataAccessLayer(use_postgresql=True)
+    with patch.object(dal, "_use_postgresql", return_value=True):
+        yield dal
+
+
+def test_request_shares_one_session(factory, dal):
+    app = Flask(__name__)
+    database.init_app(app)
+
+    with app.app_context():
+        dal.get_knowledge_list()
+        dal.get_sop_list()
+        dal.get_incidents_list()
+        assert factory.call_count == 1
+        session = database.get_request_session(factory)
+        session.close.assert_not_called()
+
+    session.close.assert_called_once()
+
+
+def test_error_rolls_back_request_session(factory, dal):
+    app = Flask(__name__)
+    database.init_app(app)
+
+    with app.app_context():
+        session = database.get_request_session(factory)
+        session.execute.side_effect = RuntimeError("connection lost")
+        with pytest.raises(RuntimeError):
+            dal.get_knowledge_list()
+        session.rollback.assert_called_once()
+
+
+def test_outside_request_opens_and_closes_per_call(factory, dal):
+    sessions = [MagicMock(), MagicMock()]
+    factory.side_effect = sessions
+    dal.get_knowledge_list()
+    dal.get_sop_list()
+
+    assert factory.call_count == 2
+    for session in sessions:
+        session.close.assert_called_once()
+    assert database.get_request_session(factory) is None
+
+
+def test_other_factory_is_not_shared(factory):
+    app = Flask(__name__)
+    with app.app_context():
+        assert database.get_request_session(MagicMock()) is None
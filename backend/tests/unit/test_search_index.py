@@ -0,0 +1,86 @@
+"""services/search_index.py のユニットテスト"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from services.search_index import (
+    KNOWLEDGE_FIELD_WEIGHTS,
+    SearchIndex,
+    parse_query,
+    query_tokens,
+)
+
+DOCS = [
+    {"id": 1, "title": "コンクリート打設手順", "summary": "品質管理", "content": "養生期間"},
+    {"id": 2, "title": "足場点検", "summary": "コンクリート", "content": "安全確認"},
+    {"id": 3, "title": "Safety Manual", "summary": "", "content": "crane inspection"},
+]
+
+
+def _ids(hits):
+    return [h[0]["id"] for h in hits]
+
+
+class TestQueryParsing:
+    def test_parse_query_splits_terms_and_phrases(self):
+        assert parse_query('Foo "bar baz" 品質') == ["foo", "bar baz", "品質"]
+
+    def test_query_tokens_single_char_is_not_indexable(self):
+        assert query_tokens("の") is None
+        assert query_tokens("品質") == ["品質"]
+
+
+class TestSearchIndex:
+    def setup_method(self):
+        self.index = SearchIndex.build(DOCS, KNOWLEDGE_FIELD_WEIGHTS)
+
+    def test_title_match_ranks_above_summary_match(self):
+        hits = self.index.search("コンクリート")
+        assert _ids(hits) == [1, 2]
+        assert hits[0][1] == ["title"]
+        assert hits[1][1] == ["summary"]
+
+    def test_and_semantics(self):
+        assert _ids(self.index.search("コンクリート 品質")) == [1]
+        assert self.index.search("コンクリート 存在しない") == []
+
+    def test_ascii_prefix_and_case_insensitive(self):
+        assert _ids(self.index.search("SAFE")) == [3]
+        assert _ids(self.index.search('"crane inspection"')) == [3]
+        assert self.index.search('"inspection crane"') == []
+
+    def test_unindexable_term_falls_back_to_scan(self):
+        hits = self.index.search("点")
+        assert _ids(hits) == [2]
+        assert hits[0][2] == 1.0
+
+    def test_incremental_add_and_remove(self):
+        self.index.add({"id": 2, "title": "足場解体", "summary": "", "content": ""})
+        assert _ids(self.index.search("コンクリート")) == [1]
+        self.index.remove(1)
+        assert self.index.search("コンクリート") == []
+        assert len(self.index) == 2
+
+    def test_ascii_infix_matches_like_substring_search(self):
+        index = SearchIndex.build(
+            [
+                {"id": 1, "title": "PostgreSQL tuning", "summary": "", "content": ""},
+                {"id": 2, "title": "MySQL backup", "summary": "", "content": "kubernetes"},
+                {"id": 3, "title": "Redis", "summary": "", "content": ""},
+            ],
+            KNOWLEDGE_FIELD_WEIGHTS,
+        )
+        assert sorted(_ids(index.search("sql"))) == [1, 2]
+        assert sorted(_ids(index.search("ql"))) == [1, 2]
+        assert _ids(index.search("tgre")) == [1]
+        assert _ids(index.search("netes")) == [2]
+        assert _ids(index.search("netes backup")) == [2]
+
+    def test_infix_expansion_follows_incremental_updates(self):
+        assert self.index.search("spect") != []
+        self.index.remove(3)
+        assert self.index.search("spect") == []
+        self.index.add({"id": 4, "title": "", "summary": "", "content": "respect"})
+        assert _ids(self.index.search("spect")) == [4]
@@ -0,0 +1,114 @@
+"""recommendation_engine.TfidfModel（学習済みTF-IDFモデル）のテスト
+
+- 逐次計算（_score_related_items）と同じ関連アイテム・スコアを返すこと
+- タグJaccard・カテゴリ一致・コサイン類似度のベクトル計算
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from recommendation_engine import RecommendationEngine, TfidfModel
+
+ITEMS = [
+    {
+        "id": 1,
+        "title": "橋梁工事の施工計画",
+        "summary": "橋梁工事の計画",
+        "content": "安全・品質管理が重要",
+        "category": "施工計画",
+        "tags": ["橋梁", "施工計画", "安全"],
+    },
+    {
+        "id": 2,
+        "title": "トンネル掘削の品質管理",
+        "summary": "掘削の品質",
+        "content": "計測管理が重要",
+        "category": "品質管理",
+        "tags": ["トンネル", "品質管理"],
+    },
+    {
+        "id": 3,
+        "title": "橋梁の品質管理 concrete",
+        "summary": "橋梁 品質",
+        "content": "Concrete strength test",
+        "category": "品質管理",
+        "tags": ["橋梁", "安全"],
+    },
+    {
+        "id": 4,
+        "title": "足場の安全点検",
+        "summary": None,
+        "content": "",
+        "category": "",
+        "tags": [],
+    },
+]
+
+
+@pytest.fixture
+def engine():
+    return RecommendationEngine()
+
+
+def _summary(result):
+    return [
+        (r["id"], r["recommendation_score"], r["recommendation_reasons"][:2])
+        for r in result
+    ]
+
+
+class TestTfidfModel:
+    def test_content_scores_match_pairwise_similarity(self, engine):
+        model = TfidfModel.fit(ITEMS)
+        scores = model.content_scores(ITEMS[0])
+        for row, item in enumerate(ITEMS):
+            expected, _ = engine.calculate_content_similarity(ITEMS[0], item, ITEMS)
+            assert scores[row] == pytest.approx(expected, abs=1e-6)
+
+    def test_tag_and_category_scores(self, engine):
+        model = TfidfModel.fit(ITEMS)
+        tag_scores = model.tag_scores(["橋梁", "安全"])
+        for row, item in enumerate(ITEMS):
+            assert tag_scores[row] == pytest.approx(
+                engine.calculate_tag_similarity(["橋梁", "安全"], item["tags"])
+            )
+        assert list(model.category_scores("品質管理")) == [0.0, 1.0, 1.0, 0.0]
+        assert not model.category_scores("").any()
+
+    @pytest.mark.parametrize("algorithm", ["hybrid", "tag", "category", "keyword"])
+    def test_related_items_match_pairwise_scoring(self, engine, algorithm):
+        for target in ITEMS:
+            with_model = engine._score_related_with_model(
+                TfidfModel.fit(ITEMS), target, 5, algorithm, 0.1
+            )
+            candidates = [i for i in ITEMS if i["id"] != target["id"]]
+            pairwise = engine._score_related_items(
+                target, candidates, ITEMS, 5, algorithm, 0.1
+            )
+            assert _summary(with_model) == _summary(pairwise)
+
+    def test_mismatched_model_is_refitted(self, engine):
+        stale = TfidfModel.fit(ITEMS[:2])
+        result = engine.get_related_items(ITEMS[0], ITEMS, model=stale)
+        assert 3 in [r["id"] for r in result]
+
+    def test_model_with_same_shape_but_edited_middle_is_refitted(self, engine):
+        edited = [dict(i) for i in ITEMS]
+        edited[1]["tags"] = ["無関係"]
+        model = TfidfModel.fit(ITEMS)
+        assert model.matches(model.items)
+        assert not model.matches(edited)
+        result = engine.get_related_items(edited[0], edited, min_score=0.0, model=model)
+        expected = RecommendationEngine().get_related_items(edited[0], edited, min_score=0.0)
+        assert _summary(result) == _summary(expected)
+
+    def test_limit_and_target_excluded(self, engine):
+        model = TfidfModel.fit(ITEMS)
+        result = engine.get_related_items(
+            ITEMS[0], model.items, limit=1, min_score=0.0, model=model
+        )
+        assert [r["id"] for r in result] == [3]
@@ -0,0 +1,137 @@
+"""services/view_counters.py（閲覧数カウンタ・人気/トレンド）のテスト
+
+- 減衰スコア・人気ランキング（上位K件 + 未永続化の差分）
+- 差分のフラッシュと失敗時の巻き戻し
+- 閲覧数のJSON永続化（DAL）
+- /knowledge/popular・/knowledge/trending・詳細APIの閲覧数
+"""
+
+import json
+import os
+import sys
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from dal import DataAccessLayer
+from services.view_counters import DecayingScores, PopularityIndex, ViewCounters
+
+HOUR = 3600.0
+
+
+class TestDecayingScores:
+    def test_score_halves_every_half_life(self):
+        scores = DecayingScores(half_life=HOUR)
+        scores.add("a", now=0.0)
+        scores.add("b", now=HOUR)
+        top = dict(scores.top(2, now=HOUR))
+        assert top["a"] == 0.5
+        assert top["b"] == 1.0
+
+    def test_rebase_keeps_scores(self):
+        scores = DecayingScores(half_life=HOUR)
+        scores.add("a", weight=2 ** 20, now=0.0)
+        scores.add("b", now=20 * HOUR)
+        top = dict(scores.top(2, now=20 * HOUR))
+        assert abs(top["a"] - 1.0) < 1e-9
+        assert abs(top["b"] - 1.0) < 1e-9
+
+
+class TestPopularityIndex:
+    ITEMS = [{"id": i, "views": v} for i, v in enumerate([50, 40, 30, 20, 10])]
+
+    def test_top_k_includes_persisted_counts(self):
+        index = PopularityIndex.build(self.ITEMS, {4: 100}, k=2)
+        assert index.top == [(4, 110), (0, 50)]
+
+    def test_pending_delta_lifts_item_outside_top_k(self):
+        index = PopularityIndex.build(self.ITEMS, {}, k=2)
+        assert index.ranked({3: 35, 99: 1000}, 3) == [(3, 55), (0, 50), (1, 40)]
+
+
+class TestViewCounters:
+    def test_flush_writes_deltas_in_one_batch(self):
+        store = MagicMock()
+        counters = ViewCounters(lambda: store)
+        for _ in range(3):
+            counters.record("knowledge", 1)
+        counters.record("sop", 2)
+
+        assert counters.pending("knowledge") == {1: 3}
+        assert counters.flush() == 4
+        store.add_view_counts.assert_any_call("knowledge", {1: 3})
+        store.add_view_counts.assert_any_call("sop", {2: 1})
+        assert counters.pending("knowledge") == {}
+
+    def test_failed_flush_keeps_deltas(self):
+        store = MagicMock()
+        store.add_view_counts.side_effect = OSError("disk full")
+        counters = ViewCounters(lambda: store)
+        counters.record("knowledge", 1)
+
+        assert counters.flush() == 0
+        assert counters.pending("knowledge") == {1: 1}
+
+    def test_trending_is_local_without_redis(self):
+        counters = ViewCounters(MagicMock, half_life=HOUR)
+        counters.record("knowledge", 1, now=0.0)
+        counters.record("knowledge", 2, now=HOUR)
+        counters.record("knowledge", 2, now=HOUR)
+        assert [item_id for item_id, _ in counters.trending("knowledge", 5, now=HOUR)] == [2, 1]
+
+
+class TestJsonPersistence:
+    def test_add_view_counts_accumulates(self, tmp_path):
+        dal = DataAccessLayer(use_postgresql=False)
+        dal.data_dir = str(tmp_path)
+        assert dal.get_view_counts_version() is None
+
+        dal.add_view_counts("knowledge", {1: 2, 3: 1})
+        dal.add_view_counts("knowledge", {1: 5})
+        dal.add_view_counts("sop", {1: 7})
+
+        assert dal.get_view_counts("knowledge") == {1: 7, 3: 1}
+        assert dal.get_view_count("sop", 1) == 7
+        assert dal.get_view_count("sop", 3) == 0
+
+
+class TestEndpoints:
+    def _write_knowledge(self, tmp_path, views):
+        items = [
+            {"id": i, "title": f"k{i}", "summary": "", "category": "c", "tags": [], "views": v}
+            for i, v in enumerate(views, start=1)
+        ]
+        (tmp_path / "knowledge.json").write_text(json.dumps(items), encoding="utf-8")
+
+    def test_popular_reflects_views_without_rewriting_data(self, client, auth_headers, tmp_path):
+        self._write_knowledge(tmp_path, [10, 5, 1])
+        before = (tmp_path / "knowledge.json").read_text(encoding="utf-8")
+
+        for _ in range(6):
+            assert client.get("/api/v1/knowledge/3", headers=auth_headers).status_code == 200
+
+        resp = client.get("/api/v1/knowledge/popular?limit=2", headers=auth_headers)
+        data = resp.get_json()["data"]
+        assert [(k["id"], k["views"]) for k in data] == [(1, 10), (3, 7)]
+        assert (tmp_path / "knowledge.json").read_text(encoding="utf-8") == before
+
+    def test_flush_persists_counts(self, client, auth_headers, tmp_path):
+        import app_helpers
+
+        self._write_knowledge(tmp_path, [0])
+        client.get("/api/v1/knowledge/1", headers=auth_headers)
+        app_helpers.flush_view_counters()
+
+        dal = app_helpers._view_count_store(str(tmp_path))
+        assert dal.get_view_counts("knowledge") == {1: 1}
+
+        resp = client.get("/api/v1/knowledge/1", headers=auth_headers)
+        assert resp.get_json()["data"]["views"] == 2
+
+    def test_trending(self, client, auth_headers, tmp_path):
+        self._write_knowledge(tmp_path, [100, 0])
+        client.get("/api/v1/knowledge/2", headers=auth_headers)
+
+        resp = client.get("/api/v1/knowledge/trending", headers=auth_headers)
+        assert resp.status_code == 200
+        assert [k["id"] for k in resp.get_json()["data"]] == [2]